@@ -1,34 +1,196 @@
 import logging
 import os
+import threading
+import time
+import uuid
+import weakref
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
 
 from agents.offer_negotiation.core.repositories.mock_deal_repository import (
     MockDealRepository,
 )
-from agents.offer_negotiation.graph.graph import create_agent_graph
+from agents.offer_negotiation.graph.interfaces import NODE_METADATA
 from agents.offer_negotiation.graph.state import DealContextState, FinalState
+from agents.offer_negotiation.graph.utils import NodeWrapper
 from agents.offer_negotiation.knowledge.domain_documents import (
     DocumentProcessor,
     load_domain_documents,
 )
 from agents.offer_negotiation.knowledge.domain_knowledge_base import DomainKnowledgeBase
+from agents.offer_negotiation.utils.agent_settings import (
+    CheckpointSettings,
+    NodeCacheSettings,
+    OfferAnalyticsSettings,
+    ResultStoreSettings,
+    StrategyIndexSettings,
+    load_agent_settings,
+)
 from agents.offer_negotiation.utils.logging import setup_logging
+from agents.offer_negotiation.utils.memory_tracking import MemoryTracker
+from agents.offer_negotiation.utils.model import get_llm
+from agents.offer_negotiation.utils.node_cache import NodeCache
+from agents.offer_negotiation.utils.node_events import get_node_event_publisher
+from agents.offer_negotiation.utils.profiling import NodeProfiler
+from agents.offer_negotiation.utils.state_usage import StatePruner
+from agents.offer_negotiation.utils.timeouts import NodeTimeouts
 from config.app_config import config
 
-# Configure logging
 logger = logging.getLogger(__name__)
-setup_logging()
 
 
-def run_agent(
-    deal_id: str,
-    model_settings: dict = None,
-) -> dict:
-    """Run the graph-based negotiation agent and return the final state."""
-    # Set the project name for LangSmith using config
-    os.environ["LANGCHAIN_PROJECT"] = config.langchain_project
+def default_node_wrappers() -> List[NodeWrapper]:
+    """Return the node wrappers enabled through configuration."""
+    wrappers: List[NodeWrapper] = []
+    settings = load_agent_settings()
+    if settings.state_pruning.enabled:
+        wrappers.append(
+            StatePruner(
+                settings.state_pruning.skip_nodes, settings.state_pruning.drop_fields
+            )
+        )
+    if settings.node_timeouts:
+        wrappers.append(NodeTimeouts(settings.node_timeouts))
+    if settings.node_cache.enabled:
+        wrappers.append(create_node_cache(settings.node_cache))
+    if config.profile_enabled:
+        wrappers.append(NodeProfiler())
+    if config.memory_tracking_enabled:
+        wrappers.append(MemoryTracker())
+    if settings.cockpit.enabled:
+        wrappers.append(get_node_event_publisher())
+    return wrappers
 
-    # Set up repositories and knowledge base
-    deal_repo = MockDealRepository()
+
+def resolve_path(path: str) -> Path:
+    """Resolve a path of agent_settings.yaml against the app base dir."""
+    path = Path(path)
+    return path if path.is_absolute() else config.base_dir / path
+
+
+def create_checkpointer(settings: CheckpointSettings):
+    """Return the checkpointer configured in agent_settings.yaml.
+
+    Graphs built with the same settings share one checkpointer per process.
+
+    Returns:
+        SqliteCheckpointer, or None when checkpointing is disabled
+    """
+    if not settings.enabled:
+        return None
+    return _open_checkpointer(resolve_path(settings.path))
+
+
+@lru_cache(maxsize=None)
+def _open_checkpointer(path: Path):
+    # langgraph is imported on first use
+    from agents.offer_negotiation.graph.checkpointer import SqliteCheckpointer
+
+    return SqliteCheckpointer(path)
+
+
+def create_result_store(settings: ResultStoreSettings):
+    """Return the result store configured in agent_settings.yaml.
+
+    Stores with the same settings are shared per process.
+
+    Returns:
+        ResultStore, or None when the store is disabled
+    """
+    if not settings.enabled:
+        return None
+    return _open_result_store(resolve_path(settings.path))
+
+
+@lru_cache(maxsize=None)
+def _open_result_store(path: Path):
+    from agents.offer_negotiation.core.repositories.result_store import ResultStore
+
+    return ResultStore(path)
+
+
+def create_strategy_index(
+    settings: StrategyIndexSettings, result_store: ResultStoreSettings
+):
+    """Return the index of past strategies configured in agent_settings.yaml.
+
+    The index is kept in the database of the result store and is shared per
+    process.
+
+    Returns:
+        StrategyIndex, or None when retrieval of past strategies is disabled
+    """
+    if not settings.enabled:
+        return None
+    return _open_strategy_index(
+        resolve_path(result_store.path), settings.max_candidates
+    )
+
+
+@lru_cache(maxsize=None)
+def _open_strategy_index(path: Path, max_candidates: int):
+    from agents.offer_negotiation.knowledge.strategy_index import StrategyIndex
+
+    return StrategyIndex(path, max_candidates)
+
+
+def create_node_cache(settings: NodeCacheSettings) -> NodeCache:
+    """Create the node cache configured in agent_settings.yaml.
+
+    Raises:
+        ValueError: If a cached node has no metadata in graph/interfaces.py
+    """
+    unknown = [name for name in settings.nodes if name not in NODE_METADATA]
+    if unknown:
+        raise ValueError(f"Cannot cache nodes without metadata: {unknown}")
+    disk_path = resolve_path(settings.disk_path) if settings.disk_path else None
+    return NodeCache(
+        {name: NODE_METADATA[name] for name in settings.nodes},
+        max_entries=settings.max_entries,
+        disk_path=disk_path,
+        max_disk_entries=settings.max_disk_entries,
+    )
+
+
+# Offer analytics of each deal repository, with the max_deals they were built
+# with; entries go away with their repository
+_offer_analytics: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_offer_analytics_lock = threading.Lock()
+
+
+def create_offer_analytics(deal_repo: Any, settings: OfferAnalyticsSettings):
+    """Return the offer analytics of a deal repository.
+
+    The offers of a repository are parsed once per process and shared by the
+    graphs built on it.
+
+    Returns:
+        OfferAnalytics, or None when offer analytics are disabled
+    """
+    if not settings.enabled:
+        return None
+    from agents.offer_negotiation.core.analytics.offer_analytics import (
+        OfferAnalytics,
+    )
+
+    with _offer_analytics_lock:
+        max_deals, analytics = _offer_analytics.get(deal_repo, (None, None))
+        if analytics is None or max_deals != settings.max_deals:
+            analytics = OfferAnalytics.from_deals(
+                deal_repo.iter_deals(), settings.max_deals
+            )
+            _offer_analytics[deal_repo] = (settings.max_deals, analytics)
+        return analytics
+
+
+@lru_cache(maxsize=None)
+def _default_deal_repo() -> MockDealRepository:
+    return MockDealRepository()
+
+
+def load_knowledge_base() -> DomainKnowledgeBase:
+    """Create a knowledge base loaded with the configured domain documents."""
     knowledge_base = DomainKnowledgeBase()
 
     # Load and process domain documents
@@ -38,10 +200,81 @@ def run_agent(
         chunks = processor.parse(doc)
         knowledge_base.add_document_chunks(chunks)
     logger.info(f"Loaded {len(documents)} domain documents into knowledge base")
+    return knowledge_base
+
+
+def build_agent(
+    deal_repo: Optional[MockDealRepository] = None,
+    knowledge_base: Optional[DomainKnowledgeBase] = None,
+    llm: Optional[Any] = None,
+    node_wrappers: Optional[Sequence[NodeWrapper]] = None,
+    checkpointer: Any = None,
+    strategy_index: Any = None,
+):
+    """Build and compile the agent graph so it can be invoked repeatedly.
 
-    # Create the agent graph
-    agent_graph = create_agent_graph(deal_repo, knowledge_base).compile()
+    Args:
+        deal_repo: Deal repository; defaults to a MockDealRepository shared
+            by the graphs of the process
+        knowledge_base: Knowledge base; defaults to load_knowledge_base()
+        llm: Chat model used for strategy generation; defaults to get_llm()
+        node_wrappers: Wrappers applied to every graph node; defaults to the
+            wrappers enabled through configuration (e.g. AGENT_PROFILE)
+        checkpointer: Checkpoint saver of the runs; defaults to the one
+            configured in agent_settings.yaml, and False disables it
+        strategy_index: Index of the past strategies retrieved for the
+            prompt; defaults to the one configured in agent_settings.yaml, and
+            False disables it
 
+    Returns:
+        Compiled agent graph
+    """
+    # Set up repositories and knowledge base
+    if deal_repo is None:
+        deal_repo = _default_deal_repo()
+    if knowledge_base is None:
+        knowledge_base = load_knowledge_base()
+
+    # Create the agent graph (langgraph is imported on first build)
+    from agents.offer_negotiation.graph.graph import create_agent_graph
+
+    if node_wrappers is None:
+        node_wrappers = default_node_wrappers()
+    for wrapper in node_wrappers:
+        if isinstance(wrapper, (MemoryTracker, NodeCache)):
+            wrapper.knowledge_base = knowledge_base
+    settings = load_agent_settings()
+    if checkpointer is None:
+        checkpointer = create_checkpointer(settings.checkpointing)
+    if strategy_index is None:
+        strategy_index = create_strategy_index(
+            settings.strategy_index, settings.result_store
+        )
+    workflow = create_agent_graph(
+        deal_repo,
+        knowledge_base,
+        node_wrappers,
+        llm,
+        offer_analytics=create_offer_analytics(deal_repo, settings.offer_analytics),
+        strategy_index=strategy_index or None,
+    )
+    return workflow.compile(checkpointer=checkpointer or None)
+
+
+def invoke_agent(agent_graph, deal_id: str, run_id: Optional[str] = None) -> dict:
+    """Run a compiled agent graph for a deal and return the final state.
+
+    With a checkpointer, the run is checkpointed under the thread
+    ``<deal_id>:<run_id>``. Invoking a deal again with the run ID of a failed
+    run resumes it from the node that failed, and with the run ID of a
+    completed run returns its final state. Runs without a run ID are deleted
+    from the checkpointer once completed.
+
+    Args:
+        agent_graph: Compiled agent graph
+        deal_id: ID of the deal to negotiate
+        run_id: ID of the run; ignored without a checkpointer
+    """
     # Prepare initial state for the graph
     initial_state = DealContextState(
         deal_id=deal_id,
@@ -52,7 +285,107 @@ def run_agent(
     )
 
     # Run the graph
-    result = agent_graph.invoke(initial_state)
+    if not agent_graph.checkpointer:
+        result = agent_graph.invoke(initial_state)
+    else:
+        result = _invoke_checkpointed(agent_graph, initial_state, run_id)
 
     final_state = FinalState(**result)
     return final_state.model_dump()
+
+
+def _invoke_checkpointed(
+    agent_graph, initial_state: DealContextState, run_id: Optional[str]
+) -> dict:
+    """Invoke a graph under the thread of a run, resuming it if it failed."""
+    keep = run_id is not None
+    run_id = run_id or uuid.uuid4().hex
+    thread_id = f"{initial_state.deal_id}:{run_id}"
+    run_config = {"configurable": {"thread_id": thread_id}}
+    checkpointer = agent_graph.checkpointer
+
+    try:
+        snapshot = agent_graph.get_state(run_config)
+        if snapshot.next:
+            logger.info(f"Resuming run {thread_id} at {', '.join(snapshot.next)}")
+            graph_input = None
+        elif snapshot.values:
+            logger.info(f"Run {thread_id} already completed")
+            return snapshot.values
+        else:
+            graph_input = initial_state
+
+        try:
+            result = agent_graph.invoke(graph_input, run_config)
+        except Exception:
+            logger.error(
+                f"Run {thread_id} failed; invoke the deal with run_id={run_id!r} "
+                "to resume it"
+            )
+            raise
+    finally:
+        # Kept runs are read back from SQLite when invoked again
+        if keep and hasattr(checkpointer, "release"):
+            checkpointer.release(thread_id)
+    if not keep:
+        checkpointer.delete_thread(thread_id)
+    return result
+
+
+def run_agent(
+    deal_id: str,
+    model_settings: dict = None,
+    node_wrappers: Optional[Sequence[NodeWrapper]] = None,
+    llm: Optional[Any] = None,
+    run_id: Optional[str] = None,
+    result_store: Any = None,
+    agent_graph: Any = None,
+) -> dict:
+    """Run the graph-based negotiation agent and return the final state.
+
+    Args:
+        deal_id: ID of the deal to negotiate
+        model_settings: Model settings loaded from model_settings.yaml
+        node_wrappers: Wrappers applied to every graph node; defaults to the
+            wrappers enabled through configuration (e.g. AGENT_PROFILE)
+        llm: Chat model to use; defaults to get_llm(model_settings)
+        run_id: ID of the run; a failed run is resumed by running the deal
+            again with its run ID
+        result_store: Store of the final state; defaults to the one
+            configured in agent_settings.yaml, and False disables it
+        agent_graph: Compiled graph to invoke (see build_agent), so a batch of
+            deals builds it once; defaults to a graph built with llm and
+            node_wrappers
+    """
+    # Configure logging on first use rather than at import
+    setup_logging()
+
+    # Set the project name for LangSmith using config
+    os.environ["LANGCHAIN_PROJECT"] = config.langchain_project
+
+    if llm is None and model_settings is not None:
+        llm = get_llm(model_settings)
+
+    if agent_graph is None:
+        agent_graph = build_agent(llm=llm, node_wrappers=node_wrappers)
+    start = time.perf_counter()
+    result = invoke_agent(agent_graph, deal_id, run_id)
+    latency = time.perf_counter() - start
+
+    if result_store is None:
+        result_store = create_result_store(load_agent_settings().result_store)
+    if result_store:
+        result_store.append(result, latency, model_id(llm, model_settings))
+    return result
+
+
+def model_id(llm: Optional[Any], model_settings: Optional[dict] = None) -> str:
+    """Return an identifier of the model generating the strategies."""
+    if model_settings is None and llm is not None:
+        name = getattr(llm, "model_name", None) or getattr(llm, "model", None)
+        return str(name or getattr(llm, "_llm_type", type(llm).__name__))
+    if model_settings is None:
+        from agents.offer_negotiation.utils.model import load_model_settings
+
+        model_settings = load_model_settings()
+    return f"{model_settings.get('provider', 'openai')}:{model_settings.get('model')}"
@@ -0,0 +1,388 @@
+"""Batch runs of the agent shared by workers on any number of machines.
+
+A batch of deal IDs is submitted to the work queue (a SQLite file every
+worker can open, see core/repositories/work_queue.py). Workers claim deals a
+few at a time, run the agent on them with one compiled graph per worker, and
+renew the leases of the claimed deals from a heartbeat thread while they
+run; the deals of a worker that stops renewing are claimed by the others once
+their lease expires. The progress and throughput of the batch can be queried
+from any machine while it runs.
+
+Usage:
+    python -m agents.offer_negotiation.batch submit renewals --synthetic 500000
+    python -m agents.offer_negotiation.batch submit renewals --deals-file ids.txt
+    python -m agents.offer_negotiation.batch work renewals --processes 8 \\
+        --synthetic 500000
+    python -m agents.offer_negotiation.batch status renewals --watch 10
+"""
+
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Set
+
+from pydantic import BaseModel
+
+from agents.offer_negotiation.core.repositories.work_queue import (
+    BatchProgress,
+    WorkQueue,
+)
+from agents.offer_negotiation.utils.agent_settings import (
+    WorkQueueSettings,
+    load_agent_settings,
+)
+
+logger = logging.getLogger(__name__)
+
+# Runs the agent for a deal; its close attribute, if any, is called once the
+# worker process stops
+Runner = Callable[[str], Any]
+
+
+class WorkerStats(BaseModel):
+    """Deals handled by a worker."""
+
+    worker: str
+    done: int = 0
+    failed: int = 0
+    lost: int = 0
+    seconds: float = 0.0
+
+
+def open_work_queue(
+    settings: Optional[WorkQueueSettings] = None, path: Optional[Path] = None
+) -> WorkQueue:
+    """Open the work queue configured in agent_settings.yaml.
+
+    Args:
+        settings: Work queue settings; defaults to agent_settings.yaml
+        path: SQLite file of the queue; defaults to the configured one
+    """
+    from agents.offer_negotiation.agent import resolve_path
+
+    if settings is None:
+        settings = load_agent_settings().work_queue
+    return WorkQueue(
+        path or resolve_path(settings.path),
+        shards=settings.shards,
+        lease_seconds=settings.lease_seconds,
+        max_attempts=settings.max_attempts,
+        journal_mode=settings.journal_mode,
+    )
+
+
+def agent_runner(synthetic_deals: Optional[int] = None) -> Runner:
+    """Return a function running the agent for a deal with one compiled graph.
+
+    Results are stored like those of run_agent, and committed before the
+    function returns: a deal is only completed in the work queue once its
+    result is stored.
+
+    Args:
+        synthetic_deals: Serve this many synthetic deals instead of the mock
+            deal repository
+    """
+    from agents.offer_negotiation.agent import (
+        build_agent,
+        create_result_store,
+        invoke_agent,
+        model_id,
+    )
+    from agents.offer_negotiation.utils.logging import setup_logging
+    from config.app_config import config
+
+    setup_logging()
+    os.environ["LANGCHAIN_PROJECT"] = config.langchain_project
+
+    deal_repo = None
+    if synthetic_deals is not None:
+        from agents.offer_negotiation.core.repositories.synthetic_deal_repository import (
+            SyntheticDealRepository,
+        )
+
+        deal_repo = SyntheticDealRepository(synthetic_deals)
+    agent_graph = build_agent(deal_repo=deal_repo)
+    result_store = create_result_store(load_agent_settings().result_store)
+    model = model_id(None)
+
+    def run(deal_id: str) -> dict:
+        start = time.perf_counter()
+        result = invoke_agent(agent_graph, deal_id)
+        if result_store:
+            result_store.append(result, time.perf_counter() - start, model)
+            result_store.flush()
+        return result
+
+    run.close = result_store.close if result_store else lambda: None
+    return run
+
+
+def run_worker(
+    queue: WorkQueue,
+    batch: str,
+    worker: str,
+    run: Runner,
+    claim_size: int = 10,
+    poll_interval: float = 5.0,
+    stop: Optional[threading.Event] = None,
+) -> WorkerStats:
+    """Run the deals of a batch until none is pending or leased.
+
+    Args:
+        queue: Work queue of the batch
+        batch: Name of the batch
+        worker: ID of the worker, stable across restarts so it keeps its shards
+        run: Runs the agent for a deal; an exception fails the attempt
+        claim_size: Deals leased per claim
+        poll_interval: Seconds between claims while the remaining deals are
+            leased by other workers
+        stop: Stops the worker after its current deal; its other leased deals
+            are handed back
+
+    Returns:
+        Deals handled by the worker
+    """
+    stop = stop or threading.Event()
+    stats = WorkerStats(worker=worker)
+    start = time.perf_counter()
+    held: Set[str] = set()
+    held_lock = threading.Lock()
+    renewing = threading.Event()
+
+    def renew_leases() -> None:
+        while not renewing.wait(queue.lease_seconds / 3):
+            with held_lock:
+                claimed = set(held)
+            still_held = set(queue.renew(batch, worker, claimed))
+            lost = claimed - still_held
+            if lost:
+                logger.warning(f"{worker} lost the leases of {sorted(lost)}")
+                with held_lock:
+                    held.difference_update(lost)
+
+    queue.join(batch, worker)
+    renewer = threading.Thread(
+        target=renew_leases, name=f"lease-renewal-{worker}", daemon=True
+    )
+    renewer.start()
+    try:
+        while not stop.is_set():
+            deal_ids = queue.claim(batch, worker, claim_size)
+            if not deal_ids:
+                if queue.remaining(batch) == 0:
+                    break
+                # Deals leased by other workers are claimable once they expire
+                stop.wait(poll_interval)
+                continue
+            with held_lock:
+                held.update(deal_ids)
+            for deal_id in deal_ids:
+                if stop.is_set():
+                    break
+                with held_lock:
+                    if deal_id not in held:
+                        stats.lost += 1
+                        continue
+                try:
+                    run(deal_id)
+                except Exception as e:
+                    logger.warning(f"{worker} failed to run {deal_id}: {e}")
+                    finished = queue.fail(batch, worker, deal_id, str(e))
+                    stats.failed += finished
+                else:
+                    finished = queue.complete(batch, worker, deal_id)
+                    stats.done += finished
+                if not finished:
+                    stats.lost += 1
+                with held_lock:
+                    held.discard(deal_id)
+    finally:
+        renewing.set()
+        renewer.join()
+        queue.leave(batch, worker)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def _work_process(
+    path: Path,
+    settings: WorkQueueSettings,
+    batch: str,
+    worker: str,
+    run_factory: Callable[[], Runner],
+) -> WorkerStats:
+    queue = open_work_queue(settings, path)
+    run = run_factory()
+    try:
+        return run_worker(
+            queue,
+            batch,
+            worker,
+            run,
+            claim_size=settings.claim_size,
+            poll_interval=settings.poll_interval,
+        )
+    finally:
+        close = getattr(run, "close", None)
+        if close is not None:
+            close()
+        queue.close()
+
+
+def run_local_workers(
+    batch: str,
+    processes: int,
+    worker_prefix: Optional[str] = None,
+    run_factory: Optional[Callable[[], Runner]] = None,
+    settings: Optional[WorkQueueSettings] = None,
+    path: Optional[Path] = None,
+) -> List[WorkerStats]:
+    """Run the deals of a batch with worker processes on this machine.
+
+    Args:
+        batch: Name of the batch
+        processes: Worker processes
+        worker_prefix: Prefix of the worker IDs, numbered from 0; defaults to
+            the host name
+        run_factory: Returns the runner of a worker process; it is pickled to
+            the processes. Defaults to agent_runner
+        settings: Work queue settings; defaults to agent_settings.yaml
+        path: SQLite file of the queue; defaults to the configured one
+
+    Returns:
+        Deals handled by each worker
+    """
+    from agents.offer_negotiation.agent import resolve_path
+
+    if processes < 1:
+        raise ValueError("processes must be positive")
+    settings = settings or load_agent_settings().work_queue
+    path = path or resolve_path(settings.path)
+    worker_prefix = worker_prefix or socket.gethostname()
+    run_factory = run_factory or agent_runner
+    workers = [f"{worker_prefix}-{i}" for i in range(processes)]
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [
+            executor.submit(_work_process, path, settings, batch, worker, run_factory)
+            for worker in workers
+        ]
+        return [future.result() for future in futures]
+
+
+def format_progress(progress: BatchProgress) -> str:
+    """Return a human-readable summary of the progress of a batch."""
+    percent = 100 * (progress.done + progress.failed) / max(progress.total, 1)
+    eta = (
+        f"{progress.eta_seconds / 60:.1f} min"
+        if progress.eta_seconds is not None
+        else "-"
+    )
+    lines = [
+        f"{progress.batch}: {progress.done}/{progress.total} done, "
+        f"{progress.failed} failed, {progress.leased} leased, "
+        f"{progress.pending} pending ({percent:.1f}%)",
+        f"  {progress.recent_deals_per_second:.2f} deals/s recently, "
+        f"{progress.deals_per_second:.2f} deals/s overall, ETA {eta}",
+    ]
+    for worker in progress.workers:
+        state = "alive" if worker.alive else "gone"
+        lines.append(
+            f"  {worker.worker} ({state}): {worker.done} done, "
+            f"{worker.failed} failed, {worker.leased} leased"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Run a batch of deals with workers on several machines."
+    )
+    parser.add_argument("--path", type=Path, help="SQLite file of the work queue")
+    parser.add_argument("--log-level", default="WARNING", help="Log level")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Add deals to a batch")
+    submit.add_argument("batch", help="Name of the batch")
+    deals = submit.add_mutually_exclusive_group(required=True)
+    deals.add_argument("--deal-id", nargs="+", help="Deals to run")
+    deals.add_argument("--deals-file", type=Path, help="File of deal IDs, one per line")
+    deals.add_argument("--synthetic", type=int, help="Synthetic deals to run")
+
+    work = commands.add_parser("work", help="Run the deals of a batch")
+    work.add_argument("batch", help="Name of the batch")
+    work.add_argument("--processes", type=int, default=1, help="Worker processes")
+    work.add_argument(
+        "--worker-prefix", help="Prefix of the worker IDs; defaults to the host name"
+    )
+    work.add_argument(
+        "--synthetic", type=int, help="Serve this many synthetic deals to the agent"
+    )
+
+    status = commands.add_parser("status", help="Show the progress of a batch")
+    status.add_argument("batch", help="Name of the batch")
+    status.add_argument(
+        "--watch", type=float, help="Refresh every this many seconds until done"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Any:
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level)
+    settings = load_agent_settings().work_queue
+
+    if args.command == "work":
+        runner = partial(agent_runner, args.synthetic)
+        stats = run_local_workers(
+            args.batch,
+            args.processes,
+            worker_prefix=args.worker_prefix,
+            run_factory=runner,
+            settings=settings,
+            path=args.path,
+        )
+        for worker in stats:
+            print(
+                f"{worker.worker}: {worker.done} done, {worker.failed} failed, "
+                f"{worker.lost} lost in {worker.seconds:.1f}s"
+            )
+        return stats
+
+    queue = open_work_queue(settings, args.path)
+    try:
+        if args.command == "submit":
+            if args.deal_id:
+                deal_ids = args.deal_id
+            elif args.deals_file:
+                with open(args.deals_file, "r") as f:
+                    deal_ids = [line.strip() for line in f if line.strip()]
+            else:
+                from agents.offer_negotiation.core.repositories.synthetic_deal_repository import (
+                    SyntheticDealRepository,
+                )
+
+                deal_ids = SyntheticDealRepository(args.synthetic).list_deal_ids()
+            added = queue.submit(args.batch, deal_ids)
+            print(f"Added {added} deals to {args.batch}")
+            return added
+
+        while True:
+            progress = queue.progress(args.batch)
+            print(format_progress(progress))
+            if not args.watch or progress.finished:
+                return progress
+            time.sleep(args.watch)
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
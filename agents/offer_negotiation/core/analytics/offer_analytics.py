@@ -0,0 +1,382 @@
+"""Offer trajectory analytics across the deal book.
+
+The offers of all deals are parsed once (see ``offer_amounts``) into columnar
+NumPy arrays: one row per offer, with the premium and deductible it proposes,
+and per-deal columns for the line of business, territory and offer count.
+Trajectory metrics are computed for every deal at once:
+
+- premium concession rate: premium reduction from the first to the last
+  offer, relative to the first premium, per negotiation round
+- deductible change: relative change of the deductible over the negotiation
+- premium/deductible elasticity: relative premium change divided by the
+  relative deductible change
+- rounds to close: number of offers exchanged (deals carry no dates, so the
+  round count stands in for the time to close)
+
+Segment statistics by line of business and territory are summarized as
+compact numbers for the strategy prompt (see ``OfferAnalytics.summarize``).
+"""
+
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from agents.offer_negotiation.core.features.deal_features import (
+    OfferTerms,
+    offer_amounts,
+)
+
+# Columns a segment can be grouped by
+SEGMENT_COLUMNS = ("line_of_business", "territory")
+
+UNKNOWN_SEGMENT = "Unknown"
+
+
+class OfferSegmentStats(BaseModel):
+    """Offer trajectory statistics of a segment of the deal book."""
+
+    line_of_business: Optional[str] = None
+    territory: Optional[str] = None
+    deals: int
+    offers: int
+    mean_premium_concession_rate: Optional[float] = None
+    mean_deductible_change: Optional[float] = None
+    mean_elasticity: Optional[float] = None
+    mean_rounds: Optional[float] = None
+
+    @property
+    def label(self) -> str:
+        """Return a readable name of the segment."""
+        parts = [p for p in (self.line_of_business, self.territory) if p]
+        return " / ".join(parts) or "All deals"
+
+
+def _deal_fields(deal: Any) -> Tuple[Optional[str], Optional[str], List[str]]:
+    """Return the line of business, territory and offers of a deal."""
+    if isinstance(deal, dict):
+        submission = deal.get("submission") or {}
+        negotiation = deal.get("negotiation_context") or {}
+        return (
+            submission.get("line_of_business"),
+            submission.get("territory"),
+            negotiation.get("offers") or [],
+        )
+    return (
+        deal.submission.line_of_business,
+        deal.submission.territory,
+        deal.negotiation_context.offers,
+    )
+
+
+def _nan_group_means(
+    values: np.ndarray, groups: np.ndarray, group_count: int
+) -> np.ndarray:
+    """Return the mean of the finite values of each group (NaN if none)."""
+    finite = np.isfinite(values)
+    counts = np.bincount(groups[finite], minlength=group_count)
+    sums = np.bincount(groups[finite], weights=values[finite], minlength=group_count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def _optional(value: float) -> Optional[float]:
+    return float(value) if np.isfinite(value) else None
+
+
+class OfferAnalytics:
+    """Columnar offer trajectories of a deal book."""
+
+    def __init__(
+        self,
+        lines_of_business: Sequence[Optional[str]],
+        territories: Sequence[Optional[str]],
+        offer_counts: Sequence[int],
+        premium: Sequence[Optional[float]],
+        deductible: Sequence[Optional[float]],
+    ):
+        """Build the offer columns.
+
+        Args:
+            lines_of_business: Line of business of each deal
+            territories: Territory of each deal
+            offer_counts: Number of offers of each deal
+            premium: Premium of each offer, deal after deal in negotiation
+                order (None when not stated)
+            deductible: Deductible of each offer, aligned with ``premium``
+
+        Raises:
+            ValueError: If the columns differ in length
+        """
+        if not len(lines_of_business) == len(territories) == len(offer_counts):
+            raise ValueError(
+                "Expected one line of business, territory and count per deal"
+            )
+        if not len(premium) == len(deductible) == sum(offer_counts):
+            raise ValueError("Expected one premium and deductible per offer")
+
+        self.segment_labels: Dict[str, np.ndarray] = {}
+        self.segment_codes: Dict[str, np.ndarray] = {}
+        for column, values in zip(SEGMENT_COLUMNS, (lines_of_business, territories)):
+            labels, codes = np.unique(
+                np.array([v or UNKNOWN_SEGMENT for v in values], dtype=object),
+                return_inverse=True,
+            )
+            self.segment_labels[column] = labels
+            self.segment_codes[column] = codes.reshape(-1).astype(np.int64)
+
+        self.offer_counts = np.asarray(offer_counts, dtype=np.int64).reshape(-1)
+        self.offer_starts = np.cumsum(self.offer_counts) - self.offer_counts
+        self.premium = np.array(premium, dtype=np.float64).reshape(-1)
+        self.deductible = np.array(deductible, dtype=np.float64).reshape(-1)
+
+        self._metrics: Optional[Dict[str, np.ndarray]] = None
+        self._segments: Dict[Tuple[str, ...], Dict[tuple, OfferSegmentStats]] = {}
+
+    @classmethod
+    def from_offers(
+        cls,
+        lines_of_business: Sequence[Optional[str]],
+        territories: Sequence[Optional[str]],
+        offers: Sequence[Sequence[OfferTerms]],
+    ) -> "OfferAnalytics":
+        """Build the analytics from the parsed offers of each deal."""
+        flat = [offer for deal_offers in offers for offer in deal_offers]
+        return cls(
+            lines_of_business,
+            territories,
+            [len(deal_offers) for deal_offers in offers],
+            [offer.premium for offer in flat],
+            [offer.deductible for offer in flat],
+        )
+
+    @classmethod
+    def from_deals(
+        cls, deals: Iterable[Any], max_deals: Optional[int] = None
+    ) -> "OfferAnalytics":
+        """Parse the offers of a deal book.
+
+        Each distinct offer text is parsed once; templated offers repeated
+        across deals cost a dictionary lookup.
+
+        Args:
+            deals: DealContext models or deal dictionaries
+            max_deals: Maximum number of deals read from ``deals``
+
+        Returns:
+            Offer analytics of the deals
+        """
+        lines, territories, counts, premium, deductible = [], [], [], [], []
+        parsed: Dict[str, tuple] = {}
+        for deal in islice(deals, max_deals):
+            line_of_business, territory, texts = _deal_fields(deal)
+            lines.append(line_of_business)
+            territories.append(territory)
+            counts.append(len(texts))
+            for text in texts:
+                amounts = parsed.get(text)
+                if amounts is None:
+                    amounts = parsed[text] = offer_amounts(text)
+                premium.append(amounts[0])
+                deductible.append(amounts[1])
+        return cls(lines, territories, counts, premium, deductible)
+
+    @property
+    def deal_count(self) -> int:
+        return len(self.offer_counts)
+
+    def deal_metrics(self) -> Dict[str, np.ndarray]:
+        """Return the trajectory metrics of every deal (NaN when undefined).
+
+        Returns:
+            Arrays ``premium_concession_rate``, ``deductible_change``,
+            ``elasticity`` and ``rounds``, one value per deal
+        """
+        if self._metrics is None:
+            self._metrics = _trajectory_metrics(
+                self.premium, self.deductible, self.offer_starts, self.offer_counts
+            )
+        return self._metrics
+
+    def segment_stats(
+        self, by: Sequence[str] = SEGMENT_COLUMNS
+    ) -> Dict[tuple, OfferSegmentStats]:
+        """Return the statistics of each segment of the deal book.
+
+        Args:
+            by: Segment columns (see SEGMENT_COLUMNS); empty for the whole book
+
+        Returns:
+            Statistics keyed by the tuple of segment values
+
+        Raises:
+            ValueError: If a column is not a segment column
+        """
+        by = tuple(by)
+        if by in self._segments:
+            return self._segments[by]
+        for column in by:
+            if column not in SEGMENT_COLUMNS:
+                raise ValueError(f"Unknown segment column: {column}")
+
+        # Combine the per-column codes into one group code per deal
+        keys = np.zeros(self.deal_count, dtype=np.int64)
+        for column in by:
+            keys = keys * len(self.segment_labels[column]) + self.segment_codes[column]
+        group_keys, groups = np.unique(keys, return_inverse=True)
+        groups = groups.reshape(-1)
+        group_count = len(group_keys)
+
+        deals = np.bincount(groups, minlength=group_count)
+        offers = np.bincount(groups, weights=self.offer_counts, minlength=group_count)
+        metrics = self.deal_metrics()
+        means = {
+            name: _nan_group_means(values, groups, group_count)
+            for name, values in metrics.items()
+        }
+
+        # Decode the segment values of each group from its first deal
+        first_deal = np.zeros(group_count, dtype=np.int64)
+        first_deal[groups[::-1]] = np.arange(self.deal_count)[::-1]
+
+        stats = {}
+        for group in range(group_count):
+            values = {
+                column: str(
+                    self.segment_labels[column][
+                        self.segment_codes[column][first_deal[group]]
+                    ]
+                )
+                for column in by
+            }
+            stats[tuple(values[column] for column in by)] = OfferSegmentStats(
+                **values,
+                deals=int(deals[group]),
+                offers=int(offers[group]),
+                mean_premium_concession_rate=_optional(
+                    means["premium_concession_rate"][group]
+                ),
+                mean_deductible_change=_optional(means["deductible_change"][group]),
+                mean_elasticity=_optional(means["elasticity"][group]),
+                mean_rounds=_optional(means["rounds"][group]),
+            )
+        self._segments[by] = stats
+        return stats
+
+    def benchmarks(
+        self, line_of_business: Optional[str], territory: Optional[str]
+    ) -> List[OfferSegmentStats]:
+        """Return the statistics of the segments of a deal, most specific first."""
+        line_of_business = line_of_business or UNKNOWN_SEGMENT
+        territory = territory or UNKNOWN_SEGMENT
+        candidates = [
+            (SEGMENT_COLUMNS, (line_of_business, territory)),
+            (("line_of_business",), (line_of_business,)),
+            ((), ()),
+        ]
+        return [
+            self.segment_stats(by)[key]
+            for by, key in candidates
+            if key in self.segment_stats(by)
+        ]
+
+    def summarize(
+        self,
+        line_of_business: Optional[str],
+        territory: Optional[str],
+        offers: Sequence[OfferTerms],
+    ) -> str:
+        """Summarize a deal's offer trajectory against its segments.
+
+        Args:
+            line_of_business: Line of business of the deal
+            territory: Territory of the deal
+            offers: Parsed offers of the deal
+
+        Returns:
+            Compact lines of numbers for the strategy prompt
+        """
+        deal = OfferAnalytics.from_offers(
+            [line_of_business], [territory], [offers]
+        ).deal_metrics()
+        lines = [
+            f"- This deal: {len(offers)} offers, "
+            + _format_metrics(
+                deal["premium_concession_rate"][0],
+                deal["deductible_change"][0],
+                deal["elasticity"][0],
+            )
+        ]
+        for stats in self.benchmarks(line_of_business, territory):
+            lines.append(
+                f"- {stats.label} (n={stats.deals}): "
+                + _format_metrics(
+                    stats.mean_premium_concession_rate,
+                    stats.mean_deductible_change,
+                    stats.mean_elasticity,
+                )
+                + (
+                    f", {stats.mean_rounds:.1f} rounds to close"
+                    if stats.mean_rounds is not None
+                    else ""
+                )
+            )
+        return "\n".join(lines)
+
+
+def _trajectory_metrics(
+    premium: np.ndarray,
+    deductible: np.ndarray,
+    starts: np.ndarray,
+    counts: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Compute the trajectory metrics of every deal from the offer columns."""
+    has_offers = counts > 0
+    if not len(premium):
+        empty = np.full(len(counts), np.nan)
+        return {
+            "premium_concession_rate": empty,
+            "deductible_change": empty.copy(),
+            "elasticity": empty.copy(),
+            "rounds": empty.copy(),
+        }
+
+    first = np.minimum(starts, len(premium) - 1)
+    last = np.clip(starts + counts - 1, 0, len(premium) - 1)
+    p0 = np.where(has_offers, premium[first], np.nan)
+    p1 = np.where(has_offers, premium[last], np.nan)
+    d0 = np.where(has_offers, deductible[first], np.nan)
+    d1 = np.where(has_offers, deductible[last], np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        premium_change = np.where(p0 > 0, (p1 - p0) / p0, np.nan)
+        deductible_change = np.where(d0 > 0, (d1 - d0) / d0, np.nan)
+        rounds = np.where(has_offers, counts.astype(np.float64), np.nan)
+        concession_rate = np.where(counts > 1, -premium_change / (rounds - 1), np.nan)
+        elasticity = np.where(
+            deductible_change != 0, premium_change / deductible_change, np.nan
+        )
+    return {
+        "premium_concession_rate": concession_rate,
+        "deductible_change": deductible_change,
+        "elasticity": elasticity,
+        "rounds": rounds,
+    }
+
+
+def _format_metrics(
+    concession_rate: Optional[float],
+    deductible_change: Optional[float],
+    elasticity: Optional[float],
+) -> str:
+    def fmt(value: Optional[float], template: str) -> str:
+        if value is None or not np.isfinite(value):
+            return "n/a"
+        return template.format(value)
+
+    return (
+        f"premium concession {fmt(concession_rate, '{:.1%}')}/round, "
+        f"deductible change {fmt(deductible_change, '{:+.1%}')}, "
+        f"premium/deductible elasticity {fmt(elasticity, '{:.2f}')}"
+    )
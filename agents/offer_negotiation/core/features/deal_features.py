@@ -0,0 +1,255 @@
+"""Deal features extracted once per deal and shared across graph nodes.
+
+The ``compute_deal_features`` node runs right after ``fetch_deal_context`` and
+stores a ``DealFeatures`` dump in the state. Downstream nodes read the
+normalized texts, objection categories and parsed amounts from it instead of
+re-scanning the raw deal strings, and heuristic rules can test the amounts
+(see the ``numeric`` conditions of RuleEngine).
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from agents.offer_negotiation.core.models.deal_models import DealContext
+
+# Objection categories and the terms identifying them
+OBJECTION_CATEGORIES: Dict[str, Sequence[str]] = {
+    "premium": ("premium",),
+    "coverage": ("coverage",),
+    "deductible": ("deductible",),
+}
+
+# Information need implied by each objection category
+OBJECTION_CATEGORY_NEEDS: Dict[str, str] = {
+    "premium": "submission.premium_structure",
+    "coverage": "submission.coverage_terms",
+    "deductible": "submission.deductible",
+}
+
+# Numeric features available to heuristic rules
+NUMERIC_FEATURES = (
+    "limit_amount",
+    "deductible_amount",
+    "premium_amount",
+    "offer_count",
+    "latest_offer_premium",
+    "latest_offer_deductible",
+)
+
+_UNITS = {
+    "k": 1e3,
+    "thousand": 1e3,
+    "m": 1e6,
+    "million": 1e6,
+    "b": 1e9,
+    "billion": 1e9,
+}
+
+# A dollar amount with an optional unit, labelled by the term right before
+# ("premium: $250K") or right after it ("$10M limit")
+_MONEY = re.compile(
+    r"(?:\b(?P<before>limit|deductible|premium)\s*:?\s*)?"
+    r"\$\s?(?P<value>\d+(?:,\d{3})*(?:\.\d+)?)"
+    r"(?:\s?(?P<unit>thousand|million|billion|[kmb]\b))?"
+    r"(?:\s+(?P<after>limit|deductible|premium)\b)?"
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Deal texts are often templated, so parsed texts are cached across deals
+_TEXT_CACHE_SIZE = 65_536
+
+
+class MoneyAmount(BaseModel):
+    """Dollar amount found in a deal text."""
+
+    amount: float
+    label: Optional[str] = None
+
+
+class OfferTerms(BaseModel):
+    """Amounts parsed from an offer."""
+
+    text: str
+    premium: Optional[float] = None
+    deductible: Optional[float] = None
+    limit: Optional[float] = None
+
+
+class DealFeatures(BaseModel):
+    """Normalized texts and parsed amounts of a deal."""
+
+    objections: List[str] = Field(default_factory=list)
+    discussion_notes: List[str] = Field(default_factory=list)
+    prior_negotiations: List[str] = Field(default_factory=list)
+    risk_profile: str = ""
+    coverage_terms: str = ""
+    premium_structure: str = ""
+    # None in features extracted before these fields were added
+    line_of_business: Optional[str] = None
+    offer_texts: Optional[List[str]] = None
+    objection_categories: List[str] = Field(default_factory=list)
+    limit_amount: Optional[float] = None
+    deductible_amount: Optional[float] = None
+    premium_amount: Optional[float] = None
+    offers: List[OfferTerms] = Field(default_factory=list)
+
+    @property
+    def latest_offer(self) -> Optional[OfferTerms]:
+        """Return the most recent offer, if any."""
+        return self.offers[-1] if self.offers else None
+
+    def field_texts(self, field: str) -> Optional[List[str]]:
+        """Return the normalized texts of a rule field (see RuleEngine).
+
+        Returns:
+            Texts of the field, item by item; None if the features lack it
+        """
+        value = getattr(self, "offer_texts" if field == "offers" else field)
+        if value is None or isinstance(value, list):
+            return value
+        return [value] if value else []
+
+    def numeric_features(self) -> Dict[str, Optional[float]]:
+        """Return the numeric features (see NUMERIC_FEATURES)."""
+        latest = self.latest_offer
+        return {
+            "limit_amount": self.limit_amount,
+            "deductible_amount": self.deductible_amount,
+            "premium_amount": self.premium_amount,
+            "offer_count": float(len(self.offers)),
+            "latest_offer_premium": latest.premium if latest else None,
+            "latest_offer_deductible": latest.deductible if latest else None,
+        }
+
+
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase a text and collapse its whitespace."""
+    return _WHITESPACE.sub(" ", text or "").strip().lower()
+
+
+def parse_money(value: str, unit: Optional[str] = None) -> float:
+    """Convert a dollar figure such as ``"2.5"`` with unit ``"m"`` to dollars.
+
+    Raises:
+        ValueError: If the value is not a number or the unit is unknown
+    """
+    amount = float(value.replace(",", ""))
+    if unit:
+        unit = unit.lower()
+        if unit not in _UNITS:
+            raise ValueError(f"Unknown money unit: {unit}")
+        amount *= _UNITS[unit]
+    return amount
+
+
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
+def _scan_amounts(text: Optional[str]) -> Tuple[Tuple[float, Optional[str]], ...]:
+    """Return the (amount, label) pairs of a text, in order of appearance."""
+    return tuple(
+        (
+            parse_money(match.group("value"), match.group("unit")),
+            match.group("after") or match.group("before"),
+        )
+        for match in _MONEY.finditer(normalize_text(text))
+    )
+
+
+def extract_amounts(text: Optional[str]) -> List[MoneyAmount]:
+    """Return the dollar amounts of a text, in order of appearance.
+
+    Amounts are labelled ``limit``, ``deductible`` or ``premium`` when that
+    term directly precedes or follows them.
+    """
+    return [
+        MoneyAmount(amount=amount, label=label) for amount, label in _scan_amounts(text)
+    ]
+
+
+def _labelled(
+    amounts: Sequence[Tuple[float, Optional[str]]], label: str
+) -> Optional[float]:
+    """Return the first amount with a label."""
+    return next((amount for amount, found in amounts if found == label), None)
+
+
+def categorize_objection(objection: str) -> List[str]:
+    """Return the categories of a (normalized) objection."""
+    return [
+        category
+        for category, terms in OBJECTION_CATEGORIES.items()
+        if any(term in objection for term in terms)
+    ]
+
+
+def offer_amounts(
+    offer: str,
+) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """Return the premium, deductible and limit proposed by an offer."""
+    amounts = _scan_amounts(offer)
+    return (
+        _labelled(amounts, "premium"),
+        _labelled(amounts, "deductible"),
+        _labelled(amounts, "limit"),
+    )
+
+
+def parse_offer(offer: str) -> OfferTerms:
+    """Parse the amounts of an offer."""
+    premium, deductible, limit = offer_amounts(offer)
+    return OfferTerms(text=offer, premium=premium, deductible=deductible, limit=limit)
+
+
+def extract_deal_features(deal: Union[DealContext, Dict[str, Any]]) -> DealFeatures:
+    """Extract the features of a deal.
+
+    Args:
+        deal: DealContext model or deal dictionary
+
+    Returns:
+        Features of the deal
+    """
+    if isinstance(deal, DealContext):
+        deal = deal.model_dump()
+    submission = deal.get("submission") or {}
+    history = deal.get("client_history") or {}
+    negotiation = deal.get("negotiation_context") or {}
+
+    objections = [normalize_text(o) for o in negotiation.get("objections") or []]
+    coverage_amounts = _scan_amounts(submission.get("coverage_terms"))
+    premium_amounts = _scan_amounts(submission.get("premium_structure"))
+
+    # The premium structure may state the premium without labelling it
+    premium = _labelled(premium_amounts, "premium")
+    if premium is None and premium_amounts:
+        premium = premium_amounts[0][0]
+
+    return DealFeatures(
+        objections=objections,
+        discussion_notes=[
+            normalize_text(n) for n in negotiation.get("discussion_notes") or []
+        ],
+        prior_negotiations=[
+            normalize_text(n) for n in history.get("prior_negotiations") or []
+        ],
+        risk_profile=normalize_text(submission.get("risk_profile")),
+        coverage_terms=normalize_text(submission.get("coverage_terms")),
+        premium_structure=normalize_text(submission.get("premium_structure")),
+        line_of_business=normalize_text(submission.get("line_of_business")),
+        offer_texts=[normalize_text(o) for o in negotiation.get("offers") or []],
+        objection_categories=list(
+            dict.fromkeys(
+                category
+                for objection in objections
+                for category in categorize_objection(objection)
+            )
+        ),
+        limit_amount=_labelled(coverage_amounts, "limit"),
+        deductible_amount=_labelled(coverage_amounts, "deductible"),
+        premium_amount=premium,
+        offers=[parse_offer(offer) for offer in negotiation.get("offers") or []],
+    )
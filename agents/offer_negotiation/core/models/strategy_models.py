@@ -0,0 +1,24 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class StrategySection(BaseModel):
+    """A section of a negotiation strategy (e.g. "Premium Adjustment")."""
+
+    title: str = Field(min_length=1)
+    content: str = Field(min_length=1)
+
+
+class StructuredStrategy(BaseModel):
+    """Strategy, rationale and citations returned by one structured LLM call."""
+
+    sections: List[StrategySection] = Field(min_length=1)
+    rationale: str = Field(min_length=1)
+    cited_chunk_ids: List[str] = Field(default_factory=list)
+
+    def format_strategy(self) -> str:
+        """Format the sections as the plain-text strategy of the state."""
+        return "\n\n".join(
+            f"{section.title}:\n{section.content.strip()}" for section in self.sections
+        )
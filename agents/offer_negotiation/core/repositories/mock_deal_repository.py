@@ -2,7 +2,7 @@
 
 import json
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List
 
 from agents.offer_negotiation.core.models.deal_models import DealContext
 from agents.offer_negotiation.tests.test_data.sample_deal import SAMPLE_DEAL
@@ -27,6 +27,14 @@ class MockDealRepository:
         if deal123:
             self._deals["DEAL123"] = deal123
 
+    def list_deal_ids(self) -> List[str]:
+        """Return the IDs of all deals in the repository."""
+        return list(self._deals)
+
+    def iter_deals(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all deals in the repository."""
+        yield from self._deals.values()
+
     def get_deal(self, deal_id: str) -> Dict[str, Any]:
         """Get a deal by ID.
 
@@ -0,0 +1,300 @@
+"""Append-only SQLite store of agent results.
+
+Every final state is stored with its deal and client IDs, the time of the
+run, the prompt version and model that produced it, and the run latency.
+Results are queued and committed in batches by a background thread, so
+storing a result adds no SQLite round trip to a run; queries first wait for
+the queued results, and the queue is committed when the process exits.
+Lookups by deal, client and time range use indexes.
+
+Usage:
+    python -m agents.offer_negotiation.core.repositories.result_store --deal-id DEAL123
+"""
+
+import argparse
+import atexit
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS results ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, deal_id TEXT NOT NULL, "
+    "client_id TEXT, created_at REAL NOT NULL, prompt_version TEXT, "
+    "model TEXT, latency_seconds REAL, result TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS results_deal ON results (deal_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS results_client ON results (client_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS results_created ON results (created_at)",
+]
+
+_COLUMNS = (
+    "id, deal_id, client_id, created_at, prompt_version, model, "
+    "latency_seconds, result"
+)
+
+# Queued row, or None to stop the writer
+_Row = Optional[Tuple[Any, ...]]
+
+
+class StoredResult(BaseModel):
+    """A stored agent result."""
+
+    id: int
+    deal_id: str
+    client_id: Optional[str] = None
+    created_at: datetime
+    prompt_version: Optional[str] = None
+    model: Optional[str] = None
+    latency_seconds: Optional[float] = None
+    result: Dict[str, Any]
+
+    @property
+    def strategy(self) -> Optional[str]:
+        return self.result.get("strategy")
+
+    @property
+    def rationale(self) -> Optional[str]:
+        return self.result.get("rationale")
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value is not None else None
+
+
+def client_id_of(result: Dict[str, Any]) -> Optional[str]:
+    """Return the client ID of a final state, if its deal context has one."""
+    deal_context = result.get("deal_context") or {}
+    return (deal_context.get("client_history") or {}).get("client_id")
+
+
+class ResultStore:
+    """Append-only result store with batched background writes."""
+
+    def __init__(self, path: Path):
+        """Open (or create) the result database.
+
+        Args:
+            path: SQLite file of the results
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+        # Queries use their own connection so they never join a write batch
+        self._reader = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._read_lock = threading.Lock()
+        self._queue: "queue.Queue[_Row]" = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._write_batches, name="result-writer", daemon=True
+        )
+        self._writer.start()
+        # Held while a result is queued, so none is queued after close()
+        self._append_lock = threading.Lock()
+        self._closed = False
+        # The writer is a daemon thread: commit the queued results on exit
+        atexit.register(self.close)
+
+    # Writes
+
+    def _write_batches(self) -> None:
+        """Insert the queued rows, one transaction per batch."""
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [row for row in batch if row is not None]
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO results (deal_id, client_id, created_at, "
+                        "prompt_version, model, latency_seconds, result) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+            except sqlite3.Error as e:
+                logger.error(f"Failed to store {len(rows)} results: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(rows) < len(batch):
+                return
+
+    def append(
+        self,
+        result: Dict[str, Any],
+        latency_seconds: Optional[float] = None,
+        model: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+    ) -> None:
+        """Queue a final state for storage.
+
+        Args:
+            result: Final state of a run (see invoke_agent)
+            latency_seconds: Duration of the run
+            model: Model that generated the strategy
+            created_at: Time of the run; defaults to now
+
+        Raises:
+            RuntimeError: If the store is closed
+        """
+        row = (
+            result["deal_id"],
+            client_id_of(result),
+            _timestamp(created_at) or time.time(),
+            result.get("prompt_version"),
+            model,
+            latency_seconds,
+            json.dumps(result, default=str, ensure_ascii=False),
+        )
+        with self._append_lock:
+            if self._closed:
+                raise RuntimeError(f"Result store {self.path} is closed")
+            self._queue.put(row)
+
+    def flush(self) -> None:
+        """Wait until the queued results are committed."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Commit the queued results and close the database."""
+        with self._append_lock:
+            if self._closed:
+                return
+            self._closed = True
+        atexit.unregister(self.close)
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._conn.close()
+        with self._read_lock:
+            self._reader.close()
+
+    # Reads
+
+    def find(
+        self,
+        deal_id: Optional[str] = None,
+        client_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[StoredResult]:
+        """Return the stored results matching all the given filters.
+
+        Args:
+            deal_id: Deal of the results
+            client_id: Client of the results' deals
+            since: Earliest time of the results (inclusive)
+            until: Latest time of the results (exclusive)
+            limit: Maximum number of results
+
+        Returns:
+            Matching results, newest first
+        """
+        conditions, params = [], []
+        for column, operator, value in [
+            ("deal_id", "=", deal_id),
+            ("client_id", "=", client_id),
+            ("created_at", ">=", _timestamp(since)),
+            ("created_at", "<", _timestamp(until)),
+        ]:
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        sql = f"SELECT {_COLUMNS} FROM results"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        self.flush()
+        with self._read_lock:
+            rows = self._reader.execute(sql, params).fetchall()
+        return [self._record(row) for row in rows]
+
+    def latest(self, deal_id: str) -> Optional[StoredResult]:
+        """Return the most recent result of a deal, if any."""
+        results = self.find(deal_id=deal_id, limit=1)
+        return results[0] if results else None
+
+    @staticmethod
+    def _record(row: Tuple[Any, ...]) -> StoredResult:
+        id_, deal_id, client_id, created_at, prompt_version, model, latency, result = (
+            row
+        )
+        return StoredResult(
+            id=id_,
+            deal_id=deal_id,
+            client_id=client_id,
+            created_at=datetime.fromtimestamp(created_at, tz=timezone.utc),
+            prompt_version=prompt_version,
+            model=model,
+            latency_seconds=latency,
+            result=json.loads(result),
+        )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Show stored agent results.")
+    parser.add_argument("--deal-id", help="Deal of the results")
+    parser.add_argument("--client-id", help="Client of the results")
+    parser.add_argument(
+        "--since", type=datetime.fromisoformat, help="Earliest time (ISO 8601)"
+    )
+    parser.add_argument(
+        "--until", type=datetime.fromisoformat, help="Latest time (ISO 8601)"
+    )
+    parser.add_argument("--limit", type=int, default=10, help="Maximum results")
+    parser.add_argument("--path", type=Path, help="SQLite file of the results")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> List[StoredResult]:
+    from agents.offer_negotiation.agent import resolve_path
+    from agents.offer_negotiation.utils.agent_settings import load_agent_settings
+
+    args = parse_args(argv)
+    path = args.path or resolve_path(load_agent_settings().result_store.path)
+    store = ResultStore(path)
+    try:
+        results = store.find(
+            deal_id=args.deal_id,
+            client_id=args.client_id,
+            since=args.since,
+            until=args.until,
+            limit=args.limit,
+        )
+    finally:
+        store.close()
+
+    for stored in results:
+        print(
+            f"{stored.created_at.isoformat()}  {stored.deal_id} "
+            f"(client {stored.client_id or '-'})  prompt {stored.prompt_version or '-'}"
+            f"  model {stored.model or '-'}  {stored.latency_seconds or 0:.2f}s"
+        )
+        print(f"{stored.rationale or 'No rationale'}\n")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Synthetic deal repository for load tests and portfolio-scale runs.
+
+Deals are modelled on ``data/deals/DEAL123.json`` and the sample deal in
+``tests/test_data/sample_deal.py``, with varying objection counts, note
+lengths, offers and comparable deals. Each deal is generated deterministically
+from the repository seed and its index, so deals do not need to be held in
+memory and the same ID always yields the same deal.
+"""
+
+import random
+from typing import Any, Dict, Iterator, List
+
+from agents.offer_negotiation.core.models.deal_models import DealContext
+
+LINES_OF_BUSINESS = ["Commercial Property", "Manufacturing", "Retail", "Hospitality"]
+TERRITORIES = ["Northeast", "Midwest", "Southwest", "Southeast", "West"]
+FACILITIES = [
+    "manufacturing facility",
+    "office park",
+    "retail center",
+    "chemical plant",
+    "warehouse",
+    "hotel",
+]
+RISK_LEVELS = ["Low-risk", "Medium-risk", "High-risk"]
+OBJECTIONS = [
+    "Premium too high compared to market",
+    "Premium increase is too high",
+    "Deductible increase not acceptable",
+    "Would like to explore higher deductible options",
+    "Need additional coverage for business interruption",
+    "Request for flood coverage",
+    "Quarterly payments are challenging",
+    "Coverage limits are too low for the facility",
+]
+PRIOR_NEGOTIATIONS = [
+    "Negotiated {pct}% premium reduction",
+    "Accepted ${amount}K deductible increase",
+    "Accepted {pct}% premium increase with deductible adjustment",
+    "Requested additional coverage for business interruption",
+    "Accepted initial terms with minor modifications",
+]
+DISCUSSION_NOTES = [
+    "Client concerned about premium increase",
+    "Discussed risk mitigation options",
+    "Client mentioned cash flow constraints",
+    "Interested in exploring deductible options",
+    "Client requesting additional coverage for business interruption",
+    "Reviewed loss history and safety protocols",
+]
+OUTCOMES = [
+    "Successfully renewed with {pct}% premium increase",
+    "Negotiated to ${premium}K premium with ${deductible}K deductible",
+    "${premium}K premium, ${deductible}K deductible, quarterly payments",
+]
+
+
+class SyntheticDealRepository:
+    """Repository serving deterministically generated synthetic deals."""
+
+    def __init__(self, deal_count: int = 1000, seed: int = 0, prefix: str = "SYN"):
+        """Initialize the repository.
+
+        Args:
+            deal_count: Number of deals in the repository
+            seed: Seed controlling the generated deals
+            prefix: Prefix of the generated deal IDs
+        """
+        self.deal_count = deal_count
+        self.seed = seed
+        self.prefix = prefix
+
+    def deal_id(self, index: int) -> str:
+        """Return the deal ID of the deal at the given index."""
+        return f"{self.prefix}{index:07d}"
+
+    def list_deal_ids(self) -> List[str]:
+        """Return the IDs of all deals in the repository."""
+        return [self.deal_id(i) for i in range(self.deal_count)]
+
+    def iter_deals(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all deals in the repository."""
+        for i in range(self.deal_count):
+            yield self.get_deal(self.deal_id(i))
+
+    def get_deal(self, deal_id: str) -> Dict[str, Any]:
+        """Get a deal by ID.
+
+        Args:
+            deal_id: ID of the deal to retrieve
+
+        Returns:
+            Deal data as a dictionary
+
+        Raises:
+            KeyError: If deal not found
+        """
+        suffix = deal_id[len(self.prefix) :]
+        if not deal_id.startswith(self.prefix) or not suffix.isdigit():
+            raise KeyError(f"Deal {deal_id} not found")
+        index = int(suffix)
+        if index >= self.deal_count:
+            raise KeyError(f"Deal {deal_id} not found")
+        return generate_synthetic_deal(deal_id, random.Random(f"{self.seed}:{index}"))
+
+    def get_deal_context(self, deal_id: str) -> DealContext:
+        return DealContext(**self.get_deal(deal_id))
+
+
+def generate_synthetic_deal(deal_id: str, rng: random.Random) -> Dict[str, Any]:
+    """Generate a realistic synthetic deal.
+
+    Args:
+        deal_id: ID of the generated deal
+        rng: Random number generator driving the variations
+
+    Returns:
+        Deal data shaped like ``data/deals/DEAL123.json``
+    """
+    line_of_business = rng.choice(LINES_OF_BUSINESS)
+    risk_level = rng.choice(RISK_LEVELS)
+    facility = rng.choice(FACILITIES)
+    flood_zone = rng.random() < 0.3
+    limit_m = rng.choice([2, 5, 10, 12, 20, 50])
+    deductible_k = rng.choice([25, 50, 75, 100, 150, 250, 500])
+    premium_k = int(limit_m * rng.uniform(10, 40))
+
+    # Offers converge from the initial premium over one to four rounds
+    offers = [f"Initial offer: ${premium_k}K premium, ${deductible_k}K deductible"]
+    offer_premium, offer_deductible = premium_k, deductible_k
+    for _ in range(rng.randint(0, 3)):
+        offer_premium = int(offer_premium * rng.uniform(0.88, 0.98))
+        offer_deductible = int(offer_deductible * rng.uniform(1.0, 1.5))
+        offers.append(
+            f"Revised offer: ${offer_premium}K premium, ${offer_deductible}K deductible"
+        )
+
+    # Discussion notes vary in count and length
+    notes = []
+    for i in range(rng.randint(1, 6)):
+        note = rng.choice(DISCUSSION_NOTES)
+        notes.append(" ".join([f"Meeting {i + 1}: {note}."] * rng.randint(1, 4)))
+
+    prior_negotiations = [
+        f"{rng.randint(2015, 2024)}: "
+        + rng.choice(PRIOR_NEGOTIATIONS).format(
+            pct=rng.randint(3, 20), amount=rng.choice([5, 10, 15, 25, 50])
+        )
+        for _ in range(rng.randint(0, 4))
+    ]
+
+    comparable_deals = [
+        {
+            "reference_deal_id": f"REF{rng.randint(100, 999)}",
+            "similarity_reason": f"Similar {facility}",
+            "outcome_summary": rng.choice(OUTCOMES).format(
+                pct=rng.randint(3, 15),
+                premium=int(premium_k * rng.uniform(0.8, 1.1)),
+                deductible=int(deductible_k * rng.uniform(1.0, 1.5)),
+            ),
+        }
+        for _ in range(rng.randint(0, 5))
+    ]
+
+    return {
+        "deal_id": deal_id,
+        "submission": {
+            "deal_id": deal_id,
+            "coverage_terms": (
+                f"{line_of_business}: ${limit_m}M limit, "
+                f"${deductible_k}K deductible"
+            ),
+            "risk_profile": f"{risk_level} {facility}"
+            + (" in flood zone" if flood_zone else ""),
+            "premium_structure": (
+                f"Annual premium: ${premium_k}K, "
+                f"{rng.choice(['Annual', 'Quarterly', 'Monthly'])} payments"
+            ),
+            "line_of_business": line_of_business,
+            "territory": rng.choice(TERRITORIES),
+        },
+        "client_history": {
+            "client_id": f"CLIENT{rng.randint(1, 50_000):05d}",
+            "prior_negotiations": prior_negotiations,
+            "relationship_notes": f"Client since {rng.randint(2005, 2023)}",
+            "claim_summary": rng.choice(
+                ["No claims in past 3 years", "One minor claim", "One major claim"]
+            ),
+        },
+        "negotiation_context": {
+            "deal_id": deal_id,
+            "discussion_notes": notes,
+            "offers": offers,
+            "objections": rng.sample(OBJECTIONS, rng.randint(0, 5)),
+        },
+        "comparable_deals": comparable_deals,
+    }
@@ -0,0 +1,520 @@
+"""Shared SQLite queue of the deals of batch runs, leased to workers.
+
+A batch is submitted as one row per deal. Workers on any number of machines
+open the same file and claim deals a few at a time: a claim leases the deals
+to the worker for ``lease_seconds``, and the worker renews its leases while
+it runs them. A deal whose lease expired (its worker died or hung) is claimed
+again by any worker, until it was claimed ``max_attempts`` times; a
+completion is only recorded while the worker still holds the lease.
+
+Deals are hashed into a fixed number of shards per batch, and the shards are
+spread over the live workers of the batch with rendezvous hashing: a deal is
+run by the same worker across claims and batches, which keeps the caches of
+that worker warm, and a worker joining or leaving only moves its own shards.
+A worker whose shards have no pending deals takes deals of other shards.
+
+Every claim is one ``BEGIN IMMEDIATE`` transaction, so concurrent workers
+never lease a deal twice. The file must be on a file system with working
+locks; WAL mode needs shared memory between the workers, so use the DELETE
+journal mode when they share the file over the network.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS batches ("
+    "batch TEXT PRIMARY KEY, shards INTEGER NOT NULL, submitted_at REAL NOT NULL, "
+    "started_at REAL)",
+    "CREATE TABLE IF NOT EXISTS work_items ("
+    "batch TEXT NOT NULL, deal_id TEXT NOT NULL, shard INTEGER NOT NULL, "
+    "status TEXT NOT NULL, worker TEXT, lease_expires REAL, "
+    "attempts INTEGER NOT NULL DEFAULT 0, claimed_at REAL, finished_at REAL, "
+    "error TEXT, PRIMARY KEY (batch, deal_id)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS work_items_claim "
+    "ON work_items (batch, status, shard)",
+    "CREATE INDEX IF NOT EXISTS work_items_lease "
+    "ON work_items (batch, status, lease_expires)",
+    "CREATE INDEX IF NOT EXISTS work_items_finished "
+    "ON work_items (batch, finished_at)",
+    "CREATE TABLE IF NOT EXISTS workers ("
+    "batch TEXT NOT NULL, worker TEXT NOT NULL, joined_at REAL NOT NULL, "
+    "heartbeat REAL NOT NULL, PRIMARY KEY (batch, worker))",
+]
+
+# Deals inserted per statement when a batch is submitted
+_SUBMIT_CHUNK = 10_000
+
+
+def _hash(value: str) -> int:
+    """Stable 64-bit hash, identical on every machine and process."""
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def shard_of(deal_id: str, shards: int) -> int:
+    """Return the shard of a deal."""
+    return _hash(deal_id) % shards
+
+
+def shard_owner(shard: int, workers: Sequence[str]) -> str:
+    """Return the worker of a shard: the one with the highest rendezvous hash."""
+    return max(workers, key=lambda worker: _hash(f"{worker}/{shard}"))
+
+
+def _datetime(value: Optional[float]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+class WorkerProgress(BaseModel):
+    """Deals of a batch handled by one worker."""
+
+    worker: str
+    leased: int = 0
+    done: int = 0
+    failed: int = 0
+    heartbeat: Optional[datetime] = None
+    alive: bool = False
+
+
+class BatchProgress(BaseModel):
+    """Progress and throughput of a batch."""
+
+    batch: str
+    total: int = 0
+    pending: int = 0
+    leased: int = 0
+    done: int = 0
+    failed: int = 0
+    started_at: Optional[datetime] = None
+    elapsed_seconds: float = 0.0
+    deals_per_second: float = 0.0
+    recent_deals_per_second: float = 0.0
+    eta_seconds: Optional[float] = None
+    workers: List[WorkerProgress] = []
+
+    @property
+    def remaining(self) -> int:
+        return self.pending + self.leased
+
+    @property
+    def finished(self) -> bool:
+        return self.remaining == 0
+
+
+class WorkQueue:
+    """Lease table of the deals of batch runs, shared by the workers."""
+
+    def __init__(
+        self,
+        path: Path,
+        shards: int = 1024,
+        lease_seconds: float = 120.0,
+        max_attempts: int = 3,
+        journal_mode: str = "WAL",
+        timeout: float = 30.0,
+    ):
+        """Open (or create) the queue database.
+
+        Args:
+            path: SQLite file shared by the workers
+            shards: Shards of the batches submitted through this queue
+            lease_seconds: Duration of a lease, and of the heartbeat after
+                which a worker no longer owns shards
+            max_attempts: Claims of a deal before its expired lease fails it
+            journal_mode: SQLite journal mode; DELETE on network file systems
+            timeout: Seconds to wait for the lock of another worker
+        """
+        if shards < 1:
+            raise ValueError("shards must be positive")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.shards = shards
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Transactions are explicit; the lock serializes the worker thread and
+        # the lease renewal thread on the connection
+        self._conn = sqlite3.connect(
+            str(self.path),
+            timeout=timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._lock = threading.Lock()
+        self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        with self._transaction():
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+        # Shards of a worker, by batch, worker and live workers
+        self._owned: Dict[Tuple[str, str, Tuple[str, ...]], List[int]] = {}
+
+    def _transaction(self):
+        """Return a context running its block in a write transaction."""
+        return _Transaction(self._conn, self._lock)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # Batches
+
+    def submit(self, batch: str, deal_ids: Iterable[str]) -> int:
+        """Add deals to a batch, creating it if needed.
+
+        Args:
+            batch: Name of the batch
+            deal_ids: Deals to run; deals already in the batch are ignored
+
+        Returns:
+            Number of deals added
+        """
+        added = 0
+        with self._transaction():
+            self._conn.execute(
+                "INSERT OR IGNORE INTO batches (batch, shards, submitted_at) "
+                "VALUES (?, ?, ?)",
+                (batch, self.shards, time.time()),
+            )
+            shards = self._batch_shards(batch)
+            chunk: List[Tuple[str, str, int, str]] = []
+            for deal_id in deal_ids:
+                chunk.append((batch, deal_id, shard_of(deal_id, shards), PENDING))
+                if len(chunk) == _SUBMIT_CHUNK:
+                    added += self._insert(chunk)
+                    chunk = []
+            added += self._insert(chunk)
+        return added
+
+    def _insert(self, rows: List[Tuple[str, str, int, str]]) -> int:
+        before = self._conn.total_changes
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO work_items (batch, deal_id, shard, status) "
+            "VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        return self._conn.total_changes - before
+
+    def _batch_shards(self, batch: str) -> int:
+        row = self._conn.execute(
+            "SELECT shards FROM batches WHERE batch = ?", (batch,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown batch: {batch}")
+        return row[0]
+
+    # Workers
+
+    def _heartbeat(self, batch: str, worker: str, now: float) -> None:
+        self._conn.execute(
+            "INSERT INTO workers (batch, worker, joined_at, heartbeat) "
+            "VALUES (?, ?, ?, ?) ON CONFLICT (batch, worker) "
+            "DO UPDATE SET heartbeat = excluded.heartbeat",
+            (batch, worker, now, now),
+        )
+
+    def join(self, batch: str, worker: str) -> None:
+        """Register a worker of a batch, so shards are assigned to it."""
+        with self._transaction():
+            self._heartbeat(batch, worker, time.time())
+
+    def leave(self, batch: str, worker: str) -> None:
+        """Unregister a worker, handing its leased deals back to the batch.
+
+        The released deals are pending again, without counting their attempt,
+        and the shards of the worker move to the other live workers.
+        """
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE work_items SET status = ?, worker = NULL, "
+                "lease_expires = NULL, attempts = attempts - 1 "
+                "WHERE batch = ? AND status = ? AND worker = ?",
+                (PENDING, batch, LEASED, worker),
+            )
+            self._conn.execute(
+                "DELETE FROM workers WHERE batch = ? AND worker = ?", (batch, worker)
+            )
+
+    def live_workers(self, batch: str, now: Optional[float] = None) -> List[str]:
+        """Return the workers of a batch with a heartbeat within a lease."""
+        now = time.time() if now is None else now
+        rows = self._conn.execute(
+            "SELECT worker FROM workers WHERE batch = ? AND heartbeat >= ? "
+            "ORDER BY worker",
+            (batch, now - self.lease_seconds),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def owned_shards(
+        self, batch: str, worker: str, workers: Sequence[str]
+    ) -> List[int]:
+        """Return the shards of a batch assigned to a worker among live workers."""
+        key = (batch, worker, tuple(workers))
+        if key not in self._owned:
+            shards = self._batch_shards(batch)
+            self._owned[key] = [
+                shard
+                for shard in range(shards)
+                if shard_owner(shard, workers) == worker
+            ]
+        return self._owned[key]
+
+    # Leases
+
+    def claim(self, batch: str, worker: str, limit: int) -> List[str]:
+        """Lease up to ``limit`` deals of a batch to a worker.
+
+        Deals whose lease expired come first, then pending deals of the
+        worker's shards, then pending deals of other shards. Expired deals
+        that were claimed ``max_attempts`` times fail instead.
+
+        Returns:
+            Leased deal IDs; empty when no deal is claimable right now
+        """
+        now = time.time()
+        with self._transaction():
+            self._heartbeat(batch, worker, now)
+            self._conn.execute(
+                "UPDATE batches SET started_at = COALESCE(started_at, ?) "
+                "WHERE batch = ?",
+                (now, batch),
+            )
+            self._conn.execute(
+                "UPDATE work_items SET status = ?, finished_at = ?, "
+                "error = 'Lease expired' "
+                "WHERE batch = ? AND status = ? AND lease_expires < ? "
+                "AND attempts >= ?",
+                (FAILED, now, batch, LEASED, now, self.max_attempts),
+            )
+            deal_ids = self._lease(
+                "status = ? AND lease_expires < ?", (LEASED, now), batch, worker, limit
+            )
+            if len(deal_ids) < limit:
+                shards = self.owned_shards(batch, worker, self.live_workers(batch, now))
+                deal_ids += self._lease(
+                    "status = ? AND shard IN (SELECT value FROM json_each(?))",
+                    (PENDING, json.dumps(shards)),
+                    batch,
+                    worker,
+                    limit - len(deal_ids),
+                )
+            if len(deal_ids) < limit:
+                deal_ids += self._lease(
+                    "status = ?", (PENDING,), batch, worker, limit - len(deal_ids)
+                )
+        return deal_ids
+
+    def _lease(
+        self, condition: str, params: Tuple, batch: str, worker: str, limit: int
+    ) -> List[str]:
+        """Lease the deals of a batch matching a condition, within a claim."""
+        rows = self._conn.execute(
+            f"SELECT deal_id FROM work_items WHERE batch = ? AND {condition} LIMIT ?",
+            (batch, *params, limit),
+        ).fetchall()
+        now = time.time()
+        self._conn.executemany(
+            "UPDATE work_items SET status = ?, worker = ?, lease_expires = ?, "
+            "claimed_at = ?, attempts = attempts + 1 "
+            "WHERE batch = ? AND deal_id = ?",
+            [
+                (LEASED, worker, now + self.lease_seconds, now, batch, row[0])
+                for row in rows
+            ],
+        )
+        return [row[0] for row in rows]
+
+    def renew(self, batch: str, worker: str, deal_ids: Iterable[str]) -> List[str]:
+        """Extend the leases of a worker's deals.
+
+        Returns:
+            The deals whose lease the worker still holds; the others were
+            claimed by another worker after their lease expired
+        """
+        deal_ids = list(deal_ids)
+        now = time.time()
+        with self._transaction():
+            self._heartbeat(batch, worker, now)
+            self._conn.executemany(
+                "UPDATE work_items SET lease_expires = ? WHERE batch = ? "
+                "AND deal_id = ? AND status = ? AND worker = ?",
+                [
+                    (now + self.lease_seconds, batch, deal_id, LEASED, worker)
+                    for deal_id in deal_ids
+                ],
+            )
+            held = self._conn.execute(
+                "SELECT deal_id FROM work_items WHERE batch = ? AND status = ? "
+                "AND worker = ? AND deal_id IN (SELECT value FROM json_each(?))",
+                (batch, LEASED, worker, json.dumps(deal_ids)),
+            ).fetchall()
+        return [row[0] for row in held]
+
+    def complete(self, batch: str, worker: str, deal_id: str) -> bool:
+        """Record a deal as done.
+
+        Returns:
+            Whether the worker still held the lease; if not, the completion
+            is not recorded and the deal runs again elsewhere
+        """
+        with self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE work_items SET status = ?, finished_at = ?, "
+                "lease_expires = NULL, error = NULL "
+                "WHERE batch = ? AND deal_id = ? AND status = ? AND worker = ?",
+                (DONE, time.time(), batch, deal_id, LEASED, worker),
+            )
+        return cursor.rowcount > 0
+
+    def fail(self, batch: str, worker: str, deal_id: str, error: str) -> bool:
+        """Record a failed run of a deal.
+
+        The deal is pending again until it was claimed ``max_attempts`` times.
+
+        Returns:
+            Whether the worker still held the lease
+        """
+        with self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE work_items SET status = CASE WHEN attempts >= ? THEN ? "
+                "ELSE ? END, finished_at = CASE WHEN attempts >= ? THEN ? END, "
+                "worker = CASE WHEN attempts >= ? THEN worker END, "
+                "lease_expires = NULL, error = ? "
+                "WHERE batch = ? AND deal_id = ? AND status = ? AND worker = ?",
+                (
+                    self.max_attempts,
+                    FAILED,
+                    PENDING,
+                    self.max_attempts,
+                    time.time(),
+                    self.max_attempts,
+                    error,
+                    batch,
+                    deal_id,
+                    LEASED,
+                    worker,
+                ),
+            )
+        return cursor.rowcount > 0
+
+    # Progress
+
+    def remaining(self, batch: str) -> int:
+        """Return the number of deals of a batch pending or leased."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM work_items WHERE batch = ? AND status IN (?, ?)",
+                (batch, PENDING, LEASED),
+            ).fetchone()
+        return row[0]
+
+    def progress(self, batch: str, window: float = 60.0) -> BatchProgress:
+        """Return the progress of a batch.
+
+        Args:
+            batch: Name of the batch
+            window: Seconds of recent completions measuring the current
+                throughput, from which the ETA is estimated
+        """
+        now = time.time()
+        with self._lock:
+            counts = dict(
+                self._conn.execute(
+                    "SELECT status, COUNT(*) FROM work_items WHERE batch = ? "
+                    "GROUP BY status",
+                    (batch,),
+                ).fetchall()
+            )
+            row = self._conn.execute(
+                "SELECT started_at FROM batches WHERE batch = ?", (batch,)
+            ).fetchone()
+            started_at = row[0] if row else None
+            recent = self._conn.execute(
+                "SELECT COUNT(*) FROM work_items WHERE batch = ? AND finished_at >= ?",
+                (batch, now - window),
+            ).fetchone()[0]
+            by_worker = self._conn.execute(
+                "SELECT worker, status, COUNT(*) FROM work_items WHERE batch = ? "
+                "AND worker IS NOT NULL GROUP BY worker, status",
+                (batch,),
+            ).fetchall()
+            heartbeats = self._conn.execute(
+                "SELECT worker, heartbeat FROM workers WHERE batch = ?", (batch,)
+            ).fetchall()
+
+        workers: Dict[str, WorkerProgress] = {}
+        for worker, heartbeat in heartbeats:
+            workers[worker] = WorkerProgress(
+                worker=worker,
+                heartbeat=_datetime(heartbeat),
+                alive=heartbeat >= now - self.lease_seconds,
+            )
+        for worker, status, count in by_worker:
+            progress = workers.setdefault(worker, WorkerProgress(worker=worker))
+            setattr(progress, status, count)
+
+        progress = BatchProgress(
+            batch=batch,
+            total=sum(counts.values()),
+            pending=counts.get(PENDING, 0),
+            leased=counts.get(LEASED, 0),
+            done=counts.get(DONE, 0),
+            failed=counts.get(FAILED, 0),
+            started_at=_datetime(started_at),
+            workers=sorted(workers.values(), key=lambda w: w.worker),
+        )
+        if started_at is not None:
+            progress.elapsed_seconds = now - started_at
+            finished = progress.done + progress.failed
+            if progress.elapsed_seconds > 0:
+                progress.deals_per_second = finished / progress.elapsed_seconds
+                progress.recent_deals_per_second = recent / min(
+                    window, progress.elapsed_seconds
+                )
+            rate = progress.recent_deals_per_second or progress.deals_per_second
+            if rate > 0:
+                progress.eta_seconds = progress.remaining / rate
+        return progress
+
+
+class _Transaction:
+    """Write transaction taking the database lock when it begins.
+
+    ``BEGIN IMMEDIATE`` makes concurrent workers wait for each other up front
+    rather than fail when a read transaction is upgraded to a write.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock):
+        self._conn = conn
+        self._lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._lock.acquire()
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self._lock.release()
+            raise
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self._lock.release()
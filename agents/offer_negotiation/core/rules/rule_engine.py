@@ -0,0 +1,411 @@
+"""Declarative heuristic rule engine.
+
+Rules are defined in ``config/agent_settings.yaml`` (``heuristic_rules``) and
+compiled into one regular expression per deal field. A batch of deals is
+evaluated with a single scan per field: the texts of all deals are joined,
+lowercased and matched at once, and each match is mapped back to its deal
+item. Deals passed with their DealFeatures are matched on the normalized
+texts of the features, which are not lowercased again.
+
+Rules may also bound the numeric deal features (parsed limit, deductible,
+premium and offer amounts, see DealFeatures); those are extracted only when
+a rule uses them and no features are passed in.
+"""
+
+import gc
+import re
+from bisect import bisect_right
+from functools import reduce
+from itertools import accumulate, repeat
+from operator import or_
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, TypedDict
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from agents.offer_negotiation.core.features.deal_features import (
+    NUMERIC_FEATURES,
+    DealFeatures,
+    extract_deal_features,
+)
+
+# Path of each matchable field in a deal; list fields match item by item
+RULE_FIELDS: Dict[str, Tuple[str, str]] = {
+    "objections": ("negotiation_context", "objections"),
+    "discussion_notes": ("negotiation_context", "discussion_notes"),
+    "offers": ("negotiation_context", "offers"),
+    "prior_negotiations": ("client_history", "prior_negotiations"),
+    "risk_profile": ("submission", "risk_profile"),
+    "coverage_terms": ("submission", "coverage_terms"),
+    "premium_structure": ("submission", "premium_structure"),
+    "line_of_business": ("submission", "line_of_business"),
+}
+
+# Separates joined field texts; terms cannot contain it, so no match spans items
+_SEPARATOR = "\x00"
+
+
+class DecisionBasis(TypedDict):
+    heuristic: str
+    justification: str
+    confidence: str
+
+
+class RuleDecision(BaseModel):
+    """Decision record emitted by a rule."""
+
+    heuristic: str
+    justification: str
+    confidence: str
+
+
+class NumericRange(BaseModel):
+    """Inclusive bounds on a numeric deal feature."""
+
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+    @model_validator(mode="after")
+    def _has_bound(self) -> "NumericRange":
+        if self.min is None and self.max is None:
+            raise ValueError("A numeric condition needs a min or a max")
+        return self
+
+    def contains(self, value: Optional[float]) -> bool:
+        """Return whether a value is known and within the bounds."""
+        return (
+            value is not None
+            and (self.min is None or value >= self.min)
+            and (self.max is None or value <= self.max)
+        )
+
+
+class RuleCase(BaseModel):
+    """Case of a for_each rule, matched against a single field item."""
+
+    match: str
+    decision: RuleDecision
+
+
+class HeuristicRule(BaseModel):
+    """Declarative heuristic rule."""
+
+    name: str
+    require: Dict[str, List[str]] = Field(default_factory=dict)
+    numeric: Dict[str, NumericRange] = Field(default_factory=dict)
+    decision: Optional[RuleDecision] = None
+    for_each: Optional[str] = None
+    cases: List[RuleCase] = Field(default_factory=list)
+
+    @field_validator("require", mode="before")
+    @classmethod
+    def _terms_as_lists(cls, value: Any) -> Any:
+        if isinstance(value, dict):
+            return {
+                field: [terms] if isinstance(terms, str) else terms
+                for field, terms in value.items()
+            }
+        return value
+
+
+class RuleEngine:
+    """Evaluates heuristic rules compiled into one matcher per field."""
+
+    def __init__(self, rules: Sequence[HeuristicRule]):
+        """Compile the rules.
+
+        Args:
+            rules: Rules evaluated in order
+
+        Raises:
+            ValueError: If a rule is malformed or uses an unknown field
+        """
+        self.rules = list(rules)
+        terms: Dict[str, List[str]] = {}
+
+        def add_term(field: str, term: str) -> None:
+            if field not in RULE_FIELDS:
+                raise ValueError(f"Unknown rule field: {field}")
+            if not term or _SEPARATOR in term:
+                raise ValueError(f"Invalid rule term: {term!r}")
+            field_terms = terms.setdefault(field, [])
+            if term.lower() not in field_terms:
+                field_terms.append(term.lower())
+
+        for rule in self.rules:
+            if (rule.decision is None) == (rule.for_each is None):
+                raise ValueError(
+                    f"Rule {rule.name} needs either a decision or for_each cases"
+                )
+            if rule.for_each is not None and not rule.cases:
+                raise ValueError(f"Rule {rule.name} has no cases")
+            for field, field_terms in rule.require.items():
+                for term in field_terms:
+                    add_term(field, term)
+            for feature in rule.numeric:
+                if feature not in NUMERIC_FEATURES:
+                    raise ValueError(f"Unknown numeric feature: {feature}")
+            for case in rule.cases:
+                add_term(rule.for_each, case.match)
+
+        self._bits = {
+            field: {term: 1 << i for i, term in enumerate(field_terms)}
+            for field, field_terms in terms.items()
+        }
+
+        # One alternation per field, longest terms first
+        self._patterns: Dict[str, re.Pattern] = {}
+        self._implied: Dict[str, Dict[str, int]] = {}
+        for field, field_terms in terms.items():
+            ordered = sorted(field_terms, key=len, reverse=True)
+            self._patterns[field] = re.compile(
+                "|".join(re.escape(term) for term in ordered)
+            )
+            self._implied[field] = {
+                term: sum(
+                    bit
+                    for other, bit in self._bits[field].items()
+                    if term.startswith(other)
+                )
+                for term in field_terms
+            }
+
+        self._require_masks = [
+            {
+                field: sum(self._bits[field][term.lower()] for term in field_terms)
+                for field, field_terms in rule.require.items()
+            }
+            for rule in self.rules
+        ]
+        self._numeric_rules = [i for i, rule in enumerate(self.rules) if rule.numeric]
+        self._case_masks = [
+            [self._bits[rule.for_each][case.match.lower()] for case in rule.cases]
+            for rule in self.rules
+        ]
+        self._decisions = [
+            rule.decision.model_dump() if rule.decision is not None else None
+            for rule in self.rules
+        ]
+        self._case_decisions = [
+            [case.decision.model_dump() for case in rule.cases] for rule in self.rules
+        ]
+
+    def _match_texts(
+        self, field: str, texts: List[str], normalized: bool = False
+    ) -> List[int]:
+        """Return the term bitmask of each text, scanning all texts at once.
+
+        Args:
+            field: Field of the texts
+            texts: Texts to match
+            normalized: Whether the texts are already lowercased
+        """
+        masks = [0] * len(texts)
+        if not texts:
+            return masks
+
+        joined = _SEPARATOR.join(texts)
+        lowered = joined if normalized else joined.lower()
+        if len(lowered) != len(joined):
+            # Lowercasing changed some lengths, lowercase item by item instead
+            texts = [text.lower() for text in texts]
+            lowered = _SEPARATOR.join(texts)
+        starts = [0, *accumulate(len(text) + 1 for text in texts[:-1])]
+
+        # Each search finds the longest term at the next position with a
+        # match; it implies the shorter terms that are its prefixes.
+        search = self._patterns[field].search
+        implied = self._implied[field]
+        match = search(lowered)
+        while match is not None:
+            position = match.start()
+            masks[bisect_right(starts, position) - 1] |= implied[match.group()]
+            match = search(lowered, position + 1)
+        return masks
+
+    def _match_field(
+        self,
+        field: str,
+        deals: Sequence[Any],
+        with_items: bool,
+        features: Optional[Sequence[Optional[DealFeatures]]] = None,
+    ) -> Tuple[List[int], Optional[List[Tuple[int, ...]]]]:
+        """Match the terms of a field against a batch of deals.
+
+        Each distinct text is matched once, so texts repeated across deals
+        (objections, templated notes) cost a dictionary lookup.
+
+        Args:
+            field: Field to match
+            deals: DealContext models or deal dictionaries
+            with_items: Whether to return the bitmasks of the field items
+            features: Features of each deal, whose normalized texts are
+                matched instead of the deal field when given
+
+        Returns:
+            Tuple of the term bitmask of each deal (all items combined) and,
+            if requested, the bitmasks of the matching items of each deal
+        """
+        outer, inner = RULE_FIELDS[field]
+        values = []
+        normalized = True
+        for deal, deal_features in zip(deals, features or repeat(None)):
+            texts = (
+                deal_features.field_texts(field) if deal_features is not None else None
+            )
+            if texts is None:
+                # Raw texts are lowercased, which leaves normalized ones as is
+                normalized = False
+                value = (
+                    (deal.get(outer) or {}).get(inner)
+                    if isinstance(deal, dict)
+                    else getattr(getattr(deal, outer), inner)
+                )
+                texts = value if isinstance(value, list) else [value] if value else []
+            values.append(texts)
+
+        unique = list(dict.fromkeys(text for value in values for text in value))
+        mask_of = dict(zip(unique, self._match_texts(field, unique, normalized)))
+        lookup = mask_of.__getitem__
+
+        deal_masks = [reduce(or_, map(lookup, value), 0) for value in values]
+        if not with_items:
+            return deal_masks, None
+        items = [
+            tuple(mask for mask in map(lookup, value) if mask) if mask else ()
+            for value, mask in zip(values, deal_masks)
+        ]
+        return deal_masks, items
+
+    def _numeric_mask(self, features: DealFeatures) -> int:
+        """Return the bitmask of the rules whose numeric conditions hold."""
+        values = features.numeric_features()
+        mask = 0
+        for index in self._numeric_rules:
+            if all(
+                bounds.contains(values[feature])
+                for feature, bounds in self.rules[index].numeric.items()
+            ):
+                mask |= 1 << index
+        return mask
+
+    def _decide(
+        self,
+        deal_masks: Dict[str, int],
+        item_masks: Dict[str, Tuple[int, ...]],
+        numeric_mask: int = 0,
+    ) -> List[DecisionBasis]:
+        """Apply the rules to the term bitmasks of a deal."""
+        decisions: List[DecisionBasis] = []
+        for index, (rule, require, decision, case_masks, case_decisions) in enumerate(
+            zip(
+                self.rules,
+                self._require_masks,
+                self._decisions,
+                self._case_masks,
+                self._case_decisions,
+            )
+        ):
+            if not all(
+                deal_masks[field] & required for field, required in require.items()
+            ):
+                continue
+            if rule.numeric and not (numeric_mask >> index) & 1:
+                continue
+            if decision is not None:
+                decisions.append(decision)
+                continue
+            for mask in item_masks[rule.for_each]:
+                for case_mask, case_decision in zip(case_masks, case_decisions):
+                    if mask & case_mask:
+                        decisions.append(case_decision)
+                        break
+        return decisions
+
+    def evaluate_batch(
+        self,
+        deals: Iterable[Any],
+        features: Optional[Sequence[Optional[DealFeatures]]] = None,
+    ) -> List[List[DecisionBasis]]:
+        """Evaluate the rules on a batch of deals.
+
+        Args:
+            deals: DealContext models or deal dictionaries
+            features: Features of each deal, whose normalized texts are
+                matched and which are used by numeric conditions; missing
+                features are extracted when a rule needs them
+
+        Returns:
+            Decision records of each deal, in rule order
+        """
+        deals = list(deals)
+        if features is not None and len(features) != len(deals):
+            raise ValueError("Expected one DealFeatures per deal")
+        fields = list(self._patterns)
+        item_fields = {rule.for_each for rule in self.rules if rule.for_each}
+
+        # The batch allocates many short-lived objects and no cycles; pausing
+        # the cyclic garbage collector avoids repeated full-heap scans
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            matches = [
+                self._match_field(field, deals, field in item_fields, features)
+                for field in fields
+            ]
+            numeric_masks = (
+                [
+                    self._numeric_mask(
+                        deal_features
+                        if deal_features is not None
+                        else extract_deal_features(deal)
+                    )
+                    for deal, deal_features in zip(
+                        deals, features or [None] * len(deals)
+                    )
+                ]
+                if self._numeric_rules
+                else [0] * len(deals)
+            )
+
+            # Deals with the same bitmasks get the same decisions, which are
+            # computed once per distinct signature
+            cache: Dict[tuple, List[DecisionBasis]] = {}
+            results = []
+            signatures = zip(
+                *(deal_masks for deal_masks, _ in matches),
+                *(items for _, items in matches if items is not None),
+                numeric_masks,
+            )
+            item_columns = [f for f, (_, items) in zip(fields, matches) if items]
+            for signature in signatures:
+                decisions = cache.get(signature)
+                if decisions is None:
+                    decisions = cache[signature] = self._decide(
+                        dict(zip(fields, signature)),
+                        dict(zip(item_columns, signature[len(fields) : -1])),
+                        signature[-1],
+                    )
+                results.append([dict(decision) for decision in decisions])
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return results
+
+    def evaluate(
+        self, deal: Any, features: Optional[DealFeatures] = None
+    ) -> List[DecisionBasis]:
+        """Evaluate the rules on a single deal."""
+        return self.evaluate_batch([deal], [features])[0]
+
+
+_engine: Optional[RuleEngine] = None
+
+
+def get_rule_engine() -> RuleEngine:
+    """Return the rule engine compiled from agent_settings.yaml."""
+    global _engine
+    if _engine is None:
+        from agents.offer_negotiation.utils.agent_settings import load_agent_settings
+
+        _engine = RuleEngine(load_agent_settings().heuristic_rules)
+    return _engine
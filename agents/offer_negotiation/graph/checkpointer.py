@@ -0,0 +1,274 @@
+"""SQLite persistence of graph checkpoints.
+
+``SqliteCheckpointer`` keeps the checkpoints of running threads in memory
+like langgraph's ``InMemorySaver``, which serves every read, and mirrors them
+to a local SQLite file so that a run that failed in one process can be
+resumed from its last completed node in another. Writes are queued and
+committed in batches by a background thread, so checkpointing adds no SQLite
+round trip to the node latency; ``flush`` waits for the queued writes, and
+the queue is committed when the process exits.
+
+A thread is dropped from memory with ``release`` once its writes are
+committed, so long batch processes do not accumulate the checkpoints of
+their runs, and is loaded from SQLite the next time it is read.
+"""
+
+import atexit
+import logging
+import pickle
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS checkpoints ("
+    "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, "
+    "checkpoint_id TEXT NOT NULL, value BLOB NOT NULL, "
+    "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))",
+    "CREATE TABLE IF NOT EXISTS blobs ("
+    "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, "
+    "channel TEXT NOT NULL, version TEXT NOT NULL, value BLOB NOT NULL, "
+    "PRIMARY KEY (thread_id, checkpoint_ns, channel, version))",
+    "CREATE TABLE IF NOT EXISTS writes ("
+    "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, "
+    "checkpoint_id TEXT NOT NULL, task_id TEXT NOT NULL, idx INTEGER NOT NULL, "
+    "value BLOB NOT NULL, "
+    "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))",
+]
+
+
+class _Release(NamedTuple):
+    """Queued once the writes of a thread: drops the thread from memory."""
+
+    thread_id: str
+
+
+# Queued statement or release, or None to stop the writer
+_Statement = Optional[Union[Tuple[str, tuple], _Release]]
+
+
+class SqliteCheckpointer(InMemorySaver):
+    """Checkpoint saver persisted to SQLite with batched background writes."""
+
+    def __init__(self, path: Path):
+        """Open (or create) the checkpoint database.
+
+        Args:
+            path: SQLite file of the checkpoints
+        """
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+        self._loaded: Set[str] = set()
+        self._load_lock = threading.Lock()
+        self._queue: "queue.Queue[_Statement]" = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._write_batches, name="checkpoint-writer", daemon=True
+        )
+        self._writer.start()
+        self._closed = False
+        # The writer is a daemon thread: commit the queued writes on exit
+        atexit.register(self.close)
+
+    # Persistence
+
+    def _write_batches(self) -> None:
+        """Commit the queued statements, one transaction per batch."""
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            statements = [s for s in batch if isinstance(s, tuple)]
+            releases = [s for s in statements if isinstance(s, _Release)]
+            statements = [s for s in statements if not isinstance(s, _Release)]
+            try:
+                with self._conn:
+                    for sql, params in statements:
+                        self._conn.execute(sql, params)
+            except sqlite3.Error as e:
+                # Released threads stay in memory, the only copy of their writes
+                logger.error(f"Failed to write {len(statements)} checkpoint rows: {e}")
+            else:
+                for release in releases:
+                    self._evict(release.thread_id)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if None in batch:
+                return
+
+    def _enqueue(self, sql: str, params: tuple) -> None:
+        self._queue.put((sql, params))
+
+    def flush(self) -> None:
+        """Wait until the queued checkpoint writes are committed."""
+        self._queue.join()
+
+    def release(self, thread_id: str) -> None:
+        """Drop a thread from memory once its queued writes are committed."""
+        self._queue.put(_Release(thread_id))
+
+    def _evict(self, thread_id: str) -> None:
+        self._loaded.discard(thread_id)
+        self.storage.pop(thread_id, None)
+        # Keys are copied first: runs of other threads keep adding entries
+        for key in [key for key in list(self.blobs) if key[0] == thread_id]:
+            self.blobs.pop(key, None)
+        for key in [key for key in list(self.writes) if key[0] == thread_id]:
+            self.writes.pop(key, None)
+
+    def close(self) -> None:
+        """Commit the queued writes and close the database."""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._conn.close()
+
+    def _load_threads(self, thread_ids: Optional[Sequence[str]] = None) -> None:
+        """Load threads (all when None) from SQLite into memory."""
+        with self._load_lock:
+            if thread_ids is None:
+                rows = self._conn.execute(
+                    "SELECT DISTINCT thread_id FROM checkpoints"
+                ).fetchall()
+                thread_ids = [row[0] for row in rows]
+            thread_ids = [t for t in thread_ids if t not in self._loaded]
+            if not thread_ids:
+                return
+            self.flush()
+            for thread_id in thread_ids:
+                self._load_thread(thread_id)
+                self._loaded.add(thread_id)
+
+    def _load_thread(self, thread_id: str) -> None:
+        rows = self._conn.execute(
+            "SELECT checkpoint_ns, checkpoint_id, value FROM checkpoints "
+            "WHERE thread_id = ?",
+            (thread_id,),
+        )
+        for ns, checkpoint_id, value in rows:
+            self.storage[thread_id][ns].setdefault(checkpoint_id, pickle.loads(value))
+        rows = self._conn.execute(
+            "SELECT checkpoint_ns, channel, version, value FROM blobs "
+            "WHERE thread_id = ?",
+            (thread_id,),
+        )
+        for ns, channel, version, value in rows:
+            self.blobs.setdefault(
+                (thread_id, ns, channel, version), pickle.loads(value)
+            )
+        rows = self._conn.execute(
+            "SELECT checkpoint_ns, checkpoint_id, task_id, idx, value FROM writes "
+            "WHERE thread_id = ?",
+            (thread_id,),
+        )
+        for ns, checkpoint_id, task_id, idx, value in rows:
+            self.writes[(thread_id, ns, checkpoint_id)].setdefault(
+                (task_id, idx), pickle.loads(value)
+            )
+
+    # BaseCheckpointSaver
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        self._load_threads([config["configurable"]["thread_id"]])
+        return super().get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        self._load_threads([config["configurable"]["thread_id"]] if config else None)
+        return super().list(config, filter=filter, before=before, limit=limit)
+
+    def get_delta_channel_history(self, *, config: RunnableConfig, channels):
+        self._load_threads([config["configurable"]["thread_id"]])
+        return super().get_delta_channel_history(config=config, channels=channels)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = saved["configurable"]["thread_id"]
+        ns = saved["configurable"]["checkpoint_ns"]
+        checkpoint_id = saved["configurable"]["checkpoint_id"]
+        self._loaded.add(thread_id)
+        for channel, version in new_versions.items():
+            self._enqueue(
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    ns,
+                    channel,
+                    str(version),
+                    pickle.dumps(self.blobs[(thread_id, ns, channel, version)]),
+                ),
+            )
+        self._enqueue(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+            (
+                thread_id,
+                ns,
+                checkpoint_id,
+                pickle.dumps(self.storage[thread_id][ns][checkpoint_id]),
+            ),
+        )
+        return saved
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        super().put_writes(config, writes, task_id, task_path)
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        stored = self.writes.get((thread_id, ns, checkpoint_id), {})
+        for idx, (channel, _) in enumerate(writes):
+            key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+            if key in stored:
+                self._enqueue(
+                    "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?)",
+                    (thread_id, ns, checkpoint_id, *key, pickle.dumps(stored[key])),
+                )
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        for table in ["checkpoints", "blobs", "writes"]:
+            self._enqueue(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
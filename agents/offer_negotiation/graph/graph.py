@@ -1,5 +1,8 @@
+from typing import Any, Optional, Sequence
+
 from langgraph.graph import END, StateGraph
 
+from agents.offer_negotiation.core.analytics.offer_analytics import OfferAnalytics
 from agents.offer_negotiation.core.repositories.mock_deal_repository import (
     MockDealRepository,
 )
@@ -14,34 +17,114 @@ from agents.offer_negotiation.graph.nodes.identify_information_needs_node import
 )
 from agents.offer_negotiation.graph.nodes.input_nodes import create_input_graph
 from agents.offer_negotiation.graph.nodes.retrieve_domain_knowledge_node import (
+    create_collect_domain_knowledge_node,
     create_retrieve_domain_knowledge_node,
+    create_retrieve_need_node,
+    fan_out_information_needs,
+)
+from agents.offer_negotiation.graph.nodes.retrieve_past_strategies_node import (
+    create_retrieve_past_strategies_node,
 )
+from agents.offer_negotiation.graph.utils import NodeWrapper, wrap_node
 from agents.offer_negotiation.knowledge.domain_knowledge_base import DomainKnowledgeBase
+from agents.offer_negotiation.knowledge.strategy_index import StrategyIndex
+from agents.offer_negotiation.utils.agent_settings import load_agent_settings
 
 
 def create_agent_graph(
     deal_repo: MockDealRepository,
     knowledge_base: DomainKnowledgeBase,
+    node_wrappers: Optional[Sequence[NodeWrapper]] = None,
+    llm: Optional[Any] = None,
+    offer_analytics: Optional[OfferAnalytics] = None,
+    strategy_index: Optional[StrategyIndex] = None,
 ) -> StateGraph:
-    """Create the complete agent graph with all nodes and edges."""
+    """Create the complete agent graph with all nodes and edges.
+
+    Independent work runs on parallel branches: the domain knowledge is
+    fetched while the information needs are identified, and each need is
+    retrieved concurrently before the results are collected in need order::
+
+        fetch_deal_context -> compute_deal_features
+            -> fetch_domain_knowledge ----------------------------+
+            -> identify_information_needs                         |
+                -> retrieve_domain_knowledge (one per need) ------+
+                    -> collect_domain_knowledge -> generate_strategy
+                        -> explain_rationale
+
+    With a strategy index, the past strategies of similar deals are retrieved
+    on another branch from compute_deal_features to collect_domain_knowledge.
+
+    Args:
+        deal_repo: Repository used to fetch deal context
+        knowledge_base: Domain knowledge base used for retrieval
+        node_wrappers: Optional wrappers applied to every node (profiling, ...)
+        llm: Chat model used for strategy generation; defaults to get_llm()
+        offer_analytics: Offer trajectories summarized in the strategy prompt;
+            defaults to the deals of ``deal_repo`` when enabled in
+            agent_settings.yaml
+        strategy_index: Index of the past strategies added to the domain
+            knowledge; none are retrieved without it
+    """
     # Create the input portion of the graph
-    workflow = create_input_graph(deal_repo, knowledge_base)
+    workflow = create_input_graph(deal_repo, knowledge_base, node_wrappers)
+
+    # Parse the offers of the deal book once for all strategy prompts
+    agent_settings = load_agent_settings()
+    if offer_analytics is None:
+        settings = agent_settings.offer_analytics
+        if settings.enabled:
+            offer_analytics = OfferAnalytics.from_deals(
+                deal_repo.iter_deals(), settings.max_deals
+            )
 
     # Add our new nodes
-    workflow.add_node(
-        "identify_information_needs", create_identify_information_needs_node()
-    )
+    nodes = {
+        "identify_information_needs": create_identify_information_needs_node(),
+        "collect_domain_knowledge": create_collect_domain_knowledge_node(),
+        "generate_strategy": create_generate_strategy_node(
+            llm,
+            offer_analytics=offer_analytics,
+            structured_output=agent_settings.structured_output,
+        ),
+        "explain_rationale": create_explain_rationale_node(),
+    }
+    for name, node in nodes.items():
+        workflow.add_node(name, wrap_node(name, node, node_wrappers))
     workflow.add_node(
         "retrieve_domain_knowledge",
-        create_retrieve_domain_knowledge_node(knowledge_base),
+        wrap_node(
+            "retrieve_domain_knowledge",
+            create_retrieve_need_node(
+                create_retrieve_domain_knowledge_node(knowledge_base)
+            ),
+            node_wrappers,
+        ),
     )
-    workflow.add_node("generate_strategy", create_generate_strategy_node())
-    workflow.add_node("explain_rationale", create_explain_rationale_node())
 
-    # Connect the nodes in sequence
-    workflow.add_edge("fetch_domain_knowledge", "identify_information_needs")
-    workflow.add_edge("identify_information_needs", "retrieve_domain_knowledge")
-    workflow.add_edge("retrieve_domain_knowledge", "generate_strategy")
+    # Branch after the deal features, fan out per need and join before the LLM
+    workflow.add_edge("compute_deal_features", "identify_information_needs")
+    workflow.add_conditional_edges(
+        "identify_information_needs",
+        fan_out_information_needs,
+        ["retrieve_domain_knowledge"],
+    )
+    joined = ["fetch_domain_knowledge", "retrieve_domain_knowledge"]
+    if strategy_index is not None:
+        workflow.add_node(
+            "retrieve_past_strategies",
+            wrap_node(
+                "retrieve_past_strategies",
+                create_retrieve_past_strategies_node(
+                    strategy_index, agent_settings.strategy_index
+                ),
+                node_wrappers,
+            ),
+        )
+        workflow.add_edge("compute_deal_features", "retrieve_past_strategies")
+        joined.append("retrieve_past_strategies")
+    workflow.add_edge(joined, "collect_domain_knowledge")
+    workflow.add_edge("collect_domain_knowledge", "generate_strategy")
     workflow.add_edge("generate_strategy", "explain_rationale")
     workflow.add_edge("explain_rationale", END)
 
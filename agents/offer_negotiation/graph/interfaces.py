@@ -22,6 +22,9 @@ class NodeMetadata(BaseModel):
     optional_fields: List[str] = Field(
         default_factory=list, description="Optional fields in the input state"
     )
+    prompts: List[str] = Field(
+        default_factory=list, description="Prompt files of config/prompts used"
+    )
 
 
 # Node Interfaces
@@ -30,15 +33,14 @@ IDENTIFY_INFORMATION_NEEDS_METADATA = NodeMetadata(
     description="Identifies information needs from the deal context",
     input_schema={
         "deal_context": Dict[str, Any],
-        "domain_knowledge": List[Dict[str, Any]],
+        "deal_features": Dict[str, Any],
     },
     output_schema={
         "deal_context": Dict[str, Any],
-        "domain_knowledge": List[Dict[str, Any]],
         "information_needs": List[str],
     },
     required_fields=["deal_context"],
-    optional_fields=["domain_knowledge"],
+    optional_fields=["deal_features"],
 )
 
 
@@ -53,25 +55,48 @@ RETRIEVE_DOMAIN_KNOWLEDGE_METADATA = NodeMetadata(
         "deal_context": Dict[str, Any],
         "information_needs": List[str],
         "domain_knowledge": List[Dict[str, Any]],
+        "retrieved_knowledge": Dict[str, List[Dict[str, Any]]],
     },
     required_fields=["deal_context", "information_needs"],
 )
 
 
+RETRIEVE_PAST_STRATEGIES_METADATA = NodeMetadata(
+    name="retrieve_past_strategies",
+    description="Retrieves the past strategies of deals with similar objections",
+    input_schema={
+        "deal_id": str,
+        "deal_context": Dict[str, Any],
+        "deal_features": Dict[str, Any],
+    },
+    output_schema={
+        "past_strategies": List[Dict[str, Any]],
+    },
+    required_fields=["deal_id", "deal_context"],
+    optional_fields=["deal_features"],
+)
+
+
 GENERATE_STRATEGY_METADATA = NodeMetadata(
     name="generate_strategy",
     description="Generates a negotiation strategy based on deal context and domain knowledge",
     input_schema={
         "deal_context": Dict[str, Any],
+        "deal_features": Dict[str, Any],
         "domain_knowledge": List[Dict[str, Any]],
     },
     output_schema={
         "deal_context": Dict[str, Any],
         "domain_knowledge": List[Dict[str, Any]],
         "strategy": str,
+        "strategy_rationale": str,
+        "used_domain_chunks": List[Dict[str, str]],
         "decision_basis": List[Dict[str, str]],
+        "prompt_version": str,
     },
     required_fields=["deal_context", "domain_knowledge"],
+    optional_fields=["deal_features"],
+    prompts=["strategy_generation.md", "structured_strategy.md", "strategy_request.md"],
 )
 
 
@@ -82,6 +107,8 @@ EXPLAIN_RATIONALE_METADATA = NodeMetadata(
         "deal_context": Dict[str, Any],
         "domain_knowledge": List[Dict[str, Any]],
         "strategy": str,
+        "strategy_rationale": str,
+        "used_domain_chunks": List[Dict[str, str]],
         "decision_basis": List[Dict[str, str]],
     },
     output_schema={
@@ -93,5 +120,23 @@ EXPLAIN_RATIONALE_METADATA = NodeMetadata(
         "reasoning_steps": List[str],
     },
     required_fields=["deal_context", "strategy"],
-    optional_fields=["domain_knowledge", "decision_basis"],
+    optional_fields=[
+        "domain_knowledge",
+        "decision_basis",
+        "strategy_rationale",
+        "used_domain_chunks",
+    ],
 )
+
+
+# Metadata of each node, by node name
+NODE_METADATA: Dict[str, NodeMetadata] = {
+    metadata.name: metadata
+    for metadata in (
+        IDENTIFY_INFORMATION_NEEDS_METADATA,
+        RETRIEVE_DOMAIN_KNOWLEDGE_METADATA,
+        RETRIEVE_PAST_STRATEGIES_METADATA,
+        GENERATE_STRATEGY_METADATA,
+        EXPLAIN_RATIONALE_METADATA,
+    )
+}
@@ -1,7 +1,7 @@
 import json
 import logging
 from datetime import UTC, datetime
-from typing import Callable
+from typing import Callable, Dict, List, Optional
 
 from langchain_core.prompts import ChatPromptTemplate
 from langsmith import traceable
@@ -20,11 +20,31 @@ from agents.offer_negotiation.utils.trace_metadata import (
 logger = logging.getLogger(__name__)
 
 
-def generate_rationale(strategy: str, decision_basis: list) -> str:
-    """Generate a rationale string based on the strategy and decision basis."""
-    rationale = (
-        f"Rationale for the proposed strategy:\n\n{strategy}\n\nDecision Basis:\n"
-    )
+def generate_rationale(
+    strategy: str,
+    decision_basis: list,
+    explanation: Optional[str] = None,
+    cited_chunks: Optional[List[Dict[str, str]]] = None,
+) -> str:
+    """Generate a rationale string based on the strategy and decision basis.
+
+    ``explanation`` is the rationale returned with a structured strategy; it
+    replaces the strategy in the rationale, followed by the cited chunks.
+    """
+    if explanation:
+        rationale = f"Rationale for the proposed strategy:\n\n{explanation}\n\n"
+        if cited_chunks:
+            rationale += "Cited Domain Knowledge:\n"
+            for chunk in cited_chunks:
+                rationale += (
+                    f"- {chunk['chunk_id']} ({chunk.get('document_type', '')})\n"
+                )
+            rationale += "\n"
+        rationale += "Decision Basis:\n"
+    else:
+        rationale = (
+            f"Rationale for the proposed strategy:\n\n{strategy}\n\nDecision Basis:\n"
+        )
     for decision in decision_basis:
         rationale += f"- {decision.get('heuristic', '')}: {decision.get('justification', '')} (Confidence: {decision.get('confidence', '')})\n"
     return rationale
@@ -55,7 +75,12 @@ def create_explain_rationale_node() -> Callable:
                 raise ValueError("decision_basis is required")
 
             # Generate rationale based on strategy and decision_basis
-            rationale = generate_rationale(state.strategy, state.decision_basis)
+            rationale = generate_rationale(
+                state.strategy,
+                state.decision_basis,
+                state.strategy_rationale,
+                state.used_domain_chunks,
+            )
 
             # Log output state
             logger.info(f"Generated rationale: {rationale}")
@@ -1,18 +1,44 @@
 import json
 import logging
 from datetime import UTC, datetime
-from typing import Any, Callable, Dict, List, Optional, TypedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 
 from langchain_core.prompts import ChatPromptTemplate
 from langsmith import traceable
 
+from agents.offer_negotiation.core.analytics.offer_analytics import OfferAnalytics
+from agents.offer_negotiation.core.features.deal_features import DealFeatures
 from agents.offer_negotiation.core.models.deal_models import DealContext
+from agents.offer_negotiation.core.models.strategy_models import StructuredStrategy
+from agents.offer_negotiation.core.rules.rule_engine import (
+    DecisionBasis,
+    get_rule_engine,
+)
 from agents.offer_negotiation.graph.interfaces import GENERATE_STRATEGY_METADATA
 from agents.offer_negotiation.graph.state import DomainKnowledgeState, StrategyState
-from agents.offer_negotiation.graph.utils import log_state
+from agents.offer_negotiation.graph.utils import get_deal_features, log_state
 from agents.offer_negotiation.knowledge.domain_documents import DocumentChunk
-from agents.offer_negotiation.utils.model import get_llm
-from agents.offer_negotiation.utils.prompt_loader import load_prompt
+from agents.offer_negotiation.utils.agent_settings import StructuredOutputSettings
+from agents.offer_negotiation.utils.model import get_llm, load_model_settings
+from agents.offer_negotiation.utils.model_router import (
+    ModelRouter,
+    score_complexity,
+    validate_strategy,
+)
+from agents.offer_negotiation.utils.node_events import record_token_usage
+from agents.offer_negotiation.utils.prompt_cache import (
+    PromptCacheTracker,
+    get_prompt_cache_tracker,
+)
+from agents.offer_negotiation.utils.prompt_loader import (
+    PromptRegistry,
+    TemplateMessages,
+    get_prompt_registry,
+)
+from agents.offer_negotiation.utils.structured_output import (
+    invoke_structured,
+    structured_problems,
+)
 from agents.offer_negotiation.utils.trace_metadata import (
     add_error_metadata,
     add_performance_metadata,
@@ -22,99 +48,162 @@ from agents.offer_negotiation.utils.trace_metadata import (
 logger = logging.getLogger(__name__)
 
 
-class DecisionBasis(TypedDict):
-    heuristic: str
-    justification: str
-    confidence: str
+def evaluate_heuristics(
+    deal_context: DealContext, features: Optional[DealFeatures] = None
+) -> List[DecisionBasis]:
+    """Evaluate deal context against defined heuristics and return matching decisions.
 
+    The heuristics are the rules of agent_settings.yaml (see RuleEngine);
+    ``features`` are the parsed deal features used by numeric conditions.
+    """
+    return get_rule_engine().evaluate(deal_context, features)
 
-def evaluate_heuristics(deal_context: DealContext) -> List[DecisionBasis]:
-    """Evaluate deal context against defined heuristics and return matching decisions."""
-    decisions: List[DecisionBasis] = []
 
-    # Heuristic 1: Premium Objection → Deductible Trade
-    if any(
-        "premium" in obj.lower() for obj in deal_context.negotiation_context.objections
-    ):
-        # Check if client has history of accepting deductible adjustments
-        has_deductible_history = any(
-            "deductible" in note.lower()
-            for note in deal_context.client_history.prior_negotiations
-        )
+def evaluate_heuristics_batch(
+    deal_contexts: Iterable[Union[DealContext, Dict[str, Any]]],
+    features: Optional[List[Optional[DealFeatures]]] = None,
+) -> List[List[DecisionBasis]]:
+    """Evaluate the heuristics on a batch of deals in one pass per field."""
+    return get_rule_engine().evaluate_batch(deal_contexts, features)
 
-        if has_deductible_history:
-            decisions.append(
-                {
-                    "heuristic": "Premium Objection → Deductible Trade",
-                    "justification": "Client objected to premium and has history of accepting deductible adjustments",
-                    "confidence": "High - Matches objection pattern and client history",
-                }
-            )
 
-    # Heuristic 2: Coverage Request → Evaluate Against Limits
-    if any(
-        "coverage" in obj.lower() for obj in deal_context.negotiation_context.objections
-    ):
-        # Extract current limits from coverage terms
-        try:
-            # Parse coverage terms to get current limits
-            coverage_terms = deal_context.submission.coverage_terms.lower()
-            if "limit" in coverage_terms:
-                # limit_str = coverage_terms.split("$")[1].split()[0]
-                # current_limit = float(limit_str.replace("m", "000000"))
-
-                # Check for specific coverage requests in objections
-                for objection in deal_context.negotiation_context.objections:
-                    if "business interruption" in objection.lower():
-                        decisions.append(
-                            {
-                                "heuristic": "Coverage Request → Business Interruption",
-                                "justification": "Client requested additional business interruption coverage",
-                                "confidence": "High - Explicit coverage request",
-                            }
-                        )
-                    elif "flood" in objection.lower():
-                        decisions.append(
-                            {
-                                "heuristic": "Coverage Request → Flood Coverage",
-                                "justification": "Client requested flood coverage consideration",
-                                "confidence": "High - Explicit coverage request",
-                            }
-                        )
-        except (IndexError, ValueError):
-            logger.warning("Could not parse coverage limits from terms")
-
-    # Heuristic 3: Risk Profile → Coverage Adjustments
-    if deal_context.submission.risk_profile:
-        risk_profile = deal_context.submission.risk_profile.lower()
-        if "high-risk" in risk_profile:
-            decisions.append(
-                {
-                    "heuristic": "High Risk → Enhanced Coverage",
-                    "justification": "High-risk profile suggests need for enhanced coverage options",
-                    "confidence": "Medium - Based on risk profile",
-                }
-            )
+def strategy_prompt_messages(structured: bool = False) -> TemplateMessages:
+    """Return the prompt files of each message of the strategy prompt."""
+    system = ["strategy_generation.md"]
+    if structured:
+        system.append("structured_strategy.md")
+    return [("system", system), ("human", ["strategy_request.md"])]
 
-    return decisions
 
+def create_strategy_prompt(structured: bool = False) -> ChatPromptTemplate:
+    """Return the prompt template used for strategy generation.
 
-def create_generate_strategy_node() -> Callable:
-    """Create a node that generates a negotiation strategy based on deal context and domain knowledge."""
-    # Get the LLM
-    llm = get_llm()
+    The system message holds only static content (instructions and few-shot
+    examples) and the deal-specific inputs come last in the human message, so
+    that providers can serve the shared prefix from their prompt cache.
 
-    # Create the prompt template
-    strategy_prompt = ChatPromptTemplate.from_messages(
+    With ``structured``, the model is asked for a StructuredStrategy JSON
+    object (see structured_strategy.md) instead of free text.
+    """
+    template, _ = get_prompt_registry().chat_template(
+        strategy_prompt_messages(structured)
+    )
+    return template
+
+
+def build_strategy_inputs(
+    deal_context: DealContext,
+    domain_chunks: List[DocumentChunk],
+    decisions: List[DecisionBasis],
+    offer_analytics: Optional[str] = None,
+    cite_chunks: bool = False,
+) -> Dict[str, str]:
+    """Format the deal context, domain knowledge and decisions for the prompt.
+
+    ``offer_analytics`` is the offer trajectory summary of the deal (see
+    OfferAnalytics.summarize); with ``cite_chunks`` each knowledge chunk is
+    prefixed with its ID so that the model can cite it.
+    """
+    # Format domain knowledge
+    domain_knowledge = "\n".join(
         [
-            ("system", load_prompt("strategy_generation.md")),
-            (
-                "human",
-                "Please generate a negotiation strategy based on the provided context and decision rules.",
-            ),
+            f"- {f'[{chunk.chunk_id}] ' if cite_chunks else ''}{chunk.text} "
+            f"(Source: {chunk.metadata['document_type']})"
+            for chunk in domain_chunks
         ]
     )
 
+    # Format decision rules for prompt
+    decision_rules = (
+        "\n".join(
+            [
+                f"- {decision['heuristic']}: {decision['justification']}"
+                for decision in decisions
+            ]
+        )
+        or "No specific decision rules were triggered."
+    )
+
+    return {
+        "deal_context": deal_context.model_dump_json(indent=2),
+        "domain_knowledge": domain_knowledge
+        or "No specific domain knowledge available.",
+        "decision_rules": decision_rules,
+        "offer_analytics": offer_analytics or "No offer analytics available.",
+    }
+
+
+def cited_chunks(
+    domain_chunks: List[DocumentChunk], chunk_ids: List[str]
+) -> List[Dict[str, str]]:
+    """Return the cited chunks of the prompt, in citation order.
+
+    IDs that were not in the prompt are dropped.
+    """
+    chunks = {chunk.chunk_id: chunk for chunk in domain_chunks}
+    unknown = [chunk_id for chunk_id in chunk_ids if chunk_id not in chunks]
+    if unknown:
+        logger.warning(f"Ignoring citations of unknown chunks: {unknown}")
+    return [
+        {
+            "chunk_id": chunk_id,
+            "source_doc_id": chunks[chunk_id].source_doc_id,
+            "document_type": str(chunks[chunk_id].metadata.get("document_type", "")),
+        }
+        for chunk_id in dict.fromkeys(chunk_ids)
+        if chunk_id in chunks
+    ]
+
+
+def create_generate_strategy_node(
+    llm: Optional[Any] = None,
+    router: Optional[ModelRouter] = None,
+    offer_analytics: Optional[OfferAnalytics] = None,
+    structured_output: Optional[StructuredOutputSettings] = None,
+    prompt_cache: Optional[PromptCacheTracker] = None,
+    prompt_registry: Optional[PromptRegistry] = None,
+) -> Callable:
+    """Create a node that generates a negotiation strategy based on deal context and domain knowledge.
+
+    Args:
+        llm: Chat model to use; defaults to the model returned by get_llm()
+        router: Model router choosing the model per deal; defaults to the
+            router configured in model_settings.yaml when no llm is given
+        offer_analytics: Offer trajectories of the deal book, summarized in
+            the prompt against the deal's own offers
+        structured_output: When enabled, the same LLM call also returns the
+            rationale and the cited knowledge chunks as StructuredStrategy
+        prompt_cache: Counts the cached input tokens of each LLM call;
+            defaults to the process-wide tracker
+        prompt_registry: Prompt templates, read on every call so that changed
+            prompts are used without a restart; defaults to config/prompts
+    """
+    structured = structured_output is not None and structured_output.enabled
+
+    # Get the LLM, or route per deal when a cascade is configured
+    if llm is None and router is None:
+        router = ModelRouter.from_model_settings(load_model_settings())
+    if llm is None and router is None:
+        llm = get_llm()
+
+    # Create the prompt template
+    # Compile the prompt when the graph is built, not on the first deal
+    if prompt_registry is None:
+        prompt_registry = get_prompt_registry()
+    prompt_messages = strategy_prompt_messages(structured)
+    prompt_registry.chat_template(prompt_messages)
+    prompt_name = "structured_strategy" if structured else "strategy"
+    if prompt_cache is None:
+        prompt_cache = get_prompt_cache_tracker()
+    validate = (
+        (lambda content: structured_problems(content, StructuredStrategy))
+        if structured
+        else validate_strategy
+    )
+
+    # Compile the heuristic rules when the graph is built, not on the first deal
+    get_rule_engine()
+
     @traceable(
         name=GENERATE_STRATEGY_METADATA.name,
         run_type="chain",
@@ -143,7 +232,8 @@ def create_generate_strategy_node() -> Callable:
             deal_context = DealContext(**state.deal_context)
 
             # Evaluate heuristics
-            decisions = evaluate_heuristics(deal_context)
+            features = get_deal_features(state)
+            decisions = evaluate_heuristics(deal_context, features)
 
             # Log triggered heuristics
             for decision in decisions:
@@ -153,49 +243,69 @@ def create_generate_strategy_node() -> Callable:
                     f"Confidence: {decision['confidence']}"
                 )
 
-            # Format domain knowledge
-            domain_knowledge = "\n".join(
-                [
-                    f"- {chunk.text} (Source: {chunk.metadata['document_type']})"
-                    for chunk in state.domain_knowledge
-                ]
-            )
-
-            # Format decision rules for prompt
-            decision_rules = (
-                "\n".join(
-                    [
-                        f"- {decision['heuristic']}: {decision['justification']}"
-                        for decision in decisions
-                    ]
+            # Generate strategy using LLM
+            offer_summary = (
+                offer_analytics.summarize(
+                    deal_context.submission.line_of_business,
+                    deal_context.submission.territory,
+                    features.offers,
                 )
-                or "No specific decision rules were triggered."
+                if offer_analytics is not None
+                else None
             )
-
-            # Generate strategy using LLM
-            chain = strategy_prompt | llm
-            response = chain.invoke(
-                {
-                    "deal_context": deal_context.model_dump_json(indent=2),
-                    "domain_knowledge": domain_knowledge
-                    or "No specific domain knowledge available.",
-                    "decision_rules": decision_rules,
-                }
+            inputs = build_strategy_inputs(
+                deal_context,
+                state.domain_knowledge,
+                decisions,
+                offer_summary,
+                cite_chunks=structured,
             )
+            if router is not None:
+                score = score_complexity(
+                    deal_context, decisions, router.settings.weights
+                )
 
-            negotiation_strategy = response.content
-            logger.info(f"Generated strategy: {negotiation_strategy}")
+            def invoke(messages):
+                if router is not None:
+                    response, routing = router.invoke(messages, score, validate)
+                    trace["routing"] = routing.model_dump()
+                else:
+                    response = llm.invoke(messages)
+                prompt_cache.record(prompt_name, response)
+                record_token_usage(response)
+                return response
+
+            strategy_prompt, prompt_version = prompt_registry.chat_template(
+                prompt_messages
+            )
+            trace["prompt_version"] = prompt_version
+            prompt = strategy_prompt.invoke(inputs)
+            updates: Dict[str, Any] = {
+                "decision_basis": decisions,
+                "prompt_version": prompt_version,
+            }
+            if structured:
+                parsed, _, repairs = invoke_structured(
+                    invoke,
+                    prompt.to_messages(),
+                    StructuredStrategy,
+                    structured_output.max_repairs,
+                )
+                trace["structured_output_repairs"] = repairs
+                updates["strategy"] = parsed.format_strategy()
+                updates["strategy_rationale"] = parsed.rationale
+                updates["used_domain_chunks"] = cited_chunks(
+                    state.domain_knowledge, parsed.cited_chunk_ids
+                )
+            else:
+                updates["strategy"] = invoke(prompt).content
+            logger.info(f"Generated strategy: {updates['strategy']}")
 
             # Update state with strategy and decision basis
             logger.info("=== Completed generate_strategy node ===")
             return StrategyState(
-                **{
-                    k: v
-                    for k, v in state.model_dump().items()
-                    if k not in ["strategy", "decision_basis"]
-                },
-                strategy=negotiation_strategy,
-                decision_basis=decisions,
+                **{k: v for k, v in state.model_dump().items() if k not in updates},
+                **updates,
             )
 
         except Exception as e:
@@ -1,15 +1,21 @@
 import logging
 from datetime import UTC, datetime
-from typing import Callable, List
+from typing import Any, Callable, Dict, List
 
 from langsmith import traceable
 
+from agents.offer_negotiation.core.features.deal_features import (
+    OBJECTION_CATEGORY_NEEDS,
+    DealFeatures,
+    categorize_objection,
+    normalize_text,
+)
 from agents.offer_negotiation.core.models.deal_models import DealContext
 from agents.offer_negotiation.graph.interfaces import (
     IDENTIFY_INFORMATION_NEEDS_METADATA,
 )
 from agents.offer_negotiation.graph.state import DealContextState, InformationNeedsState
-from agents.offer_negotiation.graph.utils import log_state
+from agents.offer_negotiation.graph.utils import get_deal_features, log_state
 from agents.offer_negotiation.utils.trace_metadata import (
     add_error_metadata,
     add_performance_metadata,
@@ -21,16 +27,46 @@ logger = logging.getLogger(__name__)
 
 def analyze_objections(objections: List[str]) -> List[str]:
     """Analyze objections to identify required information."""
-    needs = []
-    for objection in objections:
-        objection = objection.lower()
-        if "premium" in objection:
-            needs.append("submission.premium_structure")
-        if "coverage" in objection:
-            needs.append("submission.coverage_terms")
-        if "deductible" in objection:
-            needs.append("submission.deductible")
-    return needs
+    return [
+        OBJECTION_CATEGORY_NEEDS[category]
+        for objection in objections
+        for category in categorize_objection(normalize_text(objection))
+    ]
+
+
+def identify_needs(deal_context: Dict[str, Any], features: DealFeatures) -> List[str]:
+    """Identify the information needs of a deal.
+
+    Args:
+        deal_context: Deal context dictionary
+        features: Parsed features of the deal
+
+    Returns:
+        Information needs, without duplicates
+    """
+    information_needs = []
+    if "submission" in deal_context:
+        submission = deal_context["submission"]
+        if "risk_profile" in submission:
+            information_needs.append("submission.risk_profile")
+        if "premium_structure" in submission:
+            information_needs.append("submission.premium_structure")
+        if "deductible" in submission:
+            information_needs.append("submission.deductible")
+        if "coverage_terms" in submission:
+            information_needs.append("submission.coverage_terms")
+    if "client_history" in deal_context:
+        client_history = deal_context["client_history"]
+        if "prior_negotiations" in client_history:
+            information_needs.append("client_history.prior_negotiations")
+
+    # Needs raised by the parsed deal features
+    if features.deductible_amount is not None:
+        information_needs.append("submission.deductible")
+    information_needs.extend(
+        OBJECTION_CATEGORY_NEEDS[category] for category in features.objection_categories
+    )
+    return list(dict.fromkeys(information_needs))
 
 
 def create_identify_information_needs_node() -> Callable:
@@ -56,22 +92,9 @@ def create_identify_information_needs_node() -> Callable:
                 raise ValueError("deal_context is required")
 
             # Identify information needs based on deal context
-            information_needs = []
-            deal_context = state.deal_context
-            if "submission" in deal_context:
-                submission = deal_context["submission"]
-                if "risk_profile" in submission:
-                    information_needs.append("submission.risk_profile")
-                if "premium_structure" in submission:
-                    information_needs.append("submission.premium_structure")
-                if "deductible" in submission:
-                    information_needs.append("submission.deductible")
-                if "coverage_terms" in submission:
-                    information_needs.append("submission.coverage_terms")
-            if "client_history" in deal_context:
-                client_history = deal_context["client_history"]
-                if "prior_negotiations" in client_history:
-                    information_needs.append("client_history.prior_negotiations")
+            information_needs = identify_needs(
+                state.deal_context, get_deal_features(state)
+            )
 
             # Log output state
             logger.info(f"Identified information needs: {information_needs}")
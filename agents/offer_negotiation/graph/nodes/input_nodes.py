@@ -1,11 +1,13 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
 
 from langgraph.graph import END, StateGraph
 
+from ...core.features.deal_features import extract_deal_features
 from ...core.repositories.mock_deal_repository import MockDealRepository
 from ...knowledge.domain_documents import DocumentChunk, DocumentType
 from ...knowledge.domain_knowledge_base import DomainKnowledgeBase
-from ..state import DealContextState, DomainKnowledgeState
+from ..state import DealContextState, DomainKnowledgeState, FinalState
+from ..utils import NodeWrapper, wrap_node
 
 
 def create_deal_context_node(repo: MockDealRepository):
@@ -26,6 +28,21 @@ def create_deal_context_node(repo: MockDealRepository):
     return fetch_deal_context
 
 
+def create_deal_features_node():
+    """Create a node that parses the deal context into DealFeatures once."""
+
+    def compute_deal_features(state: DealContextState) -> DealContextState:
+        """Compute the features shared by the downstream nodes."""
+        features = extract_deal_features(state.deal_context or {})
+        return DealContextState(
+            deal_id=state.deal_id,
+            deal_context=state.deal_context,
+            deal_features=features.model_dump(),
+        )
+
+    return compute_deal_features
+
+
 def create_domain_knowledge_node(kb: DomainKnowledgeBase):
     """Create a node that retrieves relevant domain knowledge chunks."""
 
@@ -40,6 +57,7 @@ def create_domain_knowledge_node(kb: DomainKnowledgeBase):
         return DomainKnowledgeState(
             deal_id=state.deal_id,
             deal_context=state.deal_context,
+            deal_features=state.deal_features,
             domain_knowledge=chunks,
         )
 
@@ -47,21 +65,39 @@ def create_domain_knowledge_node(kb: DomainKnowledgeBase):
 
 
 def create_input_graph(
-    deal_repo: MockDealRepository, knowledge_base: DomainKnowledgeBase
+    deal_repo: MockDealRepository,
+    knowledge_base: DomainKnowledgeBase,
+    node_wrappers: Optional[Sequence[NodeWrapper]] = None,
 ) -> StateGraph:
     """Create the input portion of our agent graph."""
 
-    # Create the graph
-    workflow = StateGraph(DomainKnowledgeState)
+    # Create the graph; the output schema exposes the fields written by the
+    # downstream nodes (strategy, rationale, ...) in the final result
+    workflow = StateGraph(DomainKnowledgeState, output_schema=FinalState)
 
     # Add nodes
-    workflow.add_node("fetch_deal_context", create_deal_context_node(deal_repo))
     workflow.add_node(
-        "fetch_domain_knowledge", create_domain_knowledge_node(knowledge_base)
+        "fetch_deal_context",
+        wrap_node(
+            "fetch_deal_context", create_deal_context_node(deal_repo), node_wrappers
+        ),
+    )
+    workflow.add_node(
+        "compute_deal_features",
+        wrap_node("compute_deal_features", create_deal_features_node(), node_wrappers),
+    )
+    workflow.add_node(
+        "fetch_domain_knowledge",
+        wrap_node(
+            "fetch_domain_knowledge",
+            create_domain_knowledge_node(knowledge_base),
+            node_wrappers,
+        ),
     )
 
     # Define the flow
     workflow.set_entry_point("fetch_deal_context")
-    workflow.add_edge("fetch_deal_context", "fetch_domain_knowledge")
+    workflow.add_edge("fetch_deal_context", "compute_deal_features")
+    workflow.add_edge("compute_deal_features", "fetch_domain_knowledge")
 
     return workflow
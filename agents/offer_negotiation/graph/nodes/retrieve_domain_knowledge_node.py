@@ -1,7 +1,8 @@
 import logging
 from datetime import UTC, datetime
-from typing import Callable
+from typing import Callable, List
 
+from langgraph.types import Send
 from langsmith import traceable
 
 from agents.offer_negotiation.graph.interfaces import RETRIEVE_DOMAIN_KNOWLEDGE_METADATA
@@ -46,8 +47,10 @@ def create_retrieve_domain_knowledge_node(
 
             # Retrieve knowledge chunks for each information need
             domain_knowledge = []
+            retrieved_knowledge = {}
             for need in state.information_needs:
                 chunks = knowledge_base.retrieve(need)
+                retrieved_knowledge[need] = chunks
                 domain_knowledge.extend(chunks)
 
             # Log output state
@@ -71,9 +74,10 @@ def create_retrieve_domain_knowledge_node(
                 **{
                     k: v
                     for k, v in state.model_dump().items()
-                    if k != "domain_knowledge"
+                    if k not in ("domain_knowledge", "retrieved_knowledge")
                 },
                 domain_knowledge=domain_knowledge,
+                retrieved_knowledge=retrieved_knowledge,
             )
         except Exception as e:
             logger.error(f"Error in retrieve_domain_knowledge: {str(e)}")
@@ -85,3 +89,69 @@ def create_retrieve_domain_knowledge_node(
             raise
 
     return retrieve_domain_knowledge
+
+
+def fan_out_information_needs(state: InformationNeedsState) -> List[Send]:
+    """Route each information need to its own retrieval.
+
+    The retrievals run concurrently; each receives the state with a single
+    information need and without the fetched domain knowledge. A state without
+    information needs is routed as is so that retrieval reports it.
+    """
+    if not state.information_needs:
+        return [Send("retrieve_domain_knowledge", state)]
+    base = state.model_dump(exclude={"information_needs", "domain_knowledge"})
+    return [
+        Send(
+            "retrieve_domain_knowledge",
+            InformationNeedsState(**base, information_needs=[need]),
+        )
+        for need in state.information_needs
+    ]
+
+
+def create_retrieve_need_node(retrieve: Callable) -> Callable:
+    """Adapt the retrieval node to the per-need fan-out.
+
+    Concurrent retrievals only write ``retrieved_knowledge``, which is merged
+    by its reducer; ``domain_knowledge`` is left as received and written once
+    by collect_domain_knowledge.
+
+    Args:
+        retrieve: Node created by create_retrieve_domain_knowledge_node
+
+    Returns:
+        Node to wrap with wrap_node
+    """
+
+    def retrieve_need(state: InformationNeedsState) -> DomainKnowledgeState:
+        output = retrieve(state)
+        # Copied rather than read: the received value is not consumed
+        return output.model_copy(update=state.model_dump(include={"domain_knowledge"}))
+
+    return retrieve_need
+
+
+def create_collect_domain_knowledge_node() -> Callable:
+    """Create the node joining the per-need retrievals into domain_knowledge."""
+
+    def collect_domain_knowledge(state: DomainKnowledgeState) -> DomainKnowledgeState:
+        """Concatenate the retrieved chunks in information need order.
+
+        The past strategies, if retrieved, follow the document chunks.
+        """
+        domain_knowledge = [
+            chunk
+            for need in state.information_needs
+            for chunk in state.retrieved_knowledge.get(need, [])
+        ] + state.past_strategies
+        logger.info(
+            f"Collected {len(domain_knowledge)} domain knowledge chunks for "
+            f"{len(state.information_needs)} information needs"
+        )
+        return DomainKnowledgeState(
+            **{k: v for k, v in state.model_dump().items() if k != "domain_knowledge"},
+            domain_knowledge=domain_knowledge,
+        )
+
+    return collect_domain_knowledge
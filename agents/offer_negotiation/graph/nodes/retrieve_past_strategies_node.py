@@ -0,0 +1,58 @@
+import logging
+from typing import Callable
+
+from langsmith import traceable
+
+from agents.offer_negotiation.graph.interfaces import RETRIEVE_PAST_STRATEGIES_METADATA
+from agents.offer_negotiation.graph.state import DomainKnowledgeState
+from agents.offer_negotiation.graph.utils import get_deal_features
+from agents.offer_negotiation.knowledge.strategy_index import StrategyIndex
+from agents.offer_negotiation.utils.agent_settings import StrategyIndexSettings
+
+logger = logging.getLogger(__name__)
+
+
+def create_retrieve_past_strategies_node(
+    strategy_index: StrategyIndex, settings: StrategyIndexSettings
+) -> Callable:
+    """Create a node retrieving the past strategies of deals with similar objections.
+
+    Args:
+        strategy_index: Index of the stored results
+        settings: Number, size and filters of the retrieved strategies
+    """
+
+    @traceable(
+        name=RETRIEVE_PAST_STRATEGIES_METADATA.name,
+        run_type="chain",
+        metadata=RETRIEVE_PAST_STRATEGIES_METADATA.model_dump(),
+    )
+    def retrieve_past_strategies(state: DomainKnowledgeState) -> DomainKnowledgeState:
+        """Retrieve past strategies as domain knowledge chunks."""
+        features = get_deal_features(state)
+        submission = (state.deal_context or {}).get("submission") or {}
+        line_of_business = (
+            submission.get("line_of_business")
+            if settings.same_line_of_business
+            else None
+        )
+        past = strategy_index.search(
+            " ".join(features.objections),
+            line_of_business=line_of_business,
+            outcomes=settings.outcomes,
+            exclude_deal_id=state.deal_id,
+            limit=settings.max_results,
+        )
+        logger.info(
+            f"Retrieved {len(past)} past strategies: "
+            f"{[strategy.deal_id for strategy in past]}"
+        )
+        return state.model_copy(
+            update={
+                "past_strategies": [
+                    strategy.to_chunk(settings.max_chars) for strategy in past
+                ]
+            }
+        )
+
+    return retrieve_past_strategies
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional, Set
+from typing import Annotated, Any, Dict, List, Optional, Set
 
 from pydantic import BaseModel, Field
 
@@ -6,6 +6,13 @@ from agents.offer_negotiation.core.models.deal_models import DealContext
 from agents.offer_negotiation.knowledge.domain_documents import DocumentChunk
 
 
+def merge_knowledge_by_need(
+    left: Dict[str, List[DocumentChunk]], right: Dict[str, List[DocumentChunk]]
+) -> Dict[str, List[DocumentChunk]]:
+    """Reducer merging the chunks retrieved for each information need."""
+    return {**left, **right}
+
+
 class BaseState(BaseModel):
     """Base state shared across all nodes."""
 
@@ -19,6 +26,9 @@ class DealContextState(BaseState):
     deal_context: Optional[
         Dict[str, Any]
     ] = None  # Will be populated with DealContext data
+    deal_features: Optional[
+        Dict[str, Any]
+    ] = None  # Parsed once from deal_context (see DealFeatures)
     domain_knowledge: List[DocumentChunk] = Field(default_factory=list)
     reasoning_steps: List[str] = Field(default_factory=list)
     reasoning_output: Dict[str, Any] = Field(default_factory=dict)
@@ -38,12 +48,26 @@ class DomainKnowledgeState(InformationNeedsState):
     used_domain_chunks: List[Dict[str, str]] = Field(
         default_factory=list
     )  # Which chunks were used and why
+    retrieved_knowledge: Annotated[
+        Dict[str, List[DocumentChunk]], merge_knowledge_by_need
+    ] = Field(
+        default_factory=dict
+    )  # Chunks retrieved for each information need, by parallel retrievals
+    past_strategies: List[DocumentChunk] = Field(
+        default_factory=list
+    )  # Strategies of past runs with similar objections
 
 
 class StrategyState(DomainKnowledgeState):
     """State for strategy generation node."""
 
     strategy: Optional[str] = None  # The generated strategy
+    strategy_rationale: Optional[
+        str
+    ] = None  # Rationale returned with a structured strategy
+    prompt_version: Optional[
+        str
+    ] = None  # Version of the prompt that produced the strategy
     used_deal_fields: Set[str] = Field(
         default_factory=set
     )  # Which deal fields were used
@@ -63,6 +87,7 @@ class FinalState(StrategyState):
             "deal_id": self.deal_id,
             "strategy": self.strategy,
             "rationale": self.rationale,
+            "prompt_version": self.prompt_version,
             "reasoning_steps": self.reasoning_steps,
             "information_needs": self.information_needs,
             "domain_knowledge": [chunk.model_dump() for chunk in self.domain_knowledge],
@@ -1,5 +1,17 @@
+import functools
 import json
-from typing import Any, Dict, List, Set, Union
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Union
+
+from pydantic import BaseModel
+
+from agents.offer_negotiation.core.features.deal_features import (
+    DealFeatures,
+    extract_deal_features,
+)
+
+# A node wrapper receives the node name and the node callable and returns a
+# callable with the same signature (profilers, memory trackers, ...).
+NodeWrapper = Callable[[str, Callable], Callable]
 
 
 def prepare_for_json(obj: Any) -> Any:
@@ -21,3 +33,52 @@ def log_state(state: Any, prefix: str = "") -> None:
     logger.info(
         f"{prefix}state: {json.dumps(prepare_for_json(state.model_dump()), indent=2)}"
     )
+
+
+def get_deal_features(state: Any) -> DealFeatures:
+    """Return the deal features of a state, extracting them if not computed yet."""
+    if state.deal_features is not None:
+        return DealFeatures(**state.deal_features)
+    return extract_deal_features(state.deal_context or {})
+
+
+def state_update(input_state: Any, output: Any) -> Any:
+    """Return the fields of a node output that differ from its input state.
+
+    Nodes return complete state models; writing back only the changed fields
+    lets nodes on parallel branches update the graph state without conflicts.
+    Outputs that are not models (update dicts, Send lists) are returned as is.
+    """
+    if not isinstance(output, BaseModel) or not isinstance(input_state, BaseModel):
+        return output
+    update = {}
+    for field, info in type(output).model_fields.items():
+        value = getattr(output, field)
+        if field in type(input_state).model_fields:
+            changed = value != getattr(input_state, field)
+        else:
+            # Fields the node could not receive are written when set
+            changed = field in output.model_fields_set or value != info.get_default(
+                call_default_factory=True
+            )
+        if changed:
+            update[field] = value
+    return update
+
+
+def wrap_node(
+    name: str, node: Callable, wrappers: Optional[Sequence[NodeWrapper]] = None
+) -> Callable:
+    """Apply node wrappers to a node callable, innermost first.
+
+    The returned graph node writes only the fields the node changed (see
+    state_update).
+    """
+    for wrapper in wrappers or []:
+        node = wrapper(name, node)
+
+    @functools.wraps(node)
+    def graph_node(state: Any, *args, **kwargs):
+        return state_update(state, node(state, *args, **kwargs))
+
+    return graph_node
@@ -1,5 +1,6 @@
 """Domain knowledge base for the offer negotiation agent."""
 
+import hashlib
 from typing import Any, Dict, List
 
 from agents.offer_negotiation.knowledge.domain_documents import DocumentChunk
@@ -42,17 +43,36 @@ class DomainKnowledgeBase:
                 metadata={"document_type": "risk_guidelines"},
             ),
         ]
+        # Digest of the IDs and texts of the loaded chunks, so cached
+        # retrievals are invalidated by changes and shared across processes
+        # loading the same documents
+        self._digest = hashlib.sha256()
+        self._update_digest(self._knowledge_chunks)
+
+    @property
+    def content_hash(self) -> str:
+        """Return a hash of the IDs and texts of the loaded chunks."""
+        return self._digest.hexdigest()[:16]
+
+    def _update_digest(self, chunks: List[DocumentChunk]) -> None:
+        for chunk in chunks:
+            for value in (chunk.chunk_id, chunk.text):
+                encoded = value.encode("utf-8")
+                self._digest.update(len(encoded).to_bytes(8, "big") + encoded)
 
     def add_document_chunks(self, chunks: list) -> None:
         """Add document chunks to the knowledge base."""
+        added = []
         for chunk in chunks:
             if isinstance(chunk, DocumentChunk):
-                self._knowledge_chunks.append(chunk)
+                added.append(chunk)
             elif isinstance(chunk, dict):
-                self._knowledge_chunks.append(DocumentChunk(**chunk))
+                added.append(DocumentChunk(**chunk))
             else:
                 # Try to coerce to dict then DocumentChunk
-                self._knowledge_chunks.append(DocumentChunk(**dict(chunk)))
+                added.append(DocumentChunk(**dict(chunk)))
+        self._knowledge_chunks.extend(added)
+        self._update_digest(added)
 
     def retrieve(self, information_need: str) -> List[DocumentChunk]:
         """Retrieve relevant domain knowledge chunks for a given information need.
@@ -0,0 +1,415 @@
+"""Full-text index of past strategies, a retrieval source for new prompts.
+
+The index is an SQLite FTS5 table in the result store database (see
+core/repositories/result_store.py). A trigger indexes the objections,
+strategy and rationale of every stored result in the transaction that
+stores it, so ingestion is incremental and needs no separate job. Results
+stored before the index existed are indexed when it is opened.
+
+A search takes the most recent runs matching any word of the query (and the
+line of business and deal outcome filters) from the index, then ranks them
+by BM25 similarity of their objections to the query. FTS5's own ``bm25()``
+is not used: it counts the documents of each query term over the whole
+index, which takes about a second with 300,000 runs sharing common words
+such as "premium".
+
+Usage:
+    python -m agents.offer_negotiation.knowledge.strategy_index "premium too high"
+    python -m agents.offer_negotiation.knowledge.strategy_index --record-outcome DEAL123 accepted
+"""
+
+import argparse
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field
+
+from agents.offer_negotiation.core.repositories.result_store import (
+    SCHEMA as RESULT_SCHEMA,
+)
+from agents.offer_negotiation.knowledge.domain_documents import DocumentChunk
+
+# Paths of the indexed fields in the stored final states
+_OBJECTIONS = "'$.deal_context.negotiation_context.objections'"
+_LINE_OF_BUSINESS = "'$.deal_context.submission.line_of_business'"
+
+# The full-text index holds no content; the filtered and ranked fields are
+# kept in strategy_meta, and the strategies are read from the results
+SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS strategy_search USING fts5("
+    "objections, strategy, rationale, line_of_business, content = '', "
+    "tokenize = 'porter unicode61')",
+    "CREATE TABLE IF NOT EXISTS strategy_meta ("
+    "id INTEGER PRIMARY KEY, deal_id TEXT NOT NULL, line_of_business TEXT, "
+    "objections TEXT)",
+    "CREATE TABLE IF NOT EXISTS deal_outcomes ("
+    "deal_id TEXT PRIMARY KEY, outcome TEXT NOT NULL, recorded_at REAL NOT NULL)",
+]
+
+
+def _index_statements(row: str, source: str = "") -> List[str]:
+    """Return the statements indexing results.
+
+    Args:
+        row: Name of the results row in the statements ("new" in a trigger)
+        source: FROM and WHERE clauses selecting the rows, if any
+    """
+    # One objection per line
+    objections = (
+        "(SELECT group_concat(value, char(10)) "
+        f"FROM json_each({row}.result, {_OBJECTIONS}))"
+    )
+    line_of_business = f"json_extract({row}.result, {_LINE_OF_BUSINESS})"
+    return [
+        "INSERT INTO strategy_search "
+        "(rowid, objections, strategy, rationale, line_of_business) "
+        f"SELECT {row}.id, {objections}, json_extract({row}.result, '$.strategy'), "
+        f"json_extract({row}.result, '$.rationale'), {line_of_business} {source}",
+        "INSERT INTO strategy_meta (id, deal_id, line_of_business, objections) "
+        f"SELECT {row}.id, {row}.deal_id, {line_of_business}, {objections} {source}",
+    ]
+
+
+_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS results_strategy_search AFTER INSERT ON results "
+    "WHEN json_extract(new.result, '$.strategy') IS NOT NULL BEGIN "
+    + "".join(f"{statement}; " for statement in _index_statements("new"))
+    + "END"
+)
+
+# BM25 parameters of the ranking
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Words too common in objections to tell past runs apart
+STOP_WORDS = {
+    "and", "are", "but", "for", "from", "has", "have", "need", "not", "our",
+    "than", "that", "the", "their", "this", "too", "was", "with", "compared",
+}  # fmt: skip
+
+
+class PastStrategy(BaseModel):
+    """A past run found in the strategy index."""
+
+    result_id: int
+    deal_id: str
+    line_of_business: Optional[str] = None
+    outcome: Optional[str] = None
+    objections: List[str] = Field(default_factory=list)
+    strategy: str
+    rationale: Optional[str] = None
+    score: float
+
+    def to_chunk(self, max_chars: int = 1200) -> DocumentChunk:
+        """Return the run as a domain knowledge chunk for the strategy prompt."""
+        strategy = self.strategy
+        if len(strategy) > max_chars:
+            strategy = strategy[:max_chars].rstrip() + "..."
+        header = (
+            f"Past strategy for deal {self.deal_id} "
+            f"({self.line_of_business or 'unknown line of business'}; "
+            f"outcome: {self.outcome or 'unknown'}). "
+            f"Objections: {'; '.join(self.objections) or 'none'}."
+        )
+        return DocumentChunk(
+            chunk_id=f"past_strategy_{self.result_id}",
+            text=f"{header}\n{strategy}",
+            source_doc_id=f"result_{self.result_id}",
+            metadata={
+                "document_type": "past_strategy",
+                "deal_id": self.deal_id,
+                "line_of_business": self.line_of_business,
+                "outcome": self.outcome,
+            },
+        )
+
+
+def _stem(word: str) -> str:
+    """Strip a plural ending, so "payments" matches "payment"."""
+    if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def terms(text: str) -> List[str]:
+    """Return the significant words of a text, normalized for matching."""
+    return [
+        _stem(word)
+        for word in re.findall(r"[a-z0-9]+", text.lower())
+        if len(word) > 2 and word not in STOP_WORDS
+    ]
+
+
+@lru_cache(maxsize=65536)
+def _objection_terms(objection: str) -> Tuple[str, ...]:
+    # Objections are often worded alike across deals and runs
+    return tuple(terms(objection))
+
+
+def _phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def match_query(
+    query_terms: Sequence[str], line_of_business: Optional[str] = None
+) -> Optional[str]:
+    """Return the FTS5 query matching any of the given terms.
+
+    Args:
+        query_terms: Terms matched in the objections, strategy or rationale
+        line_of_business: Words of the line of business of the matched runs
+    """
+    if not query_terms:
+        return None
+    query = (
+        "{objections strategy rationale} : ("
+        + " OR ".join(_phrase(term) for term in dict.fromkeys(query_terms))
+        + ")"
+    )
+    if line_of_business is not None:
+        query += f" AND line_of_business : {_phrase(line_of_business)}"
+    return query
+
+
+def bm25_scores(
+    query_terms: Sequence[str], documents: Sequence[List[str]]
+) -> List[float]:
+    """Score documents against query terms with BM25.
+
+    Document frequencies are those of the given documents, a sample of the
+    index that is representative of its vocabulary.
+
+    Args:
+        query_terms: Terms of the query (see terms)
+        documents: Terms of each document
+
+    Returns:
+        Score of each document
+    """
+    query = set(query_terms)
+    counts = [
+        Counter(term for term in document if term in query) for document in documents
+    ]
+    frequencies = Counter(term for count in counts for term in count)
+    total = len(documents)
+    average_length = sum(map(len, documents)) / total if total else 0.0
+    idf = {
+        term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+        for term, df in frequencies.items()
+    }
+    scores = []
+    for document, count in zip(documents, counts):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(document) / (average_length or 1))
+        scores.append(
+            sum(
+                idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+                for term, tf in count.items()
+            )
+        )
+    return scores
+
+
+def _objections(value: Optional[str]) -> List[str]:
+    return value.split("\n") if value else []
+
+
+class StrategyIndex:
+    """Full-text search over the strategies of the result store."""
+
+    def __init__(self, path: Path, max_candidates: int = 1000):
+        """Open the index of a result store database, creating it if needed.
+
+        Args:
+            path: SQLite file of the result store
+            max_candidates: Number of the most recent matching runs ranked by
+                a search
+        """
+        self.path = Path(path)
+        self.max_candidates = max_candidates
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in RESULT_SCHEMA + SCHEMA:
+                self._conn.execute(statement)
+            self._backfill()
+            self._conn.execute(_TRIGGER)
+
+    def _backfill(self) -> None:
+        """Index the results stored before the trigger existed."""
+        source = (
+            "FROM results r WHERE r.id > "
+            "(SELECT IFNULL(MAX(id), 0) FROM strategy_meta) "
+            "AND json_extract(r.result, '$.strategy') IS NOT NULL"
+        )
+        # The full-text rows are inserted first, while strategy_meta still
+        # holds the previously indexed results only
+        for statement in _index_statements("r", source):
+            self._conn.execute(statement)
+
+    def record_outcome(self, deal_id: str, outcome: str) -> None:
+        """Record the outcome of a deal (e.g. "accepted"), replacing any previous."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO deal_outcomes VALUES (?, ?, ?)",
+                (deal_id, outcome, time.time()),
+            )
+
+    def search(
+        self,
+        text: str,
+        line_of_business: Optional[str] = None,
+        outcomes: Optional[Sequence[str]] = None,
+        exclude_deal_id: Optional[str] = None,
+        limit: int = 3,
+    ) -> List[PastStrategy]:
+        """Return the past runs best matching a text, one per deal.
+
+        Args:
+            text: Text to match, typically the objections of a deal
+            line_of_business: Line of business of the runs' deals
+            outcomes: Recorded outcomes of the runs' deals
+            exclude_deal_id: Deal whose runs are left out (the current one)
+            limit: Maximum number of runs
+
+        Returns:
+            Matching runs, best first; of equally similar runs, the most
+            recent first
+        """
+        query_terms = terms(text)
+        query = match_query(query_terms, line_of_business)
+        if query is None or limit <= 0:
+            return []
+        conditions, params = ["strategy_search MATCH ?"], [query]
+        # The index matches the words of the line of business; the stored
+        # value is compared for an exact match
+        if line_of_business is not None:
+            conditions.append("m.line_of_business = ?")
+            params.append(line_of_business)
+        if outcomes is not None:
+            conditions.append(f"o.outcome IN ({', '.join('?' * len(outcomes))})")
+            params.extend(outcomes)
+        if exclude_deal_id is not None:
+            conditions.append("m.deal_id != ?")
+            params.append(exclude_deal_id)
+        params.append(self.max_candidates)
+        # FTS5 returns matches in rowid order, so the most recent are read first
+        sql = (
+            "SELECT m.id, m.deal_id, m.line_of_business, o.outcome, m.objections "
+            "FROM strategy_search s JOIN strategy_meta m ON m.id = s.rowid "
+            "LEFT JOIN deal_outcomes o ON o.deal_id = m.deal_id "
+            f"WHERE {' AND '.join(conditions)} "
+            "ORDER BY s.rowid DESC LIMIT ?"
+        )
+        with self._lock:
+            candidates = self._conn.execute(sql, params).fetchall()
+
+        objections = [_objections(row[4]) for row in candidates]
+        scores = bm25_scores(
+            query_terms,
+            [
+                [term for objection in texts for term in _objection_terms(objection)]
+                for texts in objections
+            ],
+        )
+        # Sorting is stable: equal scores keep the most recent run first
+        ranked = sorted(range(len(candidates)), key=lambda i: -scores[i])
+        best, deals = [], set()
+        for i in ranked:
+            if candidates[i][1] not in deals:
+                deals.add(candidates[i][1])
+                best.append(i)
+                if len(best) == limit:
+                    break
+
+        with self._lock:
+            texts = {
+                rowid: (strategy, rationale)
+                for rowid, strategy, rationale in self._conn.execute(
+                    "SELECT id, json_extract(result, '$.strategy'), "
+                    "json_extract(result, '$.rationale') FROM results "
+                    f"WHERE id IN ({', '.join('?' * len(best))})",
+                    [candidates[i][0] for i in best],
+                )
+            }
+        results = []
+        for i in best:
+            rowid, deal_id, lob, outcome, _ = candidates[i]
+            strategy, rationale = texts[rowid]
+            results.append(
+                PastStrategy(
+                    result_id=rowid,
+                    deal_id=deal_id,
+                    line_of_business=lob,
+                    outcome=outcome,
+                    objections=objections[i],
+                    strategy=strategy,
+                    rationale=rationale,
+                    score=scores[i],
+                )
+            )
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Search past strategies.")
+    parser.add_argument("text", nargs="?", help="Text to match (e.g. objections)")
+    parser.add_argument("--line-of-business", help="Line of business of the deals")
+    parser.add_argument(
+        "--outcome", action="append", help="Outcome of the deals (repeatable)"
+    )
+    parser.add_argument("--limit", type=int, default=5, help="Maximum results")
+    parser.add_argument(
+        "--record-outcome",
+        nargs=2,
+        metavar=("DEAL_ID", "OUTCOME"),
+        help="Record the outcome of a deal instead of searching",
+    )
+    parser.add_argument("--path", type=Path, help="SQLite file of the results")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> List[PastStrategy]:
+    from agents.offer_negotiation.agent import resolve_path
+    from agents.offer_negotiation.utils.agent_settings import load_agent_settings
+
+    args = parse_args(argv)
+    path = args.path or resolve_path(load_agent_settings().result_store.path)
+    index = StrategyIndex(path)
+    try:
+        if args.record_outcome:
+            index.record_outcome(*args.record_outcome)
+            print(
+                f"Recorded outcome {args.record_outcome[1]!r} for deal "
+                f"{args.record_outcome[0]}"
+            )
+            return []
+        results = index.search(
+            args.text or "",
+            line_of_business=args.line_of_business,
+            outcomes=args.outcome,
+            limit=args.limit,
+        )
+    finally:
+        index.close()
+
+    for past in results:
+        print(past.to_chunk().text + "\n")
+    return results
+
+
+if __name__ == "__main__":
+    main()
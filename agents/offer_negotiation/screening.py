@@ -0,0 +1,257 @@
+"""Portfolio-wide heuristic screening without the LLM.
+
+Screening runs only the deterministic steps of the agent over a whole deal
+repository: deal loading, deal features, ``identify_information_needs`` and
+the heuristic rules. Deal IDs are split into chunks screened by a pool of
+worker processes; each chunk is evaluated column-wise (one rule scan per
+field for the whole chunk) and returns a table of deal IDs, triggered
+heuristics and information needs.
+
+Usage:
+    python -m agents.offer_negotiation.screening --deals 200000 --output screen.csv
+    python -m agents.offer_negotiation.screening --deals 200000 \\
+        --heuristic "Premium Objection → Deductible Trade"
+"""
+
+import argparse
+import csv
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field
+
+from agents.offer_negotiation.core.features.deal_features import (
+    extract_deal_features,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5_000
+
+# Separates the heuristics and needs of a deal in CSV cells
+CSV_LIST_SEPARATOR = "; "
+
+
+class ScreeningTable(BaseModel):
+    """Columnar screening results, one entry per deal in each column."""
+
+    deal_ids: List[str] = Field(default_factory=list)
+    heuristics: List[List[str]] = Field(default_factory=list)
+    information_needs: List[List[str]] = Field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.deal_ids)
+
+    def extend(self, other: "ScreeningTable") -> None:
+        """Append the rows of another table."""
+        self.deal_ids.extend(other.deal_ids)
+        self.heuristics.extend(other.heuristics)
+        self.information_needs.extend(other.information_needs)
+
+    def rows(self) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """Iterate over (deal_id, heuristics, information_needs) rows."""
+        return zip(self.deal_ids, self.heuristics, self.information_needs)
+
+    def matching(self, heuristic: str) -> "ScreeningTable":
+        """Return the rows of the deals triggering a heuristic."""
+        table = ScreeningTable()
+        for deal_id, heuristics, needs in self.rows():
+            if heuristic in heuristics:
+                table.deal_ids.append(deal_id)
+                table.heuristics.append(heuristics)
+                table.information_needs.append(needs)
+        return table
+
+    def heuristic_counts(self) -> Dict[str, int]:
+        """Return the number of deals triggering each heuristic."""
+        return dict(
+            Counter(name for heuristics in self.heuristics for name in heuristics)
+        )
+
+    def write_csv(self, path: Path) -> None:
+        """Write the table as CSV (list cells joined with CSV_LIST_SEPARATOR)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["deal_id", "heuristics", "information_needs"])
+            writer.writerows(
+                (
+                    deal_id,
+                    CSV_LIST_SEPARATOR.join(heuristics),
+                    CSV_LIST_SEPARATOR.join(needs),
+                )
+                for deal_id, heuristics, needs in self.rows()
+            )
+
+
+class ScreeningStats(BaseModel):
+    """Throughput of a screening run."""
+
+    deals: int
+    chunks: int
+    workers: int
+    seconds: float
+
+    @property
+    def deals_per_second(self) -> float:
+        return self.deals / self.seconds if self.seconds else 0.0
+
+
+def screen_chunk(repo: Any, deal_ids: Sequence[str]) -> ScreeningTable:
+    """Screen a chunk of deals.
+
+    Args:
+        repo: Deal repository providing ``get_deal``
+        deal_ids: IDs of the deals to screen
+
+    Returns:
+        Screening table of the chunk, in ``deal_ids`` order
+    """
+    from agents.offer_negotiation.graph.nodes.generate_strategy_node import (
+        evaluate_heuristics_batch,
+    )
+    from agents.offer_negotiation.graph.nodes.identify_information_needs_node import (
+        identify_needs,
+    )
+
+    deals = [repo.get_deal(deal_id) for deal_id in deal_ids]
+    deals = [
+        deal.model_dump() if hasattr(deal, "model_dump") else deal for deal in deals
+    ]
+    features = [extract_deal_features(deal) for deal in deals]
+    decisions = evaluate_heuristics_batch(deals, features)
+    return ScreeningTable(
+        deal_ids=list(deal_ids),
+        heuristics=[
+            [d["heuristic"] for d in deal_decisions] for deal_decisions in decisions
+        ],
+        information_needs=[
+            identify_needs(deal, deal_features)
+            for deal, deal_features in zip(deals, features)
+        ],
+    )
+
+
+def _chunks(items: Sequence[str], size: int) -> List[Sequence[str]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def screen_portfolio(
+    repo: Any,
+    deal_ids: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Tuple[ScreeningTable, ScreeningStats]:
+    """Screen the deals of a repository with a pool of worker processes.
+
+    Args:
+        repo: Deal repository providing ``get_deal`` and ``list_deal_ids``;
+            it is pickled to the workers
+        deal_ids: Deals to screen; defaults to every deal of the repository
+        workers: Worker processes; defaults to the CPU count, and 1 screens
+            in the calling process
+        chunk_size: Deals per chunk sent to a worker
+
+    Returns:
+        Screening table in ``deal_ids`` order, and the run statistics
+
+    Raises:
+        ValueError: If chunk_size or workers is not positive
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be positive")
+
+    start = time.perf_counter()
+    deal_ids = list(deal_ids if deal_ids is not None else repo.list_deal_ids())
+    chunks = _chunks(deal_ids, chunk_size)
+    workers = min(workers, max(len(chunks), 1))
+
+    table = ScreeningTable()
+    if workers == 1:
+        for chunk in chunks:
+            table.extend(screen_chunk(repo, chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk_table in executor.map(screen_chunk, repeat(repo), chunks):
+                table.extend(chunk_table)
+                logger.info(f"Screened {len(table)}/{len(deal_ids)} deals")
+
+    stats = ScreeningStats(
+        deals=len(deal_ids),
+        chunks=len(chunks),
+        workers=workers,
+        seconds=time.perf_counter() - start,
+    )
+    return table, stats
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Screen a deal portfolio against the heuristic rules."
+    )
+    parser.add_argument("--deals", type=int, default=1000, help="Synthetic deals")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic deal seed")
+    parser.add_argument(
+        "--mock", action="store_true", help="Screen the mock repository instead"
+    )
+    parser.add_argument("--workers", type=int, help="Worker processes")
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Deals per chunk"
+    )
+    parser.add_argument(
+        "--heuristic", help="Only output deals triggering this heuristic"
+    )
+    parser.add_argument("--output", type=Path, help="Path of the CSV table")
+    parser.add_argument("--log-level", default="WARNING", help="Log level")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> ScreeningTable:
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level)
+
+    if args.mock:
+        from agents.offer_negotiation.core.repositories.mock_deal_repository import (
+            MockDealRepository,
+        )
+
+        repo = MockDealRepository()
+    else:
+        from agents.offer_negotiation.core.repositories.synthetic_deal_repository import (
+            SyntheticDealRepository,
+        )
+
+        repo = SyntheticDealRepository(args.deals, seed=args.seed)
+
+    table, stats = screen_portfolio(
+        repo, workers=args.workers, chunk_size=args.chunk_size
+    )
+    print(
+        f"Screened {stats.deals} deals in {stats.seconds:.1f}s "
+        f"({stats.deals_per_second:,.0f} deals/s, {stats.workers} workers)"
+    )
+    for heuristic, count in sorted(table.heuristic_counts().items()):
+        print(f"  {heuristic}: {count} deals")
+
+    if args.heuristic:
+        table = table.matching(args.heuristic)
+        print(f"{len(table)} deals trigger {args.heuristic}")
+    if args.output:
+        table.write_csv(args.output)
+        print(f"Wrote {args.output}")
+    return table
+
+
+if __name__ == "__main__":
+    main()
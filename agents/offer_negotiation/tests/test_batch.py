@@ -0,0 +1,121 @@
+import time
+from collections import Counter
+from functools import partial
+
+from agents.offer_negotiation.batch import run_local_workers
+from agents.offer_negotiation.core.repositories.work_queue import (
+    WorkQueue,
+    shard_of,
+    shard_owner,
+)
+from agents.offer_negotiation.utils.agent_settings import WorkQueueSettings
+
+DEAL_IDS = [f"SYN{i:07d}" for i in range(120)]
+
+
+def test_expired_leases_are_claimed_again(tmp_path):
+    """Test that deals of a worker that stops renewing go to another worker."""
+    queue = WorkQueue(tmp_path / "queue.sqlite", shards=8, lease_seconds=0.5)
+    assert queue.submit("batch", DEAL_IDS[:4]) == 4
+    assert queue.submit("batch", DEAL_IDS[:4]) == 0
+
+    claimed = queue.claim("batch", "a", 10)
+    assert sorted(claimed) == DEAL_IDS[:4]
+    assert queue.claim("batch", "b", 10) == []
+    time.sleep(0.3)
+    assert sorted(queue.renew("batch", "a", claimed)) == DEAL_IDS[:4]
+    time.sleep(0.3)
+    assert queue.claim("batch", "b", 10) == []
+
+    # Worker a hangs: its leases expire and b claims its deals
+    time.sleep(0.6)
+    reclaimed = queue.claim("batch", "b", 10)
+    assert sorted(reclaimed) == DEAL_IDS[:4]
+    assert queue.renew("batch", "a", claimed) == []
+    assert not queue.complete("batch", "a", claimed[0])
+    assert queue.complete("batch", "b", claimed[0])
+    assert queue.fail("batch", "b", claimed[1], "policy system unavailable")
+
+    progress = queue.progress("batch")
+    assert (progress.done, progress.leased, progress.pending) == (1, 2, 1)
+    worker_b = next(w for w in progress.workers if w.worker == "b")
+    assert (worker_b.done, worker_b.leased) == (1, 2)
+
+    # The third expired lease of a deal fails it
+    time.sleep(0.6)
+    assert len(queue.claim("batch", "c", 10)) == 3
+    time.sleep(0.6)
+    assert queue.claim("batch", "c", 10) == []
+    progress = queue.progress("batch")
+    assert (progress.done, progress.failed, progress.finished) == (1, 3, True)
+    queue.close()
+
+
+def test_deals_hash_to_the_same_workers(tmp_path):
+    """Test that workers claim the deals of their shards first."""
+    queue = WorkQueue(tmp_path / "queue.sqlite", shards=64)
+    queue.submit("batch", DEAL_IDS)
+    queue.join("batch", "a")
+    queue.join("batch", "b")
+    workers = queue.live_workers("batch")
+    assert workers == ["a", "b"]
+
+    claimed = queue.claim("batch", "a", 20)
+    assert len(claimed) == 20
+    assert {shard_owner(shard_of(d, 64), workers) for d in claimed} == {"a"}
+
+    # A joining worker only takes shards of the others
+    owners = [shard_owner(shard, workers) for shard in range(64)]
+    moved = [shard_owner(shard, workers + ["c"]) for shard in range(64)]
+    assert all(new in (old, "c") for old, new in zip(owners, moved))
+    assert 0 < moved.count("c") < 64
+
+    # Once its shards are drained, a worker takes deals of other shards
+    while queue.claim("batch", "a", 20):
+        pass
+    assert queue.progress("batch").pending == 0
+    queue.close()
+
+
+def _recording_runner(log_path):
+    def run(deal_id):
+        time.sleep(0.005)
+        with open(log_path, "a") as f:
+            f.write(f"{deal_id}\n")
+
+    def close():
+        with open(log_path, "a") as f:
+            f.write("closed\n")
+
+    run.close = close
+    return run
+
+
+def test_worker_processes_run_every_deal_once(tmp_path):
+    """Test a batch shared by several worker processes."""
+    settings = WorkQueueSettings(shards=32, claim_size=5, poll_interval=0.05)
+    path = tmp_path / "queue.sqlite"
+    queue = WorkQueue(path, shards=settings.shards)
+    queue.submit("batch", DEAL_IDS)
+    log_path = tmp_path / "runs.log"
+
+    stats = run_local_workers(
+        "batch",
+        processes=3,
+        worker_prefix="box",
+        run_factory=partial(_recording_runner, log_path),
+        settings=settings,
+        path=path,
+    )
+
+    runs = Counter(log_path.read_text().split())
+    # Every worker process closes its runner
+    assert runs.pop("closed") == 3
+    assert sorted(runs) == DEAL_IDS
+    assert set(runs.values()) == {1}
+    assert sum(worker.done for worker in stats) == len(DEAL_IDS)
+    assert all(worker.done > 0 for worker in stats)
+    progress = queue.progress("batch")
+    assert progress.done == len(DEAL_IDS) and progress.finished
+    assert progress.deals_per_second > 0
+    queue.close()
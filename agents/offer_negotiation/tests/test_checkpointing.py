@@ -0,0 +1,123 @@
+import functools
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from agents.offer_negotiation.agent import build_agent, invoke_agent
+from agents.offer_negotiation.graph.checkpointer import SqliteCheckpointer
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+
+ROOT = Path(__file__).resolve().parents[3]
+
+
+class FlakyNodes:
+    """Node wrapper counting node calls and failing a node once."""
+
+    def __init__(self, failing_node: str):
+        self.failing_node = failing_node
+        self.failed = False
+        self.calls = []
+
+    def __call__(self, node_name, node):
+        @functools.wraps(node)
+        def wrapped(state, *args, **kwargs):
+            self.calls.append(node_name)
+            if node_name == self.failing_node and not self.failed:
+                self.failed = True
+                raise RuntimeError("LLM unavailable")
+            return node(state, *args, **kwargs)
+
+        return wrapped
+
+
+def build(checkpointer, nodes):
+    return build_agent(
+        llm=FakeChatModel(), node_wrappers=[nodes], checkpointer=checkpointer
+    )
+
+
+def test_failed_run_resumes_at_failed_node(tmp_path):
+    """Test that a retry in a new process resumes from the failed node."""
+    path = tmp_path / "checkpoints.sqlite"
+    nodes = FlakyNodes("generate_strategy")
+    checkpointer = SqliteCheckpointer(path)
+    with pytest.raises(RuntimeError):
+        invoke_agent(build(checkpointer, nodes), "DEAL123", run_id="batch-1")
+    checkpointer.close()
+    assert nodes.calls[-1] == "generate_strategy"
+
+    # A new checkpointer reads the run from SQLite
+    nodes.calls.clear()
+    checkpointer = SqliteCheckpointer(path)
+    agent_graph = build(checkpointer, nodes)
+    result = invoke_agent(agent_graph, "DEAL123", run_id="batch-1")
+    assert nodes.calls == ["generate_strategy", "explain_rationale"]
+    assert result["strategy"] and result["rationale"]
+
+    # The completed run is returned without running any node
+    nodes.calls.clear()
+    assert invoke_agent(agent_graph, "DEAL123", run_id="batch-1") == result
+    assert nodes.calls == []
+    checkpointer.close()
+
+
+def test_runs_without_id_are_deleted(tmp_path):
+    """Test that unnamed runs do not accumulate in the checkpointer."""
+    checkpointer = SqliteCheckpointer(tmp_path / "checkpoints.sqlite")
+    invoke_agent(build(checkpointer, FlakyNodes("none")), "DEAL123")
+    checkpointer.flush()
+
+    assert list(checkpointer.list(None)) == []
+    assert checkpointer._conn.execute("SELECT COUNT(*) FROM blobs").fetchone() == (0,)
+    checkpointer.close()
+
+
+def test_run_failed_in_another_process_resumes(tmp_path):
+    """Test resuming a run whose process exited without closing the checkpointer."""
+    path = tmp_path / "checkpoints.sqlite"
+    # The writer is blocked by another connection until the process exits
+    code = (
+        "import atexit, sqlite3\n"
+        "from agents.offer_negotiation.agent import invoke_agent\n"
+        "from agents.offer_negotiation.graph.checkpointer import SqliteCheckpointer\n"
+        "from agents.offer_negotiation.tests.test_checkpointing import "
+        "FlakyNodes, build\n"
+        f"checkpointer = SqliteCheckpointer({str(path)!r})\n"
+        f"blocker = sqlite3.connect({str(path)!r})\n"
+        "blocker.execute('BEGIN EXCLUSIVE')\n"
+        "atexit.register(blocker.rollback)\n"
+        "agent_graph = build(checkpointer, FlakyNodes('generate_strategy'))\n"
+        "invoke_agent(agent_graph, 'DEAL123', run_id='batch-1')\n"
+    )
+    process = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    assert process.returncode == 1
+    assert "LLM unavailable" in process.stderr
+
+    nodes = FlakyNodes("none")
+    checkpointer = SqliteCheckpointer(path)
+    result = invoke_agent(build(checkpointer, nodes), "DEAL123", run_id="batch-1")
+    assert nodes.calls == ["generate_strategy", "explain_rationale"]
+    assert result["strategy"] and result["rationale"]
+    checkpointer.close()
+
+
+def test_released_runs_are_read_back_from_sqlite(tmp_path):
+    """Test that runs do not stay in memory once their writes are committed."""
+    checkpointer = SqliteCheckpointer(tmp_path / "checkpoints.sqlite")
+    nodes = FlakyNodes("none")
+    agent_graph = build(checkpointer, nodes)
+    result = invoke_agent(agent_graph, "DEAL123", run_id="batch-1")
+    checkpointer.flush()
+    assert not checkpointer.storage
+    assert not checkpointer.blobs and not checkpointer.writes
+
+    nodes.calls.clear()
+    assert invoke_agent(agent_graph, "DEAL123", run_id="batch-1") == result
+    assert nodes.calls == []
+    checkpointer.flush()
+    assert not checkpointer.storage
+    checkpointer.close()
@@ -0,0 +1,124 @@
+import pytest
+
+from agents.offer_negotiation.core.features.deal_features import (
+    DealFeatures,
+    extract_amounts,
+    extract_deal_features,
+    parse_money,
+)
+from agents.offer_negotiation.core.repositories.mock_deal_repository import (
+    MockDealRepository,
+)
+from agents.offer_negotiation.core.repositories.synthetic_deal_repository import (
+    generate_synthetic_deal,
+)
+from agents.offer_negotiation.core.rules.rule_engine import HeuristicRule, RuleEngine
+from agents.offer_negotiation.graph.nodes.identify_information_needs_node import (
+    analyze_objections,
+    create_identify_information_needs_node,
+)
+from agents.offer_negotiation.graph.nodes.input_nodes import create_input_graph
+from agents.offer_negotiation.graph.state import DealContextState
+from agents.offer_negotiation.knowledge.domain_knowledge_base import (
+    DomainKnowledgeBase,
+)
+
+
+def test_parse_money_units():
+    """Test that dollar figures are converted with their unit."""
+    assert parse_money("10", "M") == 10_000_000
+    assert parse_money("2.5", "million") == 2_500_000
+    assert parse_money("1,500") == 1_500
+    with pytest.raises(ValueError):
+        parse_money("10", "x")
+
+
+def test_extract_amounts_labels():
+    """Test that amounts are labelled by the term before or after them."""
+    amounts = extract_amounts("Annual premium: $250K, $10M limit, $2.5M claim")
+    assert [(a.amount, a.label) for a in amounts] == [
+        (250_000, "premium"),
+        (10_000_000, "limit"),
+        (2_500_000, None),
+    ]
+
+
+def test_extract_deal_features():
+    """Test the features extracted from the reference deal."""
+    deal = MockDealRepository().get_deal_context("DEAL123")
+    features = extract_deal_features(deal)
+
+    assert features.limit_amount == 10_000_000
+    assert features.deductible_amount == 100_000
+    assert features.premium_amount == 250_000
+    assert [(o.premium, o.deductible) for o in features.offers] == [
+        (250_000, 100_000),
+        (225_000, 150_000),
+    ]
+    assert features.objection_categories == ["premium", "deductible", "coverage"]
+    assert features.objections[0] == "premium too high compared to market"
+    assert extract_deal_features(deal.model_dump()) == features
+
+
+def test_synthetic_deal_amounts_are_parsed():
+    """Test that the amounts of generated deals are parsed."""
+    import random
+
+    for i in range(20):
+        deal = generate_synthetic_deal(f"SYN{i}", random.Random(i))
+        features = extract_deal_features(deal)
+        assert features.limit_amount >= 1_000_000
+        assert features.deductible_amount is not None
+        assert features.premium_amount is not None
+        assert all(offer.premium for offer in features.offers)
+
+
+def test_input_graph_stores_features():
+    """Test that the input graph computes the features once for all nodes."""
+    graph = create_input_graph(MockDealRepository(), DomainKnowledgeBase())
+    result = graph.compile().invoke({"deal_id": "DEAL123"})
+
+    features = DealFeatures(**result["deal_features"])
+    assert features.premium_amount == 250_000
+
+    state = DealContextState(
+        deal_id="DEAL123",
+        deal_context=result["deal_context"],
+        deal_features=result["deal_features"],
+    )
+    needs = create_identify_information_needs_node()(state).information_needs
+    assert "submission.deductible" in needs
+    assert len(needs) == len(set(needs))
+
+
+def test_analyze_objections():
+    """Test that objections are mapped to information needs by category."""
+    assert analyze_objections(["Premium and coverage too low"]) == [
+        "submission.premium_structure",
+        "submission.coverage_terms",
+    ]
+
+
+def test_numeric_rule_conditions():
+    """Test that rules can bound the parsed deal amounts."""
+    decision = {"heuristic": "Large Limit", "justification": "j", "confidence": "c"}
+    engine = RuleEngine(
+        [
+            HeuristicRule(
+                name="large_limit",
+                require={"risk_profile": "high-risk"},
+                numeric={"limit_amount": {"min": 5_000_000}},
+                decision=decision,
+            )
+        ]
+    )
+    deal = MockDealRepository().get_deal_context("DEAL123").model_dump()
+    assert engine.evaluate(deal) == [decision]
+
+    small = extract_deal_features(deal).model_copy(update={"limit_amount": 1e6})
+    assert engine.evaluate(deal, small) == []
+
+    with pytest.raises(ValueError):
+        RuleEngine(
+            [HeuristicRule(name="x", numeric={"size": {"min": 1}}, decision=decision)]
+        )
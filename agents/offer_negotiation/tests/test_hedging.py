@@ -0,0 +1,205 @@
+import asyncio
+import threading
+import time
+from typing import Any, List, Optional
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+from agents.offer_negotiation.utils.agent_settings import load_agent_settings
+from agents.offer_negotiation.utils.hedging import HedgedChatModel
+from agents.offer_negotiation.utils.timeouts import NodeTimeoutError, NodeTimeouts
+
+
+class ScriptedLatencyModel(BaseChatModel):
+    """Chat model whose successive calls take the scripted latencies."""
+
+    latencies: List[float]
+    cancelled: List[int] = []
+
+    _calls: int = PrivateAttr(default=0)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _next_call(self) -> tuple:
+        with self._lock:
+            call = self._calls
+            self._calls += 1
+        return call, self.latencies[min(call, len(self.latencies) - 1)]
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        call, latency = self._next_call()
+        time.sleep(latency)
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=f"call {call}"))]
+        )
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        call, latency = self._next_call()
+        try:
+            await asyncio.sleep(latency)
+        except asyncio.CancelledError:
+            self.cancelled.append(call)
+            raise
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=f"call {call}"))]
+        )
+
+
+def test_hedge_wins_over_slow_call():
+    """Test that a hedge is sent after the delay and its response wins."""
+    llm = HedgedChatModel(
+        inner=ScriptedLatencyModel(latencies=[1.0, 0.01]), initial_delay=0.05
+    )
+    start = time.monotonic()
+    assert llm.invoke("Hello").content == "call 1"
+    assert time.monotonic() - start < 0.5
+
+    stats = llm.stats
+    assert stats.calls == 1
+    assert stats.hedged == 1
+    assert stats.hedge_wins == 1
+    assert stats.abandoned == 1
+
+
+def test_fast_call_is_not_hedged():
+    """Test that calls faster than the hedge delay are not hedged."""
+    llm = HedgedChatModel(
+        inner=ScriptedLatencyModel(latencies=[0.0]), initial_delay=0.5
+    )
+    assert llm.invoke("Hello").content == "call 0"
+    assert llm.stats.hedged == 0
+
+
+def test_hedge_delay_uses_latency_percentile():
+    """Test that the hedge delay is the percentile of observed latencies."""
+    llm = HedgedChatModel(
+        inner=ScriptedLatencyModel(latencies=[0.0]), min_samples=10, percentile=0.9
+    )
+    assert llm.hedge_delay() is None
+    for latency in range(20):
+        llm._record_win(latency / 100, hedge=False)
+    assert llm.hedge_delay() == pytest.approx(0.18)
+    assert HedgedChatModel(inner=llm.inner, max_hedges=0).hedge_delay() is None
+
+
+def test_node_budget_bounds_llm_call():
+    """Test that an LLM call fails once the node time budget is spent."""
+    llm = HedgedChatModel(inner=ScriptedLatencyModel(latencies=[2.0]), max_hedges=0)
+    timeouts = NodeTimeouts({"generate_strategy": 0.1})
+    node = timeouts("generate_strategy", lambda state: llm.invoke(state))
+
+    start = time.monotonic()
+    with pytest.raises(NodeTimeoutError):
+        node("Hello")
+    assert time.monotonic() - start < 1.0
+    assert timeouts.timeouts["generate_strategy"] == 1
+    assert llm.stats.timeouts == 1
+
+    # Nodes without a budget are not wrapped
+    identity = lambda state: state  # noqa: E731
+    assert timeouts("explain_rationale", identity) is identity
+
+
+def test_async_hedge_cancels_losing_call():
+    """Test that the losing call is cancelled on the async path."""
+    inner = ScriptedLatencyModel(latencies=[1.0, 0.01], cancelled=[])
+    llm = HedgedChatModel(inner=inner, initial_delay=0.05)
+
+    result = asyncio.run(llm.ainvoke("Hello"))
+    assert result.content == "call 1"
+    assert inner.cancelled == [0]
+    assert llm.stats.cancelled == 1
+
+
+class BimodalLatencyModel(BaseChatModel):
+    """Chat model whose first attempt of every third prompt is slow.
+
+    Hedges (second attempts of a prompt) are always fast.
+    """
+
+    slow_latencies: List[float] = [0.04, 0.06, 0.08]
+    fast_latency: float = 0.002
+
+    _attempts: dict = PrivateAttr(default_factory=dict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "bimodal"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = int(messages[-1].content)
+        with self._lock:
+            attempt = self._attempts.get(prompt, 0)
+            self._attempts[prompt] = attempt + 1
+        latency = self.fast_latency
+        if attempt == 0 and prompt % 10 in (0, 3, 6):
+            latency = self.slow_latencies[(prompt % 10) // 3]
+        time.sleep(latency)
+        message = AIMessage(
+            content=f"prompt {prompt}",
+            response_metadata={"model_name": "bimodal", "finish_reason": "stop"},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def test_hedge_delay_is_stable_under_bimodal_latencies():
+    """Test that won hedges do not pull the hedge delay down."""
+    llm = HedgedChatModel(
+        inner=BimodalLatencyModel(), percentile=0.8, min_samples=10, window=10
+    )
+    for prompt in range(10):
+        llm.invoke(str(prompt))
+    warm_delay = llm.hedge_delay()
+    assert warm_delay == pytest.approx(0.06, abs=0.01)
+
+    for prompt in range(10, 50):
+        llm.invoke(str(prompt))
+    # Hedges win the slowest calls, which still count as slow
+    assert llm.hedge_delay() >= 0.04
+    stats = llm.stats
+    assert stats.hedge_wins > 0
+    assert stats.hedge_rate < 0.3
+
+
+def test_winning_response_is_returned_unchanged():
+    """Test that the response metadata of the winning call is kept."""
+    llm = HedgedChatModel(inner=BimodalLatencyModel(), initial_delay=0.01)
+    for prompt in ["1", "0"]:
+        response = llm.invoke(prompt)
+        assert response.content == f"prompt {prompt}"
+        assert response.response_metadata["model_name"] == "bimodal"
+        assert response.response_metadata["finish_reason"] == "stop"
+    assert llm.stats.hedge_wins == 1
+
+
+def test_agent_settings_define_budgets():
+    """Test that agent_settings.yaml defines node budgets and hedging."""
+    settings = load_agent_settings()
+    assert settings.node_timeouts["generate_strategy"] > 0
+    assert 0 < settings.hedging.percentile < 1
@@ -0,0 +1,88 @@
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+from agents.offer_negotiation.utils.llm_cassette import (
+    CassetteChatModel,
+    CassetteMissError,
+    cassette_key,
+)
+from agents.offer_negotiation.utils.model import get_llm
+
+PROMPT = [SystemMessage(content="You are a negotiator."), HumanMessage(content="Hi")]
+
+
+def test_cassette_key_is_stable_per_prompt_and_model():
+    """Test that cassette keys depend on the messages and model only."""
+    assert cassette_key(PROMPT, "fake:a") == cassette_key(list(PROMPT), "fake:a")
+    assert cassette_key(PROMPT, "fake:a") != cassette_key(PROMPT, "fake:b")
+    assert cassette_key(PROMPT, "fake:a") != cassette_key(PROMPT[:1], "fake:a")
+
+
+def test_record_then_replay(tmp_path):
+    """Test that recorded responses are replayed without the live model."""
+    path = tmp_path / "cassette.json"
+    recorder = CassetteChatModel(
+        inner_factory=lambda: FakeChatModel(response="recorded strategy"),
+        cassette_path=str(path),
+        mode="record",
+    )
+    recorded = recorder.invoke(PROMPT)
+    assert recorded.content == "recorded strategy"
+    assert path.exists()
+
+    def fail():
+        raise AssertionError("live model must not be created in replay mode")
+
+    player = CassetteChatModel(
+        inner_factory=fail, cassette_path=str(path), mode="replay"
+    )
+    replayed = player.invoke(PROMPT)
+    assert replayed.content == "recorded strategy"
+    assert replayed.usage_metadata == recorded.usage_metadata
+
+
+def test_replay_miss_policies(tmp_path):
+    """Test that a replay miss raises or falls back to the live model."""
+    path = tmp_path / "cassette.json"
+    strict = CassetteChatModel(cassette_path=str(path), mode="replay")
+    with pytest.raises(CassetteMissError):
+        strict.invoke(PROMPT)
+
+    fallback = CassetteChatModel(
+        inner_factory=lambda: FakeChatModel(response="live"),
+        cassette_path=str(path),
+        mode="replay",
+        on_miss="fallback",
+    )
+    assert fallback.invoke(PROMPT).content == "live"
+    # The fallback response is recorded for the next replay
+    replay = CassetteChatModel(cassette_path=str(path), mode="replay")
+    assert replay.invoke(PROMPT).content == "live"
+
+
+def test_get_llm_backend_from_settings(tmp_path, monkeypatch):
+    """Test that get_llm selects the backend from settings and env overrides."""
+    for name in ("LLM_BACKEND_MODE", "LLM_CASSETTE_PATH", "LLM_CASSETTE_ON_MISS"):
+        monkeypatch.delenv(name, raising=False)
+    settings = {
+        "provider": "fake",
+        "model": "fake",
+        "backend": {"mode": "record", "cassette_path": str(tmp_path / "a.json")},
+    }
+    llm = get_llm(settings)
+    assert isinstance(llm, CassetteChatModel)
+    assert llm.mode == "record"
+    llm.invoke(PROMPT)
+
+    monkeypatch.setenv("LLM_BACKEND_MODE", "replay")
+    replay = get_llm(settings)
+    assert replay.mode == "replay"
+    assert replay.invoke(PROMPT).content == llm.invoke(PROMPT).content
+
+    monkeypatch.setenv("LLM_BACKEND_MODE", "live")
+    assert isinstance(get_llm(settings), FakeChatModel)
+
+    monkeypatch.setenv("LLM_BACKEND_MODE", "tape")
+    with pytest.raises(ValueError):
+        get_llm(settings)
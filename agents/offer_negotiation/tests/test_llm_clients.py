@@ -0,0 +1,295 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from agents.offer_negotiation.utils.llm_clients import (
+    AdaptiveConcurrencyLimiter,
+    ClientPoolSettings,
+    LLMClientRegistry,
+    TokenBucket,
+    get_client_registry,
+    reset_client_registry,
+)
+from agents.offer_negotiation.utils.timeouts import NodeTimeoutError, deadline_scope
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI chat completions endpoint."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.requests += 1
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            status = server.statuses.pop(0) if server.statuses else 200
+        time.sleep(server.latency)
+        with server.lock:
+            server.active -= 1
+        if status == 200 and body.get("stream"):
+            self._stream_chunks(body["model"], ["stub ", "strategy"])
+            return
+        if status == 200:
+            payload = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "stub strategy"},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 10,
+                    "completion_tokens": 5,
+                    "total_tokens": 15,
+                },
+            }
+        else:
+            payload = {"error": {"message": "Rate limit", "type": "rate_limit"}}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("retry-after-ms", "10")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_chunks(self, model, contents):
+        events = [
+            {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"role": "assistant", "content": content},
+                        "finish_reason": None,
+                    }
+                ],
+            }
+            for content in contents
+        ]
+        data = b"".join(f"data: {json.dumps(event)}\n\n".encode() for event in events)
+        data += b"data: [DONE]\n\n"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """Run a stub OpenAI server on a local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAIHandler)
+    server.lock = threading.Lock()
+    server.connections = set()
+    server.requests = 0
+    server.statuses = []
+    server.latency = 0.0
+    server.active = 0
+    server.max_active = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def test_token_bucket_limits_rate():
+    """Test that the token bucket delays acquisitions beyond its rate."""
+    bucket = TokenBucket(rate_per_minute=1200, capacity=2)  # 20 per second
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # Two tokens are available immediately, the other four take 0.2 seconds
+    assert time.monotonic() - start >= 0.15
+
+
+def test_adaptive_concurrency_limiter():
+    """Test additive increase and multiplicative decrease of the limit."""
+    limiter = AdaptiveConcurrencyLimiter(max_limit=8, initial_limit=4)
+    limiter.acquire()
+    limiter.release(latency=0.1, throttled=True)
+    assert limiter.limit == 2
+
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release(latency=0.1)
+    assert 2 < limiter.limit <= 4
+
+    limit = limiter.limit
+    limiter.acquire()
+    limiter.release(latency=1.0)  # 10x the baseline latency
+    assert limiter.limit < limit
+
+
+def test_waits_are_bounded_by_the_node_deadline():
+    """Test that waiting for tokens or a slot stops at the node deadline."""
+    bucket = TokenBucket(rate_per_minute=60, capacity=1)  # one per second
+    bucket.acquire()
+    limiter = AdaptiveConcurrencyLimiter(max_limit=1)
+    limiter.acquire()
+
+    with deadline_scope(0.1):
+        start = time.monotonic()
+        with pytest.raises(NodeTimeoutError):
+            bucket.acquire()
+        with pytest.raises(NodeTimeoutError):
+            asyncio.run(bucket.acquire_async())
+        # The bucket fails at once; the limiter waits for a release until then
+        assert time.monotonic() - start < 0.05
+        with pytest.raises(NodeTimeoutError):
+            limiter.acquire()
+        with pytest.raises(NodeTimeoutError):
+            asyncio.run(limiter.acquire_async())
+        assert time.monotonic() - start < 0.5
+    assert limiter.in_flight == 1 and not limiter._async_waiters
+
+
+def test_registry_warns_about_conflicting_settings(caplog):
+    """Test that settings differing from the existing registry's are reported."""
+    reset_client_registry()
+    try:
+        registry = get_client_registry({"max_concurrency": 4})
+        assert get_client_registry({"max_concurrency": 4}) is registry
+        assert get_client_registry() is registry
+        assert not caplog.records
+
+        assert get_client_registry({"max_concurrency": 8}) is registry
+        assert "Ignoring client_pool settings" in caplog.text
+        assert registry.settings.max_concurrency == 4
+    finally:
+        reset_client_registry()
+
+
+def test_registry_reuses_connections(stub_server):
+    """Test that chat models share pooled keep-alive connections."""
+    from langchain_openai import ChatOpenAI
+
+    registry = LLMClientRegistry(ClientPoolSettings(tokens_per_minute=60_000))
+    key = {"provider": "openai", "model": "stub"}
+
+    def factory():
+        return ChatOpenAI(
+            model="stub",
+            api_key="test",
+            base_url=_url(stub_server),
+            http_client=registry.http_client,
+            max_retries=0,
+        )
+
+    llm = registry.get_chat_model(key, factory)
+    assert registry.get_chat_model(key, factory) is llm
+
+    for _ in range(5):
+        assert llm.invoke("Hello").content == "stub strategy"
+    registry.close()
+
+    assert stub_server.requests == 5
+    assert len(stub_server.connections) == 1
+    stats = registry.stats()
+    assert stats.requests == 5
+    assert stats.tokens == 75
+
+
+def test_registry_backs_off_on_throttling(stub_server):
+    """Test that 429 responses reduce the concurrency limit."""
+    from langchain_openai import ChatOpenAI
+
+    stub_server.statuses = [429, 429]
+    registry = LLMClientRegistry(ClientPoolSettings(max_concurrency=8))
+    llm = ChatOpenAI(
+        model="stub",
+        api_key="test",
+        base_url=_url(stub_server),
+        http_client=registry.http_client,
+        max_retries=2,
+    )
+
+    assert llm.invoke("Hello").content == "stub strategy"
+    registry.close()
+
+    stats = registry.stats()
+    assert stats.throttled == 2
+    assert stats.requests == 3
+    assert stats.concurrency_limit < 8
+
+
+def _stub_model(server, registry, **kwargs):
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model="stub",
+        api_key="test",
+        base_url=_url(server),
+        http_client=registry.http_client,
+        http_async_client=registry.async_http_client,
+        max_retries=0,
+        **kwargs,
+    )
+
+
+def test_streamed_responses_hold_their_slot(stub_server):
+    """Test that streamed responses are not read up front."""
+    registry = LLMClientRegistry(ClientPoolSettings(tokens_per_minute=60_000))
+    llm = _stub_model(stub_server, registry)
+
+    chunks = []
+    in_flight = []
+    for chunk in llm.stream("Hello"):
+        chunks.append(chunk.content)
+        in_flight.append(registry.stats().in_flight)
+    assert "".join(chunks) == "stub strategy"
+    # The slot is held while the stream is read, and released once closed
+    assert in_flight[:2] == [1, 1]
+    assert registry.stats().in_flight == 0
+    assert registry.stats().requests == 1
+    registry.close()
+
+
+def test_async_requests_share_the_pool_limits(stub_server):
+    """Test that async calls go through the pool's concurrency limit."""
+    stub_server.latency = 0.05
+    registry = LLMClientRegistry(ClientPoolSettings(max_concurrency=2))
+    llm = _stub_model(stub_server, registry)
+
+    async def run_calls():
+        results = await asyncio.gather(*(llm.ainvoke("Hello") for _ in range(6)))
+        return [result.content for result in results]
+
+    # Each event loop gets its own connection pool
+    assert asyncio.run(run_calls()) == ["stub strategy"] * 6
+    assert asyncio.run(run_calls()) == ["stub strategy"] * 6
+    assert stub_server.max_active <= 2
+    stats = registry.stats()
+    assert (stats.requests, stats.tokens, stats.in_flight) == (12, 180, 0)
+
+    async def stream():
+        return "".join([chunk.content async for chunk in llm.astream("Hello")])
+
+    assert asyncio.run(stream()) == "stub strategy"
+    assert registry.stats().in_flight == 0
+    registry.close()
@@ -0,0 +1,111 @@
+import threading
+import tracemalloc
+
+from agents.offer_negotiation.agent import build_agent, invoke_agent
+from agents.offer_negotiation.core.repositories.mock_deal_repository import (
+    MockDealRepository,
+)
+from agents.offer_negotiation.graph.nodes.input_nodes import create_input_graph
+from agents.offer_negotiation.knowledge.domain_knowledge_base import DomainKnowledgeBase
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+from agents.offer_negotiation.utils.memory_tracking import MemoryTracker, deep_sizeof
+
+
+def test_memory_tracker_records_allocations():
+    """Test that allocations made by a node are recorded and attached to a trace."""
+    tracker = MemoryTracker(knowledge_base=DomainKnowledgeBase())
+
+    def allocating_node(state):
+        return {**state, "payload": [str(i) * 10 for i in range(10_000)]}
+
+    result = tracker("allocating_node", allocating_node)({"deal_id": "DEAL123"})
+
+    assert len(result["payload"]) == 10_000
+    assert not tracemalloc.is_tracing()
+
+    record = tracker.records[0]
+    assert record.node == "allocating_node"
+    assert record.deal_id == "DEAL123"
+    assert record.allocated_bytes > 100_000
+    assert record.peak_bytes >= record.allocated_bytes
+    assert record.state_size_bytes >= deep_sizeof(result["payload"])
+    assert record.knowledge_base_size_bytes > 0
+    assert record.top_allocations
+    assert record.trace["node"] == "allocating_node"
+    assert record.trace["memory"]["allocated_bytes"] == record.allocated_bytes
+
+
+def test_memory_tracker_summarizes_batch():
+    """Test that records from several runs are summarized per node."""
+    tracker = MemoryTracker()
+    graph = create_input_graph(
+        MockDealRepository(), DomainKnowledgeBase(), node_wrappers=[tracker]
+    ).compile()
+
+    for deal_id in ["DEAL123", "DEAL001"]:
+        graph.invoke({"deal_id": deal_id})
+
+    summary = tracker.summary()
+    assert set(summary) == {
+        "fetch_deal_context",
+        "compute_deal_features",
+        "fetch_domain_knowledge",
+    }
+    assert summary["fetch_deal_context"]["runs"] == 2
+    assert summary["fetch_deal_context"]["max_state_size_bytes"] > 0
+
+
+def test_memory_tracker_isolates_parallel_nodes():
+    """Test that concurrently running tracked nodes are measured one at a time."""
+    tracker = MemoryTracker()
+    started = threading.Barrier(2, timeout=5)
+
+    def allocating_node(state):
+        return {**state, "payload": [str(i) * 10 for i in range(20_000)]}
+
+    def small_node(state):
+        return {**state, "payload": [1]}
+
+    nodes = [
+        tracker("allocating_node", allocating_node),
+        tracker("small_node", small_node),
+    ]
+
+    def run(node):
+        started.wait()
+        node({"deal_id": "DEAL123"})
+
+    threads = [threading.Thread(target=run, args=(node,)) for node in nodes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    records = {record.node: record for record in tracker.records}
+    assert records["allocating_node"].peak_bytes > 500_000
+    assert records["small_node"].peak_bytes < 100_000
+    assert not tracemalloc.is_tracing()
+
+
+def test_memory_tracker_on_parallel_graph():
+    """Test tracking the parallel branches of the agent graph."""
+    tracker = MemoryTracker()
+    agent_graph = build_agent(
+        llm=FakeChatModel(),
+        node_wrappers=[tracker],
+        checkpointer=False,
+        strategy_index=False,
+    )
+    for _ in range(5):
+        invoke_agent(agent_graph, "DEAL123")
+
+    summary = tracker.summary()
+    assert summary["retrieve_domain_knowledge"]["runs"] > 5
+    assert summary["fetch_domain_knowledge"]["runs"] == 5
+    assert not tracemalloc.is_tracing()
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    """Test that shared objects are only counted once."""
+    shared = "x" * 1000
+    assert deep_sizeof([shared, shared]) < deep_sizeof([shared, "y" * 1000])
@@ -0,0 +1,101 @@
+from agents.offer_negotiation.core.repositories.mock_deal_repository import (
+    MockDealRepository,
+)
+from agents.offer_negotiation.graph.nodes.generate_strategy_node import (
+    create_generate_strategy_node,
+    evaluate_heuristics,
+)
+from agents.offer_negotiation.graph.nodes.identify_information_needs_node import (
+    create_identify_information_needs_node,
+)
+from agents.offer_negotiation.graph.nodes.retrieve_domain_knowledge_node import (
+    create_retrieve_domain_knowledge_node,
+)
+from agents.offer_negotiation.graph.state import DealContextState
+from agents.offer_negotiation.knowledge.domain_knowledge_base import DomainKnowledgeBase
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+from agents.offer_negotiation.utils.model_router import (
+    ModelRouter,
+    ModelTier,
+    RoutingSettings,
+    score_complexity,
+    validate_strategy,
+)
+
+TIERS = [
+    ModelTier(name="fast", model="small", max_complexity=3.0),
+    ModelTier(
+        name="strong",
+        model="large",
+        cost_per_1k_input_tokens=1.0,
+        cost_per_1k_output_tokens=2.0,
+    ),
+]
+
+
+def _router(responses, escalate=True):
+    settings = RoutingSettings(
+        enabled=True,
+        tiers=[tier.model_copy() for tier in TIERS],
+        escalate_on_invalid=escalate,
+    )
+    return ModelRouter(
+        settings, lambda tier: FakeChatModel(response=responses[tier.name])
+    )
+
+
+def test_score_complexity_grows_with_objections_and_heuristics():
+    """Test that objections and triggered heuristics raise the score."""
+    deal = MockDealRepository().get_deal_context("DEAL123")
+    decisions = evaluate_heuristics(deal)
+    base = score_complexity(deal, [])
+    assert score_complexity(deal, decisions) == base + len(decisions)
+
+    simpler = deal.model_copy(deep=True)
+    simpler.negotiation_context.objections = []
+    assert score_complexity(simpler, []) < base
+
+
+def test_select_tier():
+    """Test that scores are routed to the first tier covering them."""
+    router = _router({"fast": "", "strong": ""})
+    assert router.select_tier(1.0) == 0
+    assert router.select_tier(3.0) == 0
+    assert router.select_tier(7.5) == 1
+
+
+def test_invalid_response_escalates():
+    """Test that an invalid response is escalated to the next tier."""
+    router = _router(
+        {"fast": "Just lower the premium.", "strong": "Strategy: x\nRationale: y"}
+    )
+    response, decision = router.invoke("Negotiate", 1.0, validate_strategy)
+
+    assert response.content.startswith("Strategy:")
+    assert decision.tier == "strong"
+    assert decision.escalated_from == ["fast"]
+    stats = router.stats()
+    assert stats["fast"].escalations == 1
+    assert stats["strong"].calls == 1
+    assert stats["strong"].cost > 0
+
+    # Without escalation the invalid response of the routed tier is returned
+    router = _router({"fast": "Just lower the premium.", "strong": ""}, False)
+    _, decision = router.invoke("Negotiate", 1.0, validate_strategy)
+    assert decision.tier == "fast"
+
+
+def test_generate_strategy_node_routes_by_complexity():
+    """Test that the strategy node uses the tier chosen for the deal."""
+    deal = MockDealRepository().get_deal_context("DEAL123")
+    state = DealContextState(deal_id="DEAL123", deal_context=deal.model_dump())
+    state = create_identify_information_needs_node()(state)
+    state = create_retrieve_domain_knowledge_node(DomainKnowledgeBase())(state)
+
+    router = _router({"fast": "Strategy: fast\nRationale: r", "strong": "unused"})
+    router.settings.tiers[0].max_complexity = 100.0
+    result = create_generate_strategy_node(router=router)(state)
+
+    assert result.strategy == "Strategy: fast\nRationale: r"
+    assert router.stats()["fast"].calls == 1
+    assert router.stats()["strong"].calls == 0
@@ -0,0 +1,122 @@
+from agents.offer_negotiation.agent import build_agent, invoke_agent
+from agents.offer_negotiation.core.repositories.mock_deal_repository import (
+    MockDealRepository,
+)
+from agents.offer_negotiation.graph.interfaces import (
+    IDENTIFY_INFORMATION_NEEDS_METADATA,
+    NODE_METADATA,
+    RETRIEVE_DOMAIN_KNOWLEDGE_METADATA,
+)
+from agents.offer_negotiation.graph.nodes.identify_information_needs_node import (
+    create_identify_information_needs_node,
+)
+from agents.offer_negotiation.graph.state import DealContextState
+from agents.offer_negotiation.knowledge.domain_documents import DocumentChunk
+from agents.offer_negotiation.knowledge.domain_knowledge_base import (
+    DomainKnowledgeBase,
+)
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+from agents.offer_negotiation.utils.node_cache import (
+    NodeCache,
+    input_fields,
+    output_fields,
+    stable_hash,
+)
+
+CACHED_NODES = ["identify_information_needs", "retrieve_domain_knowledge"]
+
+
+def deal_state(deal_id: str = "DEAL123") -> DealContextState:
+    deal = MockDealRepository().get_deal_context(deal_id)
+    return DealContextState(deal_id=deal_id, deal_context=deal.model_dump())
+
+
+def test_declared_fields():
+    """Test that keys and stored fields follow the node interfaces."""
+    assert input_fields(IDENTIFY_INFORMATION_NEEDS_METADATA) == [
+        "deal_context",
+        "deal_features",
+    ]
+    assert output_fields(IDENTIFY_INFORMATION_NEEDS_METADATA) == ["information_needs"]
+    assert output_fields(RETRIEVE_DOMAIN_KNOWLEDGE_METADATA) == [
+        "domain_knowledge",
+        "retrieved_knowledge",
+    ]
+    assert stable_hash({"b": 1, "a": {2, 1}}) == stable_hash({"a": [1, 2], "b": 1})
+
+
+def test_cached_node_hits_and_invalidation():
+    """Test hits on repeated inputs and misses after input or KB changes."""
+    knowledge_base = DomainKnowledgeBase()
+    cache = NodeCache(
+        {"identify_information_needs": IDENTIFY_INFORMATION_NEEDS_METADATA},
+        knowledge_base=knowledge_base,
+    )
+    node = cache("identify_information_needs", create_identify_information_needs_node())
+
+    first = node(deal_state())
+    second = node(deal_state())
+    assert second == first
+    assert cache.stats()["identify_information_needs"].hits == 1
+
+    node(deal_state("DEAL001"))
+    knowledge_base.add_document_chunks(
+        [DocumentChunk(chunk_id="new", text="New guideline", source_doc_id="doc")]
+    )
+    node(deal_state())
+    stats = cache.stats()["identify_information_needs"]
+    assert (stats.hits, stats.misses) == (1, 3)
+    assert stats.hit_rate == 0.25
+
+
+def test_memory_tier_is_bounded():
+    """Test that the least recently used entries are evicted."""
+    cache = NodeCache(
+        {"identify_information_needs": IDENTIFY_INFORMATION_NEEDS_METADATA},
+        max_entries=1,
+    )
+    node = cache("identify_information_needs", create_identify_information_needs_node())
+    for deal_id in ["DEAL123", "DEAL001", "DEAL123"]:
+        node(deal_state(deal_id))
+    assert cache.stats()["identify_information_needs"].misses == 3
+
+
+def test_disk_tier_survives_restarts(tmp_path):
+    """Test that a new cache serves entries stored on disk by a previous one."""
+    nodes = {name: NODE_METADATA[name] for name in CACHED_NODES}
+    path = tmp_path / "node_cache.sqlite"
+
+    def run(cache):
+        agent_graph = build_agent(llm=FakeChatModel(), node_wrappers=[cache])
+        return invoke_agent(agent_graph, "DEAL123")
+
+    first_cache = NodeCache(nodes, disk_path=path)
+    first = run(first_cache)
+    first_cache.close()
+
+    cache = NodeCache(nodes, disk_path=path)
+    second = run(cache)
+    assert second == first
+    # Knowledge is retrieved (and cached) once per information need
+    assert {name: s.disk_hits for name, s in cache.stats().items()} == {
+        "identify_information_needs": 1,
+        "retrieve_domain_knowledge": len(first["information_needs"]),
+    }
+    assert all(s.misses == 0 for s in cache.stats().values())
+
+
+def test_knowledge_base_hash_follows_content():
+    """Test that knowledge bases with the same chunks share cache keys."""
+    chunk = DocumentChunk(chunk_id="new", text="New guideline", source_doc_id="doc")
+    first, second = DomainKnowledgeBase(), DomainKnowledgeBase()
+    assert first.content_hash == second.content_hash
+
+    first.add_document_chunks([chunk])
+    assert first.content_hash != second.content_hash
+    second.add_document_chunks([chunk.model_dump()])
+    assert first.content_hash == second.content_hash
+
+    second.add_document_chunks([])
+    assert first.content_hash == second.content_hash
+    second.add_document_chunks([chunk.model_copy(update={"text": "Changed"})])
+    assert first.content_hash != second.content_hash
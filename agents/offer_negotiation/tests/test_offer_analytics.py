@@ -0,0 +1,136 @@
+import math
+
+import numpy as np
+import pytest
+
+from agents.offer_negotiation.agent import build_agent
+from agents.offer_negotiation.core.analytics.offer_analytics import OfferAnalytics
+from agents.offer_negotiation.core.features.deal_features import parse_offer
+from agents.offer_negotiation.core.repositories.synthetic_deal_repository import (
+    SyntheticDealRepository,
+)
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+
+
+def make_deal(line_of_business, territory, offers):
+    return {
+        "submission": {"line_of_business": line_of_business, "territory": territory},
+        "negotiation_context": {"offers": offers},
+    }
+
+
+BOOK = [
+    make_deal(
+        "Property",
+        "Northeast",
+        [
+            "Initial offer: $100K premium, $100K deductible",
+            "Revised offer: $90K premium, $150K deductible",
+            "Revised offer: $80K premium, $200K deductible",
+        ],
+    ),
+    make_deal("Property", "West", []),
+    make_deal("Marine", "West", ["Initial offer: $50K premium, $10K deductible"]),
+]
+
+
+def test_deal_metrics():
+    """Test the trajectory metrics of each deal."""
+    metrics = OfferAnalytics.from_deals(BOOK).deal_metrics()
+
+    assert metrics["premium_concession_rate"][0] == pytest.approx(0.1)
+    assert metrics["deductible_change"][0] == pytest.approx(1.0)
+    assert metrics["elasticity"][0] == pytest.approx(-0.2)
+    assert metrics["rounds"].tolist()[::2] == [3.0, 1.0]
+
+    # No offers, or a single offer, leave the trajectory undefined
+    assert all(math.isnan(values[1]) for values in metrics.values())
+    assert math.isnan(metrics["premium_concession_rate"][2])
+    assert math.isnan(metrics["elasticity"][2])
+
+
+def test_segment_stats():
+    """Test that segment means skip deals with undefined metrics."""
+    analytics = OfferAnalytics.from_deals(BOOK)
+
+    by_line = analytics.segment_stats(["line_of_business"])
+    assert by_line[("Property",)].deals == 2
+    assert by_line[("Property",)].offers == 3
+    assert by_line[("Property",)].mean_premium_concession_rate == pytest.approx(0.1)
+    assert by_line[("Marine",)].mean_elasticity is None
+
+    book = analytics.segment_stats([])[()]
+    assert book.deals == 3
+    assert book.mean_rounds == pytest.approx(2.0)
+
+    with pytest.raises(ValueError):
+        analytics.segment_stats(["client_id"])
+
+
+def test_vectorized_metrics_match_scalar_computation():
+    """Test the vectorized metrics against a per-deal computation."""
+    deals = list(SyntheticDealRepository(300, seed=3).iter_deals())
+    metrics = OfferAnalytics.from_deals(deals).deal_metrics()
+
+    for index, deal in enumerate(deals):
+        offers = [parse_offer(o) for o in deal["negotiation_context"]["offers"]]
+        first, last = offers[0], offers[-1]
+        premium_change = (last.premium - first.premium) / first.premium
+        deductible_change = (last.deductible - first.deductible) / first.deductible
+        assert metrics["deductible_change"][index] == pytest.approx(deductible_change)
+        if len(offers) > 1:
+            assert metrics["premium_concession_rate"][index] == pytest.approx(
+                -premium_change / (len(offers) - 1)
+            )
+        if deductible_change:
+            assert metrics["elasticity"][index] == pytest.approx(
+                premium_change / deductible_change
+            )
+        else:
+            assert np.isnan(metrics["elasticity"][index])
+
+
+def test_summarize_for_prompt():
+    """Test the compact summary of a deal against its segments."""
+    analytics = OfferAnalytics.from_deals(BOOK)
+    offers = [parse_offer(o) for o in BOOK[0]["negotiation_context"]["offers"]]
+    summary = analytics.summarize("Property", "Northeast", offers).splitlines()
+
+    assert summary[0].startswith(
+        "- This deal: 3 offers, premium concession 10.0%/round"
+    )
+    assert summary[1].startswith("- Property / Northeast (n=1)")
+    assert summary[2].startswith("- Property (n=2)")
+    assert summary[3].startswith("- All deals (n=3)")
+    assert "n/a" in analytics.summarize("Aviation", None, [])
+
+
+def test_build_agent_parses_a_repository_once(monkeypatch):
+    """Test that graphs built on the same repository share its analytics."""
+    calls = []
+    from_deals = OfferAnalytics.from_deals
+
+    def counting_from_deals(deals, max_deals=None):
+        calls.append(max_deals)
+        return from_deals(deals, max_deals)
+
+    monkeypatch.setattr(OfferAnalytics, "from_deals", counting_from_deals)
+    deal_repo = SyntheticDealRepository(20)
+    for _ in range(3):
+        build_agent(
+            deal_repo=deal_repo,
+            llm=FakeChatModel(),
+            node_wrappers=[],
+            checkpointer=False,
+            strategy_index=False,
+        )
+    assert len(calls) == 1
+
+    build_agent(
+        deal_repo=SyntheticDealRepository(20),
+        llm=FakeChatModel(),
+        node_wrappers=[],
+        checkpointer=False,
+        strategy_index=False,
+    )
+    assert len(calls) == 2
@@ -0,0 +1,64 @@
+import threading
+
+from agents.offer_negotiation.agent import build_agent, invoke_agent
+from agents.offer_negotiation.graph.nodes.retrieve_domain_knowledge_node import (
+    create_retrieve_domain_knowledge_node,
+)
+from agents.offer_negotiation.graph.state import InformationNeedsState
+from agents.offer_negotiation.graph.utils import state_update
+from agents.offer_negotiation.knowledge.domain_knowledge_base import (
+    DomainKnowledgeBase,
+)
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+
+
+class BarrierKnowledgeBase(DomainKnowledgeBase):
+    """Knowledge base whose retrievals wait until all of them have started."""
+
+    def __init__(self, parties: int):
+        super().__init__()
+        self.barrier = threading.Barrier(parties, timeout=5)
+
+    def retrieve(self, need, *args, **kwargs):
+        self.barrier.wait()
+        return super().retrieve(need, *args, **kwargs)
+
+
+def run(knowledge_base):
+    agent_graph = build_agent(
+        knowledge_base=knowledge_base,
+        llm=FakeChatModel(),
+        node_wrappers=[],
+        checkpointer=False,
+    )
+    return invoke_agent(agent_graph, "DEAL123")
+
+
+def test_needs_are_retrieved_concurrently_in_need_order():
+    """Test that per-need retrievals overlap and are collected in order."""
+    needs = run(DomainKnowledgeBase())["information_needs"]
+    assert len(needs) > 1
+
+    # A sequential retrieval would break the barrier
+    knowledge_base = BarrierKnowledgeBase(len(needs))
+    result = run(knowledge_base)
+    assert not knowledge_base.barrier.broken
+
+    retrieve = create_retrieve_domain_knowledge_node(DomainKnowledgeBase())
+    sequential = retrieve(
+        InformationNeedsState(deal_id="DEAL123", information_needs=needs)
+    )
+    assert result["domain_knowledge"] == [
+        chunk.model_dump() for chunk in sequential.domain_knowledge
+    ]
+    assert set(result["retrieved_knowledge"]) == set(needs)
+
+
+def test_state_update_keeps_changed_fields():
+    """Test that graph nodes only write the fields they changed."""
+    state = InformationNeedsState(deal_id="DEAL123", deal_context={"a": 1})
+    output = InformationNeedsState(
+        deal_id="DEAL123", deal_context={"a": 1}, information_needs=["x"]
+    )
+    assert state_update(state, output) == {"information_needs": ["x"]}
+    assert state_update(state, {"error": "e"}) == {"error": "e"}
@@ -0,0 +1,98 @@
+import json
+import time
+from pathlib import Path
+
+from agents.offer_negotiation.core.repositories.mock_deal_repository import (
+    MockDealRepository,
+)
+from agents.offer_negotiation.graph.nodes.input_nodes import create_input_graph
+from agents.offer_negotiation.knowledge.domain_knowledge_base import DomainKnowledgeBase
+from agents.offer_negotiation.utils.profiling import NodeProfiler, summarize_self_time
+
+
+def _busy_work(seconds: float) -> int:
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def test_profiler_writes_collapsed_stacks_and_summary(tmp_path):
+    """Test that a profiled node produces tagged collapsed stacks and a summary."""
+    profiler = NodeProfiler(output_dir=tmp_path, interval_ms=1.0, sample_rate=1.0)
+
+    def slow_node(state):
+        _busy_work(0.05)
+        return state
+
+    wrapped = profiler("slow_node", slow_node)
+    assert wrapped({"deal_id": "DEAL123"}) == {"deal_id": "DEAL123"}
+
+    assert len(profiler.profiles) == 1
+    profile = profiler.profiles[0]
+    assert profile.node == "slow_node"
+    assert profile.deal_id == "DEAL123"
+    assert profile.sample_count > 0
+    assert any("_busy_work" in t.function for t in profile.top_self_time)
+
+    assert Path(profile.collapsed_path).parent == tmp_path / "DEAL123"
+    collapsed = Path(profile.collapsed_path).read_text()
+    for line in collapsed.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("deal:DEAL123;node:slow_node;")
+        assert int(count) > 0
+
+    summary = json.loads(Path(profile.summary_path).read_text())
+    assert summary["node"] == "slow_node"
+    assert summary["top_self_time"]
+
+
+def test_repeated_node_profiles_are_kept(tmp_path):
+    """Test that several runs of a node for a deal write separate files."""
+    profiler = NodeProfiler(output_dir=tmp_path, interval_ms=1.0, sample_rate=1.0)
+    wrapped = profiler("node", lambda state: state)
+    for _ in range(3):
+        wrapped({"deal_id": "DEAL123"})
+
+    paths = {profile.collapsed_path for profile in profiler.profiles}
+    assert len(paths) == 3
+    assert len(list((tmp_path / "DEAL123").glob("node.*.collapsed"))) == 3
+    assert len(list((tmp_path / "DEAL123").glob("node.*.summary.json"))) == 3
+
+
+def test_profiler_respects_sample_rate(tmp_path):
+    """Test that nodes are not profiled when the sample rate is zero."""
+    profiler = NodeProfiler(output_dir=tmp_path, sample_rate=0.0)
+    wrapped = profiler("node", lambda state: state)
+    wrapped({"deal_id": "DEAL123"})
+    assert profiler.profiles == []
+    assert not any(tmp_path.iterdir())
+
+
+def test_summarize_self_time():
+    """Test self and total time attribution from collapsed stacks."""
+    stacks = {"a;b;c": 3, "a;b": 1, "a;d": 2}
+    timings = summarize_self_time(stacks, interval_ms=10.0)
+    by_function = {t.function: t for t in timings}
+    assert timings[0].function == "c"
+    assert by_function["c"].self_seconds == 0.03
+    assert by_function["b"].total_seconds == 0.04
+    assert "a" not in by_function
+
+
+def test_profiler_wraps_graph_nodes(tmp_path):
+    """Test that the profiler can be installed on every graph node."""
+    profiler = NodeProfiler(output_dir=tmp_path, sample_rate=1.0)
+    graph = create_input_graph(
+        MockDealRepository(), DomainKnowledgeBase(), node_wrappers=[profiler]
+    )
+    result = graph.compile().invoke({"deal_id": "DEAL123"})
+
+    assert result["deal_context"]["submission"]["deal_id"] == "DEAL123"
+    assert [p.node for p in profiler.profiles] == [
+        "fetch_deal_context",
+        "compute_deal_features",
+        "fetch_domain_knowledge",
+    ]
+    assert all(p.deal_id == "DEAL123" for p in profiler.profiles)
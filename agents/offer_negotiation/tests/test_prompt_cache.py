@@ -0,0 +1,96 @@
+import pytest
+from langchain_core.messages import AIMessage
+
+from agents.offer_negotiation.core.repositories.mock_deal_repository import (
+    MockDealRepository,
+)
+from agents.offer_negotiation.core.repositories.synthetic_deal_repository import (
+    SyntheticDealRepository,
+)
+from agents.offer_negotiation.graph.nodes.generate_strategy_node import (
+    build_strategy_inputs,
+    create_generate_strategy_node,
+    create_strategy_prompt,
+)
+from agents.offer_negotiation.graph.nodes.identify_information_needs_node import (
+    create_identify_information_needs_node,
+)
+from agents.offer_negotiation.graph.nodes.retrieve_domain_knowledge_node import (
+    create_retrieve_domain_knowledge_node,
+)
+from agents.offer_negotiation.graph.state import DealContextState
+from agents.offer_negotiation.knowledge.domain_knowledge_base import DomainKnowledgeBase
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+from agents.offer_negotiation.utils.model_router import ModelRouter, RoutingSettings
+from agents.offer_negotiation.utils.prompt_cache import PromptCacheTracker
+
+
+def _strategy_state(deal_context):
+    state = DealContextState(
+        deal_id=deal_context.submission.deal_id, deal_context=deal_context.model_dump()
+    )
+    state = create_identify_information_needs_node()(state)
+    return create_retrieve_domain_knowledge_node(DomainKnowledgeBase())(state)
+
+
+def test_strategy_prompt_keeps_deal_content_out_of_the_prefix():
+    """Test that prompts of different deals share everything but the last message."""
+    deals = [
+        MockDealRepository().get_deal_context("DEAL123"),
+        SyntheticDealRepository(1, seed=0).get_deal_context("SYN000000"),
+    ]
+    for structured in (False, True):
+        prompt = create_strategy_prompt(structured)
+        first, second = (
+            prompt.invoke(build_strategy_inputs(deal, [], [])).to_messages()
+            for deal in deals
+        )
+        assert first[:-1] == second[:-1]
+        assert first[-1] != second[-1]
+        assert "SYN000000" in second[-1].content
+
+
+def test_prompt_cache_hits_are_recorded():
+    """Test that the cached input tokens of repeated strategy calls are counted."""
+    tracker = PromptCacheTracker()
+    node = create_generate_strategy_node(
+        FakeChatModel(prefix_cache=True), prompt_cache=tracker
+    )
+    node(_strategy_state(MockDealRepository().get_deal_context("DEAL123")))
+    node(_strategy_state(SyntheticDealRepository(1).get_deal_context("SYN000000")))
+
+    stats = tracker.stats()["strategy"]
+    assert stats.calls == 2
+    system_tokens = len(create_strategy_prompt().messages[0].prompt.template.split())
+    # The second call is served the static system prompt from the cache
+    assert stats.cached_input_tokens >= system_tokens
+    assert 0 < stats.hit_rate < 1
+
+
+def test_router_bills_cached_tokens_at_the_cached_rate():
+    """Test that cached input tokens lower the cost recorded by the router."""
+    settings = RoutingSettings(
+        enabled=True,
+        tiers=[
+            {
+                "name": "only",
+                "cost_per_1k_input_tokens": 1.0,
+                "cost_per_1k_cached_input_tokens": 0.5,
+            }
+        ],
+    )
+    response = AIMessage(
+        content="x",
+        usage_metadata={
+            "input_tokens": 1000,
+            "output_tokens": 0,
+            "total_tokens": 1000,
+            "input_token_details": {"cache_read": 800},
+        },
+    )
+    router = ModelRouter(settings, lambda tier: None)
+    router._record(settings.tiers[0], 0.0, 0.1, response)
+
+    stats = router.stats()["only"]
+    assert stats.cached_input_tokens == 800
+    assert stats.cost == pytest.approx(0.2 + 0.4)
@@ -0,0 +1,127 @@
+import os
+
+import pytest
+
+from agents.offer_negotiation.core.repositories.mock_deal_repository import (
+    MockDealRepository,
+)
+from agents.offer_negotiation.graph.interfaces import GENERATE_STRATEGY_METADATA
+from agents.offer_negotiation.graph.nodes.generate_strategy_node import (
+    create_generate_strategy_node,
+    strategy_prompt_messages,
+)
+from agents.offer_negotiation.graph.nodes.identify_information_needs_node import (
+    create_identify_information_needs_node,
+)
+from agents.offer_negotiation.graph.nodes.retrieve_domain_knowledge_node import (
+    create_retrieve_domain_knowledge_node,
+)
+from agents.offer_negotiation.graph.state import DealContextState
+from agents.offer_negotiation.knowledge.domain_knowledge_base import DomainKnowledgeBase
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+from agents.offer_negotiation.utils.node_cache import NodeCache
+from agents.offer_negotiation.utils.prompt_loader import PromptRegistry
+from config.app_config import config
+
+
+@pytest.fixture
+def prompts_dir(tmp_path):
+    """Copy of the strategy prompts."""
+    for _, names in strategy_prompt_messages(structured=True):
+        for name in names:
+            (tmp_path / name).write_text(
+                (config.prompts_dir / name).read_text(encoding="utf-8"),
+                encoding="utf-8",
+            )
+    return tmp_path
+
+
+def _edit(path, text):
+    """Rewrite a prompt file with a later modification time."""
+    mtime = path.stat().st_mtime_ns
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+def test_templates_are_compiled_once_per_version(prompts_dir):
+    """Test that templates are reused until a prompt file changes."""
+    registry = PromptRegistry(prompts_dir, hot_reload=True, check_interval=0)
+    messages = strategy_prompt_messages()
+    template, version = registry.chat_template(messages)
+    assert registry.chat_template(messages) == (template, version)
+    assert registry.version(["strategy_request.md"]) == (
+        registry.get("strategy_request.md").version
+    )
+
+    # Editing an unused prompt does not change the version
+    _edit(prompts_dir / "structured_strategy.md", "Respond with JSON.")
+    assert registry.chat_template(messages)[1] == version
+
+    _edit(prompts_dir / "strategy_request.md", "Deal Context:\n{deal_context}")
+    new_template, new_version = registry.chat_template(messages)
+    assert new_version != version
+    assert new_template.input_variables == ["deal_context"]
+
+    with pytest.raises(FileNotFoundError):
+        registry.get("missing.md")
+
+
+def test_prompts_are_not_reloaded_without_hot_reload(prompts_dir):
+    """Test that a registry without hot reload keeps its first snapshot."""
+    registry = PromptRegistry(prompts_dir, hot_reload=False)
+    version = registry.get("strategy_request.md").version
+    _edit(prompts_dir / "strategy_request.md", "Deal Context:\n{deal_context}")
+    assert registry.get("strategy_request.md").version == version
+    assert registry.reload() == {
+        "strategy_request.md": registry.get("strategy_request.md").version
+    }
+
+
+def test_broken_prompt_files_keep_their_last_good_version(prompts_dir, caplog):
+    """Test that a deleted, truncated or malformed prompt is not swapped in."""
+    registry = PromptRegistry(prompts_dir, hot_reload=True, check_interval=0)
+    messages = strategy_prompt_messages()
+    request = registry.get("strategy_request.md")
+    template, version = registry.chat_template(messages)
+
+    _edit(prompts_dir / "strategy_request.md", "")
+    assert registry.chat_template(messages) == (template, version)
+    _edit(prompts_dir / "strategy_request.md", "Deal Context:\n{deal_context")
+    assert registry.chat_template(messages) == (template, version)
+    (prompts_dir / "strategy_request.md").unlink()
+    assert registry.get("strategy_request.md") == request
+    assert registry.chat_template(messages)[1] == version
+    assert caplog.text.count("Keeping version") == 3
+
+    # A fixed file is reloaded
+    (prompts_dir / "strategy_request.md").write_text(
+        "Deal: {deal_context}", encoding="utf-8"
+    )
+    assert registry.get("strategy_request.md").text == "Deal: {deal_context}"
+    assert registry.chat_template(messages)[1] != version
+
+
+def test_prompt_version_is_stamped_and_invalidates_cache(prompts_dir):
+    """Test that a changed prompt is used without a restart and misses the cache."""
+    registry = PromptRegistry(prompts_dir, hot_reload=True, check_interval=0)
+    deal = MockDealRepository().get_deal_context("DEAL123")
+    state = DealContextState(deal_id="DEAL123", deal_context=deal.model_dump())
+    state = create_identify_information_needs_node()(state)
+    state = create_retrieve_domain_knowledge_node(DomainKnowledgeBase())(state)
+
+    cache = NodeCache(
+        {"generate_strategy": GENERATE_STRATEGY_METADATA}, prompt_registry=registry
+    )
+    node = cache(
+        "generate_strategy",
+        create_generate_strategy_node(FakeChatModel(), prompt_registry=registry),
+    )
+    first = node(state)
+    assert first.prompt_version == registry.chat_template(strategy_prompt_messages())[1]
+    assert node(state).prompt_version == first.prompt_version
+    assert cache.stats()["generate_strategy"].hits == 1
+
+    _edit(prompts_dir / "strategy_generation.md", "You are a negotiator.")
+    second = node(state)
+    assert second.prompt_version != first.prompt_version
+    assert cache.stats()["generate_strategy"].misses == 2
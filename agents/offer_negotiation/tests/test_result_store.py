@@ -0,0 +1,109 @@
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from agents.offer_negotiation.agent import run_agent
+from agents.offer_negotiation.core.repositories.result_store import ResultStore
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+ROOT = Path(__file__).resolve().parents[3]
+
+
+def _result(deal_id, client_id, rationale):
+    return {
+        "deal_id": deal_id,
+        "deal_context": {"client_history": {"client_id": client_id}},
+        "rationale": rationale,
+        "prompt_version": "abc123",
+    }
+
+
+def test_results_are_found_by_deal_client_and_time(tmp_path):
+    """Test lookups by deal, client and time range, newest first."""
+    store = ResultStore(tmp_path / "results.sqlite")
+    for day, (deal_id, client_id) in enumerate(
+        [("DEAL1", "C1"), ("DEAL2", "C1"), ("DEAL1", "C1"), ("DEAL3", "C2")]
+    ):
+        store.append(
+            _result(deal_id, client_id, f"day {day}"),
+            latency_seconds=1.5,
+            model="fake",
+            created_at=START + timedelta(days=day),
+        )
+
+    assert [r.rationale for r in store.find(deal_id="DEAL1")] == ["day 2", "day 0"]
+    assert [r.deal_id for r in store.find(client_id="C1")] == [
+        "DEAL1",
+        "DEAL2",
+        "DEAL1",
+    ]
+    in_range = store.find(
+        since=START + timedelta(days=1), until=START + timedelta(days=3)
+    )
+    assert [r.rationale for r in in_range] == ["day 2", "day 1"]
+
+    latest = store.latest("DEAL1")
+    assert latest.created_at == START + timedelta(days=2)
+    assert (latest.prompt_version, latest.model, latest.latency_seconds) == (
+        "abc123",
+        "fake",
+        1.5,
+    )
+    assert store.latest("DEAL9") is None
+    store.close()
+
+    # Results persist across processes
+    store = ResultStore(tmp_path / "results.sqlite")
+    assert len(store.find(limit=2)) == 2
+    assert len(store.find()) == 4
+    store.close()
+
+
+def test_run_agent_stores_the_final_state(tmp_path):
+    """Test that a run stores its rationale, prompt version and latency."""
+    store = ResultStore(tmp_path / "results.sqlite")
+    result = run_agent("DEAL123", llm=FakeChatModel(), result_store=store)
+
+    stored = store.latest("DEAL123")
+    assert stored.rationale == result["rationale"]
+    assert stored.client_id == result["deal_context"]["client_history"]["client_id"]
+    assert stored.prompt_version == result["prompt_version"]
+    assert stored.model == "fake"
+    assert stored.latency_seconds > 0
+    store.close()
+
+
+def test_queued_results_are_committed_on_exit(tmp_path):
+    """Test that a process exiting without closing the store keeps its results."""
+    path = tmp_path / "results.sqlite"
+    code = (
+        "from agents.offer_negotiation.core.repositories.result_store import "
+        "ResultStore; "
+        f"ResultStore({str(path)!r}).append("
+        "{'deal_id': 'DEAL123', 'rationale': 'stored on exit'})"
+    )
+    for _ in range(3):
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+    store = ResultStore(path)
+    results = store.find(deal_id="DEAL123")
+    assert [r.rationale for r in results] == ["stored on exit"] * 3
+    store.close()
+
+
+def test_closed_store_rejects_results(tmp_path):
+    """Test that appending to a closed store fails instead of losing the result."""
+    store = ResultStore(tmp_path / "results.sqlite")
+    store.append({"deal_id": "DEAL123"})
+    store.close()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        store.append({"deal_id": "DEAL001"})
+
+    store = ResultStore(tmp_path / "results.sqlite")
+    assert [r.deal_id for r in store.find()] == ["DEAL123"]
+    store.close()
@@ -0,0 +1,160 @@
+from typing import List
+
+import pytest
+
+from agents.offer_negotiation.core.features.deal_features import extract_deal_features
+from agents.offer_negotiation.core.models.deal_models import DealContext
+from agents.offer_negotiation.core.repositories.mock_deal_repository import (
+    MockDealRepository,
+)
+from agents.offer_negotiation.core.repositories.synthetic_deal_repository import (
+    SyntheticDealRepository,
+)
+from agents.offer_negotiation.core.rules.rule_engine import (
+    HeuristicRule,
+    RuleEngine,
+)
+from agents.offer_negotiation.graph.nodes.generate_strategy_node import (
+    evaluate_heuristics,
+    evaluate_heuristics_batch,
+)
+
+
+def legacy_evaluate_heuristics(deal_context: DealContext) -> List[dict]:
+    """The hard-coded heuristics replaced by the rules of agent_settings.yaml."""
+    decisions = []
+    objections = deal_context.negotiation_context.objections
+    if any("premium" in obj.lower() for obj in objections):
+        if any(
+            "deductible" in note.lower()
+            for note in deal_context.client_history.prior_negotiations
+        ):
+            decisions.append(
+                {
+                    "heuristic": "Premium Objection → Deductible Trade",
+                    "justification": "Client objected to premium and has history of accepting deductible adjustments",
+                    "confidence": "High - Matches objection pattern and client history",
+                }
+            )
+    if any("coverage" in obj.lower() for obj in objections):
+        if "limit" in deal_context.submission.coverage_terms.lower():
+            for objection in objections:
+                if "business interruption" in objection.lower():
+                    decisions.append(
+                        {
+                            "heuristic": "Coverage Request → Business Interruption",
+                            "justification": "Client requested additional business interruption coverage",
+                            "confidence": "High - Explicit coverage request",
+                        }
+                    )
+                elif "flood" in objection.lower():
+                    decisions.append(
+                        {
+                            "heuristic": "Coverage Request → Flood Coverage",
+                            "justification": "Client requested flood coverage consideration",
+                            "confidence": "High - Explicit coverage request",
+                        }
+                    )
+    if deal_context.submission.risk_profile:
+        if "high-risk" in deal_context.submission.risk_profile.lower():
+            decisions.append(
+                {
+                    "heuristic": "High Risk → Enhanced Coverage",
+                    "justification": "High-risk profile suggests need for enhanced coverage options",
+                    "confidence": "Medium - Based on risk profile",
+                }
+            )
+    return decisions
+
+
+def test_rules_match_legacy_heuristics():
+    """Test that the configured rules reproduce the original heuristics."""
+    deals = list(SyntheticDealRepository(2000, seed=7).iter_deals())
+    deals.append(MockDealRepository().get_deal("DEAL123"))
+    # Interleaved coverage requests keep the objection order
+    edge = MockDealRepository().get_deal("DEAL123")
+    edge["negotiation_context"]["objections"] = [
+        "Request for FLOOD coverage",
+        "Premium too high",
+        "Need additional coverage for business interruption",
+        "Flood and business interruption coverage",
+    ]
+    deals.append(edge)
+
+    models = [DealContext(**deal) for deal in deals]
+    expected = [legacy_evaluate_heuristics(model) for model in models]
+
+    assert evaluate_heuristics_batch(deals) == expected
+    assert evaluate_heuristics_batch(models) == expected
+    features = [extract_deal_features(deal) for deal in deals]
+    assert evaluate_heuristics_batch(deals, features) == expected
+    assert [evaluate_heuristics(model) for model in models[-2:]] == expected[-2:]
+    assert sum(map(len, expected)) > 0
+
+
+def test_batch_results_are_independent():
+    """Test that decision records are not shared between deals."""
+    deal = MockDealRepository().get_deal("DEAL123")
+    first, second = evaluate_heuristics_batch([deal, deal])
+    assert first == second
+    first[0]["confidence"] = "changed"
+    assert second[0]["confidence"] != "changed"
+
+
+def test_overlapping_terms():
+    """Test terms that share a start position or overlap."""
+    decision = {"heuristic": "h", "justification": "j", "confidence": "c"}
+    rules = [
+        HeuristicRule(name=name, require={"risk_profile": term}, decision=decision)
+        for name, term in [
+            ("flood", "flood"),
+            ("flood_zone", "flood zone"),
+            ("zone", "ZONE"),
+            ("missing", "quake"),
+        ]
+    ]
+    engine = RuleEngine(rules)
+    deal = {"submission": {"risk_profile": "Plant in flood zone"}}
+    assert len(engine.evaluate(deal)) == 3
+
+    # Lowercasing that changes the text length falls back to per-item lowering
+    deal = {"submission": {"risk_profile": "İstanbul plant in FLOOD zone"}}
+    assert len(engine.evaluate(deal)) == 3
+
+
+def test_rules_match_feature_texts():
+    """Test that deals with features are matched on their normalized texts."""
+    decision = {"heuristic": "h", "justification": "j", "confidence": "c"}
+    engine = RuleEngine(
+        [
+            HeuristicRule(
+                name="flood_offer",
+                require={"offers": "flood zone", "line_of_business": "property"},
+                decision=decision,
+            )
+        ]
+    )
+    deal = {
+        "submission": {"line_of_business": "Commercial Property"},
+        "negotiation_context": {"offers": ["Exclude the FLOOD zone"]},
+    }
+    features = extract_deal_features(deal)
+    assert features.field_texts("offers") == ["exclude the flood zone"]
+    assert engine.evaluate(deal, features) == [decision]
+
+    other = features.model_copy(update={"offer_texts": ["no exclusions"]})
+    assert engine.evaluate(deal, other) == []
+    # Features extracted without the field fall back to the deal
+    legacy = other.model_copy(update={"offer_texts": None})
+    assert engine.evaluate_batch([deal, deal], [legacy, other]) == [[decision], []]
+
+
+def test_invalid_rules():
+    """Test that malformed rules are rejected when compiled."""
+    decision = {"heuristic": "h", "justification": "j", "confidence": "c"}
+    with pytest.raises(ValueError):
+        RuleEngine(
+            [HeuristicRule(name="r", require={"color": "red"}, decision=decision)]
+        )
+    with pytest.raises(ValueError):
+        RuleEngine([HeuristicRule(name="r", require={"offers": "x"})])
@@ -0,0 +1,62 @@
+import csv
+
+import pytest
+
+from agents.offer_negotiation.agent import build_agent, invoke_agent
+from agents.offer_negotiation.core.repositories.mock_deal_repository import (
+    MockDealRepository,
+)
+from agents.offer_negotiation.core.repositories.synthetic_deal_repository import (
+    SyntheticDealRepository,
+)
+from agents.offer_negotiation.screening import main, screen_portfolio
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+
+
+def test_screening_matches_agent_runs():
+    """Test that screening finds the heuristics and needs of full agent runs."""
+    repo = MockDealRepository()
+    table, stats = screen_portfolio(repo, workers=1)
+    assert stats.deals == len(table) == len(repo.list_deal_ids())
+
+    agent_graph = build_agent(deal_repo=repo, llm=FakeChatModel(), node_wrappers=[])
+    for deal_id, heuristics, needs in table.rows():
+        result = invoke_agent(agent_graph, deal_id)
+        assert heuristics == [d["heuristic"] for d in result["decision_basis"]]
+        assert needs == result["information_needs"]
+
+
+def test_multiprocess_screening_preserves_order():
+    """Test that chunks screened by worker processes are reassembled in order."""
+    repo = SyntheticDealRepository(120, seed=5)
+    serial, _ = screen_portfolio(repo, workers=1, chunk_size=50)
+    parallel, stats = screen_portfolio(repo, workers=2, chunk_size=50)
+
+    assert stats.chunks == 3
+    assert stats.workers == 2
+    assert parallel == serial
+    assert parallel.deal_ids == repo.list_deal_ids()
+
+
+def test_screening_table_output(tmp_path):
+    """Test filtering, counting and writing the screening table."""
+    output = tmp_path / "screen.csv"
+    heuristic = "Premium Objection → Deductible Trade"
+    table = main(
+        ["--deals", "200", "--workers", "1", "--heuristic", heuristic]
+        + ["--output", str(output)]
+    )
+
+    assert table.deal_ids
+    assert all(heuristic in heuristics for heuristics in table.heuristics)
+    assert table.heuristic_counts()[heuristic] == len(table)
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["deal_id"] for row in rows] == table.deal_ids
+    assert heuristic in rows[0]["heuristics"]
+
+
+def test_screening_rejects_invalid_chunk_size():
+    """Test that chunk sizes must be positive."""
+    with pytest.raises(ValueError):
+        screen_portfolio(MockDealRepository(), chunk_size=0)
@@ -0,0 +1,82 @@
+from agents.offer_negotiation.agent import build_agent, invoke_agent
+from agents.offer_negotiation.graph.state import (
+    DealContextState,
+    InformationNeedsState,
+)
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+from agents.offer_negotiation.utils.state_usage import (
+    StatePruner,
+    StateUsageTracker,
+)
+
+
+def run(node_wrappers, deal_ids=("DEAL123", "DEAL001")):
+    agent_graph = build_agent(
+        llm=FakeChatModel(),
+        node_wrappers=node_wrappers,
+        checkpointer=False,
+        strategy_index=False,
+    )
+    return [invoke_agent(agent_graph, deal_id) for deal_id in deal_ids]
+
+
+def test_report_finds_dead_writes():
+    """Test that the fetched domain knowledge is reported as overwritten unread."""
+    tracker = StateUsageTracker()
+    run([tracker])
+    report = tracker.report()
+
+    assert report.runs == 2
+    fetch = report.nodes["fetch_domain_knowledge"]
+    assert fetch.runs == 2
+    assert fetch.writes["domain_knowledge"].overwritten_unread == 2
+    assert fetch.dead
+
+    collect = report.nodes["collect_domain_knowledge"]
+    assert collect.reads == [
+        "information_needs",
+        "past_strategies",
+        "retrieved_knowledge",
+    ]
+    assert collect.writes["domain_knowledge"].consumed == 2
+    assert not report.nodes["retrieve_domain_knowledge"].dead
+    assert {"used_deal_fields", "used_domain_chunks"} <= set(report.unpopulated_fields)
+    assert report.pruning_settings()["skip_nodes"] == ["fetch_domain_knowledge"]
+
+
+def test_never_consumed_outside_graph():
+    """Test the classification of node calls made outside a graph."""
+    tracker = StateUsageTracker(result_fields=[])
+
+    def identify(state: DealContextState) -> InformationNeedsState:
+        return InformationNeedsState(
+            deal_id=state.deal_id,
+            deal_context=state.deal_context,
+            information_needs=["submission.risk_profile"],
+        )
+
+    tracker("identify", identify)(DealContextState(deal_id="D", deal_context={}))
+    usage = tracker.report().nodes["identify"]
+    assert usage.reads == ["deal_context", "deal_id"]
+    assert usage.writes["information_needs"].never_consumed == 1
+
+
+def test_pruning_keeps_results():
+    """Test that the pruned graph returns the same results."""
+    tracker = StateUsageTracker()
+    pruner = StatePruner(skip_nodes=["fetch_domain_knowledge"])
+
+    assert run([pruner, tracker]) == run([])
+    assert tracker.report().nodes["fetch_domain_knowledge"].writes == {}
+
+
+def test_pruner_drops_fields():
+    """Test that dropped fields are left as received."""
+    pruner = StatePruner(drop_fields={"identify": ["information_needs"]})
+    state = DealContextState(deal_id="D")
+
+    def identify(state: DealContextState) -> InformationNeedsState:
+        return InformationNeedsState(deal_id=state.deal_id, information_needs=["x"])
+
+    assert pruner("identify", identify)(state).information_needs == []
+    assert pruner("other", identify)(state).information_needs == ["x"]
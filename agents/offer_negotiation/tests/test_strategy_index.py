@@ -0,0 +1,87 @@
+from agents.offer_negotiation.agent import build_agent, invoke_agent
+from agents.offer_negotiation.core.repositories.result_store import ResultStore
+from agents.offer_negotiation.knowledge.strategy_index import StrategyIndex
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+
+
+def _result(deal_id, objections, line_of_business="Commercial Property"):
+    return {
+        "deal_id": deal_id,
+        "deal_context": {
+            "submission": {"line_of_business": line_of_business},
+            "negotiation_context": {"objections": objections},
+        },
+        "strategy": f"Strategy for {deal_id}",
+        "rationale": f"Rationale for {deal_id}",
+    }
+
+
+def test_search_ranks_similar_objections_with_filters(tmp_path):
+    """Test ranking, filters and incremental ingestion of stored results."""
+    path = tmp_path / "results.sqlite"
+    store = ResultStore(path)
+    store.append(_result("FLOOD", ["Flood coverage is missing"]))
+    store.flush()
+    # Results stored before the index existed are indexed when it is opened
+    index = StrategyIndex(path)
+
+    store.append(_result("PREMIUM", ["Premium too high", "Quarterly payments"]))
+    store.append(_result("RETAIL", ["Premium too high"], "Retail"))
+    store.append(_result("DEDUCTIBLE", ["Deductible increase not acceptable"]))
+    store.append(_result("NO_STRATEGY", ["Premium too high"]) | {"strategy": None})
+    store.flush()
+
+    found = index.search("premium is too high and payments are monthly", limit=5)
+    assert [past.deal_id for past in found] == ["PREMIUM", "RETAIL"]
+    assert found[0].objections == ["Premium too high", "Quarterly payments"]
+    assert found[0].strategy == "Strategy for PREMIUM"
+    assert index.search("flood")[0].deal_id == "FLOOD"
+
+    assert [
+        past.deal_id
+        for past in index.search("premium", line_of_business="Commercial Property")
+    ] == ["PREMIUM"]
+    assert index.search("premium", exclude_deal_id="PREMIUM")[0].deal_id == "RETAIL"
+    assert index.search("premium", outcomes=["accepted"]) == []
+    index.record_outcome("RETAIL", "accepted")
+    assert [p.deal_id for p in index.search("premium", outcomes=["accepted"])] == [
+        "RETAIL"
+    ]
+
+    # One result per deal, the latest of equally similar runs
+    store.append(_result("PREMIUM", ["Premium too high", "Quarterly payments"]))
+    store.flush()
+    latest = index.search("premium payments", limit=5)
+    assert [past.deal_id for past in latest] == ["PREMIUM", "RETAIL"]
+    assert latest[0].result_id == store.latest("PREMIUM").id
+
+    chunk = latest[0].to_chunk(max_chars=8)
+    assert chunk.chunk_id == f"past_strategy_{latest[0].result_id}"
+    assert chunk.text.endswith("\nStrategy...")
+    assert chunk.metadata["document_type"] == "past_strategy"
+    index.close()
+    store.close()
+
+
+def test_past_strategies_are_added_to_the_domain_knowledge(tmp_path):
+    """Test that the graph retrieves past strategies of similar deals."""
+    path = tmp_path / "results.sqlite"
+    store = ResultStore(path)
+    store.append(_result("DEAL999", ["Premium too high compared to market"]))
+    store.append(_result("DEAL123", ["Premium too high compared to market"]))
+    store.close()
+    index = StrategyIndex(path)
+
+    agent_graph = build_agent(
+        llm=FakeChatModel(), checkpointer=False, strategy_index=index
+    )
+    result = invoke_agent(agent_graph, "DEAL123")
+
+    past = [
+        chunk
+        for chunk in result["domain_knowledge"]
+        if chunk["metadata"].get("document_type") == "past_strategy"
+    ]
+    assert [chunk["metadata"]["deal_id"] for chunk in past] == ["DEAL999"]
+    assert "Strategy for DEAL999" in past[0]["text"]
+    index.close()
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents.offer_negotiation.core.models.strategy_models import StructuredStrategy
+from agents.offer_negotiation.core.repositories.mock_deal_repository import (
+    MockDealRepository,
+)
+from agents.offer_negotiation.graph.nodes.explain_rationale_node import (
+    create_explain_rationale_node,
+)
+from agents.offer_negotiation.graph.nodes.generate_strategy_node import (
+    create_generate_strategy_node,
+)
+from agents.offer_negotiation.graph.nodes.identify_information_needs_node import (
+    create_identify_information_needs_node,
+)
+from agents.offer_negotiation.graph.nodes.retrieve_domain_knowledge_node import (
+    create_retrieve_domain_knowledge_node,
+)
+from agents.offer_negotiation.graph.state import DealContextState
+from agents.offer_negotiation.knowledge.domain_knowledge_base import DomainKnowledgeBase
+from agents.offer_negotiation.utils.agent_settings import StructuredOutputSettings
+from agents.offer_negotiation.utils.structured_output import (
+    StructuredOutputError,
+    invoke_structured,
+    parse_structured,
+)
+
+VALID = {
+    "sections": [{"title": "Strategy", "content": "Trade deductible for premium"}],
+    "rationale": "The client accepted deductible trades before.",
+    "cited_chunk_ids": ["sample_1", "unknown_chunk"],
+}
+
+
+class ScriptedModel:
+    """Returns the scripted responses in order and records the prompts."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def invoke(self, messages):
+        self.prompts.append(list(messages))
+        return AIMessage(content=self.responses.pop(0))
+
+
+def test_parse_structured_ignores_fences_and_prose():
+    """Test that the JSON object is found inside fences and prose."""
+    text = f"Here is the strategy:\n```json\n{json.dumps(VALID)}\n```\nThanks"
+    parsed = parse_structured(text, StructuredStrategy)
+    assert parsed.rationale == VALID["rationale"]
+    assert parsed.format_strategy() == "Strategy:\nTrade deductible for premium"
+
+    with pytest.raises(ValueError):
+        parse_structured('{"sections": [], "rationale": "x"}', StructuredStrategy)
+
+
+def test_invalid_response_is_repaired():
+    """Test that an invalid response is sent back with its error."""
+    model = ScriptedModel("Lower the premium.", json.dumps(VALID))
+    parsed, response, repairs = invoke_structured(
+        model.invoke, [HumanMessage(content="Negotiate")], StructuredStrategy
+    )
+
+    assert repairs == 1
+    assert parsed.cited_chunk_ids == VALID["cited_chunk_ids"]
+    repair_prompt = model.prompts[1]
+    assert repair_prompt[1].content == "Lower the premium."
+    assert "could not be parsed" in repair_prompt[2].content
+
+    model = ScriptedModel("Lower the premium.", "Still prose.")
+    with pytest.raises(StructuredOutputError):
+        invoke_structured(
+            model.invoke, [HumanMessage(content="Negotiate")], StructuredStrategy
+        )
+
+
+def test_structured_strategy_gives_rationale_and_citations_in_one_call():
+    """Test that one LLM call yields the strategy, rationale and citations."""
+    deal = MockDealRepository().get_deal_context("DEAL123")
+    state = DealContextState(deal_id="DEAL123", deal_context=deal.model_dump())
+    state = create_identify_information_needs_node()(state)
+    state = create_retrieve_domain_knowledge_node(DomainKnowledgeBase())(state)
+    chunk_id = state.domain_knowledge[0].chunk_id
+
+    llm = ScriptedModel(json.dumps({**VALID, "cited_chunk_ids": [chunk_id]}))
+    node = create_generate_strategy_node(
+        llm, structured_output=StructuredOutputSettings(enabled=True)
+    )
+    state = node(state)
+
+    assert len(llm.prompts) == 1
+    assert f"[{chunk_id}]" in llm.prompts[0][-1].content
+    assert state.strategy == "Strategy:\nTrade deductible for premium"
+    assert [c["chunk_id"] for c in state.used_domain_chunks] == [chunk_id]
+
+    result = create_explain_rationale_node()(state)
+    assert VALID["rationale"] in result.rationale
+    assert f"- {chunk_id}" in result.rationale
+    assert state.strategy not in result.rationale
@@ -0,0 +1,44 @@
+import pytest
+
+from agents.offer_negotiation.core.models.deal_models import DealContext
+from agents.offer_negotiation.core.repositories.synthetic_deal_repository import (
+    SyntheticDealRepository,
+)
+
+
+def test_synthetic_deals_are_valid_and_deterministic():
+    """Test that synthetic deals validate and are stable for a given seed."""
+    repo = SyntheticDealRepository(deal_count=50, seed=7)
+    deal_ids = repo.list_deal_ids()
+    assert len(deal_ids) == 50
+
+    contexts = [repo.get_deal_context(deal_id) for deal_id in deal_ids]
+    assert all(isinstance(context, DealContext) for context in contexts)
+    assert repo.get_deal(deal_ids[3]) == SyntheticDealRepository(50, 7).get_deal(
+        deal_ids[3]
+    )
+    assert repo.get_deal(deal_ids[3]) != SyntheticDealRepository(50, 8).get_deal(
+        deal_ids[3]
+    )
+
+
+def test_synthetic_deals_vary_in_shape():
+    """Test that objection counts, notes and comparables vary across deals."""
+    deals = list(SyntheticDealRepository(deal_count=200).iter_deals())
+    objection_counts = {len(d["negotiation_context"]["objections"]) for d in deals}
+    comparable_counts = {len(d["comparable_deals"]) for d in deals}
+    note_lengths = {
+        sum(len(n) for n in d["negotiation_context"]["discussion_notes"]) for d in deals
+    }
+    assert len(objection_counts) > 3
+    assert len(comparable_counts) > 3
+    assert len(note_lengths) > 50
+
+
+def test_synthetic_repository_unknown_deal():
+    """Test that unknown deal IDs raise KeyError like MockDealRepository."""
+    repo = SyntheticDealRepository(deal_count=10)
+    with pytest.raises(KeyError):
+        repo.get_deal("SYN0000010")
+    with pytest.raises(KeyError):
+        repo.get_deal("DEAL123")
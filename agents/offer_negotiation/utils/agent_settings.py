@@ -0,0 +1,153 @@
+"""Agent runtime settings loaded from agent_settings.yaml."""
+
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from agents.offer_negotiation.core.rules.rule_engine import HeuristicRule
+from config.app_config import config
+
+
+class HedgingSettings(BaseModel):
+    """Settings of hedged LLM requests."""
+
+    enabled: bool = False
+    percentile: float = 0.95
+    min_samples: int = 20
+    initial_delay: Optional[float] = None
+    max_hedges: int = 1
+    window: int = 200
+
+
+class OfferAnalyticsSettings(BaseModel):
+    """Settings of the offer trajectory analytics fed to the strategy prompt."""
+
+    enabled: bool = True
+    max_deals: Optional[int] = 10_000
+
+
+class PromptSettings(BaseModel):
+    """Settings of the prompt registry (see utils/prompt_loader.py)."""
+
+    hot_reload: bool = True
+    check_interval: float = 2.0
+
+
+class StructuredOutputSettings(BaseModel):
+    """Settings of the structured (JSON) strategy generation."""
+
+    enabled: bool = False
+    max_repairs: int = Field(default=1, ge=0)
+
+
+class NodeCacheSettings(BaseModel):
+    """Settings of the memoization of deterministic nodes."""
+
+    enabled: bool = False
+    nodes: List[str] = Field(default_factory=list)
+    max_entries: int = 1024
+    disk_path: Optional[str] = None
+    max_disk_entries: int = 100_000
+
+
+class StatePruningSettings(BaseModel):
+    """Dead graph work skipped, as reported by utils/state_usage.py."""
+
+    enabled: bool = False
+    skip_nodes: List[str] = Field(default_factory=list)
+    drop_fields: Dict[str, List[str]] = Field(default_factory=dict)
+
+
+class CheckpointSettings(BaseModel):
+    """Settings of the persistence of graph checkpoints."""
+
+    enabled: bool = False
+    path: str = "logs/checkpoints.sqlite"
+
+
+class ResultStoreSettings(BaseModel):
+    """Settings of the store of agent results."""
+
+    enabled: bool = False
+    path: str = "logs/results.sqlite"
+
+
+class StrategyIndexSettings(BaseModel):
+    """Settings of the retrieval of past strategies from the result store."""
+
+    enabled: bool = False
+    max_results: int = Field(default=3, ge=0)
+    max_candidates: int = Field(default=500, ge=1)
+    max_chars: int = Field(default=1200, ge=1)
+    same_line_of_business: bool = True
+    outcomes: Optional[List[str]] = None
+
+
+class MessageBusSettings(BaseModel):
+    """Settings of the deal event bus (see interfaces/message_bus.py)."""
+
+    capacity: int = Field(default=1000, ge=1)
+    max_attempts: int = Field(default=3, ge=1)
+    concurrency: int = Field(default=4, ge=1)
+    handler_timeout: Optional[float] = None
+
+
+class WorkQueueSettings(BaseModel):
+    """Settings of the work queue of batch runs (see batch.py)."""
+
+    path: str = "logs/work_queue.sqlite"
+    journal_mode: str = "WAL"
+    shards: int = Field(default=1024, ge=1)
+    lease_seconds: float = Field(default=120.0, gt=0)
+    max_attempts: int = Field(default=3, ge=1)
+    claim_size: int = Field(default=10, ge=1)
+    poll_interval: float = Field(default=5.0, gt=0)
+
+
+class CockpitSettings(BaseModel):
+    """Settings of the live run cockpit (see interfaces/cockpit_ui.py)."""
+
+    enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 8800
+    max_queued_events: int = Field(default=1000, ge=1)
+    window_seconds: float = Field(default=300.0, gt=0)
+    stuck_after: float = Field(default=120.0, gt=0)
+    stats_interval: float = Field(default=1.0, gt=0)
+
+
+class AgentSettings(BaseModel):
+    """Runtime settings of the agent."""
+
+    node_timeouts: Dict[str, float] = Field(default_factory=dict)
+    hedging: HedgingSettings = Field(default_factory=HedgingSettings)
+    heuristic_rules: List[HeuristicRule] = Field(default_factory=list)
+    offer_analytics: OfferAnalyticsSettings = Field(
+        default_factory=OfferAnalyticsSettings
+    )
+    prompts: PromptSettings = Field(default_factory=PromptSettings)
+    structured_output: StructuredOutputSettings = Field(
+        default_factory=StructuredOutputSettings
+    )
+    node_cache: NodeCacheSettings = Field(default_factory=NodeCacheSettings)
+    checkpointing: CheckpointSettings = Field(default_factory=CheckpointSettings)
+    result_store: ResultStoreSettings = Field(default_factory=ResultStoreSettings)
+    strategy_index: StrategyIndexSettings = Field(default_factory=StrategyIndexSettings)
+    message_bus: MessageBusSettings = Field(default_factory=MessageBusSettings)
+    work_queue: WorkQueueSettings = Field(default_factory=WorkQueueSettings)
+    cockpit: CockpitSettings = Field(default_factory=CockpitSettings)
+    state_pruning: StatePruningSettings = Field(default_factory=StatePruningSettings)
+
+
+def load_agent_settings() -> AgentSettings:
+    """Load agent settings from the agent_settings.yaml file.
+
+    Returns:
+        Agent settings; defaults for an empty or missing file
+    """
+    import yaml
+
+    if not config.agent_settings_path.exists():
+        return AgentSettings()
+    with open(config.agent_settings_path, "r") as f:
+        return AgentSettings(**(yaml.safe_load(f) or {}))
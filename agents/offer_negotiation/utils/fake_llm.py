@@ -0,0 +1,159 @@
+"""Deterministic fake chat model for offline runs, tests and benchmarks."""
+
+import json
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+DEFAULT_STRATEGY_RESPONSE = """Deal Context Summary:
+- Deal ID: see deal context
+- Risk Profile: as submitted
+
+Key Objections:
+1. Premium level
+2. Deductible terms
+
+Domain Rules Used:
+1. Premium Objection → Deductible Trade
+   - Confidence: High
+
+Strategy:
+1. Premium Adjustment
+   - Proposed: 5% premium reduction
+2. Deductible Trade-off
+   - Proposed: Increase deductible to offset the premium reduction
+
+Rationale:
+- Supported by client history and comparable deal outcomes
+
+Expected Outcome:
+- Client accepts adjusted premium and deductible terms"""
+
+# Response of structured strategy generation (see StructuredStrategy)
+DEFAULT_STRUCTURED_STRATEGY_RESPONSE = json.dumps(
+    {
+        "sections": [
+            {
+                "title": "Strategy",
+                "content": "1. Premium Adjustment\n   - Proposed: 5% premium reduction\n"
+                "2. Deductible Trade-off\n"
+                "   - Proposed: Increase deductible to offset the premium reduction",
+            },
+            {
+                "title": "Expected Outcome",
+                "content": "- Client accepts adjusted premium and deductible terms",
+            },
+        ],
+        "rationale": "The premium objection is met with a deductible trade, which "
+        "the client accepted in prior negotiations and comparable deals closed on.",
+        "cited_chunk_ids": ["sample_1"],
+    },
+    indent=2,
+)
+
+
+def count_tokens(text: str) -> int:
+    """Approximate the token count of a text by whitespace splitting."""
+    return len(text.split())
+
+
+def _common_prefix(left: List[str], right: List[str]) -> int:
+    length = 0
+    for a, b in zip(left, right):
+        if a != b:
+            break
+        length += 1
+    return length
+
+
+class FakeLLMError(RuntimeError):
+    """Simulated failure raised by the fake chat model."""
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that returns a fixed response after a configurable latency.
+
+    The latency is ``latency_seconds`` scaled by a log-normal factor with
+    standard deviation ``latency_sigma`` (0 disables the jitter), and a fraction
+    ``error_rate`` of the calls fails with FakeLLMError.
+
+    With ``prefix_cache``, the usage metadata reports as cached the longest
+    token prefix the prompt shares with one of the recent prompts, like the
+    prompt caches of LLM providers.
+    """
+
+    response: str = DEFAULT_STRATEGY_RESPONSE
+    latency_seconds: float = 0.0
+    latency_sigma: float = 0.0
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+    prefix_cache: bool = False
+    prefix_cache_size: int = 64
+
+    _rng: random.Random = PrivateAttr(default=None)
+    _prompts: Deque[List[str]] = PrivateAttr(default=None)
+    _prompts_lock: threading.Lock = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        self._prompts = deque(maxlen=self.prefix_cache_size)
+        self._prompts_lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def sample_latency(self) -> float:
+        """Sample the latency of a single call, in seconds."""
+        if self.latency_sigma > 0:
+            return self.latency_seconds * self._rng.lognormvariate(
+                0.0, self.latency_sigma
+            )
+        return self.latency_seconds
+
+    def cached_tokens(self, messages: List[BaseMessage]) -> int:
+        """Return the prompt tokens served from the simulated prefix cache."""
+        tokens = [
+            token
+            for message in messages
+            for token in [f"<{message.type}>", *str(message.content).split()]
+        ]
+        with self._prompts_lock:
+            cached = max(
+                (_common_prefix(tokens, seen) for seen in self._prompts), default=0
+            )
+            self._prompts.append(tokens)
+        # Role markers are not counted as tokens (see count_tokens)
+        return cached - sum(1 for token in tokens[:cached] if token.startswith("<"))
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        latency = self.sample_latency()
+        if latency > 0:
+            time.sleep(latency)
+        if self.error_rate > 0 and self._rng.random() < self.error_rate:
+            raise FakeLLMError("Simulated LLM failure")
+
+        input_tokens = sum(count_tokens(str(m.content)) for m in messages)
+        output_tokens = count_tokens(self.response)
+        usage = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        if self.prefix_cache:
+            usage["input_token_details"] = {"cache_read": self.cached_tokens(messages)}
+        message = AIMessage(content=self.response, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
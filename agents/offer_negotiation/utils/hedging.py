@@ -0,0 +1,246 @@
+"""Hedged LLM requests.
+
+``HedgedChatModel`` wraps a chat model: when a call is slower than a
+percentile of the recent call latencies, an identical call is sent and the
+first response wins. Calls wait at most until the deadline of the running
+node (see ``timeouts.py``).
+
+On the async path the losing task is cancelled and awaited, which also
+closes its HTTP request. The sync path runs calls in worker threads, which
+cannot be interrupted: a losing call is cancelled if it has not started yet
+and otherwise abandoned, keeping its connection and concurrency slot until
+its response arrives, which is then discarded. Use ``ainvoke`` where
+abandoned calls are too costly.
+
+The latency window records the time each call took from its first attempt,
+whichever attempt won. A won hedge thus counts as at least the hedge delay,
+so hedges do not pull the percentile, and with it the delay, down.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Deque, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import BaseModel, PrivateAttr
+
+from agents.offer_negotiation.utils.timeouts import NodeTimeoutError, current_deadline
+
+logger = logging.getLogger(__name__)
+
+
+class HedgeStats(BaseModel):
+    """Counters of hedged LLM requests."""
+
+    calls: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    timeouts: int = 0
+    cancelled: int = 0
+    abandoned: int = 0
+
+    @property
+    def hedge_rate(self) -> float:
+        """Fraction of calls that sent a hedge request."""
+        return self.hedged / self.calls if self.calls else 0.0
+
+
+class HedgedChatModel(BaseChatModel):
+    """Chat model sending a hedge request when a call is slow.
+
+    Hedging starts once ``min_samples`` latencies have been observed, with the
+    ``percentile`` of the last ``window`` latencies as delay, or immediately
+    with ``initial_delay`` if set. ``max_hedges=0`` only enforces deadlines.
+    """
+
+    inner: BaseChatModel
+    percentile: float = 0.95
+    min_samples: int = 20
+    initial_delay: Optional[float] = None
+    max_hedges: int = 1
+    window: int = 200
+    max_workers: int = 32
+
+    _latencies: Deque[float] = PrivateAttr(default=None)
+    _stats: HedgeStats = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default=None)
+    _executor: Optional[ThreadPoolExecutor] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._latencies = deque(maxlen=self.window)
+        self._stats = HedgeStats()
+        self._lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "hedged"
+
+    @property
+    def stats(self) -> HedgeStats:
+        """Return a snapshot of the hedging counters."""
+        with self._lock:
+            return self._stats.model_copy()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Return the delay before a hedge request, or None to not hedge."""
+        if self.max_hedges <= 0:
+            return None
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self.min_samples:
+            return self.initial_delay
+        index = min(len(latencies) - 1, int(self.percentile * len(latencies)))
+        return latencies[index]
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for field, value in increments.items():
+                setattr(self._stats, field, getattr(self._stats, field) + value)
+
+    def _record_win(self, latency: float, hedge: bool) -> None:
+        """Record the latency of a call, from the start of its first attempt."""
+        with self._lock:
+            self._latencies.append(latency)
+            if hedge:
+                self._stats.hedge_wins += 1
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="llm-hedge"
+                )
+            return self._executor
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self._count(calls=1)
+        deadline = current_deadline()
+        delay = self.hedge_delay()
+        executor = self._get_executor()
+
+        def call() -> BaseMessage:
+            return self.inner.invoke(messages, stop=stop, **kwargs)
+
+        attempts: List[Future] = [executor.submit(call)]
+        first_start = last_start = time.monotonic()
+        pending = set(attempts)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                now = time.monotonic()
+                timeout = None
+                can_hedge = delay is not None and len(attempts) <= self.max_hedges
+                if can_hedge:
+                    timeout = max(0.0, last_start + delay - now)
+                if deadline is not None:
+                    remaining = max(0.0, deadline - now)
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+
+                done, pending = wait(
+                    pending, timeout=timeout, return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                        continue
+                    self._record_win(
+                        time.monotonic() - first_start, future is not attempts[0]
+                    )
+                    return _to_result(future.result())
+
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    self._count(timeouts=1)
+                    raise NodeTimeoutError("LLM call exceeded the node time budget")
+                if pending and can_hedge and now >= last_start + delay:
+                    logger.info(f"LLM call slower than {delay:.2f}s, sending hedge")
+                    self._count(hedged=1)
+                    hedge = executor.submit(call)
+                    attempts.append(hedge)
+                    pending.add(hedge)
+                    last_start = now
+            raise error
+        finally:
+            for future in pending:
+                if future.cancel():
+                    self._count(cancelled=1)
+                else:
+                    self._count(abandoned=1)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self._count(calls=1)
+        deadline = current_deadline()
+        delay = self.hedge_delay()
+
+        async def call() -> BaseMessage:
+            return await self.inner.ainvoke(messages, stop=stop, **kwargs)
+
+        attempts = [asyncio.ensure_future(call())]
+        first_start = last_start = time.monotonic()
+        pending = set(attempts)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                now = time.monotonic()
+                timeout = None
+                can_hedge = delay is not None and len(attempts) <= self.max_hedges
+                if can_hedge:
+                    timeout = max(0.0, last_start + delay - now)
+                if deadline is not None:
+                    remaining = max(0.0, deadline - now)
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    self._record_win(
+                        time.monotonic() - first_start, task is not attempts[0]
+                    )
+                    return _to_result(task.result())
+
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    self._count(timeouts=1)
+                    raise NodeTimeoutError("LLM call exceeded the node time budget")
+                if pending and can_hedge and now >= last_start + delay:
+                    logger.info(f"LLM call slower than {delay:.2f}s, sending hedge")
+                    self._count(hedged=1)
+                    hedge = asyncio.ensure_future(call())
+                    attempts.append(hedge)
+                    pending.add(hedge)
+                    last_start = now
+            raise error
+        finally:
+            # Cancel the losing calls, including when the caller is cancelled
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                self._count(cancelled=len(pending))
+
+
+def _to_result(message: BaseMessage) -> ChatResult:
+    """Wrap the winning response of the inner model, unchanged, as a chat result."""
+    return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,187 @@
+"""Record/replay LLM backend for deterministic offline runs.
+
+In record mode every prompt/response pair of the wrapped chat model is saved
+to a JSON cassette file. In replay mode responses are served from the cassette
+without calling the model; a prompt missing from the cassette either raises
+CassetteMissError or falls back to the live model (and is recorded).
+
+The backend is selected with the ``backend`` section of model_settings.yaml or
+the ``LLM_BACKEND_MODE``, ``LLM_CASSETTE_PATH`` and ``LLM_CASSETTE_ON_MISS``
+environment variables.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+MISS_POLICIES = ("error", "fallback")
+
+
+class CassetteMissError(KeyError):
+    """Raised in replay mode when a prompt is not found in the cassette."""
+
+
+def serialize_messages(messages: List[BaseMessage]) -> List[Dict[str, Any]]:
+    """Convert chat messages into a JSON-serializable list."""
+    return [{"type": m.type, "content": m.content} for m in messages]
+
+
+def cassette_key(messages: List[BaseMessage], model_id: str) -> str:
+    """Return a stable key for a prompt sent to a model."""
+    payload = json.dumps(
+        {"model": model_id, "messages": serialize_messages(messages)},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """JSON file of recorded prompt/response pairs."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                self._interactions = json.load(f).get("interactions", {})
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the recorded interaction for a key, if any."""
+        return self._interactions.get(key)
+
+    def record(self, key: str, interaction: Dict[str, Any]) -> None:
+        """Record an interaction and persist the cassette."""
+        with self._lock:
+            self._interactions[key] = interaction
+            self.save()
+
+    def save(self) -> None:
+        """Write the cassette atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {"version": 1, "interactions": self._interactions},
+                f,
+                indent=2,
+                sort_keys=True,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, self.path)
+
+
+class CassetteChatModel(BaseChatModel):
+    """Chat model recording to or replaying from a cassette.
+
+    The wrapped model is created lazily through ``inner_factory`` so replay
+    runs never construct (or need credentials for) a live client.
+    """
+
+    cassette_path: str
+    mode: str = "replay"
+    on_miss: str = "error"
+    model_id: str = "default"
+
+    _cassette: Cassette = PrivateAttr(default=None)
+    _inner_factory: Optional[Callable[[], BaseChatModel]] = PrivateAttr(default=None)
+    _inner: Optional[BaseChatModel] = PrivateAttr(default=None)
+
+    def __init__(
+        self, inner_factory: Optional[Callable[[], BaseChatModel]] = None, **kwargs
+    ):
+        super().__init__(**kwargs)
+        if self.mode not in ("record", "replay"):
+            raise ValueError(f"Unsupported cassette mode: {self.mode}")
+        if self.on_miss not in MISS_POLICIES:
+            raise ValueError(f"Unsupported cassette miss policy: {self.on_miss}")
+        self._inner_factory = inner_factory
+        self._cassette = Cassette(Path(self.cassette_path))
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    @property
+    def cassette(self) -> Cassette:
+        return self._cassette
+
+    def _get_inner(self) -> BaseChatModel:
+        """Create the wrapped model on first use."""
+        if self._inner is None:
+            if self._inner_factory is None:
+                raise ValueError("No live model configured for the cassette backend")
+            self._inner = self._inner_factory()
+        return self._inner
+
+    def _call_and_record(self, key: str, messages: List[BaseMessage]) -> AIMessage:
+        """Call the wrapped model and record the response."""
+        response = self._get_inner().invoke(messages)
+        self._cassette.record(
+            key,
+            {
+                "model": self.model_id,
+                "messages": serialize_messages(messages),
+                "response": {
+                    "content": response.content,
+                    "usage_metadata": getattr(response, "usage_metadata", None),
+                },
+            },
+        )
+        return response
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = cassette_key(messages, self.model_id)
+
+        if self.mode == "record":
+            message = self._call_and_record(key, messages)
+        else:
+            interaction = self._cassette.get(key)
+            if interaction is not None:
+                response = interaction["response"]
+                message = AIMessage(
+                    content=response["content"],
+                    usage_metadata=response.get("usage_metadata"),
+                )
+            elif self.on_miss == "fallback":
+                logger.warning(f"Cassette miss for {key[:12]}, calling live model")
+                message = self._call_and_record(key, messages)
+            else:
+                raise CassetteMissError(
+                    f"No recorded response for prompt {key[:12]} in "
+                    f"{self._cassette.path}"
+                )
+
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(**_message_fields(message)))]
+        )
+
+
+def _message_fields(message: BaseMessage) -> Dict[str, Any]:
+    """Return the fields needed to rebuild a response as an AIMessage."""
+    fields = {"content": message.content}
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        fields["usage_metadata"] = usage
+    return fields
@@ -0,0 +1,604 @@
+"""Process-wide LLM client registry with rate limiting.
+
+All chat models created by ``get_llm()`` share a pooled keep-alive ``httpx``
+client and its async counterpart. Requests sent through either are limited by
+the same:
+
+- a request token bucket (``requests_per_minute``)
+- a token bucket for LLM tokens (``tokens_per_minute``), debited with an
+  estimate before the request and corrected with the reported usage
+- an adaptive concurrency limit, halved on 429 responses, reduced when the
+  latency rises above the baseline and increased additively otherwise
+
+Streamed (server-sent event) responses hold their concurrency slot until the
+stream is closed; other responses are read before the slot is released.
+Waiting for tokens or a slot is bounded by the deadline of the running node
+(see utils/timeouts.py) and raises NodeTimeoutError once it cannot be met.
+
+The registry is configured from the ``client_pool`` section of
+model_settings.yaml when it is first used; different settings passed later are
+ignored with a warning.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from pydantic import BaseModel
+
+from agents.offer_negotiation.utils.timeouts import (
+    NodeTimeoutError,
+    remaining_time,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ClientPoolSettings(BaseModel):
+    """Settings of the shared LLM client pool."""
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    timeout: float = 60.0
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    max_concurrency: int = 16
+    min_concurrency: int = 1
+    latency_threshold: float = 2.0
+
+
+class ClientPoolStats(BaseModel):
+    """Counters of the shared LLM client pool."""
+
+    requests: int = 0
+    throttled: int = 0
+    errors: int = 0
+    tokens: int = 0
+    concurrency_limit: float = 0.0
+    in_flight: int = 0
+
+
+def _check_wait(delay: float, waiting_for: str) -> None:
+    """Raise NodeTimeoutError if a wait would outlast the node deadline."""
+    remaining = remaining_time()
+    if remaining is not None and delay > remaining:
+        raise NodeTimeoutError(
+            f"Waiting for {waiting_for} would exceed the node time budget"
+        )
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at a rate per minute."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """Initialize the bucket.
+
+        Args:
+            rate_per_minute: Refill rate of the bucket
+            capacity: Burst size; defaults to one second worth of tokens, and
+                at least one token
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def _take(self, amount: float) -> float:
+        """Take tokens if available; otherwise return the time to wait."""
+        with self._lock:
+            self._refill()
+            needed = min(amount, self.capacity)
+            if self._tokens >= needed:
+                self._tokens -= amount
+                return 0.0
+            return (needed - self._tokens) / self.rate
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Take tokens from the bucket, waiting until they are available.
+
+        Amounts larger than the capacity are granted once the bucket is full
+        and leave it in debt, so large requests are delayed but not rejected.
+
+        Returns:
+            Time spent waiting, in seconds
+
+        Raises:
+            NodeTimeoutError: If the tokens are not available before the
+                deadline of the running node
+        """
+        waited = 0.0
+        delay = self._take(amount)
+        while delay > 0:
+            _check_wait(delay, "rate limit tokens")
+            time.sleep(delay)
+            waited += delay
+            delay = self._take(amount)
+        return waited
+
+    async def acquire_async(self, amount: float = 1.0) -> float:
+        """Take tokens from the bucket without blocking the event loop."""
+        waited = 0.0
+        delay = self._take(amount)
+        while delay > 0:
+            _check_wait(delay, "rate limit tokens")
+            await asyncio.sleep(delay)
+            waited += delay
+            delay = self._take(amount)
+        return waited
+
+    def adjust(self, amount: float) -> None:
+        """Debit (positive) or credit (negative) tokens without waiting."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Concurrency limit adapted with additive increase, multiplicative decrease.
+
+    The limit is halved on throttled responses and reduced by 10% when a
+    response is slower than ``latency_threshold`` times the baseline latency
+    (an exponential moving average); it grows by ``1 / limit`` per successful
+    response, i.e. by one per round of requests.
+    """
+
+    def __init__(
+        self,
+        max_limit: int = 16,
+        min_limit: int = 1,
+        latency_threshold: float = 2.0,
+        initial_limit: Optional[float] = None,
+    ):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.latency_threshold = latency_threshold
+        self.limit = float(initial_limit if initial_limit is not None else max_limit)
+        self.baseline_latency: Optional[float] = None
+        self.in_flight = 0
+        self._condition = threading.Condition()
+        # Event loops and futures of the coroutines waiting for a slot
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def _full(self) -> bool:
+        return self.in_flight >= max(self.min_limit, int(self.limit))
+
+    def acquire(self) -> None:
+        """Wait for a free concurrency slot, at most until the node deadline."""
+        with self._condition:
+            while self._full():
+                _check_wait(0.0, "a concurrency slot")
+                self._condition.wait(remaining_time())
+            self.in_flight += 1
+
+    async def acquire_async(self) -> None:
+        """Wait for a free concurrency slot without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if not self._full():
+                    self.in_flight += 1
+                    return
+                _check_wait(0.0, "a concurrency slot")
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await asyncio.wait_for(waiter, remaining_time())
+            except asyncio.TimeoutError:
+                # Checked again on the next iteration
+                pass
+            finally:
+                with self._condition:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+
+    def release(self, latency: float, throttled: bool = False) -> None:
+        """Release a slot and adapt the limit to the outcome of the request."""
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.min_limit, self.limit / 2)
+            elif (
+                self.baseline_latency is not None
+                and latency > self.latency_threshold * self.baseline_latency
+            ):
+                self.limit = max(self.min_limit, self.limit * 0.9)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+            if not throttled:
+                self.baseline_latency = (
+                    latency
+                    if self.baseline_latency is None
+                    else 0.9 * self.baseline_latency + 0.1 * latency
+                )
+            self._condition.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # The loop of the waiter is closed
+                pass
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def estimate_request_tokens(request: httpx.Request) -> int:
+    """Estimate the tokens used by a chat completion request.
+
+    Prompt tokens are approximated as four characters per token; the
+    completion is assumed to use its full ``max_tokens``.
+    """
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, UnicodeDecodeError):
+        return 0
+    if not isinstance(body, dict):
+        return 0
+    prompt_chars = sum(
+        len(str(message.get("content", "")))
+        for message in body.get("messages", [])
+        if isinstance(message, dict)
+    )
+    completion = body.get("max_completion_tokens") or body.get("max_tokens") or 0
+    return prompt_chars // 4 + int(completion)
+
+
+def response_total_tokens(response: httpx.Response) -> Optional[int]:
+    """Return the total tokens reported by a JSON response, if any."""
+    if "application/json" not in response.headers.get("content-type", ""):
+        return None
+    try:
+        usage = response.json().get("usage") or {}
+    except ValueError:
+        return None
+    return usage.get("total_tokens")
+
+
+def is_event_stream(response: httpx.Response) -> bool:
+    """Return whether a response is a stream of server-sent events."""
+    return response.headers.get("content-type", "").startswith("text/event-stream")
+
+
+class _Slot:
+    """Concurrency slot of a request, released once."""
+
+    def __init__(self, limiter: AdaptiveConcurrencyLimiter):
+        self.limiter = limiter
+        self.start = time.perf_counter()
+        self.throttled = False
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self.limiter.release(time.perf_counter() - self.start, self.throttled)
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response stream releasing the slot of its request once closed."""
+
+    def __init__(self, stream: httpx.SyncByteStream, slot: _Slot):
+        self._stream = stream
+        self._slot = slot
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._slot.release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    """Async response stream releasing the slot of its request once closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, slot: _Slot):
+        self._stream = stream
+        self._slot = slot
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._slot.release()
+
+
+class _RateLimits:
+    """Rate and concurrency limits of a pool, shared by its transports."""
+
+    def __init__(
+        self,
+        transport: Any,
+        limiter: AdaptiveConcurrencyLimiter,
+        request_bucket: Optional[TokenBucket] = None,
+        token_bucket: Optional[TokenBucket] = None,
+        stats: Optional[ClientPoolStats] = None,
+    ):
+        self.transport = transport
+        self.limiter = limiter
+        self.request_bucket = request_bucket
+        self.token_bucket = token_bucket
+        self.stats = stats or ClientPoolStats()
+        self._lock = threading.Lock()
+
+    def _count_error(self) -> None:
+        with self._lock:
+            self.stats.errors += 1
+
+    def _record(
+        self, response: httpx.Response, estimate: int, throttled: bool
+    ) -> httpx.Response:
+        """Correct the token bucket with the reported usage and count the request."""
+        total_tokens = None if throttled else response_total_tokens(response)
+        if self.token_bucket is not None and total_tokens is not None:
+            self.token_bucket.adjust(total_tokens - estimate)
+
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.throttled += int(throttled)
+            self.stats.tokens += total_tokens or 0
+        if throttled:
+            logger.warning(
+                f"LLM request throttled, concurrency limit now "
+                f"{self.limiter.limit:.1f}"
+            )
+        return response
+
+
+class RateLimitedTransport(_RateLimits, httpx.BaseTransport):
+    """HTTP transport applying the rate and concurrency limits of a pool."""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        estimate = estimate_request_tokens(request)
+        if self.request_bucket is not None:
+            self.request_bucket.acquire(1)
+        if self.token_bucket is not None and estimate:
+            self.token_bucket.acquire(estimate)
+
+        self.limiter.acquire()
+        slot = _Slot(self.limiter)
+        streaming = False
+        try:
+            response = self.transport.handle_request(request)
+            slot.throttled = response.status_code == 429
+            streaming = not slot.throttled and is_event_stream(response)
+            if streaming:
+                # Held until the caller has consumed and closed the stream
+                response.stream = _ReleasingStream(response.stream, slot)
+            elif not response.is_stream_consumed and not slot.throttled:
+                response.read()
+        except Exception:
+            self._count_error()
+            raise
+        finally:
+            if not streaming:
+                slot.release()
+        return self._record(response, estimate, slot.throttled)
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class RateLimitedAsyncTransport(_RateLimits, httpx.AsyncBaseTransport):
+    """Async HTTP transport applying the rate and concurrency limits of a pool.
+
+    Waiting for tokens or a concurrency slot suspends the coroutine rather
+    than blocking the event loop.
+    """
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        estimate = estimate_request_tokens(request)
+        if self.request_bucket is not None:
+            await self.request_bucket.acquire_async(1)
+        if self.token_bucket is not None and estimate:
+            await self.token_bucket.acquire_async(estimate)
+
+        await self.limiter.acquire_async()
+        slot = _Slot(self.limiter)
+        streaming = False
+        try:
+            response = await self.transport.handle_async_request(request)
+            slot.throttled = response.status_code == 429
+            streaming = not slot.throttled and is_event_stream(response)
+            if streaming:
+                response.stream = _AsyncReleasingStream(response.stream, slot)
+            elif not response.is_stream_consumed and not slot.throttled:
+                await response.aread()
+        except Exception:
+            self._count_error()
+            raise
+        finally:
+            if not streaming:
+                slot.release()
+        return self._record(response, estimate, slot.throttled)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class PerLoopAsyncTransport(httpx.AsyncBaseTransport):
+    """Async transport keeping one connection pool per event loop.
+
+    Pooled connections belong to the event loop that opened them, so a
+    process running several loops (e.g. successive ``asyncio.run`` calls)
+    gets a pool for each; a pool is dropped with its loop.
+    """
+
+    def __init__(self, factory: Callable[[], httpx.AsyncBaseTransport]):
+        self.factory = factory
+        self._transports: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _transport(self) -> httpx.AsyncBaseTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = self._transports[loop] = self.factory()
+            return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close the pool of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.pop(loop, None)
+        if transport is not None:
+            await transport.aclose()
+
+
+class LLMClientRegistry:
+    """Shares pooled HTTP connections and chat models across the process."""
+
+    def __init__(self, settings: Optional[ClientPoolSettings] = None):
+        self.settings = settings or ClientPoolSettings()
+        self.limiter = AdaptiveConcurrencyLimiter(
+            max_limit=self.settings.max_concurrency,
+            min_limit=self.settings.min_concurrency,
+            latency_threshold=self.settings.latency_threshold,
+        )
+        self._stats = ClientPoolStats()
+        limits = httpx.Limits(
+            max_connections=self.settings.max_connections,
+            max_keepalive_connections=self.settings.max_keepalive_connections,
+            keepalive_expiry=self.settings.keepalive_expiry,
+        )
+        # The sync and async clients draw from the same buckets and limiter
+        rate_limits = dict(
+            request_bucket=(
+                TokenBucket(self.settings.requests_per_minute)
+                if self.settings.requests_per_minute
+                else None
+            ),
+            token_bucket=(
+                TokenBucket(
+                    self.settings.tokens_per_minute,
+                    capacity=self.settings.tokens_per_minute / 60.0 * 10,
+                )
+                if self.settings.tokens_per_minute
+                else None
+            ),
+            stats=self._stats,
+        )
+        self._transport = RateLimitedTransport(
+            httpx.HTTPTransport(limits=limits), self.limiter, **rate_limits
+        )
+        self.http_client = httpx.Client(
+            transport=self._transport, timeout=self.settings.timeout
+        )
+        self._async_transport = RateLimitedAsyncTransport(
+            PerLoopAsyncTransport(lambda: httpx.AsyncHTTPTransport(limits=limits)),
+            self.limiter,
+            **rate_limits,
+        )
+        self.async_http_client = httpx.AsyncClient(
+            transport=self._async_transport, timeout=self.settings.timeout
+        )
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get_chat_model(self, key: Dict[str, Any], factory: Callable[[], Any]):
+        """Return the chat model for a configuration, creating it once.
+
+        Args:
+            key: JSON-serializable configuration identifying the model
+            factory: Callable creating the model on first use
+
+        Returns:
+            Shared chat model
+        """
+        cache_key = json.dumps(key, sort_keys=True, default=str)
+        with self._lock:
+            if cache_key not in self._models:
+                self._models[cache_key] = factory()
+            return self._models[cache_key]
+
+    def stats(self) -> ClientPoolStats:
+        """Return a snapshot of the pool counters."""
+        return self._stats.model_copy(
+            update={
+                "concurrency_limit": self.limiter.limit,
+                "in_flight": self.limiter.in_flight,
+            }
+        )
+
+    def close(self) -> None:
+        """Close the pooled connections.
+
+        Async connections are closed with their event loop, or by ``aclose``
+        from within it.
+        """
+        self.http_client.close()
+
+    async def aclose(self) -> None:
+        """Close the pooled connections, including those of the running loop."""
+        self.http_client.close()
+        await self._async_transport.aclose()
+
+
+_registry: Optional[LLMClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry(
+    settings: Optional[Dict[str, Any]] = None,
+) -> LLMClientRegistry:
+    """Return the process-wide client registry.
+
+    Args:
+        settings: ``client_pool`` settings, used when the registry is created;
+            settings differing from those of an existing registry are ignored
+            with a warning (see reset_client_registry)
+
+    Returns:
+        Shared LLM client registry
+    """
+    global _registry
+    pool_settings = ClientPoolSettings(**(settings or {}))
+    with _registry_lock:
+        if _registry is None:
+            _registry = LLMClientRegistry(pool_settings)
+        elif settings is not None and pool_settings != _registry.settings:
+            logger.warning(
+                f"Ignoring client_pool settings {pool_settings.model_dump()}: "
+                f"the client registry already uses {_registry.settings.model_dump()}"
+            )
+        return _registry
+
+
+def reset_client_registry() -> None:
+    """Close and discard the process-wide registry (e.g. after fork)."""
+    global _registry
+    with _registry_lock:
+        if _registry is not None:
+            _registry.close()
+        _registry = None
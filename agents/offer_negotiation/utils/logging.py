@@ -6,6 +6,7 @@ from config.app_config import config
 
 def setup_logging():
     """Configure logging for the application."""
+    config.log_file_path.parent.mkdir(parents=True, exist_ok=True)
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
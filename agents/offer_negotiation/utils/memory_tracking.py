@@ -0,0 +1,261 @@
+"""Per-node memory and allocation tracking for the offer negotiation agent.
+
+The tracker uses ``tracemalloc`` to record, for every node execution, the net
+allocated bytes, the peak above the node's starting point and the top
+allocation sites. It also records the retained (deep) size of the node's output
+state and of the knowledge base chunks. Records can be summarized across a
+batch of runs to spot memory regressions early.
+
+tracemalloc is process-wide, so tracked nodes share one tracing session,
+started by the first tracked node and stopped after the last one, and run one
+at a time: parallel branches of a run are serialized while tracking is on, so
+the peak and allocations of a node do not include those of other branches.
+
+Tracking is enabled with ``AGENT_MEMORY_TRACKING=true`` or
+``python run.py --memory``.
+"""
+
+import functools
+import logging
+import sys
+import threading
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel, Field
+
+from agents.offer_negotiation.utils.trace_metadata import (
+    add_memory_metadata,
+    create_trace_metadata,
+    get_state_value,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Tracing session shared by the tracked nodes of the process
+_session_lock = threading.Lock()
+_session_users = 0
+_session_started = False
+
+# Held by the tracked node being measured
+_measure_lock = threading.Lock()
+
+
+@contextmanager
+def tracing_session(frames: int = 1) -> Iterator[None]:
+    """Keep tracemalloc tracing while the block runs.
+
+    Tracing is started by the first concurrent user, unless it was already on,
+    and stopped when the last one leaves.
+    """
+    global _session_users, _session_started
+    with _session_lock:
+        if _session_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            _session_started = True
+        _session_users += 1
+    try:
+        yield
+    finally:
+        with _session_lock:
+            _session_users -= 1
+            if _session_users == 0 and _session_started:
+                tracemalloc.stop()
+                _session_started = False
+
+
+def deep_sizeof(obj: Any) -> int:
+    """Return the retained size of an object graph in bytes.
+
+    Shared objects are counted once. Pydantic models, containers and objects
+    with ``__dict__`` or ``__slots__`` are traversed.
+    """
+    seen = set()
+    stack = [obj]
+    size = 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+
+        if isinstance(current, (str, bytes, bytearray, int, float, bool)):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        else:
+            if hasattr(current, "__dict__"):
+                stack.append(current.__dict__)
+            for slot in getattr(type(current), "__slots__", ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return size
+
+
+class AllocationSite(BaseModel):
+    """Source line responsible for allocations during a node execution."""
+
+    location: str
+    size_bytes: int
+    count: int
+
+
+class NodeMemoryRecord(BaseModel):
+    """Memory usage of a single node execution."""
+
+    node: str
+    deal_id: str
+    allocated_bytes: int
+    peak_bytes: int
+    state_size_bytes: int
+    knowledge_base_size_bytes: Optional[int] = None
+    top_allocations: List[AllocationSite] = Field(default_factory=list)
+    trace: Dict[str, Any] = Field(default_factory=dict)
+
+
+class MemoryTracker:
+    """Node wrapper that records per-node memory usage with tracemalloc.
+
+    Instances are passed to ``create_agent_graph`` through ``node_wrappers``.
+    """
+
+    def __init__(self, knowledge_base=None, top_n: int = 5, frames: int = 1):
+        """Initialize the tracker.
+
+        Args:
+            knowledge_base: DomainKnowledgeBase whose chunks are sized
+            top_n: Number of allocation sites recorded per node
+            frames: Number of frames stored per allocation by tracemalloc
+        """
+        self.knowledge_base = knowledge_base
+        self.top_n = top_n
+        self.frames = frames
+        self.records: List[NodeMemoryRecord] = []
+        # Sizing a large knowledge base is expensive, so cache it by chunk count
+        self._kb_size_cache: Optional[tuple] = None
+
+    def __call__(self, node_name: str, node: Callable) -> Callable:
+        """Wrap a node so that its memory usage is recorded."""
+
+        @functools.wraps(node)
+        def tracked_node(state: Any, *args, **kwargs):
+            # Waiting nodes keep the session open between measurements
+            with tracing_session(self.frames), _measure_lock:
+                tracemalloc.reset_peak()
+                before = tracemalloc.take_snapshot()
+                current_before, _ = tracemalloc.get_traced_memory()
+
+                result = node(state, *args, **kwargs)
+
+                current_after, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
+
+            self._record(
+                node_name,
+                state,
+                result,
+                allocated=current_after - current_before,
+                peak=peak - current_before,
+                sites=after.compare_to(before, "lineno")[: self.top_n],
+            )
+            return result
+
+        return tracked_node
+
+    def _knowledge_base_size(self) -> Optional[int]:
+        """Return the retained size of the knowledge base chunks."""
+        if self.knowledge_base is None:
+            return None
+        chunks = self.knowledge_base._knowledge_chunks
+        key = (id(chunks), len(chunks))
+        if self._kb_size_cache is None or self._kb_size_cache[0] != key:
+            self._kb_size_cache = (key, deep_sizeof(chunks))
+        return self._kb_size_cache[1]
+
+    def _record(
+        self,
+        node_name: str,
+        state: Any,
+        result: Any,
+        allocated: int,
+        peak: int,
+        sites: List[tracemalloc.StatisticDiff],
+    ) -> None:
+        """Store the memory record of a node execution."""
+        memory = {
+            "allocated_bytes": allocated,
+            "peak_bytes": peak,
+            "state_size_bytes": deep_sizeof(result),
+            "knowledge_base_size_bytes": self._knowledge_base_size(),
+            "top_allocations": [
+                {
+                    "location": str(site.traceback[0]),
+                    "size_bytes": site.size_diff,
+                    "count": site.count_diff,
+                }
+                for site in sites
+                if site.size_diff > 0
+            ],
+        }
+        trace = add_memory_metadata(create_trace_metadata(node_name, state), memory)
+        record = NodeMemoryRecord(
+            node=node_name,
+            deal_id=str(get_state_value(state, "deal_id", "unknown")),
+            trace=trace,
+            **memory,
+        )
+        self.records.append(record)
+
+        logger.info(
+            f"Memory for {node_name}: allocated {allocated} bytes, "
+            f"peak {peak} bytes, state {record.state_size_bytes} bytes"
+        )
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Summarize the recorded node executions per node.
+
+        Returns:
+            Mapping of node name to run count, mean and max allocated bytes,
+            max peak, max state size, latest knowledge base size and the
+            allocation sites with the highest cumulative size
+        """
+        by_node: Dict[str, List[NodeMemoryRecord]] = defaultdict(list)
+        for record in self.records:
+            by_node[record.node].append(record)
+
+        summary = {}
+        for node, records in by_node.items():
+            sites: Dict[str, int] = defaultdict(int)
+            for record in records:
+                for site in record.top_allocations:
+                    sites[site.location] += site.size_bytes
+            summary[node] = {
+                "runs": len(records),
+                "mean_allocated_bytes": sum(r.allocated_bytes for r in records)
+                / len(records),
+                "max_allocated_bytes": max(r.allocated_bytes for r in records),
+                "max_peak_bytes": max(r.peak_bytes for r in records),
+                "max_state_size_bytes": max(r.state_size_bytes for r in records),
+                "knowledge_base_size_bytes": records[-1].knowledge_base_size_bytes,
+                "top_allocations": sorted(
+                    sites.items(), key=lambda item: item[1], reverse=True
+                )[: self.top_n],
+            }
+        return summary
+
+    def log_summary(self) -> None:
+        """Log the per-node memory summary."""
+        for node, stats in self.summary().items():
+            logger.info(
+                f"Memory summary for {node} ({stats['runs']} runs): "
+                f"mean allocated {stats['mean_allocated_bytes']:.0f} bytes, "
+                f"max peak {stats['max_peak_bytes']} bytes, "
+                f"max state {stats['max_state_size_bytes']} bytes"
+            )
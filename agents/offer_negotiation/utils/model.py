@@ -1,18 +1,150 @@
 import os
-
-import yaml
-from langchain_openai import ChatOpenAI
+from typing import Any, Dict, Optional
 
 from config.app_config import config
 
+# Chat model clients (langchain_openai, langchain_core) are imported when a
+# model is first created: they dominate the import time of the package.
+
+BACKEND_MODES = ("live", "record", "replay")
+
+
+def load_model_settings() -> Dict[str, Any]:
+    """Load model settings from the model_settings.yaml file."""
+    import yaml
 
-def get_llm():
-    """Get the LLM instance."""
-    # Load model settings from YAML using config path
     with open(config.model_settings_path, "r") as f:
-        settings = yaml.safe_load(f)
+        return yaml.safe_load(f)
+
+
+def get_backend_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve the LLM backend settings.
+
+    Environment variables (LLM_BACKEND_MODE, LLM_CASSETTE_PATH and
+    LLM_CASSETTE_ON_MISS) take precedence over the ``backend`` section of the
+    model settings.
+
+    Args:
+        settings: Model settings
+
+    Returns:
+        Backend settings with mode, cassette_path and on_miss
+    """
+    backend = settings.get("backend") or {}
+    cassette_path = config.llm_cassette_path or backend.get("cassette_path")
+    if cassette_path is None:
+        cassette_path = config.base_dir / "tests" / "cassettes" / "llm.json"
+    elif not os.path.isabs(cassette_path):
+        cassette_path = config.base_dir / cassette_path
+
+    mode = config.llm_backend_mode or backend.get("mode", "live")
+    if mode not in BACKEND_MODES:
+        raise ValueError(f"Unsupported LLM backend mode: {mode}")
+
+    return {
+        "mode": mode,
+        "cassette_path": str(cassette_path),
+        "on_miss": config.llm_cassette_on_miss or backend.get("on_miss", "error"),
+    }
+
+
+def create_provider_llm(settings: Dict[str, Any]):
+    """Create the chat model of the configured provider.
+
+    Args:
+        settings: Model settings
 
+    Returns:
+        Chat model for the configured provider ("openai" or "fake")
+    """
     # Get model kwargs, removing any None values
-    model_kwargs = {k: v for k, v in settings["model_kwargs"].items() if v is not None}
+    model_kwargs = {
+        k: v for k, v in (settings.get("model_kwargs") or {}).items() if v is not None
+    }
+
+    provider = settings.get("provider", "openai")
+    if provider == "fake":
+        from agents.offer_negotiation.utils.agent_settings import load_agent_settings
+        from agents.offer_negotiation.utils.fake_llm import (
+            DEFAULT_STRATEGY_RESPONSE,
+            DEFAULT_STRUCTURED_STRATEGY_RESPONSE,
+            FakeChatModel,
+        )
+
+        structured = load_agent_settings().structured_output.enabled
+        return FakeChatModel(
+            response=(
+                DEFAULT_STRUCTURED_STRATEGY_RESPONSE
+                if structured
+                else DEFAULT_STRATEGY_RESPONSE
+            ),
+            latency_seconds=settings.get("fake_latency_seconds", 0.0),
+            prefix_cache=True,
+        )
+    if provider != "openai":
+        raise ValueError(f"Unsupported model provider: {provider}")
+
+    from langchain_openai import ChatOpenAI
+
+    from agents.offer_negotiation.utils.agent_settings import load_agent_settings
+    from agents.offer_negotiation.utils.hedging import HedgedChatModel
+    from agents.offer_negotiation.utils.llm_clients import get_client_registry
+
+    hedging = load_agent_settings().hedging
+
+    def create_model():
+        llm = ChatOpenAI(
+            model=settings["model"],
+            http_client=registry.http_client,
+            http_async_client=registry.async_http_client,
+            **model_kwargs,
+        )
+        # Without hedging the wrapper still bounds calls by the node budgets
+        return HedgedChatModel(
+            inner=llm,
+            **hedging.model_dump(exclude={"enabled", "max_hedges"}),
+            max_hedges=hedging.max_hedges if hedging.enabled else 0,
+        )
+
+    # Models share pooled connections, rate limits and latency history
+    registry = get_client_registry(settings.get("client_pool"))
+    return registry.get_chat_model(
+        {
+            "provider": provider,
+            "model": settings["model"],
+            "hedging": hedging.model_dump(),
+            **model_kwargs,
+        },
+        create_model,
+    )
+
+
+def get_llm(settings: Optional[Dict[str, Any]] = None):
+    """Get the LLM instance.
+
+    In record and replay mode the provider model is wrapped in a
+    CassetteChatModel; in replay mode it is only created on a cassette miss
+    with the "fallback" policy.
+
+    Args:
+        settings: Model settings; loaded from model_settings.yaml if None
+
+    Returns:
+        Chat model for the configured provider and backend
+    """
+    if settings is None:
+        settings = load_model_settings()
+
+    backend = get_backend_settings(settings)
+    if backend["mode"] == "live":
+        return create_provider_llm(settings)
+
+    from agents.offer_negotiation.utils.llm_cassette import CassetteChatModel
 
-    return ChatOpenAI(model=settings["model"], **model_kwargs)
+    return CassetteChatModel(
+        inner_factory=lambda: create_provider_llm(settings),
+        cassette_path=backend["cassette_path"],
+        mode=backend["mode"],
+        on_miss=backend["on_miss"],
+        model_id=f"{settings.get('provider', 'openai')}:{settings.get('model')}",
+    )
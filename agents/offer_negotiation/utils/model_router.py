@@ -0,0 +1,264 @@
+"""Model cascade routing deals to model tiers by complexity.
+
+Deals are scored from the triggered heuristics, the objection count and the
+size of the deal context, and sent to the first tier whose
+``max_complexity`` covers the score. When the response fails validation it
+is escalated to the next, stronger tier. Routing decisions, latency, tokens
+and cost are logged and counted per tier.
+
+Tiers are configured in the ``routing`` section of model_settings.yaml.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel, Field
+
+from agents.offer_negotiation.core.models.deal_models import DealContext
+from agents.offer_negotiation.utils.prompt_cache import cached_input_tokens
+
+logger = logging.getLogger(__name__)
+
+# Sections a generated strategy must contain (see strategy_generation.md)
+REQUIRED_STRATEGY_SECTIONS = ("Strategy:", "Rationale:")
+
+
+class ModelTier(BaseModel):
+    """A model tier of the cascade."""
+
+    name: str
+    model: Optional[str] = None
+    max_complexity: Optional[float] = None
+    cost_per_1k_input_tokens: float = 0.0
+    cost_per_1k_cached_input_tokens: Optional[float] = None
+    cost_per_1k_output_tokens: float = 0.0
+
+
+class ComplexityWeights(BaseModel):
+    """Weights of the deal complexity score."""
+
+    heuristics: float = 1.0
+    objections: float = 1.0
+    context_kb: float = 0.25
+
+
+class RoutingSettings(BaseModel):
+    """Settings of the model cascade."""
+
+    enabled: bool = False
+    tiers: List[ModelTier] = Field(default_factory=list)
+    weights: ComplexityWeights = Field(default_factory=ComplexityWeights)
+    escalate_on_invalid: bool = True
+
+
+class TierStats(BaseModel):
+    """Counters of a model tier."""
+
+    calls: int = 0
+    invalid: int = 0
+    escalations: int = 0
+    latency_seconds: float = 0.0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+
+
+class RoutingDecision(BaseModel):
+    """Tier that produced a response and how it was chosen."""
+
+    score: float
+    tier: str
+    model: Optional[str] = None
+    escalated_from: List[str] = Field(default_factory=list)
+
+
+def score_complexity(
+    deal_context: DealContext,
+    decisions: Sequence[Dict[str, Any]],
+    weights: Optional[ComplexityWeights] = None,
+) -> float:
+    """Score the complexity of a deal.
+
+    Args:
+        deal_context: Deal context
+        decisions: Heuristics triggered by the deal (see evaluate_heuristics)
+        weights: Weights of the score components
+
+    Returns:
+        Weighted sum of the triggered heuristics, the objections and the size
+        of the deal context in kilobytes
+    """
+    weights = weights or ComplexityWeights()
+    context_kb = len(deal_context.model_dump_json()) / 1000
+    return (
+        weights.heuristics * len(decisions)
+        + weights.objections * len(deal_context.negotiation_context.objections)
+        + weights.context_kb * context_kb
+    )
+
+
+def validate_strategy(strategy: str) -> List[str]:
+    """Return the problems of a generated strategy (empty if valid)."""
+    if not strategy or not strategy.strip():
+        return ["Strategy is empty"]
+    lowered = strategy.lower()
+    return [
+        f"Missing section '{section}'"
+        for section in REQUIRED_STRATEGY_SECTIONS
+        if section.lower() not in lowered
+    ]
+
+
+class ModelRouter:
+    """Routes LLM calls to model tiers and escalates invalid responses."""
+
+    def __init__(
+        self,
+        settings: RoutingSettings,
+        llm_factory: Callable[[ModelTier], Any],
+    ):
+        """Initialize the router.
+
+        Args:
+            settings: Routing settings with tiers ordered from fast to strong
+            llm_factory: Creates the chat model of a tier
+
+        Raises:
+            ValueError: If no tier is configured
+        """
+        if not settings.tiers:
+            raise ValueError("Model routing requires at least one tier")
+        self.settings = settings
+        self.llm_factory = llm_factory
+        self._llms: Dict[str, Any] = {}
+        self._stats = {tier.name: TierStats() for tier in settings.tiers}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_model_settings(
+        cls, model_settings: Dict[str, Any]
+    ) -> Optional["ModelRouter"]:
+        """Create a router from model settings, or None if routing is disabled."""
+        settings = RoutingSettings(**(model_settings.get("routing") or {}))
+        if not settings.enabled:
+            return None
+
+        from agents.offer_negotiation.utils.model import get_llm
+
+        def create_llm(tier: ModelTier):
+            return get_llm(
+                {**model_settings, "model": tier.model or model_settings.get("model")}
+            )
+
+        return cls(settings, create_llm)
+
+    def select_tier(self, score: float) -> int:
+        """Return the index of the first tier covering a complexity score."""
+        for index, tier in enumerate(self.settings.tiers):
+            if tier.max_complexity is None or score <= tier.max_complexity:
+                return index
+        return len(self.settings.tiers) - 1
+
+    def get_llm(self, tier: ModelTier) -> Any:
+        """Return the chat model of a tier, creating it on first use."""
+        with self._lock:
+            if tier.name not in self._llms:
+                self._llms[tier.name] = self.llm_factory(tier)
+            return self._llms[tier.name]
+
+    def invoke(
+        self,
+        prompt: Any,
+        score: float,
+        validate: Optional[Callable[[str], List[str]]] = None,
+    ) -> tuple:
+        """Invoke the tier covering the score, escalating invalid responses.
+
+        Args:
+            prompt: Prompt value or messages passed to the chat model
+            score: Complexity score of the deal
+            validate: Returns the problems of a response content
+
+        Returns:
+            Tuple of the response message and the RoutingDecision
+        """
+        index = self.select_tier(score)
+        escalated_from: List[str] = []
+        while True:
+            tier = self.settings.tiers[index]
+            start = time.perf_counter()
+            response = self.get_llm(tier).invoke(prompt)
+            self._record(tier, score, time.perf_counter() - start, response)
+
+            problems = validate(response.content) if validate else []
+            last_tier = index == len(self.settings.tiers) - 1
+            if problems:
+                with self._lock:
+                    self._stats[tier.name].invalid += 1
+            if not problems or last_tier or not self.settings.escalate_on_invalid:
+                if problems:
+                    logger.warning(
+                        f"Response of tier {tier.name} failed validation: {problems}"
+                    )
+                return response, RoutingDecision(
+                    score=score,
+                    tier=tier.name,
+                    model=tier.model,
+                    escalated_from=escalated_from,
+                )
+
+            logger.warning(
+                f"Escalating from tier {tier.name} after invalid response: {problems}"
+            )
+            with self._lock:
+                self._stats[tier.name].escalations += 1
+            escalated_from.append(tier.name)
+            index += 1
+
+    def _record(
+        self, tier: ModelTier, score: float, latency: float, response: Any
+    ) -> None:
+        usage = getattr(response, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens", 0)
+        cached_tokens = cached_input_tokens(response)
+        output_tokens = usage.get("output_tokens", 0)
+        # Cached input tokens are billed at the cached rate when it is set
+        cached_rate = tier.cost_per_1k_cached_input_tokens
+        if cached_rate is None:
+            cached_rate = tier.cost_per_1k_input_tokens
+        cost = (
+            (input_tokens - cached_tokens) * tier.cost_per_1k_input_tokens
+            + cached_tokens * cached_rate
+            + output_tokens * tier.cost_per_1k_output_tokens
+        ) / 1000
+        with self._lock:
+            stats = self._stats[tier.name]
+            stats.calls += 1
+            stats.latency_seconds += latency
+            stats.input_tokens += input_tokens
+            stats.cached_input_tokens += cached_tokens
+            stats.output_tokens += output_tokens
+            stats.cost += cost
+        logger.info(
+            f"Routed complexity {score:.2f} to tier {tier.name} "
+            f"(model {tier.model or 'default'}): {latency:.2f}s, "
+            f"{input_tokens}+{output_tokens} tokens ({cached_tokens} cached), "
+            f"${cost:.4f}"
+        )
+
+    def stats(self) -> Dict[str, TierStats]:
+        """Return a snapshot of the per-tier counters."""
+        with self._lock:
+            return {name: s.model_copy() for name, s in self._stats.items()}
+
+    def log_summary(self) -> None:
+        """Log the per-tier counters."""
+        for name, stats in self.stats().items():
+            mean = stats.latency_seconds / stats.calls if stats.calls else 0.0
+            logger.info(
+                f"Tier {name}: {stats.calls} calls, {stats.escalations} escalations, "
+                f"mean latency {mean:.2f}s, cost ${stats.cost:.4f}"
+            )
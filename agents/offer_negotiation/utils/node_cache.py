@@ -0,0 +1,286 @@
+"""Memoization of deterministic graph nodes.
+
+A cached node is keyed by a stable hash of its declared inputs (the
+``input_schema``, ``required_fields`` and ``optional_fields`` of its
+``NodeMetadata`` in graph/interfaces.py), a hash of the content of the
+knowledge base and, for nodes rendering prompts, the version of their prompt
+files. The cache stores the fields the node adds to the state (its
+``output_schema`` fields that are not inputs) in a bounded in-memory LRU tier
+and, optionally, a bounded SQLite tier shared across processes and runs.
+
+Only pure nodes may be cached; they are listed under ``node_cache.nodes`` in
+agent_settings.yaml.
+"""
+
+import functools
+import hashlib
+import importlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from agents.offer_negotiation.graph.interfaces import NodeMetadata
+from agents.offer_negotiation.graph.utils import prepare_for_json
+from agents.offer_negotiation.utils.prompt_loader import get_prompt_registry
+
+logger = logging.getLogger(__name__)
+
+
+class NodeCacheStats(BaseModel):
+    """Counters of a cached node."""
+
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def calls(self) -> int:
+        return self.hits + self.disk_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of calls served from either tier."""
+        return (self.hits + self.disk_hits) / self.calls if self.calls else 0.0
+
+
+def stable_hash(value: Any) -> str:
+    """Return a hash of a value that is stable across processes."""
+
+    def encode(obj: Any) -> Any:
+        if isinstance(obj, BaseModel):
+            return obj.model_dump(mode="json")
+        return str(obj)
+
+    payload = json.dumps(
+        prepare_for_json(value), sort_keys=True, default=encode, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def input_fields(metadata: NodeMetadata) -> List[str]:
+    """Return the state fields a node declares as inputs."""
+    fields = [*metadata.input_schema, *metadata.required_fields]
+    fields.extend(metadata.optional_fields)
+    return sorted(set(fields))
+
+
+def output_fields(metadata: NodeMetadata) -> List[str]:
+    """Return the state fields a node adds to its inputs."""
+    inputs = set(input_fields(metadata))
+    return sorted(field for field in metadata.output_schema if field not in inputs)
+
+
+class _DiskTier:
+    """SQLite table of cached node outputs, bounded by entry count."""
+
+    def __init__(self, path: Path, max_entries: int):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS node_cache ("
+                "key TEXT PRIMARY KEY, node TEXT NOT NULL, "
+                "value TEXT NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS node_cache_accessed "
+                "ON node_cache (accessed)"
+            )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM node_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE node_cache SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+        return json.loads(row[0])
+
+    def put(self, key: str, node: str, value: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO node_cache VALUES (?, ?, ?, ?)",
+                (key, node, json.dumps(value, ensure_ascii=False), time.time()),
+            )
+            # Evict the least recently used entries beyond the bound
+            self._conn.execute(
+                "DELETE FROM node_cache WHERE key IN (SELECT key FROM node_cache "
+                "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class NodeCache:
+    """Node wrapper memoizing deterministic nodes.
+
+    Instances are passed to ``create_agent_graph`` through ``node_wrappers``.
+    The knowledge base is assigned by ``build_agent`` so that adding documents
+    invalidates the cached entries.
+    """
+
+    def __init__(
+        self,
+        nodes: Dict[str, NodeMetadata],
+        max_entries: int = 1024,
+        disk_path: Optional[Path] = None,
+        max_disk_entries: int = 100_000,
+        knowledge_base=None,
+        prompt_registry=None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            nodes: Metadata of the cached nodes, by node name
+            max_entries: Entries kept in memory (least recently used evicted)
+            disk_path: SQLite file of the on-disk tier; None for memory only
+            max_disk_entries: Entries kept on disk
+            knowledge_base: DomainKnowledgeBase whose content hash is part of
+                keys
+            prompt_registry: PromptRegistry versioning the prompts of the
+                nodes; defaults to the registry of config/prompts
+        """
+        self.nodes = nodes
+        self.max_entries = max_entries
+        self.knowledge_base = knowledge_base
+        self.prompt_registry = prompt_registry
+        self._memory: "OrderedDict[str, Tuple[type, Dict[str, Any]]]" = OrderedDict()
+        self._disk = _DiskTier(disk_path, max_disk_entries) if disk_path else None
+        self._stats = {name: NodeCacheStats() for name in nodes}
+        self._lock = threading.Lock()
+
+    @property
+    def knowledge_base_hash(self) -> str:
+        return getattr(self.knowledge_base, "content_hash", "")
+
+    def key(self, node_name: str, state: Any) -> str:
+        """Return the cache key of a node call."""
+        metadata = self.nodes[node_name]
+        inputs = {
+            field: getattr(state, field, None) for field in input_fields(metadata)
+        }
+        key = {
+            "node": node_name,
+            "inputs": inputs,
+            "knowledge_base_hash": self.knowledge_base_hash,
+        }
+        if metadata.prompts:
+            if self.prompt_registry is None:
+                self.prompt_registry = get_prompt_registry()
+            key["prompt_version"] = self.prompt_registry.version(metadata.prompts)
+        return stable_hash(key)
+
+    def _lookup(
+        self, node_name: str, key: str
+    ) -> Optional[Tuple[type, Dict[str, Any]]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats[node_name].hits += 1
+                return entry
+        if self._disk is not None:
+            stored = self._disk.get(key)
+            if stored is not None:
+                module, _, name = stored["output_type"].rpartition(".")
+                entry = (
+                    getattr(importlib.import_module(module), name),
+                    stored["fields"],
+                )
+                with self._lock:
+                    self._stats[node_name].disk_hits += 1
+                self._remember(key, entry)
+                return entry
+        with self._lock:
+            self._stats[node_name].misses += 1
+        return None
+
+    def _remember(self, key: str, entry: Tuple[type, Dict[str, Any]]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _store(self, node_name: str, key: str, output: BaseModel) -> None:
+        fields = {
+            field: getattr(output, field)
+            for field in output_fields(self.nodes[node_name])
+        }
+        output_type = type(output)
+        self._remember(key, (output_type, fields))
+        if self._disk is not None:
+            self._disk.put(
+                key,
+                node_name,
+                {
+                    "output_type": f"{output_type.__module__}.{output_type.__qualname__}",
+                    "fields": {
+                        field: prepare_for_json(
+                            output.model_dump(mode="json", include={field})[field]
+                        )
+                        for field in fields
+                    },
+                },
+            )
+
+    def __call__(self, node_name: str, node: Callable) -> Callable:
+        """Wrap a node so that repeated inputs are served from the cache."""
+        if node_name not in self.nodes:
+            return node
+
+        @functools.wraps(node)
+        def cached_node(state: Any, *args, **kwargs):
+            key = self.key(node_name, state)
+            entry = self._lookup(node_name, key)
+            if entry is not None:
+                output_type, fields = entry
+                return output_type(**{**state.model_dump(), **fields})
+
+            output = node(state, *args, **kwargs)
+            if isinstance(output, BaseModel):
+                self._store(node_name, key, output)
+            return output
+
+        return cached_node
+
+    def stats(self) -> Dict[str, NodeCacheStats]:
+        """Return a snapshot of the per-node counters."""
+        with self._lock:
+            return {name: s.model_copy() for name, s in self._stats.items()}
+
+    def clear(self) -> None:
+        """Drop the in-memory entries."""
+        with self._lock:
+            self._memory.clear()
+
+    def close(self) -> None:
+        """Close the on-disk tier."""
+        if self._disk is not None:
+            self._disk.close()
+
+    def log_summary(self) -> None:
+        """Log the per-node hit rates."""
+        for name, stats in self.stats().items():
+            logger.info(
+                f"Node cache {name}: {stats.calls} calls, "
+                f"{stats.hits} memory hits, {stats.disk_hits} disk hits, "
+                f"hit rate {stats.hit_rate:.1%}"
+            )
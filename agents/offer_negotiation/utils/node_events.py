@@ -0,0 +1,176 @@
+"""Start and finish events of graph nodes, for live monitoring.
+
+``NodeEventPublisher`` is a node wrapper sending a ``NodeEvent`` to its
+subscribers when a node starts, finishes or fails, with the deal, the node
+duration, the number of domain knowledge chunks in the node's output state
+and the LLM tokens the node used. LLM calls report their usage with
+``record_token_usage``, which counts it toward the node running in the
+current context.
+
+Subscribers are called on the thread of the node and must return at once
+(the cockpit only hands the event over to its event loop, see
+interfaces/cockpit_ui.py); a failing subscriber is logged and never fails the
+node. Without subscribers, a node only pays for an empty-list check.
+"""
+
+import functools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from enum import Enum
+from typing import Any, Callable, List, Optional
+
+from pydantic import BaseModel
+
+from agents.offer_negotiation.utils.trace_metadata import get_state_value
+
+logger = logging.getLogger(__name__)
+
+
+class NodeEventType(str, Enum):
+    """Types of node events."""
+
+    NODE_STARTED = "node_started"
+    NODE_FINISHED = "node_finished"
+    NODE_FAILED = "node_failed"
+
+
+class TokenUsage(BaseModel):
+    """LLM tokens used by a node."""
+
+    llm_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_input_tokens: int = 0
+
+
+class NodeEvent(BaseModel):
+    """Start, finish or failure of a graph node for a deal."""
+
+    type: NodeEventType
+    deal_id: str
+    node: str
+    timestamp: float
+    duration_seconds: Optional[float] = None
+    chunk_count: Optional[int] = None
+    tokens: Optional[TokenUsage] = None
+    error: Optional[str] = None
+
+
+Subscriber = Callable[[NodeEvent], None]
+
+# Token usage of the node running in the current context
+_usage: ContextVar[Optional[TokenUsage]] = ContextVar("node_usage", default=None)
+
+
+def record_token_usage(response: Any) -> None:
+    """Count the token usage of an LLM response toward the running node."""
+    usage = _usage.get()
+    if usage is None:
+        return
+    metadata = getattr(response, "usage_metadata", None) or {}
+    details = metadata.get("input_token_details") or {}
+    usage.llm_calls += 1
+    usage.input_tokens += metadata.get("input_tokens") or 0
+    usage.output_tokens += metadata.get("output_tokens") or 0
+    usage.cached_input_tokens += details.get("cache_read") or 0
+
+
+def _chunk_count(state: Any) -> Optional[int]:
+    chunks = get_state_value(state, "domain_knowledge")
+    return len(chunks) if isinstance(chunks, list) else None
+
+
+class NodeEventPublisher:
+    """Node wrapper publishing node events to subscribers.
+
+    Instances are passed to ``create_agent_graph`` through ``node_wrappers``.
+    """
+
+    def __init__(self):
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        """Call a function with every node event."""
+        with self._lock:
+            # Copied on write, so publishing never takes the lock
+            self._subscribers = [*self._subscribers, subscriber]
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s != subscriber]
+
+    def publish(self, event: NodeEvent) -> None:
+        """Send an event to the subscribers."""
+        for subscriber in self._subscribers:
+            try:
+                subscriber(event)
+            except Exception as e:
+                logger.warning(f"Node event subscriber failed: {e}")
+
+    def __call__(self, node_name: str, node: Callable) -> Callable:
+        """Wrap a node so that its start and finish are published."""
+
+        @functools.wraps(node)
+        def published_node(state: Any, *args, **kwargs):
+            if not self._subscribers:
+                return node(state, *args, **kwargs)
+
+            deal_id = str(get_state_value(state, "deal_id", "unknown"))
+            self.publish(
+                NodeEvent(
+                    type=NodeEventType.NODE_STARTED,
+                    deal_id=deal_id,
+                    node=node_name,
+                    timestamp=time.time(),
+                )
+            )
+            usage = TokenUsage()
+            token = _usage.set(usage)
+            start = time.perf_counter()
+            try:
+                result = node(state, *args, **kwargs)
+            except Exception as e:
+                self.publish(
+                    NodeEvent(
+                        type=NodeEventType.NODE_FAILED,
+                        deal_id=deal_id,
+                        node=node_name,
+                        timestamp=time.time(),
+                        duration_seconds=time.perf_counter() - start,
+                        tokens=usage,
+                        error=f"{type(e).__name__}: {e}",
+                    )
+                )
+                raise
+            finally:
+                _usage.reset(token)
+            self.publish(
+                NodeEvent(
+                    type=NodeEventType.NODE_FINISHED,
+                    deal_id=deal_id,
+                    node=node_name,
+                    timestamp=time.time(),
+                    duration_seconds=time.perf_counter() - start,
+                    chunk_count=_chunk_count(result),
+                    tokens=usage,
+                )
+            )
+            return result
+
+        return published_node
+
+
+_publisher: Optional[NodeEventPublisher] = None
+_publisher_lock = threading.Lock()
+
+
+def get_node_event_publisher() -> NodeEventPublisher:
+    """Return the process-wide node event publisher."""
+    global _publisher
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = NodeEventPublisher()
+        return _publisher
@@ -0,0 +1,239 @@
+"""Opt-in per-node CPU profiling for the offer negotiation agent.
+
+The profiler samples the call stack of the thread executing a graph node at a
+fixed interval and writes the samples in collapsed-stack format
+(``frame;frame;frame count``), which can be rendered by ``flamegraph.pl`` or
+loaded directly into speedscope. Each profile is accompanied by a JSON summary
+of the functions with the highest self time.
+
+Profiling is enabled with ``AGENT_PROFILE=true`` or ``python run.py --profile``.
+"""
+
+import functools
+import itertools
+import json
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from agents.offer_negotiation.utils.trace_metadata import get_state_value
+from config.app_config import config
+
+logger = logging.getLogger(__name__)
+
+
+class FunctionTiming(BaseModel):
+    """Self and total time attributed to a single function."""
+
+    function: str
+    self_seconds: float
+    total_seconds: float
+    self_samples: int
+
+
+class NodeProfile(BaseModel):
+    """Profile of a single node execution."""
+
+    node: str
+    deal_id: str
+    duration_seconds: float
+    interval_ms: float
+    sample_count: int
+    stacks: Dict[str, int] = Field(default_factory=dict)
+    top_self_time: List[FunctionTiming] = Field(default_factory=list)
+    collapsed_path: Optional[str] = None
+    summary_path: Optional[str] = None
+
+
+def _format_frame(frame) -> str:
+    """Format a frame as ``module:qualname`` for collapsed-stack output."""
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    name = getattr(code, "co_qualname", code.co_name)
+    # ';' separates frames and ' ' separates the count in collapsed stacks
+    return f"{module}:{name}".replace(";", ":").replace(" ", "_")
+
+
+class _StackSampler(threading.Thread):
+    """Background thread sampling the stack of another thread."""
+
+    def __init__(self, thread_id: int, stop_frame, interval: float):
+        super().__init__(name="node-profiler", daemon=True)
+        self._thread_id = thread_id
+        self._stop_frame = stop_frame
+        self._interval = interval
+        self._stop_event = threading.Event()
+        self.samples: Counter = Counter()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            # Walk up to (but excluding) the profiler wrapper frame
+            while frame is not None and frame is not self._stop_frame:
+                stack.append(_format_frame(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def summarize_self_time(
+    stacks: Dict[str, int], interval_ms: float, top_n: int = 10
+) -> List[FunctionTiming]:
+    """Compute the functions with the highest self time from collapsed stacks.
+
+    Args:
+        stacks: Mapping of collapsed stack to sample count
+        interval_ms: Sampling interval used to collect the stacks
+        top_n: Number of functions to return
+
+    Returns:
+        Functions ordered by self time, highest first
+    """
+    interval = interval_ms / 1000.0
+    self_samples: Counter = Counter()
+    total_samples: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        self_samples[frames[-1]] += count
+        # Count each function once per stack for inclusive time (recursion)
+        for function in set(frames):
+            total_samples[function] += count
+
+    return [
+        FunctionTiming(
+            function=function,
+            self_seconds=count * interval,
+            total_seconds=total_samples[function] * interval,
+            self_samples=count,
+        )
+        for function, count in self_samples.most_common(top_n)
+    ]
+
+
+class NodeProfiler:
+    """Node wrapper that profiles graph node executions.
+
+    Instances are passed to ``create_agent_graph`` through ``node_wrappers``.
+    """
+
+    def __init__(
+        self,
+        output_dir: Optional[Path] = None,
+        interval_ms: Optional[float] = None,
+        sample_rate: Optional[float] = None,
+        top_n: int = 10,
+    ):
+        """Initialize the profiler.
+
+        Args:
+            output_dir: Directory for profile output (defaults to config)
+            interval_ms: Stack sampling interval in milliseconds
+            sample_rate: Fraction of node executions to profile
+            top_n: Number of functions listed in each self-time summary
+        """
+        self.output_dir = Path(output_dir or config.profile_dir)
+        self.interval_ms = (
+            interval_ms if interval_ms is not None else config.profile_interval_ms
+        )
+        self.sample_rate = (
+            sample_rate if sample_rate is not None else config.profile_sample_rate
+        )
+        self.top_n = top_n
+        self.profiles: List[NodeProfile] = []
+        # Output files are suffixed with the start of the profiler and a
+        # sequence number, so runs of a node in parallel branches, for later
+        # deals or in later processes do not overwrite each other
+        self._run_stamp = time.strftime("%Y%m%dT%H%M%S")
+        self._sequence = itertools.count(1)
+
+    def __call__(self, node_name: str, node: Callable) -> Callable:
+        """Wrap a node so that sampled executions are profiled."""
+
+        @functools.wraps(node)
+        def profiled_node(state: Any, *args, **kwargs):
+            if random.random() >= self.sample_rate:
+                return node(state, *args, **kwargs)
+
+            sampler = _StackSampler(
+                threading.get_ident(), sys._getframe(), self.interval_ms / 1000.0
+            )
+            start = time.perf_counter()
+            sampler.start()
+            try:
+                return node(state, *args, **kwargs)
+            finally:
+                sampler.stop()
+                self._record(
+                    node_name,
+                    str(get_state_value(state, "deal_id", "unknown")),
+                    time.perf_counter() - start,
+                    dict(sampler.samples),
+                )
+
+        return profiled_node
+
+    def _record(
+        self,
+        node_name: str,
+        deal_id: str,
+        duration: float,
+        samples: Dict[str, int],
+    ) -> None:
+        """Store a node profile and write its collapsed stacks and summary."""
+        profile = NodeProfile(
+            node=node_name,
+            deal_id=deal_id,
+            duration_seconds=duration,
+            interval_ms=self.interval_ms,
+            sample_count=sum(samples.values()),
+            stacks=samples,
+            top_self_time=summarize_self_time(samples, self.interval_ms, self.top_n),
+        )
+        try:
+            self._write(profile)
+        except OSError as e:
+            logger.warning(f"Could not write profile for {node_name}: {str(e)}")
+        self.profiles.append(profile)
+
+        logger.info(
+            f"Profiled {node_name} for deal {deal_id}: {duration:.4f}s, "
+            f"{profile.sample_count} samples"
+        )
+        for timing in profile.top_self_time[:5]:
+            logger.info(
+                f"  self {timing.self_seconds:.4f}s "
+                f"total {timing.total_seconds:.4f}s  {timing.function}"
+            )
+
+    def _write(self, profile: NodeProfile) -> None:
+        """Write collapsed stacks and a self-time summary for a profile."""
+        safe_deal_id = re.sub(r"[^A-Za-z0-9_.-]", "_", profile.deal_id)
+        profile_dir = self.output_dir / safe_deal_id
+        profile_dir.mkdir(parents=True, exist_ok=True)
+
+        # Root the stacks at the deal and node so that profiles from several
+        # files can be concatenated into a single flamegraph
+        name = f"{profile.node}.{self._run_stamp}-{next(self._sequence)}"
+        collapsed_path = profile_dir / f"{name}.collapsed"
+        with open(collapsed_path, "w") as f:
+            for stack, count in sorted(profile.stacks.items()):
+                f.write(f"deal:{safe_deal_id};node:{profile.node};{stack} {count}\n")
+
+        summary_path = profile_dir / f"{name}.summary.json"
+        profile.collapsed_path = str(collapsed_path)
+        profile.summary_path = str(summary_path)
+        with open(summary_path, "w") as f:
+            json.dump(profile.model_dump(exclude={"stacks"}), f, indent=2)
@@ -0,0 +1,91 @@
+"""Prompt-prefix cache usage reported by LLM providers.
+
+Providers that cache prompt prefixes report the input tokens served from the
+cache in the usage of each response (``input_token_details.cache_read`` of
+the LangChain usage metadata). ``PromptCacheTracker`` sums them per prompt so
+that the share of cached input tokens can be checked after a prompt layout
+change; strategy prompts keep their static instructions and examples in a
+stable prefix (see create_strategy_prompt).
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class PromptCacheStats(BaseModel):
+    """Input token counters of a prompt."""
+
+    calls: int = 0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of the input tokens served from the prompt cache."""
+        return (
+            self.cached_input_tokens / self.input_tokens if self.input_tokens else 0.0
+        )
+
+
+def cached_input_tokens(response: Any) -> int:
+    """Return the cached input tokens reported with a response."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    return details.get("cache_read") or 0
+
+
+class PromptCacheTracker:
+    """Thread-safe counters of cached input tokens, by prompt name."""
+
+    def __init__(self):
+        self._stats: Dict[str, PromptCacheStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, prompt: str, response: Any) -> None:
+        """Count the input tokens of a response to a prompt."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens") or 0
+        cached = cached_input_tokens(response)
+        with self._lock:
+            stats = self._stats.setdefault(prompt, PromptCacheStats())
+            stats.calls += 1
+            stats.input_tokens += input_tokens
+            stats.cached_input_tokens += cached
+        logger.debug(f"Prompt {prompt}: {cached}/{input_tokens} input tokens cached")
+
+    def stats(self) -> Dict[str, PromptCacheStats]:
+        """Return a snapshot of the per-prompt counters."""
+        with self._lock:
+            return {name: s.model_copy() for name, s in self._stats.items()}
+
+    def reset(self) -> None:
+        """Drop the counters."""
+        with self._lock:
+            self._stats.clear()
+
+    def log_summary(self) -> None:
+        """Log the cached share of the input tokens of each prompt."""
+        for name, stats in self.stats().items():
+            logger.info(
+                f"Prompt cache {name}: {stats.calls} calls, "
+                f"{stats.cached_input_tokens}/{stats.input_tokens} input tokens "
+                f"cached ({stats.hit_rate:.1%})"
+            )
+
+
+_tracker: Optional[PromptCacheTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_prompt_cache_tracker() -> PromptCacheTracker:
+    """Return the process-wide prompt cache tracker."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = PromptCacheTracker()
+        return _tracker
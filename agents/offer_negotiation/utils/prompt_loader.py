@@ -1,8 +1,237 @@
-import os
+"""Prompt templates of config/prompts, loaded once and versioned.
+
+``PromptRegistry`` reads every template of the prompts directory once and
+identifies each by a version ID: the first 12 hex digits of the SHA-256 of
+its content. Chat templates assembled from prompt files are compiled once
+per combination of versions, and their version is recorded with the results
+they produce and in the keys of cached nodes.
+
+With hot reload, the file modification times are checked at most every
+``check_interval`` seconds, and a snapshot of all the prompts is re-read and
+swapped in at once when a file changed, so a caller never mixes versions.
+A prompt file that is deleted, empty (e.g. truncated mid-write), unreadable
+or not a valid template keeps its last good version until it is fixed.
+"""
+
+import hashlib
+import logging
+import string
+import threading
+import time
 from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
 
 from config.app_config import config
 
+logger = logging.getLogger(__name__)
+
+# Extensions of the prompt template files
+PROMPT_SUFFIXES = (".md", ".txt")
+
+# Messages of a chat template: (role, prompt files joined by blank lines)
+TemplateMessages = Sequence[Tuple[str, Sequence[str]]]
+
+
+class Prompt(BaseModel, frozen=True):
+    """A prompt template file and its version."""
+
+    name: str
+    text: str
+    version: str
+
+
+def content_version(text: str) -> str:
+    """Return the version ID of a prompt content."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+def combined_version(versions: Sequence[str]) -> str:
+    """Return the version ID of a combination of prompt versions."""
+    if len(versions) == 1:
+        return versions[0]
+    return content_version("+".join(versions))
+
+
+class PromptRegistry:
+    """Prompt templates of a directory, loaded once and swapped on change."""
+
+    def __init__(
+        self,
+        prompts_dir: Path,
+        hot_reload: bool = False,
+        check_interval: float = 2.0,
+    ):
+        """Load the prompts of a directory.
+
+        Args:
+            prompts_dir: Directory of the prompt template files
+            hot_reload: Whether changed files are reloaded without a restart
+            check_interval: Minimum seconds between modification time checks
+        """
+        self.prompts_dir = Path(prompts_dir)
+        self.hot_reload = hot_reload
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._templates: Dict[Tuple, Any] = {}
+        self._mtimes = self._scan()
+        self._prompts = self._load()
+        self._checked = time.monotonic()
+
+    def _scan(self) -> Dict[str, int]:
+        """Return the modification times of the prompt files, by name."""
+        if not self.prompts_dir.is_dir():
+            return {}
+        mtimes = {}
+        for path in self.prompts_dir.iterdir():
+            if path.suffix not in PROMPT_SUFFIXES:
+                continue
+            try:
+                if path.is_file():
+                    mtimes[path.name] = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                # Deleted while scanning
+                continue
+        return mtimes
+
+    def _load(self) -> Dict[str, Prompt]:
+        prompts = {}
+        for name in self._mtimes:
+            text = (self.prompts_dir / name).read_text(encoding="utf-8")
+            prompts[name] = Prompt(name=name, text=text, version=content_version(text))
+        return prompts
+
+    def _reload_prompts(self, previous: Dict[str, Prompt]) -> Dict[str, Prompt]:
+        """Re-read the prompts, keeping the previous version of broken files."""
+        prompts = {}
+        for name in self._mtimes:
+            try:
+                text = (self.prompts_dir / name).read_text(encoding="utf-8")
+                if not text.strip():
+                    raise ValueError("the file is empty")
+                list(string.Formatter().parse(text))
+            except (OSError, UnicodeDecodeError, ValueError) as e:
+                if name in previous:
+                    logger.warning(
+                        f"Keeping version {previous[name].version} of prompt "
+                        f"{name}, failed to reload it: {e}"
+                    )
+                    prompts[name] = previous[name]
+                else:
+                    logger.warning(f"Failed to load prompt {name}: {e}")
+                continue
+            prompts[name] = Prompt(name=name, text=text, version=content_version(text))
+        for name in previous.keys() - self._mtimes.keys():
+            logger.warning(
+                f"Keeping version {previous[name].version} of prompt {name}, "
+                f"its file was deleted"
+            )
+            prompts[name] = previous[name]
+        return prompts
+
+    def reload(self) -> Dict[str, str]:
+        """Re-read the prompts if a file changed.
+
+        Returns:
+            Versions of the added or changed prompts, by name
+        """
+        with self._lock:
+            self._checked = time.monotonic()
+            mtimes = self._scan()
+            if mtimes == self._mtimes:
+                return {}
+            self._mtimes = mtimes
+            previous = self._prompts
+            self._prompts = self._reload_prompts(previous)
+            self._templates.clear()
+            changed = {
+                name: prompt.version
+                for name, prompt in self._prompts.items()
+                if name not in previous or previous[name].version != prompt.version
+            }
+        if changed:
+            logger.info(f"Reloaded prompts: {changed}")
+        return changed
+
+    def _snapshot(self) -> Dict[str, Prompt]:
+        if self.hot_reload and time.monotonic() - self._checked >= self.check_interval:
+            self.reload()
+        return self._prompts
+
+    def get(self, name: str) -> Prompt:
+        """Return a prompt by file name.
+
+        Raises:
+            FileNotFoundError: If the prompts directory has no such file
+        """
+        return self._lookup(self._snapshot(), name)
+
+    def version(self, names: Sequence[str]) -> str:
+        """Return the version ID of a combination of prompts."""
+        prompts = self._snapshot()
+        return combined_version([self._lookup(prompts, name).version for name in names])
+
+    def chat_template(self, messages: TemplateMessages) -> Tuple[Any, str]:
+        """Return the compiled chat template of prompt files and its version.
+
+        Args:
+            messages: Role and prompt files of each message; the files of a
+                message are joined by blank lines
+
+        Returns:
+            Tuple of the ChatPromptTemplate and its version ID
+        """
+        from langchain_core.prompts import ChatPromptTemplate
+
+        prompts = self._snapshot()
+        resolved = [
+            (role, [self._lookup(prompts, name) for name in names])
+            for role, names in messages
+        ]
+        version = combined_version(
+            [prompt.version for _, parts in resolved for prompt in parts]
+        )
+        key = (tuple((role, tuple(names)) for role, names in messages), version)
+        with self._lock:
+            template = self._templates.get(key)
+        if template is None:
+            template = ChatPromptTemplate.from_messages(
+                [
+                    (role, "\n\n".join(prompt.text for prompt in parts))
+                    for role, parts in resolved
+                ]
+            )
+            with self._lock:
+                self._templates[key] = template
+        return template, version
+
+    def _lookup(self, prompts: Dict[str, Prompt], name: str) -> Prompt:
+        prompt = prompts.get(name)
+        if prompt is None:
+            raise FileNotFoundError(f"Prompt not found: {self.prompts_dir / name}")
+        return prompt
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Return the registry of config/prompts, configured in agent_settings.yaml."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            from agents.offer_negotiation.utils.agent_settings import (
+                load_agent_settings,
+            )
+
+            settings = load_agent_settings().prompts
+            _registry = PromptRegistry(
+                config.prompts_dir, settings.hot_reload, settings.check_interval
+            )
+        return _registry
+
 
 def load_prompt(filename: str) -> str:
     """Load a prompt template from the config/prompts directory.
@@ -13,7 +242,4 @@ def load_prompt(filename: str) -> str:
     Returns:
         str: Contents of the prompt file
     """
-    prompt_path = config.prompts_dir / filename
-
-    with open(prompt_path, "r") as f:
-        return f.read()
+    return get_prompt_registry().get(filename).text
@@ -0,0 +1,93 @@
+"""Import-time profiling of the agent startup.
+
+Modules are imported in a fresh interpreter with ``-X importtime`` so that
+modules already loaded by the caller do not hide their cost.
+"""
+
+import subprocess
+import sys
+from typing import List, Sequence
+
+from pydantic import BaseModel
+
+
+class ImportTiming(BaseModel):
+    """Import time of a single module, in microseconds."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse the stderr output of ``python -X importtime``.
+
+    Args:
+        output: Lines of the form ``import time: self | cumulative | module``
+
+    Returns:
+        Import timings in the order reported by the interpreter
+    """
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        timings.append(
+            ImportTiming(
+                module=stripped,
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return timings
+
+
+def measure_import_times(
+    modules: Sequence[str], python: str = sys.executable
+) -> List[ImportTiming]:
+    """Import modules in a fresh interpreter and return their import times.
+
+    Args:
+        modules: Modules imported in order
+        python: Python interpreter to use
+
+    Returns:
+        Import timings of every module loaded
+
+    Raises:
+        RuntimeError: If a module cannot be imported
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    process = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n{process.stderr}")
+    return parse_importtime(process.stderr)
+
+
+def total_import_time(timings: List[ImportTiming]) -> int:
+    """Return the total import time of top-level imports, in microseconds."""
+    return sum(t.cumulative_us for t in timings if t.depth == 0)
+
+
+def print_import_report(timings: List[ImportTiming], top_n: int = 25) -> None:
+    """Print the slowest imports by cumulative and by self time."""
+    print(f"Total import time: {total_import_time(timings) / 1000:.1f}ms\n")
+
+    print(f"{'cumulative(ms)':>14} {'self(ms)':>9}  module")
+    for t in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top_n]:
+        print(f"{t.cumulative_us / 1000:>14.1f} {t.self_us / 1000:>9.1f}  {t.module}")
+
+    print(f"\n{'self(ms)':>9}  module")
+    for t in sorted(timings, key=lambda t: t.self_us, reverse=True)[:top_n]:
+        print(f"{t.self_us / 1000:>9.1f}  {t.module}")
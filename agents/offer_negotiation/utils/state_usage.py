@@ -0,0 +1,379 @@
+"""State field usage analysis and pruning of graph work.
+
+``StateUsageTracker`` records, for every node execution, the state fields the
+node reads (attribute access on its input state; copying the state with
+``model_dump`` is not a read) and the fields it writes (see
+``graph.utils.state_update``). Events are ordered by langgraph superstep, so a
+write is consumed when a node of a later step reads the field before or while
+it is written again. Each write is classified as:
+
+- ``consumed``: read by a later node, or a result field of the run
+- ``overwritten_unread``: written again before any node read it
+- ``never_consumed``: never read again and not a result field
+
+``StatePruner`` skips the nodes and drops the field writes that a report found
+dead, as configured under ``state_pruning`` in agent_settings.yaml.
+
+Usage:
+    python -m agents.offer_negotiation.utils.state_usage --deal-id DEAL123 DEAL001
+"""
+
+import argparse
+import functools
+import itertools
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+# Fields of the final state consumed by callers of the agent (run.py)
+RESULT_FIELDS = (
+    "deal_id",
+    "strategy",
+    "rationale",
+    "prompt_version",
+    "decision_basis",
+    "reasoning_steps",
+    "information_needs",
+)
+
+CONSUMED = "consumed"
+OVERWRITTEN_UNREAD = "overwritten_unread"
+NEVER_CONSUMED = "never_consumed"
+
+
+class FieldWriteUsage(BaseModel):
+    """How the writes of a field by a node were used across runs."""
+
+    field: str
+    consumed: int = 0
+    overwritten_unread: int = 0
+    never_consumed: int = 0
+
+    @property
+    def dead(self) -> bool:
+        """Whether no write of the field by the node was ever consumed."""
+        return self.consumed == 0
+
+
+class NodeUsage(BaseModel):
+    """State fields read and written by a node across runs."""
+
+    node: str
+    runs: int = 0
+    reads: List[str] = Field(default_factory=list)
+    writes: Dict[str, FieldWriteUsage] = Field(default_factory=dict)
+
+    @property
+    def dead_fields(self) -> List[str]:
+        return sorted(field for field, usage in self.writes.items() if usage.dead)
+
+    @property
+    def dead(self) -> bool:
+        """Whether none of the node's writes was ever consumed."""
+        return len(self.dead_fields) == len(self.writes)
+
+
+class StateUsageReport(BaseModel):
+    """Usage of the state fields over the analyzed runs."""
+
+    runs: int
+    nodes: Dict[str, NodeUsage]
+    unpopulated_fields: List[str] = Field(default_factory=list)
+
+    def pruning_settings(self) -> Dict[str, Any]:
+        """Return the ``state_pruning`` settings removing the dead work."""
+        skip_nodes = sorted(name for name, usage in self.nodes.items() if usage.dead)
+        drop_fields = {
+            name: usage.dead_fields
+            for name, usage in sorted(self.nodes.items())
+            if not usage.dead and usage.dead_fields
+        }
+        return {"enabled": True, "skip_nodes": skip_nodes, "drop_fields": drop_fields}
+
+    def format(self) -> str:
+        """Format the report as a table of writes per node."""
+        lines = [f"State usage over {self.runs} runs"]
+        for name, usage in self.nodes.items():
+            lines.append(f"\n{name} ({usage.runs} executions)")
+            lines.append(f"  reads: {', '.join(usage.reads) or '-'}")
+            for field, write in sorted(usage.writes.items()):
+                lines.append(
+                    f"  writes {field}: {write.consumed} consumed, "
+                    f"{write.overwritten_unread} overwritten unread, "
+                    f"{write.never_consumed} never consumed"
+                    + (" [dead]" if write.dead else "")
+                )
+        if self.unpopulated_fields:
+            lines.append(
+                f"\nNever written by a node: {', '.join(self.unpopulated_fields)}"
+            )
+        return "\n".join(lines)
+
+
+class _ReadRecorder:
+    """Proxy of a state model recording the fields read through it."""
+
+    __slots__ = ("_state", "_fields", "_reads")
+
+    def __init__(self, state: BaseModel):
+        object.__setattr__(self, "_state", state)
+        object.__setattr__(self, "_fields", type(state).model_fields)
+        object.__setattr__(self, "_reads", set())
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self._fields:
+            self._reads.add(name)
+        return getattr(self._state, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._state, name, value)
+
+
+def _current_step() -> Optional[int]:
+    """Return the langgraph superstep of the running node, if any."""
+    from langgraph.config import get_config
+
+    try:
+        return get_config()["metadata"]["langgraph_step"]
+    except (RuntimeError, KeyError):
+        return None
+
+
+class _RunEvents:
+    """Read and write events of one run, by field."""
+
+    def __init__(self):
+        self.max_step = 0
+        self.reads: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+        self.writes: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+        self.executions: Dict[str, int] = defaultdict(int)
+        self.node_reads: Dict[str, Set[str]] = defaultdict(set)
+
+
+class StateUsageTracker:
+    """Node wrapper recording the state fields each node reads and writes.
+
+    Instances are passed to ``create_agent_graph`` through ``node_wrappers``,
+    first so that reads made by other wrappers (cache keys, tracing) are not
+    recorded. Runs are told apart by deal ID and by the superstep restarting.
+    """
+
+    def __init__(
+        self,
+        result_fields: Iterable[str] = RESULT_FIELDS,
+        state_type: Optional[type] = None,
+    ):
+        """Initialize the tracker.
+
+        Args:
+            result_fields: Fields consumed by the caller once the run ends
+            state_type: State model whose fields are checked for population;
+                defaults to FinalState
+        """
+        self.result_fields = set(result_fields)
+        self.state_type = state_type
+        self._runs: List[_RunEvents] = []
+        self._current: Dict[str, _RunEvents] = {}
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __call__(self, node_name: str, node: Callable) -> Callable:
+        """Wrap a node so that its field reads and writes are recorded."""
+        from agents.offer_negotiation.graph.utils import state_update
+
+        @functools.wraps(node)
+        def tracked_node(state: Any, *args, **kwargs):
+            if not isinstance(state, BaseModel):
+                return node(state, *args, **kwargs)
+            step = _current_step()
+            recorder = _ReadRecorder(state)
+            output = node(recorder, *args, **kwargs)
+            if output is recorder:
+                output = state
+            update = state_update(state, output)
+            written = update.keys() if isinstance(update, dict) else ()
+            self._record(node_name, state, step, recorder._reads, written)
+            return output
+
+        return tracked_node
+
+    def _record(
+        self,
+        node_name: str,
+        state: BaseModel,
+        step: Optional[int],
+        reads: Set[str],
+        writes: Iterable[str],
+    ) -> None:
+        key = str(getattr(state, "deal_id", ""))
+        with self._lock:
+            run = self._current.get(key)
+            if step is None:
+                # Outside a graph, nodes are ordered by call
+                step = next(self._sequence)
+            elif run is not None and step < run.max_step:
+                run = None
+            if run is None:
+                run = self._current[key] = _RunEvents()
+                self._runs.append(run)
+            run.max_step = max(run.max_step, step)
+            run.executions[node_name] += 1
+            run.node_reads[node_name].update(reads)
+            for field in reads:
+                run.reads[field].append((step, node_name))
+            for field in writes:
+                run.writes[field].append((step, node_name))
+
+    def reset(self) -> None:
+        """Drop the recorded runs."""
+        with self._lock:
+            self._runs.clear()
+            self._current.clear()
+
+    def _classify(self, run: _RunEvents, field: str, step: int) -> str:
+        later_writes = [s for s, _ in run.writes[field] if s > step]
+        next_write = min(later_writes, default=None)
+        for read_step, _ in run.reads[field]:
+            if read_step > step and (next_write is None or read_step <= next_write):
+                return CONSUMED
+        if next_write is not None:
+            return OVERWRITTEN_UNREAD
+        return CONSUMED if field in self.result_fields else NEVER_CONSUMED
+
+    def report(self) -> StateUsageReport:
+        """Classify the recorded writes of every node."""
+        if self.state_type is None:
+            from agents.offer_negotiation.graph.state import FinalState
+
+            self.state_type = FinalState
+
+        nodes: Dict[str, NodeUsage] = {}
+        written: Set[str] = set()
+        with self._lock:
+            runs = list(self._runs)
+        for run in runs:
+            for name, count in run.executions.items():
+                usage = nodes.setdefault(name, NodeUsage(node=name))
+                usage.runs += count
+                usage.reads = sorted(set(usage.reads) | run.node_reads[name])
+            for field, events in run.writes.items():
+                written.add(field)
+                for step, name in events:
+                    write = nodes[name].writes.setdefault(
+                        field, FieldWriteUsage(field=field)
+                    )
+                    status = self._classify(run, field, step)
+                    setattr(write, status, getattr(write, status) + 1)
+        return StateUsageReport(
+            runs=len(runs),
+            nodes=nodes,
+            unpopulated_fields=sorted(
+                field
+                for field in self.state_type.model_fields
+                if field not in written and field != "deal_id"
+            ),
+        )
+
+
+class StatePruner:
+    """Node wrapper skipping dead nodes and dropping dead field writes.
+
+    A skipped node returns its input state unchanged, so it still completes
+    (joins waiting on it proceed) but writes nothing. Instances are passed
+    first in ``node_wrappers`` so that skipped nodes cost nothing else.
+    """
+
+    def __init__(
+        self,
+        skip_nodes: Iterable[str] = (),
+        drop_fields: Optional[Dict[str, List[str]]] = None,
+    ):
+        """Initialize the pruner.
+
+        Args:
+            skip_nodes: Nodes whose outputs are dead
+            drop_fields: Dead fields of the other nodes, by node name
+        """
+        self.skip_nodes = set(skip_nodes)
+        self.drop_fields = {
+            name: set(fields) for name, fields in (drop_fields or {}).items()
+        }
+
+    def __call__(self, node_name: str, node: Callable) -> Callable:
+        """Wrap a node so that its dead work is skipped."""
+        if node_name in self.skip_nodes:
+
+            @functools.wraps(node)
+            def skipped_node(state: Any, *args, **kwargs):
+                return state
+
+            return skipped_node
+
+        dead = self.drop_fields.get(node_name)
+        if not dead:
+            return node
+
+        @functools.wraps(node)
+        def pruned_node(state: Any, *args, **kwargs):
+            output = node(state, *args, **kwargs)
+            if not isinstance(output, BaseModel):
+                return output
+            fields = type(output).model_fields
+            return output.model_copy(
+                update={
+                    field: (
+                        getattr(state, field)
+                        if hasattr(state, field)
+                        else fields[field].get_default(call_default_factory=True)
+                    )
+                    for field in dead
+                    if field in fields
+                }
+            )
+
+        return pruned_node
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Report the state fields each graph node reads and writes."
+    )
+    parser.add_argument(
+        "--deal-id", nargs="+", default=["DEAL123"], help="Deals to run"
+    )
+    parser.add_argument("--log-level", default="WARNING", help="Log level")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> StateUsageReport:
+    import yaml
+
+    from agents.offer_negotiation.agent import build_agent, invoke_agent
+    from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level)
+
+    # Run offline, unpruned and uncached so that every node does its work
+    tracker = StateUsageTracker()
+    agent_graph = build_agent(
+        llm=FakeChatModel(), node_wrappers=[tracker], checkpointer=False
+    )
+    for deal_id in args.deal_id:
+        invoke_agent(agent_graph, deal_id)
+
+    report = tracker.report()
+    print(report.format())
+    print("\nSuggested agent_settings.yaml section:\n")
+    print(yaml.safe_dump({"state_pruning": report.pruning_settings()}))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Parsing of JSON responses into Pydantic models, with repair retries.
+
+The model is asked for JSON in its prompt rather than through a provider's
+JSON mode, so that every chat model (including the fake and recorded ones)
+is supported. A response that is not valid JSON for the schema is sent back
+to the model with the validation error, up to ``max_repairs`` times.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Callable, List, Tuple, Type, TypeVar
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+REPAIR_PROMPT = (
+    "Your response could not be parsed: {error}\n"
+    "Respond again with only the corrected JSON object, without any other text."
+)
+
+_CODE_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a response is still invalid once the repairs are spent."""
+
+
+def extract_json(text: str) -> Any:
+    """Decode the JSON object of a response, ignoring fences and prose.
+
+    Raises:
+        json.JSONDecodeError: If the response contains no valid JSON object
+    """
+    fenced = _CODE_FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        text = text[start : end + 1]
+    return json.loads(text)
+
+
+def parse_structured(text: str, schema: Type[ModelT]) -> ModelT:
+    """Parse a response into a schema.
+
+    Raises:
+        ValueError: If the response is not valid JSON for the schema
+    """
+    return schema.model_validate(extract_json(text))
+
+
+def structured_problems(text: str, schema: Type[BaseModel]) -> List[str]:
+    """Return the problems of a structured response (empty if valid)."""
+    try:
+        parse_structured(text, schema)
+    except ValueError as e:
+        return [_describe(e)]
+    return []
+
+
+def _describe(error: ValueError) -> str:
+    # Keep repair prompts short: the first lines of a validation error suffice
+    return " ".join(str(error).splitlines()[:6])
+
+
+def invoke_structured(
+    invoke: Callable[[List[BaseMessage]], Any],
+    messages: List[BaseMessage],
+    schema: Type[ModelT],
+    max_repairs: int = 1,
+) -> Tuple[ModelT, Any, int]:
+    """Invoke a chat model and parse its response, repairing invalid ones.
+
+    Args:
+        invoke: Sends messages to the chat model and returns its response
+        messages: Prompt messages
+        schema: Model the response must validate against
+        max_repairs: Repair requests sent after an invalid response
+
+    Returns:
+        Tuple of the parsed response, the response message and the number of
+        repairs requested
+
+    Raises:
+        StructuredOutputError: If the last response is still invalid
+    """
+    messages = list(messages)
+    for repairs in range(max_repairs + 1):
+        response = invoke(messages)
+        try:
+            return parse_structured(response.content, schema), response, repairs
+        except ValueError as e:
+            error = _describe(e)
+        logger.warning(f"Invalid {schema.__name__} response: {error}")
+        messages += [
+            AIMessage(content=response.content),
+            HumanMessage(content=REPAIR_PROMPT.format(error=error)),
+        ]
+    raise StructuredOutputError(
+        f"No valid {schema.__name__} after {max_repairs} repairs: {error}"
+    )
@@ -0,0 +1,90 @@
+"""Per-node timeout budgets.
+
+A node budget is propagated as a deadline in a context variable; blocking
+calls made by the node (LLM calls through HedgedChatModel) wait at most until
+the deadline and then raise NodeTimeoutError.
+"""
+
+import functools
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_deadline: ContextVar[Optional[float]] = ContextVar("node_deadline", default=None)
+
+
+class NodeTimeoutError(TimeoutError):
+    """Raised when a node exceeds its time budget."""
+
+
+def current_deadline() -> Optional[float]:
+    """Return the deadline of the running node (``time.monotonic()``), if any."""
+    return _deadline.get()
+
+
+def remaining_time() -> Optional[float]:
+    """Return the time left before the deadline of the running node, if any."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[float]:
+    """Run a block with a deadline; nested scopes keep the earliest deadline."""
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+class NodeTimeouts:
+    """Node wrapper applying per-node time budgets.
+
+    Instances are passed to ``create_agent_graph`` through ``node_wrappers``.
+    """
+
+    def __init__(self, budgets: Dict[str, float]):
+        """Initialize the wrapper.
+
+        Args:
+            budgets: Time budget of each node, in seconds
+        """
+        self.budgets = budgets
+        self.timeouts: Counter = Counter()
+        self.overruns: Counter = Counter()
+
+    def __call__(self, node_name: str, node: Callable) -> Callable:
+        """Wrap a node so that it runs within its time budget."""
+        budget = self.budgets.get(node_name)
+        if budget is None:
+            return node
+
+        @functools.wraps(node)
+        def budgeted_node(state: Any, *args, **kwargs):
+            start = time.monotonic()
+            with deadline_scope(budget):
+                try:
+                    return node(state, *args, **kwargs)
+                except NodeTimeoutError:
+                    self.timeouts[node_name] += 1
+                    raise
+                finally:
+                    elapsed = time.monotonic() - start
+                    if elapsed > budget:
+                        self.overruns[node_name] += 1
+                        logger.warning(
+                            f"Node {node_name} took {elapsed:.2f}s, "
+                            f"budget {budget:.2f}s"
+                        )
+
+        return budgeted_node
@@ -8,7 +8,8 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 
-def _get_state_value(state, key, default=None):
+def get_state_value(state, key, default=None):
+    """Read a key from a state model or a plain state dict."""
     if hasattr(state, key):
         return getattr(state, key)
     if isinstance(state, dict):
@@ -16,7 +17,8 @@ def _get_state_value(state, key, default=None):
     return default
 
 
-def _has_state_key(state, key):
+def has_state_key(state, key):
+    """Check whether a state model or plain state dict has a key."""
     if hasattr(state, key):
         return True
     if isinstance(state, dict):
@@ -43,27 +45,27 @@ def create_trace_metadata(
         "timestamp": datetime.utcnow().isoformat(),
         "node": node_name,
         "state_summary": {
-            "deal_id": _get_state_value(state, "deal_id", "unknown"),
-            "has_domain_chunks": bool(_get_state_value(state, "domain_chunks")),
-            "has_strategy": bool(_get_state_value(state, "strategy")),
-            "has_rationale": bool(_get_state_value(state, "rationale")),
+            "deal_id": get_state_value(state, "deal_id", "unknown"),
+            "has_domain_chunks": bool(get_state_value(state, "domain_chunks")),
+            "has_strategy": bool(get_state_value(state, "strategy")),
+            "has_rationale": bool(get_state_value(state, "rationale")),
         },
     }
 
     # Add information needs if present
-    if _has_state_key(state, "information_needs"):
-        metadata["state_summary"]["information_needs"] = _get_state_value(
+    if has_state_key(state, "information_needs"):
+        metadata["state_summary"]["information_needs"] = get_state_value(
             state, "information_needs"
         )
 
     # Add decision basis if present
-    if _has_state_key(state, "decision_basis"):
+    if has_state_key(state, "decision_basis"):
         metadata["state_summary"]["decision_basis"] = [
             {
                 "heuristic": decision["heuristic"],
                 "confidence": decision["confidence"],
             }
-            for decision in _get_state_value(state, "decision_basis")
+            for decision in get_state_value(state, "decision_basis")
         ]
 
     # Add any additional metadata
@@ -133,3 +135,19 @@ def add_performance_metadata(
         performance_metadata["performance"]["metrics"] = metrics
 
     return {**metadata, **performance_metadata}
+
+
+def add_memory_metadata(
+    metadata: Dict[str, Any],
+    memory: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Add memory usage information to trace metadata.
+
+    Args:
+        metadata: Existing trace metadata
+        memory: Memory metrics (allocated bytes, peak, allocation sites, ...)
+
+    Returns:
+        Updated metadata dictionary with memory information
+    """
+    return {**metadata, "memory": memory}
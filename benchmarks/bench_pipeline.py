@@ -0,0 +1,378 @@
+"""Benchmarks for the offer negotiation agent pipeline.
+
+All benchmarks run offline: strategy generation uses the deterministic
+``FakeChatModel`` with a configurable latency instead of a live LLM.
+
+Usage:
+    python -m benchmarks.bench_pipeline --output results.json
+    python -m benchmarks.bench_pipeline --compare results.json --max-chunks 10000
+"""
+
+import argparse
+import logging
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from agents.offer_negotiation.agent import build_agent, invoke_agent
+from agents.offer_negotiation.core.analytics.offer_analytics import OfferAnalytics
+from agents.offer_negotiation.core.models.deal_models import DealContext
+from agents.offer_negotiation.core.repositories.mock_deal_repository import (
+    MockDealRepository,
+)
+from agents.offer_negotiation.core.repositories.synthetic_deal_repository import (
+    SyntheticDealRepository,
+)
+from agents.offer_negotiation.graph.nodes.explain_rationale_node import (
+    create_explain_rationale_node,
+)
+from agents.offer_negotiation.graph.nodes.generate_strategy_node import (
+    build_strategy_inputs,
+    create_generate_strategy_node,
+    create_strategy_prompt,
+    evaluate_heuristics,
+    evaluate_heuristics_batch,
+)
+from agents.offer_negotiation.graph.nodes.identify_information_needs_node import (
+    create_identify_information_needs_node,
+)
+from agents.offer_negotiation.graph.nodes.retrieve_domain_knowledge_node import (
+    create_retrieve_domain_knowledge_node,
+)
+from agents.offer_negotiation.graph.state import DealContextState
+from agents.offer_negotiation.knowledge.domain_documents import (
+    DocumentProcessor,
+    DocumentType,
+    DomainDocument,
+)
+from agents.offer_negotiation.knowledge.domain_knowledge_base import DomainKnowledgeBase
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+from benchmarks.harness import (
+    BenchmarkResult,
+    compare_results,
+    run_benchmark,
+    save_results,
+)
+from config.app_config import config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS_SIZES = [10, 1_000, 100_000, 1_000_000]
+DEFAULT_RULE_BATCH_SIZES = [1_000, 100_000]
+BENCHMARK_DEAL_ID = "DEAL123"
+
+# Paragraph templates cycled to build synthetic domain corpora
+CORPUS_PARAGRAPHS = [
+    "Premium objections can be addressed by adjusting deductibles or payment terms.",
+    "Manufacturing facilities in flood zones require enhanced coverage limits.",
+    "Quarterly payments are preferred for premium amounts over $100K.",
+    "Prior negotiation history indicates the strategy the client responds to.",
+    "Business interruption coverage is capped relative to the property limit.",
+    "Claims history older than five years carries reduced underwriting weight.",
+]
+
+
+class RemoteKnowledgeBase(DomainKnowledgeBase):
+    """Knowledge base standing in for a remote vector store."""
+
+    def __init__(self, latency_seconds: float):
+        super().__init__()
+        self.latency_seconds = latency_seconds
+
+    def retrieve(self, information_need: str):
+        time.sleep(self.latency_seconds)
+        return super().retrieve(information_need)
+
+
+def make_corpus_document(paragraph_count: int) -> DomainDocument:
+    """Build a synthetic domain document with the given number of paragraphs."""
+    paragraphs = (
+        f"{CORPUS_PARAGRAPHS[i % len(CORPUS_PARAGRAPHS)]} (section {i})"
+        for i in range(paragraph_count)
+    )
+    return DomainDocument(
+        doc_id=f"synthetic_{paragraph_count}",
+        type=DocumentType.BEST_PRACTICES,
+        source_name="synthetic.md",
+        content="\n\n".join(paragraphs),
+    )
+
+
+def bench_corpus(
+    sizes: Iterable[int], min_time: float, need: str = "submission.premium_structure"
+) -> List[BenchmarkResult]:
+    """Benchmark document parsing and retrieval at increasing corpus sizes."""
+    results = []
+    processor = DocumentProcessor()
+    for size in sizes:
+        document = make_corpus_document(size)
+        chunks: list = []
+
+        def parse():
+            chunks[:] = processor.parse(document)
+
+        results.append(
+            run_benchmark("document_processor.parse", parse, {"chunks": size}, min_time)
+        )
+
+        knowledge_base = DomainKnowledgeBase()
+        knowledge_base.add_document_chunks(chunks)
+        results.append(
+            run_benchmark(
+                "knowledge_base.retrieve",
+                lambda: knowledge_base.retrieve(need),
+                {"chunks": size},
+                min_time,
+            )
+        )
+        logger.warning(f"Finished corpus benchmarks for {size} chunks")
+    return results
+
+
+def bench_rules(sizes: Iterable[int], min_time: float) -> List[BenchmarkResult]:
+    """Benchmark batch heuristic rule evaluation over synthetic deals."""
+    results = []
+    for size in sizes:
+        deals = list(SyntheticDealRepository(size).iter_deals())
+        results.append(
+            run_benchmark(
+                "rules.evaluate_batch",
+                lambda: evaluate_heuristics_batch(deals),
+                {"deals": size},
+                min_time,
+                max_iterations=100,
+            )
+        )
+    return results
+
+
+def bench_offer_analytics(
+    sizes: Iterable[int], min_time: float
+) -> List[BenchmarkResult]:
+    """Benchmark parsing a synthetic deal book into offer segment statistics."""
+    results = []
+    for size in sizes:
+        deals = list(SyntheticDealRepository(size).iter_deals())
+        results.append(
+            run_benchmark(
+                "analytics.offer_trajectories",
+                lambda: OfferAnalytics.from_deals(deals).segment_stats(),
+                {"deals": size},
+                min_time,
+                max_iterations=100,
+            )
+        )
+    return results
+
+
+def bench_nodes(min_time: float, llm_latency_ms: float) -> List[BenchmarkResult]:
+    """Benchmark each graph node on the benchmark deal."""
+    llm = FakeChatModel(latency_seconds=llm_latency_ms / 1000.0)
+    knowledge_base = DomainKnowledgeBase()
+    deal_context = MockDealRepository().get_deal_context(BENCHMARK_DEAL_ID)
+    deal_dict = deal_context.model_dump()
+
+    identify = create_identify_information_needs_node()
+    retrieve = create_retrieve_domain_knowledge_node(knowledge_base)
+    generate = create_generate_strategy_node(llm)
+    explain = create_explain_rationale_node()
+
+    deal_state = DealContextState(deal_id=BENCHMARK_DEAL_ID, deal_context=deal_dict)
+    needs_state = identify(deal_state)
+    knowledge_state = retrieve(needs_state)
+    strategy_state = generate(knowledge_state)
+
+    prompt = create_strategy_prompt()
+
+    def build_prompt():
+        decisions = evaluate_heuristics(DealContext(**deal_dict))
+        return prompt.invoke(
+            build_strategy_inputs(
+                deal_context, knowledge_state.domain_knowledge, decisions
+            )
+        )
+
+    params = {"llm_latency_ms": llm_latency_ms}
+    return [
+        run_benchmark(
+            "node.identify_information_needs",
+            lambda: identify(deal_state),
+            {},
+            min_time,
+        ),
+        run_benchmark(
+            "node.retrieve_domain_knowledge",
+            lambda: retrieve(needs_state),
+            {},
+            min_time,
+        ),
+        run_benchmark(
+            "node.generate_strategy.prompt_build", build_prompt, {}, min_time
+        ),
+        run_benchmark(
+            "node.generate_strategy",
+            lambda: generate(knowledge_state),
+            params,
+            min_time,
+        ),
+        run_benchmark(
+            "node.explain_rationale", lambda: explain(strategy_state), {}, min_time
+        ),
+    ]
+
+
+def bench_end_to_end(
+    min_time: float, llm_latency_ms: float, retrieval_latency_ms: float = 0.0
+) -> List[BenchmarkResult]:
+    """Benchmark complete graph runs (runs/sec is reported as ops_per_second).
+
+    With a retrieval latency, every knowledge base retrieval sleeps as a
+    remote vector store would, which the per-need fan-out overlaps.
+    """
+    knowledge_base = RemoteKnowledgeBase(retrieval_latency_ms / 1000.0)
+    agent_graph = build_agent(
+        knowledge_base=knowledge_base,
+        llm=FakeChatModel(latency_seconds=llm_latency_ms / 1000.0),
+        node_wrappers=[],
+    )
+    return [
+        run_benchmark(
+            "end_to_end",
+            lambda: invoke_agent(agent_graph, BENCHMARK_DEAL_ID),
+            {
+                "llm_latency_ms": llm_latency_ms,
+                "retrieval_latency_ms": retrieval_latency_ms,
+            },
+            min_time,
+        )
+    ]
+
+
+def run_suite(
+    sizes: Iterable[int] = DEFAULT_CORPUS_SIZES,
+    min_time: float = 0.5,
+    llm_latency_ms: float = 0.0,
+    rule_batch_sizes: Iterable[int] = DEFAULT_RULE_BATCH_SIZES,
+    retrieval_latency_ms: float = 0.0,
+) -> List[BenchmarkResult]:
+    """Run all pipeline benchmarks."""
+    results = bench_nodes(min_time, llm_latency_ms)
+    results.extend(bench_end_to_end(min_time, llm_latency_ms))
+    if retrieval_latency_ms:
+        results.extend(bench_end_to_end(min_time, llm_latency_ms, retrieval_latency_ms))
+    results.extend(bench_rules(rule_batch_sizes, min_time))
+    results.extend(bench_offer_analytics(rule_batch_sizes, min_time))
+    results.extend(bench_corpus(sizes, min_time))
+    return results
+
+
+def print_results(results: List[BenchmarkResult]) -> None:
+    """Print benchmark results as a table."""
+    print(f"{'benchmark':<60} {'iters':>6} {'mean':>12} {'p95':>12} {'ops/s':>12}")
+    for result in results:
+        print(
+            f"{result.key:<60} {result.iterations:>6} "
+            f"{result.mean_seconds * 1000:>10.3f}ms {result.p95_seconds * 1000:>10.3f}ms "
+            f"{result.ops_per_second:>12.1f}"
+        )
+
+
+def print_comparison(rows: List[dict]) -> None:
+    """Print a comparison with a baseline run."""
+    print(f"\n{'benchmark':<60} {'baseline':>12} {'current':>12} {'change':>8}")
+    for row in rows:
+        print(
+            f"{row['benchmark']:<60} "
+            f"{row['baseline_mean_seconds'] * 1000:>10.3f}ms "
+            f"{row['current_mean_seconds'] * 1000:>10.3f}ms "
+            f"{row['change']:>+8.1%}"
+        )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the agent pipeline.")
+    parser.add_argument("--output", type=Path, help="Path of the JSON results file")
+    parser.add_argument("--compare", type=Path, help="Baseline results to compare")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_CORPUS_SIZES,
+        help="Corpus sizes (number of chunks) for parse and retrieve benchmarks",
+    )
+    parser.add_argument(
+        "--rule-batch-sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_RULE_BATCH_SIZES,
+        help="Numbers of synthetic deals per heuristic and offer analytics batch",
+    )
+    parser.add_argument(
+        "--max-chunks", type=int, help="Skip corpus sizes above this number of chunks"
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.5,
+        help="Minimum measured time per benchmark, in seconds",
+    )
+    parser.add_argument(
+        "--llm-latency-ms",
+        type=float,
+        default=0.0,
+        help="Latency of the fake LLM, in milliseconds",
+    )
+    parser.add_argument(
+        "--retrieval-latency-ms",
+        type=float,
+        default=0.0,
+        help="Also run end to end with this latency per knowledge base retrieval",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="WARNING",
+        help="Log level during the benchmarks (node logging is verbose)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> List[BenchmarkResult]:
+    args = parse_args(argv)
+    logging.getLogger().setLevel(args.log_level)
+
+    sizes = [s for s in args.sizes if args.max_chunks is None or s <= args.max_chunks]
+    results = run_suite(
+        sizes,
+        args.min_time,
+        args.llm_latency_ms,
+        args.rule_batch_sizes,
+        args.retrieval_latency_ms,
+    )
+    print_results(results)
+
+    output = args.output or (
+        config.logs_dir
+        / "benchmarks"
+        / f"pipeline_{datetime.now(UTC).strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    save_results(
+        results,
+        output,
+        {
+            "llm_latency_ms": args.llm_latency_ms,
+            "retrieval_latency_ms": args.retrieval_latency_ms,
+            "corpus_sizes": sizes,
+            "rule_batch_sizes": args.rule_batch_sizes,
+        },
+    )
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        print_comparison(compare_results(results, args.compare))
+    return results
+
+
+if __name__ == "__main__":
+    main()
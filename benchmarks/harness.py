@@ -0,0 +1,150 @@
+"""Timing harness shared by the agent benchmarks."""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class BenchmarkResult(BaseModel):
+    """Timing statistics of a single benchmark."""
+
+    name: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+    iterations: int
+    mean_seconds: float
+    min_seconds: float
+    p50_seconds: float
+    p95_seconds: float
+    ops_per_second: float
+
+    @property
+    def key(self) -> str:
+        """Unique key of the benchmark, including its parameters."""
+        if not self.params:
+            return self.name
+        params = ",".join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        return f"{self.name}[{params}]"
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_benchmark(
+    name: str,
+    fn: Callable[[], Any],
+    params: Optional[Dict[str, Any]] = None,
+    min_time: float = 0.5,
+    max_iterations: int = 1000,
+) -> BenchmarkResult:
+    """Time a callable repeatedly until min_time or max_iterations is reached.
+
+    The first call is treated as warm-up unless it alone exceeds min_time, in
+    which case it is the only measurement (large corpus sizes).
+
+    Args:
+        name: Benchmark name
+        fn: Callable to time
+        params: Parameters of the benchmark (corpus size, latency, ...)
+        min_time: Minimum total measured time in seconds
+        max_iterations: Maximum number of measured calls
+
+    Returns:
+        Timing statistics of the measured calls
+    """
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+
+    timings = [first] if first >= min_time else []
+    total = sum(timings)
+    while total < min_time and len(timings) < max_iterations:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        total += elapsed
+
+    mean = statistics.fmean(timings)
+    return BenchmarkResult(
+        name=name,
+        params=params or {},
+        iterations=len(timings),
+        mean_seconds=mean,
+        min_seconds=min(timings),
+        p50_seconds=percentile(timings, 0.5),
+        p95_seconds=percentile(timings, 0.95),
+        ops_per_second=1.0 / mean if mean > 0 else float("inf"),
+    )
+
+
+def _git_revision() -> Optional[str]:
+    """Return the current git revision, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(
+    results: List[BenchmarkResult],
+    path: Path,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Save benchmark results and run metadata to a JSON file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "metadata": {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **(metadata or {}),
+        },
+        "results": {result.key: result.model_dump() for result in results},
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+
+def compare_results(
+    results: List[BenchmarkResult], baseline_path: Path
+) -> List[Dict[str, Any]]:
+    """Compare benchmark results with a previously saved run.
+
+    Returns:
+        One row per benchmark present in both runs, with the baseline and
+        current mean and the relative change (negative is faster)
+    """
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)["results"]
+
+    rows = []
+    for result in results:
+        if result.key not in baseline:
+            continue
+        before = baseline[result.key]["mean_seconds"]
+        rows.append(
+            {
+                "benchmark": result.key,
+                "baseline_mean_seconds": before,
+                "current_mean_seconds": result.mean_seconds,
+                "change": (result.mean_seconds - before) / before if before else 0.0,
+            }
+        )
+    return rows
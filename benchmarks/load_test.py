@@ -0,0 +1,370 @@
+"""Load-test driver replaying synthetic deals against the agent.
+
+Requests are issued open-loop at a fixed or linearly ramping rate, so a
+saturated agent shows up as growing queue depth and latency rather than as a
+lower request rate. The agent runs in-process against a stubbed LLM with a
+log-normal latency distribution, or is called over HTTP.
+
+Usage:
+    python -m benchmarks.load_test --rate 10 --ramp-to 100 --duration 60
+    python -m benchmarks.load_test --rate 20 --hedge-percentile 0.95
+    python -m benchmarks.load_test --url http://localhost:8000/run --rate 20
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from pydantic import BaseModel, Field
+
+from agents.offer_negotiation.agent import build_agent, invoke_agent
+from agents.offer_negotiation.core.repositories.synthetic_deal_repository import (
+    SyntheticDealRepository,
+)
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+from agents.offer_negotiation.utils.hedging import HedgedChatModel
+from benchmarks.harness import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class RequestRecord(BaseModel):
+    """Timing of a single load-test request, relative to the test start."""
+
+    deal_id: str
+    scheduled: float
+    started: float = 0.0
+    finished: float = 0.0
+    ok: bool = False
+    error: Optional[str] = None
+
+
+class WindowStats(BaseModel):
+    """Load-test statistics over a time window."""
+
+    start: float
+    offered_rate: float
+    completed: int
+    throughput: float
+    error_rate: float
+    queue_depth: int
+    latency_p50: Optional[float] = None
+    latency_p95: Optional[float] = None
+    latency_p99: Optional[float] = None
+
+
+class LoadTestReport(BaseModel):
+    """Complete load-test report."""
+
+    requests: int
+    completed: int
+    errors: int
+    duration_seconds: float
+    throughput: float
+    latency_p50: Optional[float] = None
+    latency_p95: Optional[float] = None
+    latency_p99: Optional[float] = None
+    max_queue_depth: int = 0
+    windows: List[WindowStats] = Field(default_factory=list)
+
+
+def offered_rate(
+    elapsed: float, rate: float, ramp_to: Optional[float], duration: float
+):
+    """Return the target request rate at a point in time of the test."""
+    if ramp_to is None or duration <= 0:
+        return rate
+    return rate + (ramp_to - rate) * min(1.0, elapsed / duration)
+
+
+def make_stub_llm(
+    llm_latency_ms: float = 0.0,
+    llm_latency_sigma: float = 0.0,
+    llm_error_rate: float = 0.0,
+    seed: int = 0,
+) -> FakeChatModel:
+    """Build the stubbed LLM with a log-normal latency distribution."""
+    return FakeChatModel(
+        latency_seconds=llm_latency_ms / 1000.0,
+        latency_sigma=llm_latency_sigma,
+        error_rate=llm_error_rate,
+        seed=seed,
+    )
+
+
+def in_process_target(
+    deal_count: int = 1000,
+    llm_latency_ms: float = 0.0,
+    llm_latency_sigma: float = 0.0,
+    llm_error_rate: float = 0.0,
+    seed: int = 0,
+    llm: Optional[BaseChatModel] = None,
+) -> Callable[[str], dict]:
+    """Build an in-process agent against synthetic deals and a stubbed LLM.
+
+    A given ``llm`` (e.g. a HedgedChatModel around the stub) replaces the
+    stubbed LLM built from the latency and error settings.
+    """
+    if llm is None:
+        llm = make_stub_llm(llm_latency_ms, llm_latency_sigma, llm_error_rate, seed)
+    agent_graph = build_agent(
+        deal_repo=SyntheticDealRepository(deal_count, seed=seed),
+        llm=llm,
+        node_wrappers=[],
+    )
+    return lambda deal_id: invoke_agent(agent_graph, deal_id)
+
+
+def http_target(url: str, timeout: float = 60.0) -> Callable[[str], dict]:
+    """Build a target posting deal IDs to an agent HTTP endpoint."""
+    import httpx
+
+    client = httpx.Client(timeout=timeout)
+
+    def call(deal_id: str) -> dict:
+        response = client.post(url, json={"deal_id": deal_id})
+        response.raise_for_status()
+        return response.json()
+
+    return call
+
+
+def run_load_test(
+    target: Callable[[str], dict],
+    deal_ids: List[str],
+    rate: float,
+    duration: float,
+    ramp_to: Optional[float] = None,
+    workers: int = 32,
+    window: float = 1.0,
+) -> LoadTestReport:
+    """Drive a target at a fixed or ramping request rate.
+
+    Args:
+        target: Callable running the agent for a deal ID
+        deal_ids: Deal IDs replayed round-robin
+        rate: Initial request rate (requests per second)
+        duration: Test duration in seconds
+        ramp_to: Final request rate of a linear ramp; fixed rate if None
+        workers: Number of concurrent agent runs
+        window: Length of the reporting windows in seconds
+
+    Returns:
+        Load-test report with overall and per-window statistics
+    """
+    records: List[RequestRecord] = []
+    lock = threading.Lock()
+    counters = {"submitted": 0, "started": 0}
+    queue_samples: List[tuple] = []
+
+    def execute(record: RequestRecord, origin: float) -> None:
+        record.started = time.perf_counter() - origin
+        with lock:
+            counters["started"] += 1
+        try:
+            target(record.deal_id)
+            record.ok = True
+        except Exception as e:
+            record.error = f"{e.__class__.__name__}: {e}"
+        record.finished = time.perf_counter() - origin
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    origin = time.perf_counter()
+    next_send = 0.0
+    index = 0
+    try:
+        while next_send < duration:
+            now = time.perf_counter() - origin
+            if now < next_send:
+                time.sleep(min(next_send - now, 0.01))
+                with lock:
+                    queue_samples.append(
+                        (now, counters["submitted"] - counters["started"])
+                    )
+                continue
+
+            record = RequestRecord(
+                deal_id=deal_ids[index % len(deal_ids)], scheduled=next_send
+            )
+            records.append(record)
+            with lock:
+                counters["submitted"] += 1
+            executor.submit(execute, record, origin)
+            index += 1
+            next_send += 1.0 / max(
+                offered_rate(next_send, rate, ramp_to, duration), 1e-6
+            )
+    finally:
+        executor.shutdown(wait=True)
+    elapsed = time.perf_counter() - origin
+
+    return build_report(
+        records, queue_samples, elapsed, rate, ramp_to, duration, window
+    )
+
+
+def build_report(
+    records: List[RequestRecord],
+    queue_samples: List[tuple],
+    elapsed: float,
+    rate: float,
+    ramp_to: Optional[float],
+    duration: float,
+    window: float,
+) -> LoadTestReport:
+    """Aggregate request records into overall and per-window statistics.
+
+    Latency is measured from the scheduled send time, so time spent queued
+    behind busy workers is included.
+    """
+    completed = [r for r in records if r.ok]
+    latencies = [r.finished - r.scheduled for r in completed]
+
+    windows = []
+    window_count = max(1, int(elapsed / window + 0.999))
+    for w in range(window_count):
+        start, end = w * window, (w + 1) * window
+        finished = [r for r in records if start <= r.finished < end]
+        ok = [r.finished - r.scheduled for r in finished if r.ok]
+        depths = [depth for t, depth in queue_samples if start <= t < end]
+        windows.append(
+            WindowStats(
+                start=start,
+                offered_rate=offered_rate(start, rate, ramp_to, duration),
+                completed=len(ok),
+                throughput=len(ok) / window,
+                error_rate=(
+                    (len(finished) - len(ok)) / len(finished) if finished else 0.0
+                ),
+                queue_depth=max(depths, default=0),
+                latency_p50=percentile(ok, 0.50) if ok else None,
+                latency_p95=percentile(ok, 0.95) if ok else None,
+                latency_p99=percentile(ok, 0.99) if ok else None,
+            )
+        )
+
+    return LoadTestReport(
+        requests=len(records),
+        completed=len(completed),
+        errors=len(records) - len(completed),
+        duration_seconds=elapsed,
+        throughput=len(completed) / elapsed if elapsed > 0 else 0.0,
+        latency_p50=percentile(latencies, 0.50) if latencies else None,
+        latency_p95=percentile(latencies, 0.95) if latencies else None,
+        latency_p99=percentile(latencies, 0.99) if latencies else None,
+        max_queue_depth=max((depth for _, depth in queue_samples), default=0),
+        windows=windows,
+    )
+
+
+def print_report(report: LoadTestReport) -> None:
+    """Print a load-test report as a table over time."""
+
+    def ms(value: Optional[float]) -> str:
+        return f"{value * 1000:.1f}" if value is not None else "-"
+
+    print(
+        f"{'t(s)':>6} {'offered':>8} {'done/s':>8} {'errors':>7} {'queue':>6} "
+        f"{'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9}"
+    )
+    for w in report.windows:
+        print(
+            f"{w.start:>6.1f} {w.offered_rate:>8.1f} {w.throughput:>8.1f} "
+            f"{w.error_rate:>7.1%} {w.queue_depth:>6} {ms(w.latency_p50):>9} "
+            f"{ms(w.latency_p95):>9} {ms(w.latency_p99):>9}"
+        )
+    print(
+        f"\n{report.completed}/{report.requests} completed, {report.errors} errors, "
+        f"{report.throughput:.1f} req/s, p50 {ms(report.latency_p50)}ms, "
+        f"p95 {ms(report.latency_p95)}ms, p99 {ms(report.latency_p99)}ms, "
+        f"max queue depth {report.max_queue_depth}"
+    )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Load-test the negotiation agent.")
+    parser.add_argument("--rate", type=float, default=10.0, help="Requests/second")
+    parser.add_argument("--ramp-to", type=float, help="Final rate of a linear ramp")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument("--workers", type=int, default=32, help="Concurrent runs")
+    parser.add_argument("--window", type=float, default=1.0, help="Report window")
+    parser.add_argument("--deals", type=int, default=1000, help="Synthetic deals")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic deal seed")
+    parser.add_argument("--url", help="Agent HTTP endpoint; in-process if omitted")
+    parser.add_argument(
+        "--llm-latency-ms", type=float, default=500.0, help="Median LLM latency"
+    )
+    parser.add_argument(
+        "--llm-latency-sigma",
+        type=float,
+        default=0.5,
+        help="Log-normal sigma of the LLM latency",
+    )
+    parser.add_argument(
+        "--llm-error-rate", type=float, default=0.0, help="Fraction of LLM failures"
+    )
+    parser.add_argument(
+        "--hedge-percentile",
+        type=float,
+        help="Hedge stubbed LLM calls slower than this latency percentile",
+    )
+    parser.add_argument("--output", type=Path, help="Path of the JSON report")
+    parser.add_argument("--log-level", default="WARNING", help="Log level")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> LoadTestReport:
+    args = parse_args(argv)
+    logging.getLogger().setLevel(args.log_level)
+
+    deal_ids = SyntheticDealRepository(args.deals, seed=args.seed).list_deal_ids()
+    llm = None
+    if args.url:
+        target = http_target(args.url)
+    else:
+        llm = make_stub_llm(
+            args.llm_latency_ms,
+            args.llm_latency_sigma,
+            args.llm_error_rate,
+            args.seed,
+        )
+        if args.hedge_percentile is not None:
+            llm = HedgedChatModel(
+                inner=llm, percentile=args.hedge_percentile, max_workers=args.workers
+            )
+        target = in_process_target(args.deals, seed=args.seed, llm=llm)
+
+    report = run_load_test(
+        target,
+        deal_ids,
+        rate=args.rate,
+        duration=args.duration,
+        ramp_to=args.ramp_to,
+        workers=args.workers,
+        window=args.window,
+    )
+    print_report(report)
+    if isinstance(llm, HedgedChatModel):
+        stats = llm.stats
+        print(
+            f"Hedging: {stats.hedged}/{stats.calls} calls hedged "
+            f"({stats.hedge_rate:.1%}), {stats.hedge_wins} hedge wins, "
+            f"{stats.abandoned} abandoned"
+        )
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report.model_dump(), f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
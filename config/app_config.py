@@ -18,9 +18,6 @@ class AppConfig:
         self._data_dir = Path(os.getenv("DATA_DIR", self._base_dir / "data"))
         self._logs_dir = Path(os.getenv("LOGS_DIR", self._base_dir / "logs"))
 
-        # Ensure directories exist
-        self._logs_dir.mkdir(exist_ok=True)
-
     @property
     def base_dir(self) -> Path:
         """Base directory of the application."""
@@ -52,6 +49,11 @@ class AppConfig:
         """Path to model settings YAML file."""
         return self._config_dir / "model_settings.yaml"
 
+    @property
+    def agent_settings_path(self) -> Path:
+        """Path to agent settings YAML file."""
+        return self._config_dir / "agent_settings.yaml"
+
     @property
     def prompts_dir(self) -> Path:
         """Path to prompts directory."""
@@ -103,6 +105,46 @@ class AppConfig:
         """LangChain project name."""
         return os.getenv("LANGCHAIN_PROJECT", "OfferNegotiationAgent")
 
+    @property
+    def profile_enabled(self) -> bool:
+        """Whether per-node CPU profiling is enabled."""
+        return os.getenv("AGENT_PROFILE", "false").lower() == "true"
+
+    @property
+    def profile_dir(self) -> Path:
+        """Directory where node profiles are written."""
+        return Path(os.getenv("AGENT_PROFILE_DIR", self._logs_dir / "profiles"))
+
+    @property
+    def profile_interval_ms(self) -> float:
+        """Stack sampling interval of the node profiler, in milliseconds."""
+        return float(os.getenv("AGENT_PROFILE_INTERVAL_MS", "1.0"))
+
+    @property
+    def profile_sample_rate(self) -> float:
+        """Fraction of node executions that are profiled (0.0 - 1.0)."""
+        return float(os.getenv("AGENT_PROFILE_SAMPLE_RATE", "1.0"))
+
+    @property
+    def memory_tracking_enabled(self) -> bool:
+        """Whether per-node memory tracking is enabled."""
+        return os.getenv("AGENT_MEMORY_TRACKING", "false").lower() == "true"
+
+    @property
+    def llm_backend_mode(self) -> Optional[str]:
+        """LLM backend mode override (live, record or replay)."""
+        return os.getenv("LLM_BACKEND_MODE")
+
+    @property
+    def llm_cassette_path(self) -> Optional[str]:
+        """Cassette file override for the record/replay LLM backend."""
+        return os.getenv("LLM_CASSETTE_PATH")
+
+    @property
+    def llm_cassette_on_miss(self) -> Optional[str]:
+        """Replay miss policy override (error or fallback)."""
+        return os.getenv("LLM_CASSETTE_ON_MISS")
+
     def validate(self) -> bool:
         """Validate that required configuration is present."""
         errors = []
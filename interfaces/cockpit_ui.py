@@ -0,0 +1,426 @@
+"""Live cockpit of agent runs, streamed to browsers over server-sent events.
+
+The cockpit subscribes to the node events of the graph runs in its process
+(agents/offer_negotiation/utils/node_events.py): each node start, finish and
+failure, with the deal, node duration, domain knowledge chunks and LLM
+tokens. Connected clients receive every event, plus periodic ``stats``
+messages with the throughput and latency of the runs and nodes of the last
+``window_seconds``, and the nodes running for more than ``stuck_after``
+seconds.
+
+The agent never waits for the cockpit. A node event only updates counters and
+is handed to the cockpit's event loop with ``call_soon_threadsafe``; each
+client has a bounded queue which drops its oldest events when the client
+falls behind (unlike the deal event bus, whose producers wait for room).
+
+Usage:
+    python -m interfaces.cockpit_ui --deal-id DEAL123 DEAL001 --repeat 100
+    curl -N http://127.0.0.1:8800/events
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from agents.offer_negotiation.utils.node_events import (
+    NodeEvent,
+    NodeEventPublisher,
+    NodeEventType,
+    get_node_event_publisher,
+)
+
+logger = logging.getLogger(__name__)
+
+# Node whose finish ends a run
+FINAL_NODE = "explain_rationale"
+
+# Samples kept per node, and runs kept, within the window
+_MAX_SAMPLES = 10_000
+
+
+class NodeStats(BaseModel):
+    """Latency and tokens of a node over the window."""
+
+    node: str
+    finished: int = 0
+    failed: int = 0
+    mean_seconds: float = 0.0
+    p50_seconds: float = 0.0
+    p95_seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+class RunningNode(BaseModel):
+    """A node that has started and not finished yet."""
+
+    deal_id: str
+    node: str
+    started_at: datetime
+    elapsed_seconds: float
+    stuck: bool = False
+
+
+class CockpitStats(BaseModel):
+    """Aggregates of the runs of the window."""
+
+    window_seconds: float
+    runs_finished: int = 0
+    runs_failed: int = 0
+    runs_per_second: float = 0.0
+    run_p50_seconds: float = 0.0
+    run_p95_seconds: float = 0.0
+    nodes: List[NodeStats] = []
+    running: List[RunningNode] = []
+    clients: int = 0
+    dropped_events: int = 0
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+class RunAggregates:
+    """Thread-safe sliding-window aggregates of node events."""
+
+    def __init__(
+        self,
+        window_seconds: float = 300.0,
+        stuck_after: float = 120.0,
+        final_node: str = FINAL_NODE,
+    ):
+        self.window_seconds = window_seconds
+        self.stuck_after = stuck_after
+        self.final_node = final_node
+        self._lock = threading.Lock()
+        # (timestamp, event) of the finished and failed nodes, by node
+        self._nodes: Dict[str, Deque[Tuple[float, NodeEvent]]] = {}
+        # (timestamp, duration, failed) of the finished runs
+        self._runs: Deque[Tuple[float, float, bool]] = deque(maxlen=_MAX_SAMPLES)
+        # Start times of the running nodes by deal and node; a node fanned out
+        # over the information needs of a deal runs several times at once
+        self._running: Dict[Tuple[str, str], List[float]] = {}
+        self._run_started: Dict[str, float] = {}
+        self._started_at = time.time()
+
+    def record(self, event: NodeEvent) -> None:
+        """Count a node event."""
+        key = (event.deal_id, event.node)
+        with self._lock:
+            if event.type == NodeEventType.NODE_STARTED:
+                self._running.setdefault(key, []).append(event.timestamp)
+                self._run_started.setdefault(event.deal_id, event.timestamp)
+                return
+            started = self._running.get(key)
+            if started:
+                started.pop(0)
+                if not started:
+                    del self._running[key]
+            samples = self._nodes.setdefault(event.node, deque(maxlen=_MAX_SAMPLES))
+            samples.append((event.timestamp, event))
+            failed = event.type == NodeEventType.NODE_FAILED
+            if failed or event.node == self.final_node:
+                started = self._run_started.pop(event.deal_id, event.timestamp)
+                self._runs.append((event.timestamp, event.timestamp - started, failed))
+
+    def stats(self, now: Optional[float] = None) -> CockpitStats:
+        """Return the aggregates of the window ending now."""
+        now = time.time() if now is None else now
+        since = now - self.window_seconds
+        with self._lock:
+            runs = [run for run in self._runs if run[0] >= since]
+            node_events = {
+                node: [event for timestamp, event in samples if timestamp >= since]
+                for node, samples in self._nodes.items()
+            }
+            running = [
+                (key, start)
+                for key, starts in self._running.items()
+                for start in starts
+            ]
+
+        finished_runs = [duration for _, duration, failed in runs if not failed]
+        stats = CockpitStats(
+            window_seconds=self.window_seconds,
+            runs_finished=len(finished_runs),
+            runs_failed=len(runs) - len(finished_runs),
+            runs_per_second=len(finished_runs)
+            / max(min(self.window_seconds, now - self._started_at), 1e-9),
+            run_p50_seconds=_percentile(finished_runs, 0.5),
+            run_p95_seconds=_percentile(finished_runs, 0.95),
+        )
+        for node, events in sorted(node_events.items()):
+            durations = [
+                e.duration_seconds or 0.0
+                for e in events
+                if e.type == NodeEventType.NODE_FINISHED
+            ]
+            stats.nodes.append(
+                NodeStats(
+                    node=node,
+                    finished=len(durations),
+                    failed=len(events) - len(durations),
+                    mean_seconds=sum(durations) / len(durations) if durations else 0.0,
+                    p50_seconds=_percentile(durations, 0.5),
+                    p95_seconds=_percentile(durations, 0.95),
+                    input_tokens=sum(e.tokens.input_tokens for e in events if e.tokens),
+                    output_tokens=sum(
+                        e.tokens.output_tokens for e in events if e.tokens
+                    ),
+                )
+            )
+        for (deal_id, node), started in sorted(running, key=lambda item: item[1]):
+            elapsed = now - started
+            stats.running.append(
+                RunningNode(
+                    deal_id=deal_id,
+                    node=node,
+                    started_at=datetime.fromtimestamp(started, tz=timezone.utc),
+                    elapsed_seconds=elapsed,
+                    stuck=elapsed > self.stuck_after,
+                )
+            )
+        return stats
+
+
+class CockpitClient:
+    """Bounded queue of the events of one connected client."""
+
+    def __init__(self, max_queued_events: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued_events)
+        self.dropped = 0
+
+    def put(self, event: NodeEvent) -> None:
+        """Queue an event, dropping the oldest one if the client is behind."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class Cockpit:
+    """Streams the node events of the process to connected clients."""
+
+    def __init__(
+        self,
+        publisher: Optional[NodeEventPublisher] = None,
+        max_queued_events: int = 1000,
+        window_seconds: float = 300.0,
+        stuck_after: float = 120.0,
+        stats_interval: float = 1.0,
+    ):
+        """Create a cockpit.
+
+        Args:
+            publisher: Publisher of the node events; defaults to the
+                process-wide one installed by default_node_wrappers
+            max_queued_events: Events queued per client before its oldest
+                events are dropped
+            window_seconds: Window of the throughput and latency aggregates
+            stuck_after: Seconds after which a running node is flagged stuck
+            stats_interval: Seconds between the stats messages of a stream
+        """
+        self.publisher = publisher or get_node_event_publisher()
+        self.max_queued_events = max_queued_events
+        self.stats_interval = stats_interval
+        self.aggregates = RunAggregates(window_seconds, stuck_after)
+        self.clients: Set[CockpitClient] = set()
+        self._dropped_by_gone_clients = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.publisher.subscribe(self._on_event)
+
+    def attach(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Stream events to clients served by an event loop.
+
+        Args:
+            loop: Loop of the clients; defaults to the running loop
+        """
+        self._loop = loop or asyncio.get_running_loop()
+
+    def close(self) -> None:
+        """Stop receiving node events."""
+        self.publisher.unsubscribe(self._on_event)
+        self._loop = None
+
+    def _on_event(self, event: NodeEvent) -> None:
+        """Receive a node event on the thread of the node."""
+        self.aggregates.record(event)
+        loop = self._loop
+        if loop is None or not self.clients:
+            return
+        try:
+            loop.call_soon_threadsafe(self._fan_out, event)
+        except RuntimeError:
+            # The loop was closed while the agent kept running
+            self._loop = None
+
+    def _fan_out(self, event: NodeEvent) -> None:
+        for client in self.clients:
+            client.put(event)
+
+    def connect(self) -> CockpitClient:
+        """Register a client; call from the attached loop."""
+        client = CockpitClient(self.max_queued_events)
+        self.clients.add(client)
+        return client
+
+    def disconnect(self, client: CockpitClient) -> None:
+        if client in self.clients:
+            self.clients.discard(client)
+            self._dropped_by_gone_clients += client.dropped
+
+    def stats(self) -> CockpitStats:
+        """Return the aggregates of the window and the client counters."""
+        stats = self.aggregates.stats()
+        stats.clients = len(self.clients)
+        stats.dropped_events = self._dropped_by_gone_clients + sum(
+            client.dropped for client in self.clients
+        )
+        return stats
+
+    async def stream(self, client: CockpitClient) -> AsyncIterator[str]:
+        """Yield the events of a client as server-sent events.
+
+        A ``stats`` event is sent first and then every ``stats_interval``
+        seconds; the client is disconnected when the iteration stops.
+        """
+        try:
+            next_stats = time.monotonic()
+            while True:
+                timeout = next_stats - time.monotonic()
+                if timeout <= 0:
+                    yield format_sse("stats", self.stats().model_dump())
+                    next_stats = time.monotonic() + self.stats_interval
+                    continue
+                try:
+                    event = await asyncio.wait_for(client.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    continue
+                yield format_sse(event.type.value, event.model_dump())
+        finally:
+            self.disconnect(client)
+
+
+def create_cockpit() -> Cockpit:
+    """Create a cockpit with the settings of agent_settings.yaml."""
+    from agents.offer_negotiation.utils.agent_settings import load_agent_settings
+
+    settings = load_agent_settings().cockpit
+    return Cockpit(
+        max_queued_events=settings.max_queued_events,
+        window_seconds=settings.window_seconds,
+        stuck_after=settings.stuck_after,
+        stats_interval=settings.stats_interval,
+    )
+
+
+def create_app(cockpit: Optional[Cockpit] = None):
+    """Create the FastAPI app of a cockpit.
+
+    Routes:
+        GET /events: server-sent node events and periodic stats
+        GET /stats: current aggregates, as JSON
+    """
+    from contextlib import asynccontextmanager
+
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+
+    cockpit = cockpit or create_cockpit()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        cockpit.attach()
+        yield
+        cockpit.close()
+
+    app = FastAPI(title="Offer negotiation cockpit", lifespan=lifespan)
+
+    @app.get("/events")
+    async def events():
+        return StreamingResponse(
+            cockpit.stream(cockpit.connect()),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+        )
+
+    @app.get("/stats")
+    async def stats():
+        return cockpit.stats().model_dump()
+
+    app.state.cockpit = cockpit
+    return app
+
+
+def _run_deals(deal_ids: List[str], repeat: int) -> None:
+    from agents.offer_negotiation.agent import (
+        build_agent,
+        default_node_wrappers,
+        invoke_agent,
+    )
+
+    wrappers = default_node_wrappers()
+    publisher = get_node_event_publisher()
+    if publisher not in wrappers:
+        wrappers.append(publisher)
+    agent_graph = build_agent(node_wrappers=wrappers)
+    for _ in range(repeat):
+        for deal_id in deal_ids:
+            try:
+                invoke_agent(agent_graph, deal_id)
+            except Exception as e:
+                logger.error(f"Run of {deal_id} failed: {e}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Serve the live cockpit of the agent runs of this process."
+    )
+    parser.add_argument("--deal-id", nargs="+", help="Deals to run while serving")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs of each deal")
+    parser.add_argument("--host", help="Host to listen on")
+    parser.add_argument("--port", type=int, help="Port to listen on")
+    parser.add_argument("--log-level", default="WARNING", help="Log level")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    import uvicorn
+
+    from agents.offer_negotiation.utils.agent_settings import load_agent_settings
+
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level)
+    settings = load_agent_settings().cockpit
+    app = create_app()
+    if args.deal_id:
+        threading.Thread(
+            target=_run_deals, args=(args.deal_id, args.repeat), daemon=True
+        ).start()
+    uvicorn.run(
+        app,
+        host=args.host or settings.host,
+        port=args.port or settings.port,
+        log_level=args.log_level.lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,463 @@
+"""In-process message bus carrying deal events to agent workers.
+
+Producers publish events (a deal was updated, an objection was added, a
+strategy is ready) and every subscription to the event type receives them in
+its own asyncio queue. A subscription holds at most ``capacity`` events,
+queued or being handled: ``publish`` waits for room and ``publish_nowait``
+raises ``BusFull``, so a slow consumer slows its producers down instead of
+growing memory.
+
+Delivery is at least once. An event stays counted against the capacity until
+its handler returns; when the handler raises or times out, the event is
+delivered again, up to ``max_attempts`` times, and is then kept with the
+subscription's dead letters.
+
+Handlers running the agent in a worker thread cannot be interrupted. The
+handler timeout is passed to the thread as a deadline (see
+agents/offer_negotiation/utils/timeouts.py), so its LLM calls fail once it
+expires. A timed-out thread keeps running until it returns, and the next run
+of the same deal waits for it, so a deal is never run twice at once.
+
+Strategies are refreshed on deal events, within a running event loop, with::
+
+    bus = create_message_bus()
+    consumer = serve_strategy_refreshes(bus)
+    await bus.publish(Event(type=EventType.DEAL_UPDATED, deal_id="DEAL123"))
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+import uuid
+from collections import deque
+from contextlib import nullcontext
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from pydantic import BaseModel, Field
+
+from agents.offer_negotiation.utils.timeouts import deadline_scope
+
+logger = logging.getLogger(__name__)
+
+
+class EventType(str, Enum):
+    """Types of deal events."""
+
+    DEAL_UPDATED = "deal_updated"
+    OBJECTION_ADDED = "objection_added"
+    STRATEGY_READY = "strategy_ready"
+
+
+# Events after which the strategy of a deal is regenerated
+REFRESH_EVENTS = (EventType.DEAL_UPDATED, EventType.OBJECTION_ADDED)
+
+
+class Event(BaseModel):
+    """A deal event."""
+
+    type: EventType
+    deal_id: str
+    data: Dict[str, Any] = Field(default_factory=dict)
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: float = Field(default_factory=time.time)
+
+
+class BusFull(Exception):
+    """Raised when a subscription has no room for a published event."""
+
+
+# Handlers are coroutine functions, or functions run in a worker thread; a
+# coroutine running threads of its own exposes their DealThreads as `threads`
+Handler = Callable[[Event], Union[Awaitable[Any], Any]]
+
+
+class SubscriptionStats(BaseModel):
+    """Counters of a subscription."""
+
+    published: int = 0
+    acked: int = 0
+    redelivered: int = 0
+    dead_lettered: int = 0
+    pending: int = 0
+
+
+class Delivery:
+    """An event delivered to a consumer, to acknowledge once handled."""
+
+    def __init__(self, subscription: "Subscription", event: Event, attempt: int):
+        self.subscription = subscription
+        self.event = event
+        self.attempt = attempt
+        self._settled = False
+
+    def ack(self) -> None:
+        """Acknowledge the event, releasing its room in the subscription."""
+        if not self._settled:
+            self._settled = True
+            self.subscription._settle(self, acked=True)
+
+    def nack(self) -> None:
+        """Deliver the event again, or dead-letter it after the last attempt."""
+        if not self._settled:
+            self._settled = True
+            self.subscription._settle(self, acked=False)
+
+
+class Subscription:
+    """Bounded queue of the events of some types, for one group of consumers."""
+
+    def __init__(
+        self,
+        name: str,
+        event_types: Optional[Iterable[EventType]],
+        capacity: int,
+        max_attempts: int,
+        max_dead_letters: int = 1000,
+    ):
+        self.name = name
+        self.event_types = set(event_types) if event_types is not None else None
+        self.capacity = capacity
+        self.max_attempts = max_attempts
+        self.dead_letters: deque = deque(maxlen=max_dead_letters)
+        self.stats = SubscriptionStats()
+        # One item per queued or unacknowledged event; the events themselves
+        # are queued unbounded, as a redelivered event keeps its room
+        self._room: asyncio.Queue = asyncio.Queue(maxsize=capacity)
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def accepts(self, event: Event) -> bool:
+        return self.event_types is None or event.type in self.event_types
+
+    @property
+    def full(self) -> bool:
+        return self._room.full()
+
+    @property
+    def pending(self) -> int:
+        """Number of the events queued or being handled."""
+        return self._room.qsize()
+
+    def _release(self) -> None:
+        self._room.get_nowait()
+        self._room.task_done()
+
+    def _enqueue(self, event: Event) -> None:
+        """Queue an event whose room was taken."""
+        self.stats.published += 1
+        self._queue.put_nowait((event, 1))
+
+    def _requeue(self, delivery: Delivery, attempt: int) -> None:
+        self._queue.put_nowait((delivery.event, attempt))
+
+    async def get(self) -> Delivery:
+        """Wait for the next event to handle."""
+        event, attempt = await self._queue.get()
+        return Delivery(self, event, attempt)
+
+    def _settle(self, delivery: Delivery, acked: bool) -> None:
+        if not acked and delivery.attempt < self.max_attempts:
+            self.stats.redelivered += 1
+            self._requeue(delivery, delivery.attempt + 1)
+            return
+        if acked:
+            self.stats.acked += 1
+        else:
+            self.stats.dead_lettered += 1
+            self.dead_letters.append(delivery.event)
+            logger.error(
+                f"Dead-lettered {delivery.event.type.value} event "
+                f"{delivery.event.id} of {delivery.event.deal_id} in "
+                f"{self.name} after {delivery.attempt} attempts"
+            )
+        self._release()
+
+    async def join(self) -> None:
+        """Wait until every published event is acknowledged or dead-lettered."""
+        await self._room.join()
+
+    def consume(
+        self,
+        handler: Handler,
+        concurrency: int = 1,
+        handler_timeout: Optional[float] = None,
+    ) -> "Consumer":
+        """Start workers handling the events of the subscription.
+
+        Args:
+            handler: Called with each event; an exception redelivers it
+            concurrency: Number of events handled at the same time
+            handler_timeout: Seconds after which a handler call fails
+
+        Returns:
+            Consumer running the workers
+        """
+        return Consumer(self, handler, concurrency, handler_timeout)
+
+
+class DealThreads:
+    """Blocking calls run in worker threads, one at a time per deal.
+
+    A thread cannot be cancelled: when the caller times out, the call keeps
+    running, and the next call for the same deal waits for it to finish.
+    """
+
+    def __init__(self):
+        self._running: Dict[str, asyncio.Future] = {}
+
+    async def idle(self, deal_id: str) -> None:
+        """Wait until no call of a deal is running."""
+        running = self._running.get(deal_id)
+        while running is not None and not running.done():
+            await asyncio.wait([running])
+            running = self._running.get(deal_id)
+
+    def _finished(self, deal_id: str, future: asyncio.Future) -> None:
+        if self._running.get(deal_id) is future:
+            del self._running[deal_id]
+        if not future.cancelled():
+            # Retrieved, as the caller of an abandoned call never awaits it
+            future.exception()
+
+    async def run(self, deal_id: str, function: Callable, *args) -> Any:
+        """Run a function in a worker thread once the deal is idle."""
+        await self.idle(deal_id)
+        future = asyncio.ensure_future(asyncio.to_thread(function, *args))
+        self._running[deal_id] = future
+        future.add_done_callback(lambda done: self._finished(deal_id, done))
+        return await asyncio.shield(future)
+
+
+class Consumer:
+    """Workers handling the events of a subscription."""
+
+    def __init__(
+        self,
+        subscription: Subscription,
+        handler: Handler,
+        concurrency: int = 1,
+        handler_timeout: Optional[float] = None,
+    ):
+        self.subscription = subscription
+        self.handler = handler
+        self.handler_timeout = handler_timeout
+        self._threads = getattr(handler, "threads", None) or DealThreads()
+        self._workers = [
+            asyncio.ensure_future(self._work()) for _ in range(concurrency)
+        ]
+
+    async def _handle(self, event: Event) -> None:
+        # A timed-out run of the deal is not counted against the timeout
+        await self._threads.idle(event.deal_id)
+        if inspect.iscoroutinefunction(self.handler):
+            call = self.handler(event)
+        else:
+            call = self._threads.run(event.deal_id, self.handler, event)
+        timeout = self.handler_timeout
+        # Worker threads inherit the deadline and stop at their next LLM call
+        with deadline_scope(timeout) if timeout is not None else nullcontext():
+            await asyncio.wait_for(call, timeout)
+
+    async def _work(self) -> None:
+        while True:
+            delivery = await self.subscription.get()
+            try:
+                await self._handle(delivery.event)
+            except asyncio.CancelledError:
+                # Stopped mid-event: it is delivered again, without counting
+                # the interrupted attempt
+                self.subscription._requeue(delivery, delivery.attempt)
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"Handling {delivery.event.type.value} event of "
+                    f"{delivery.event.deal_id} failed (attempt "
+                    f"{delivery.attempt}): {e}"
+                )
+                delivery.nack()
+            else:
+                delivery.ack()
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop the workers.
+
+        Args:
+            drain: Whether the published events are handled first
+        """
+        if drain:
+            await self.subscription.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+
+class MessageBus:
+    """Routes published events to the bounded queues of their subscriptions."""
+
+    def __init__(self, capacity: int = 1000, max_attempts: int = 3):
+        """Create a bus.
+
+        Args:
+            capacity: Default maximum number of queued or unacknowledged
+                events of a subscription
+            max_attempts: Default number of deliveries of an event
+        """
+        self.capacity = capacity
+        self.max_attempts = max_attempts
+        self.subscriptions: Dict[str, Subscription] = {}
+
+    def subscribe(
+        self,
+        name: str,
+        event_types: Optional[Iterable[EventType]] = None,
+        capacity: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ) -> Subscription:
+        """Return the subscription of a name, creating it if needed.
+
+        Args:
+            name: Name of the subscription, shared by its consumers
+            event_types: Types of the events received; None receives all
+            capacity: Maximum number of queued or unacknowledged events
+            max_attempts: Number of deliveries of an event
+        """
+        if name not in self.subscriptions:
+            self.subscriptions[name] = Subscription(
+                name,
+                event_types,
+                capacity or self.capacity,
+                max_attempts or self.max_attempts,
+            )
+        return self.subscriptions[name]
+
+    def _targets(self, event: Event) -> List[Subscription]:
+        return [sub for sub in self.subscriptions.values() if sub.accepts(event)]
+
+    def publish_nowait(self, event: Event) -> None:
+        """Publish an event without waiting.
+
+        Raises:
+            BusFull: If a subscription of the event has no room; the event is
+                not published
+        """
+        targets = self._targets(event)
+        full = [sub.name for sub in targets if sub.full]
+        if full:
+            raise BusFull(f"Subscriptions are full: {full}")
+        # Nothing runs in between, so every subscription still has room
+        for sub in targets:
+            sub._room.put_nowait(None)
+            sub._enqueue(event)
+
+    async def publish(self, event: Event, timeout: Optional[float] = None) -> None:
+        """Publish an event once its subscriptions have room.
+
+        Args:
+            event: Event to publish
+            timeout: Maximum seconds to wait for room; None waits indefinitely
+
+        Raises:
+            BusFull: If the timeout expires; the event is not published
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        taken: List[Subscription] = []
+        try:
+            for sub in self._targets(event):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                await asyncio.wait_for(sub._room.put(None), remaining)
+                taken.append(sub)
+        except BaseException as e:
+            for sub in taken:
+                sub._release()
+            if isinstance(e, asyncio.TimeoutError):
+                raise BusFull(f"No room for the event after {timeout}s") from e
+            raise
+        for sub in taken:
+            sub._enqueue(event)
+
+    def stats(self) -> Dict[str, SubscriptionStats]:
+        """Return the counters of each subscription."""
+        return {
+            name: sub.stats.model_copy(update={"pending": sub.pending})
+            for name, sub in self.subscriptions.items()
+        }
+
+
+def strategy_refresh_handler(
+    bus: MessageBus, run: Optional[Callable[[str], dict]] = None
+) -> Callable[[Event], Awaitable[None]]:
+    """Return a handler regenerating the strategy of updated deals.
+
+    Each refresh runs the agent in a worker thread and publishes a
+    STRATEGY_READY event with the strategy. Events published before the
+    latest successful refresh of their deal started are skipped, as that
+    refresh saw their update; a failed refresh skips nothing.
+
+    Args:
+        bus: Bus receiving the STRATEGY_READY events
+        run: Runs the agent for a deal and returns its final state; defaults
+            to run_agent
+    """
+    if run is None:
+        from agents.offer_negotiation.agent import run_agent as run
+
+    refreshed_at: Dict[str, float] = {}
+    threads = DealThreads()
+
+    async def refresh_strategy(event: Event) -> None:
+        if event.type not in REFRESH_EVENTS:
+            return
+        if event.created_at < refreshed_at.get(event.deal_id, float("-inf")):
+            logger.info(f"Strategy of {event.deal_id} already refreshed")
+            return
+        started = time.time()
+        result = await threads.run(event.deal_id, run, event.deal_id)
+        refreshed_at[event.deal_id] = max(
+            started, refreshed_at.get(event.deal_id, float("-inf"))
+        )
+        await bus.publish(
+            Event(
+                type=EventType.STRATEGY_READY,
+                deal_id=event.deal_id,
+                data={
+                    "strategy": result.get("strategy"),
+                    "rationale": result.get("rationale"),
+                    "prompt_version": result.get("prompt_version"),
+                    "trigger": event.id,
+                },
+            )
+        )
+
+    refresh_strategy.threads = threads
+    return refresh_strategy
+
+
+def create_message_bus() -> MessageBus:
+    """Create a bus with the settings of agent_settings.yaml."""
+    from agents.offer_negotiation.utils.agent_settings import load_agent_settings
+
+    settings = load_agent_settings().message_bus
+    return MessageBus(settings.capacity, settings.max_attempts)
+
+
+def serve_strategy_refreshes(
+    bus: MessageBus, run: Optional[Callable[[str], dict]] = None
+) -> Consumer:
+    """Refresh strategies on deal events, with the workers of agent_settings.yaml.
+
+    Args:
+        bus: Bus of the deal events
+        run: Runs the agent for a deal (see strategy_refresh_handler)
+
+    Returns:
+        Consumer of the "strategy_refresh" subscription
+    """
+    from agents.offer_negotiation.utils.agent_settings import load_agent_settings
+
+    settings = load_agent_settings().message_bus
+    return bus.subscribe("strategy_refresh", REFRESH_EVENTS).consume(
+        strategy_refresh_handler(bus, run),
+        concurrency=settings.concurrency,
+        handler_timeout=settings.handler_timeout,
+    )
@@ -1,3 +1,4 @@
+import argparse
 import logging
 import os
 import time
@@ -6,22 +7,16 @@ from pathlib import Path
 from pprint import pformat
 from typing import Dict
 
-import yaml
-from dotenv import load_dotenv
-
-from agents.offer_negotiation.agent import run_agent
 from config.app_config import config
 
-# Load environment variables from secrets file (if it exists)
-load_dotenv(config.secrets_env_path, override=True)
-
-# Load model settings
-with open(config.model_settings_path, "r") as f:
-    model_settings = yaml.safe_load(f)
+# The agent (langgraph, langchain, langsmith), yaml and dotenv are imported in
+# main() so that --help, --startup-profile and importing this module stay fast.
 
 
 # Configure logging
 def setup_logging():
+    config.log_file_path.parent.mkdir(parents=True, exist_ok=True)
+
     # Configure root logger
     logging.basicConfig(
         level=logging.INFO,
@@ -50,10 +45,11 @@ def setup_logging():
         logging.getLogger(logger_name).setLevel(logging.INFO)
 
 
-# Setup logging
-setup_logging()
 logger = logging.getLogger(__name__)
 
+# Modules imported to run the agent, measured by --startup-profile
+STARTUP_MODULES = ["run", "agents.offer_negotiation.agent"]
+
 
 def format_timing(start_time: float, end_time: float) -> str:
     """Format timing information in a readable way."""
@@ -72,6 +68,10 @@ def display_results(result: dict):
     if deal_id:
         print(f"📊 Deal ID: {deal_id}\n")
 
+    # Prompt version
+    if result.get("prompt_version"):
+        print(f"📝 Prompt Version: {result['prompt_version']}\n")
+
     # Decision Basis
     if "decision_basis" in result and result["decision_basis"]:
         print("🎯 Decision Rules Applied\n──────────────────────")
@@ -108,7 +108,87 @@ def display_results(result: dict):
     print()  # Final newline for spacing
 
 
-def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Run the offer negotiation agent.")
+    parser.add_argument(
+        "--deal-id",
+        nargs="+",
+        default=["DEAL123"],
+        help="Deal ID(s) to negotiate; several IDs are run as one batch",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile each graph node and write collapsed stacks to the logs dir",
+    )
+    parser.add_argument(
+        "--profile-interval-ms",
+        type=float,
+        help="Stack sampling interval of the profiler, in milliseconds",
+    )
+    parser.add_argument(
+        "--profile-sample-rate",
+        type=float,
+        help="Fraction of node executions to profile (0.0 - 1.0)",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Track per-node memory allocations and summarize them per batch",
+    )
+    parser.add_argument(
+        "--run-id",
+        help="Checkpoint the runs under this ID; running a deal again with the "
+        "ID of a failed run resumes it from the failed node",
+    )
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="Report the import time of the agent by module and exit",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.startup_profile:
+        from agents.offer_negotiation.utils.startup_profile import (
+            measure_import_times,
+            print_import_report,
+        )
+
+        print_import_report(measure_import_times(STARTUP_MODULES))
+        return
+
+    from dotenv import load_dotenv
+
+    from agents.offer_negotiation.agent import (
+        build_agent,
+        default_node_wrappers,
+        run_agent,
+    )
+    from agents.offer_negotiation.utils.memory_tracking import MemoryTracker
+    from agents.offer_negotiation.utils.model import get_llm, load_model_settings
+    from agents.offer_negotiation.utils.node_cache import NodeCache
+    from agents.offer_negotiation.utils.prompt_cache import get_prompt_cache_tracker
+
+    # Load environment variables from secrets file (if it exists)
+    load_dotenv(config.secrets_env_path, override=True)
+    setup_logging()
+    model_settings = load_model_settings()
+
+    # Command line flags override the profiling environment variables
+    if args.profile:
+        os.environ["AGENT_PROFILE"] = "true"
+    if args.profile_interval_ms is not None:
+        os.environ["AGENT_PROFILE_INTERVAL_MS"] = str(args.profile_interval_ms)
+    if args.profile_sample_rate is not None:
+        os.environ["AGENT_PROFILE_SAMPLE_RATE"] = str(args.profile_sample_rate)
+    if args.memory:
+        os.environ["AGENT_MEMORY_TRACKING"] = "true"
+
     try:
         # Validate configuration
         if not config.validate():
@@ -117,18 +197,35 @@ def main():
             )
             return
 
-        # Example usage
-        logger.info("Starting agent with deal DEAL123...")
+        # Share node wrappers across the batch so their results are aggregated,
+        # and build the graph once for all the deals
+        node_wrappers = default_node_wrappers()
+        llm = get_llm(model_settings)
+        agent_graph = build_agent(llm=llm, node_wrappers=node_wrappers)
+
+        for deal_id in args.deal_id:
+            logger.info(f"Starting agent with deal {deal_id}...")
+
+            # Run the agent
+            result = run_agent(
+                deal_id=deal_id,
+                model_settings=model_settings,
+                llm=llm,
+                run_id=args.run_id,
+                agent_graph=agent_graph,
+            )
 
-        # Run the agent
-        result = run_agent(deal_id="DEAL123", model_settings=model_settings)
+            # Debug logging to see what we got back
+            logger.debug("Raw result from agent:")
+            logger.debug(pformat(result))
 
-        # Debug logging to see what we got back
-        logger.debug("Raw result from agent:")
-        logger.debug(pformat(result))
+            # Display results in ASCII format
+            display_results(result)
 
-        # Display results in ASCII format
-        display_results(result)
+        for wrapper in node_wrappers:
+            if isinstance(wrapper, (MemoryTracker, NodeCache)):
+                wrapper.log_summary()
+        get_prompt_cache_tracker().log_summary()
 
     except Exception as e:
         logger.error(f"Error running agent: {str(e)}")
@@ -0,0 +1,90 @@
+from agents.offer_negotiation.agent import build_agent, invoke_agent, run_agent
+from agents.offer_negotiation.core.repositories.result_store import ResultStore
+from agents.offer_negotiation.utils.fake_llm import (
+    DEFAULT_STRATEGY_RESPONSE,
+    FakeChatModel,
+)
+from agents.offer_negotiation.utils.model import get_llm
+from benchmarks.bench_pipeline import main as run_benchmarks
+
+
+def test_agent_flow_with_fake_llm(tmp_path):
+    """Test a complete offline agent run with the deterministic fake LLM."""
+    store = ResultStore(tmp_path / "results.sqlite")
+    result = run_agent(deal_id="DEAL123", llm=FakeChatModel(), result_store=store)
+    store.close()
+
+    assert result["deal_id"] == "DEAL123"
+    assert result["strategy"] == DEFAULT_STRATEGY_RESPONSE
+    assert result["information_needs"]
+    assert result["domain_knowledge"]
+    assert [d["heuristic"] for d in result["decision_basis"]] == [
+        "Coverage Request → Business Interruption",
+        "High Risk → Enhanced Coverage",
+    ]
+    assert result["rationale"].startswith("Rationale for the proposed strategy")
+
+
+def test_compiled_agent_is_reusable():
+    """Test that a compiled agent can be invoked for several deals."""
+    agent_graph = build_agent(
+        llm=FakeChatModel(), node_wrappers=[], checkpointer=False, strategy_index=False
+    )
+    results = [invoke_agent(agent_graph, deal_id) for deal_id in ["DEAL123", "DEAL001"]]
+    assert [r["deal_id"] for r in results] == ["DEAL123", "DEAL001"]
+    assert all(r["strategy"] for r in results)
+
+
+def test_run_agent_reuses_a_given_graph(tmp_path, monkeypatch):
+    """Test that run_agent invokes a given graph instead of building one."""
+    llm = FakeChatModel()
+    agent_graph = build_agent(llm=llm, node_wrappers=[], checkpointer=False)
+
+    def fail(**kwargs):
+        raise AssertionError("run_agent built a graph")
+
+    monkeypatch.setattr("agents.offer_negotiation.agent.build_agent", fail)
+    store = ResultStore(tmp_path / "results.sqlite")
+    results = [
+        run_agent(deal_id, llm=llm, result_store=store, agent_graph=agent_graph)
+        for deal_id in ["DEAL123", "DEAL001"]
+    ]
+    assert [r["deal_id"] for r in results] == ["DEAL123", "DEAL001"]
+    assert [r.deal_id for r in store.find()] == ["DEAL001", "DEAL123"]
+    store.close()
+
+
+def test_get_llm_fake_provider():
+    """Test that the fake provider can be selected in model settings."""
+    llm = get_llm({"provider": "fake", "fake_latency_seconds": 0.0})
+    assert isinstance(llm, FakeChatModel)
+    assert llm.invoke("hello").usage_metadata["input_tokens"] == 1
+
+
+def test_benchmark_suite_smoke(tmp_path):
+    """Test that the benchmark suite runs and saves comparable results."""
+    output = tmp_path / "results.json"
+    args = [
+        "--sizes",
+        "10",
+        "--rule-batch-sizes",
+        "10",
+        "--min-time",
+        "0",
+        "--output",
+        str(output),
+    ]
+    results = run_benchmarks(args)
+    assert output.exists()
+    assert {r.name for r in results} >= {
+        "node.identify_information_needs",
+        "node.generate_strategy.prompt_build",
+        "end_to_end",
+        "rules.evaluate_batch",
+        "analytics.offer_trajectories",
+        "document_processor.parse",
+        "knowledge_base.retrieve",
+    }
+
+    # A second run can be compared against the first
+    run_benchmarks(args + ["--compare", str(output)])
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+
+from agents.offer_negotiation.agent import build_agent, invoke_agent
+from agents.offer_negotiation.utils.fake_llm import FakeChatModel
+from agents.offer_negotiation.utils.node_events import (
+    NodeEvent,
+    NodeEventPublisher,
+    NodeEventType,
+)
+from interfaces.cockpit_ui import Cockpit
+
+
+def _event(type, deal_id, node, timestamp, duration=None):
+    return NodeEvent(
+        type=type,
+        deal_id=deal_id,
+        node=node,
+        timestamp=timestamp,
+        duration_seconds=duration,
+    )
+
+
+def test_node_events_report_durations_chunks_and_tokens():
+    """Test the events published by the nodes of an agent run."""
+    publisher = NodeEventPublisher()
+    events = []
+    publisher.subscribe(events.append)
+    agent_graph = build_agent(
+        llm=FakeChatModel(),
+        node_wrappers=[publisher],
+        checkpointer=False,
+        strategy_index=False,
+    )
+    invoke_agent(agent_graph, "DEAL123")
+
+    finished = {e.node: e for e in events if e.type == NodeEventType.NODE_FINISHED}
+    counts = Counter((e.type, e.node) for e in events)
+    for node in finished:
+        assert (
+            counts[NodeEventType.NODE_STARTED, node]
+            == counts[NodeEventType.NODE_FINISHED, node]
+        )
+    assert counts[NodeEventType.NODE_FINISHED, "retrieve_domain_knowledge"] > 1
+    assert all(e.deal_id == "DEAL123" for e in events)
+    assert all(e.duration_seconds >= 0 for e in finished.values())
+    assert finished["collect_domain_knowledge"].chunk_count > 0
+    strategy = finished["generate_strategy"]
+    assert strategy.tokens.llm_calls == 1
+    assert strategy.tokens.input_tokens > 0 and strategy.tokens.output_tokens > 0
+    assert finished["compute_deal_features"].tokens.llm_calls == 0
+
+    # Without subscribers, nodes run without publishing
+    publisher.unsubscribe(events.append)
+    count = len(events)
+    invoke_agent(agent_graph, "DEAL001")
+    assert len(events) == count
+
+
+def test_stats_aggregate_runs_and_flag_stuck_nodes():
+    """Test run throughput and latency, node percentiles and stuck nodes."""
+    cockpit = Cockpit(NodeEventPublisher(), window_seconds=60, stuck_after=30)
+    now = time.time()
+    for i, deal_id in enumerate(["A", "B", "C"]):
+        start = now - 10 + i
+        for type, node, at, duration in [
+            (NodeEventType.NODE_STARTED, "generate_strategy", start, None),
+            (NodeEventType.NODE_FINISHED, "generate_strategy", start + 2, 2.0),
+            (NodeEventType.NODE_STARTED, "explain_rationale", start + 2, None),
+            (NodeEventType.NODE_FINISHED, "explain_rationale", start + 3, 1.0),
+        ]:
+            cockpit.publisher.publish(_event(type, deal_id, node, at, duration))
+    cockpit.publisher.publish(
+        _event(NodeEventType.NODE_STARTED, "D", "generate_strategy", now - 45)
+    )
+    cockpit.publisher.publish(
+        _event(NodeEventType.NODE_STARTED, "E", "generate_strategy", now - 1)
+    )
+
+    stats = cockpit.stats()
+    assert (stats.runs_finished, stats.runs_failed) == (3, 0)
+    assert stats.run_p50_seconds == 3.0
+    nodes = {n.node: n for n in stats.nodes}
+    assert nodes["generate_strategy"].finished == 3
+    assert nodes["generate_strategy"].p95_seconds == 2.0
+    assert [(r.deal_id, r.stuck) for r in stats.running] == [
+        ("D", True),
+        ("E", False),
+    ]
+
+    cockpit.publisher.publish(
+        NodeEvent(
+            type=NodeEventType.NODE_FAILED,
+            deal_id="D",
+            node="generate_strategy",
+            timestamp=time.time(),
+            duration_seconds=45.0,
+            error="NodeTimeoutError: budget spent",
+        )
+    )
+    stats = cockpit.stats()
+    assert (stats.runs_finished, stats.runs_failed) == (3, 1)
+    assert [r.deal_id for r in stats.running] == ["E"]
+
+
+def test_slow_clients_do_not_block_the_agent():
+    """Test that events are streamed and a stalled client only drops events."""
+
+    async def scenario():
+        publisher = NodeEventPublisher()
+        cockpit = Cockpit(publisher, max_queued_events=10, stats_interval=60)
+        cockpit.attach()
+        stalled = cockpit.connect()
+        stream = cockpit.stream(cockpit.connect())
+        assert (await stream.__anext__()).startswith("event: stats\n")
+
+        def publish():
+            for i in range(2000):
+                publisher.publish(
+                    _event(NodeEventType.NODE_STARTED, f"D{i}", "node", time.time())
+                )
+
+        start = time.perf_counter()
+        thread = threading.Thread(target=publish)
+        thread.start()
+        thread.join()
+        # The agent side never waits for the clients
+        assert time.perf_counter() - start < 1.0
+        await asyncio.sleep(0.05)
+
+        message = await stream.__anext__()
+        assert message.startswith("event: node_started\n")
+        assert '"deal_id": "D1990"' in message
+        assert stalled.queue.qsize() == 10 and stalled.dropped == 1990
+        assert cockpit.stats().clients == 2
+        await stream.aclose()
+        assert cockpit.stats().clients == 1
+        assert cockpit.stats().dropped_events == 1990 * 2
+
+    asyncio.run(scenario())
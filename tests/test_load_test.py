@@ -0,0 +1,29 @@
+from benchmarks.load_test import in_process_target, run_load_test
+
+
+def test_load_test_reports_windows():
+    """Test an in-process load test against the stubbed LLM."""
+    target = in_process_target(deal_count=20, llm_latency_ms=5, llm_latency_sigma=0.3)
+    deal_ids = [f"SYN{i:07d}" for i in range(20)]
+    report = run_load_test(
+        target, deal_ids, rate=20, ramp_to=40, duration=1.0, workers=4, window=0.5
+    )
+
+    assert report.requests >= 20
+    assert report.completed + report.errors == report.requests
+    assert report.latency_p50 is not None
+    assert report.latency_p50 <= report.latency_p99
+    assert len(report.windows) >= 2
+    assert report.windows[-1].offered_rate > report.windows[0].offered_rate
+
+
+def test_load_test_counts_errors():
+    """Test that target failures are reported as errors."""
+
+    def failing_target(deal_id):
+        raise RuntimeError("boom")
+
+    report = run_load_test(failing_target, ["SYN0000000"], rate=50, duration=0.2)
+    assert report.completed == 0
+    assert report.errors == report.requests
+    assert any(w.error_rate == 1.0 for w in report.windows)
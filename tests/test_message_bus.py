@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agents.offer_negotiation.utils.timeouts import remaining_time
+
+from interfaces.message_bus import (
+    REFRESH_EVENTS,
+    BusFull,
+    Event,
+    EventType,
+    MessageBus,
+    strategy_refresh_handler,
+)
+
+
+def _event(deal_id="DEAL123", type=EventType.DEAL_UPDATED):
+    return Event(type=type, deal_id=deal_id)
+
+
+def test_producers_get_backpressure():
+    """Test that a full subscription refuses or delays events until acked."""
+
+    async def scenario():
+        bus = MessageBus(capacity=2)
+        sub = bus.subscribe("refresh", REFRESH_EVENTS)
+        bus.publish_nowait(_event("A"))
+        bus.publish_nowait(_event("B"))
+        # Events of other types are not routed to the subscription
+        bus.publish_nowait(_event("A", EventType.STRATEGY_READY))
+        with pytest.raises(BusFull):
+            bus.publish_nowait(_event("C"))
+        with pytest.raises(BusFull):
+            await bus.publish(_event("C"), timeout=0.01)
+
+        # Handling an event frees its room only once it is acknowledged
+        delivery = await sub.get()
+        assert sub.full
+        waiting = asyncio.ensure_future(bus.publish(_event("C")))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        delivery.ack()
+        await asyncio.wait_for(waiting, 1)
+        assert bus.stats()["refresh"].pending == 2
+        assert bus.stats()["refresh"].published == 3
+
+    asyncio.run(scenario())
+
+
+def test_failed_events_are_redelivered_then_dead_lettered():
+    """Test at-least-once delivery with concurrent workers."""
+
+    async def scenario():
+        bus = MessageBus(capacity=10, max_attempts=3)
+        sub = bus.subscribe("refresh")
+        attempts = {}
+        active, peak = 0, 0
+
+        async def handler(event):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            attempts[event.deal_id] = attempts.get(event.deal_id, 0) + 1
+            if event.deal_id == "FLAKY" and attempts["FLAKY"] == 1:
+                raise RuntimeError("policy system unavailable")
+            if event.deal_id == "BROKEN":
+                raise RuntimeError("invalid deal")
+
+        consumer = sub.consume(handler, concurrency=3)
+        for deal_id in ["A", "B", "FLAKY", "BROKEN"]:
+            await bus.publish(_event(deal_id))
+        await asyncio.wait_for(consumer.stop(), 1)
+
+        assert attempts == {"A": 1, "B": 1, "FLAKY": 2, "BROKEN": 3}
+        assert peak == 3
+        assert [event.deal_id for event in sub.dead_letters] == ["BROKEN"]
+        stats = bus.stats()["refresh"]
+        assert (stats.acked, stats.redelivered, stats.dead_lettered) == (3, 3, 1)
+        assert stats.pending == 0
+
+    asyncio.run(scenario())
+
+
+def test_deal_updates_refresh_strategies():
+    """Test that updates trigger one refresh per deal and publish strategies."""
+
+    async def scenario():
+        bus = MessageBus(capacity=10)
+        ready = bus.subscribe("cockpit", [EventType.STRATEGY_READY])
+        runs = []
+
+        def run(deal_id):
+            runs.append(deal_id)
+            return {"strategy": f"Strategy for {deal_id}", "prompt_version": "v1"}
+
+        consumer = bus.subscribe("refresh", REFRESH_EVENTS).consume(
+            strategy_refresh_handler(bus, run), concurrency=1
+        )
+        # Updates queued before the refresh of their deal started are covered
+        await bus.publish(_event("DEAL123", EventType.OBJECTION_ADDED))
+        await bus.publish(_event("DEAL123"))
+        await bus.publish(_event("DEAL001"))
+        await asyncio.wait_for(consumer.stop(), 1)
+
+        assert runs == ["DEAL123", "DEAL001"]
+        delivery = await ready.get()
+        assert delivery.event.data["strategy"] == "Strategy for DEAL123"
+        assert ready.pending == 2
+
+    asyncio.run(scenario())
+
+
+def test_failed_refreshes_are_retried():
+    """Test that a redelivered event runs again after a failed refresh."""
+
+    async def scenario():
+        bus = MessageBus(capacity=10)
+        runs = []
+
+        def run(deal_id):
+            runs.append(deal_id)
+            if len(runs) == 1:
+                raise RuntimeError("policy system unavailable")
+            return {"strategy": f"Strategy for {deal_id}"}
+
+        sub = bus.subscribe("refresh", REFRESH_EVENTS)
+        consumer = sub.consume(strategy_refresh_handler(bus, run))
+        await bus.publish(_event("DEAL123"))
+        await asyncio.wait_for(consumer.stop(), 1)
+
+        assert runs == ["DEAL123", "DEAL123"]
+        stats = bus.stats()["refresh"]
+        assert (stats.acked, stats.redelivered, stats.dead_lettered) == (1, 1, 0)
+
+    asyncio.run(scenario())
+
+
+def _overlap_tracker():
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0, "runs": 0, "budgets": []}
+
+    def run(deal_id, seconds):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            state["runs"] += 1
+            state["budgets"].append(remaining_time())
+        try:
+            time.sleep(seconds)
+        finally:
+            with lock:
+                state["active"] -= 1
+
+    return state, run
+
+
+def test_timed_out_threads_are_not_run_twice():
+    """Test that a timed-out handler thread finishes before its redelivery."""
+    state, track = _overlap_tracker()
+
+    def handler(event):
+        track(event.deal_id, 0.2 if state["runs"] == 0 else 0.0)
+
+    async def scenario():
+        bus = MessageBus(capacity=10)
+        sub = bus.subscribe("refresh")
+        consumer = sub.consume(handler, concurrency=2, handler_timeout=0.05)
+        await bus.publish(_event("DEAL123"))
+        await asyncio.wait_for(consumer.stop(), 2)
+        return bus.stats()["refresh"]
+
+    stats = asyncio.run(scenario())
+    assert (state["runs"], state["peak"]) == (2, 1)
+    assert (stats.acked, stats.redelivered) == (1, 1)
+    # The handler timeout is the deadline of the LLM calls of the thread
+    assert all(0 < budget <= 0.05 for budget in state["budgets"])
+
+
+def test_timed_out_refreshes_are_not_run_twice():
+    """Test that a redelivered refresh waits for the timed-out run of its deal."""
+    state, track = _overlap_tracker()
+
+    def run(deal_id):
+        track(deal_id, 0.2 if state["runs"] == 0 else 0.0)
+        return {"strategy": f"Strategy for {deal_id}"}
+
+    async def scenario():
+        bus = MessageBus(capacity=10)
+        sub = bus.subscribe("refresh", REFRESH_EVENTS)
+        consumer = sub.consume(strategy_refresh_handler(bus, run), handler_timeout=0.05)
+        await bus.publish(_event("DEAL123"))
+        await asyncio.wait_for(consumer.stop(), 2)
+        return bus.stats()["refresh"]
+
+    stats = asyncio.run(scenario())
+    assert (state["runs"], state["peak"]) == (2, 1)
+    assert (stats.acked, stats.redelivered) == (1, 1)
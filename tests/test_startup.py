@@ -0,0 +1,65 @@
+from agents.offer_negotiation.utils.startup_profile import (
+    measure_import_times,
+    parse_importtime,
+)
+from config.app_config import AppConfig
+
+# Import-time budgets, in milliseconds (cumulative time of the module)
+RUN_IMPORT_BUDGET_MS = 150
+AGENT_IMPORT_BUDGET_MS = 600
+
+# Dependencies that must only be imported when the agent first runs
+HEAVY_MODULES = {
+    "langgraph",
+    "langchain_core",
+    "langchain_openai",
+    "langsmith",
+    "openai",
+    "yaml",
+    "dotenv",
+    "numpy",
+}
+
+
+def _loaded_packages(timings):
+    return {t.module.split(".")[0] for t in timings}
+
+
+def test_parse_importtime():
+    """Test parsing of the -X importtime output."""
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   json.decoder\n"
+        "import time:       300 |        420 | json\n"
+    )
+    timings = parse_importtime(output)
+    assert [t.module for t in timings] == ["json.decoder", "json"]
+    assert timings[0].depth == 1
+    assert timings[1].depth == 0
+    assert timings[1].cumulative_us == 420
+
+
+def test_run_import_is_lightweight():
+    """Test that importing run.py defers the agent and its dependencies."""
+    timings = measure_import_times(["run"])
+    assert not _loaded_packages(timings) & HEAVY_MODULES
+    run_timing = next(t for t in timings if t.module == "run")
+    assert run_timing.cumulative_us / 1000 < RUN_IMPORT_BUDGET_MS
+
+
+def test_agent_import_budget():
+    """Test that importing the agent defers graph construction dependencies."""
+    timings = measure_import_times(["agents.offer_negotiation.agent"])
+    assert not _loaded_packages(timings) & HEAVY_MODULES
+    agent_timing = next(
+        t for t in timings if t.module == "agents.offer_negotiation.agent"
+    )
+    assert agent_timing.cumulative_us / 1000 < AGENT_IMPORT_BUDGET_MS
+
+
+def test_config_has_no_import_side_effects(tmp_path, monkeypatch):
+    """Test that creating the config does not create the logs directory."""
+    logs_dir = tmp_path / "logs"
+    monkeypatch.setenv("LOGS_DIR", str(logs_dir))
+    assert AppConfig().log_file_path == logs_dir / "agent.log"
+    assert not logs_dir.exists()